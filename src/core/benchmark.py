@@ -0,0 +1,157 @@
+"""
+Medição de desempenho dos caminhos críticos e comparação com uma linha de base.
+
+Cada caso (BenchmarkCase) executa `ops` operações por rodada; o resultado guarda a
+mediana e o mínimo das rodadas e o custo por operação. `compare_results` aponta os
+casos que ficaram mais lentos que a base além de um limite (regressões).
+As definições dos casos e a linha de comando ficam em src/tools/benchmark.py.
+"""
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.15  # 15% mais lento que a base = regressão
+
+
+class SkipBenchmark(Exception):
+    """Levantada pelo setup de um caso quando ele não pode rodar (ex.: dependência ausente)."""
+
+
+class BenchmarkCase:
+    """Um caso de benchmark: `run(state)` executa `ops` operações."""
+
+    def __init__(self, name, run, ops, setup=None, teardown=None, repeat=5, warmup=1):
+        """
+        :param name: Nome único ("grupo/variação"), usado na comparação com a base.
+        :param run: Função(state) cronometrada; state vem do setup (ou None).
+        :param ops: Operações executadas por chamada de `run` (para o custo por operação).
+        :param setup: Função() -> state, fora da cronometragem (pode levantar SkipBenchmark).
+        :param teardown: Função(state) chamada ao final.
+        :param repeat: Rodadas cronometradas.
+        :param warmup: Rodadas descartadas antes de cronometrar.
+        """
+        self.name = name
+        self.run = run
+        self.ops = ops
+        self.setup = setup
+        self.teardown = teardown
+        self.repeat = repeat
+        self.warmup = warmup
+
+
+def run_case(case, clock=time.perf_counter):
+    """Executa um caso. Retorna o dict de resultado ({"skipped": motivo} se não pôde rodar)."""
+    try:
+        state = case.setup() if case.setup else None
+    except SkipBenchmark as e:
+        return {"skipped": str(e)}
+    try:
+        for _ in range(case.warmup):
+            case.run(state)
+        timings = []
+        for _ in range(case.repeat):
+            start = clock()
+            case.run(state)
+            timings.append(clock() - start)
+    finally:
+        if case.teardown:
+            case.teardown(state)
+    median = statistics.median(timings)
+    return {
+        "ops": case.ops,
+        "repeat": case.repeat,
+        "median_s": median,
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "per_op_us": median / case.ops * 1e6,
+        "ops_per_s": case.ops / median if median > 0 else None
+    }
+
+
+def run_cases(cases, progress=None):
+    """
+    Executa os casos em ordem.
+
+    :param progress: Função(nome, resultado) chamada após cada caso (ex.: imprimir).
+    :return: Documento de resultados (pronto para save_results).
+    """
+    results = {}
+    for case in cases:
+        result = run_case(case)
+        results[case.name] = result
+        if progress:
+            progress(case.name, result)
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": results
+    }
+
+
+def save_results(document, path):
+    """Grava os resultados em JSON (atômico: tmp + replace)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != RESULTS_VERSION:
+        raise ValueError(f"Versão de resultados não suportada em {path}: {document.get('version')}")
+    return document
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compara o custo por operação de cada caso presente (e não pulado) nos dois documentos.
+
+    :return: Lista de dicts {"name", "baseline_us", "current_us", "ratio", "status"}, com
+             status "regression" (mais lento que 1 + threshold), "improvement"
+             (mais rápido que 1 - threshold) ou "ok", ordenada pelo nome.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, result in sorted(current.get("results", {}).items()):
+        base = base_results.get(name)
+        if not base or "skipped" in base or "skipped" in result:
+            continue
+        ratio = result["per_op_us"] / base["per_op_us"] if base["per_op_us"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name,
+            "baseline_us": base["per_op_us"],
+            "current_us": result["per_op_us"],
+            "ratio": ratio,
+            "status": status
+        })
+    return rows
+
+
+def format_us(value):
+    """Custo por operação legível: '850 ns', '12.3 µs', '4.56 ms', '1.20 s'."""
+    if value < 1:
+        return f"{value * 1000:.0f} ns"
+    if value < 1000:
+        return f"{value:.1f} µs"
+    if value < 1e6:
+        return f"{value / 1000:.2f} ms"
+    return f"{value / 1e6:.2f} s"
@@ -0,0 +1,300 @@
+"""
+Arquivo de legendas em SQLite (modo WAL) com busca full-text (FTS5).
+
+Complementa os arquivos .txt do FileManager (limitados a 5 x 2MB): cada frase
+commitada é guardada com data e hora completas e o id da sessão, e pode ser
+encontrada por busca textual sem varrer arquivos. As inserções são feitas em lote
+na thread do GroupCommitWriter, nunca na thread da GUI; leituras usam conexões
+próprias (o WAL permite ler enquanto o escritor grava).
+"""
+import datetime
+import os
+import sqlite3
+import threading
+
+from src.core.group_commit_writer import GroupCommitWriter, DURABILITY_ALWAYS, DURABILITY_INTERVAL, DURABILITY_OS
+from src.core.caption_reader import iter_captions
+from src.utils.paths import get_captions_dir
+
+ARCHIVE_FILE = "captions_archive.db"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT 'live'
+);
+CREATE TABLE IF NOT EXISTS captions (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    ts TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_captions_ts ON captions(ts);
+CREATE INDEX IF NOT EXISTS idx_captions_session ON captions(session_id);
+"""
+
+# Tabela FTS5 com conteúdo externo (o texto fica só em `captions`), mantida por triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS captions_fts USING fts5(text, content='captions', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS captions_ai AFTER INSERT ON captions BEGIN
+    INSERT INTO captions_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS captions_ad AFTER DELETE ON captions BEGIN
+    INSERT INTO captions_fts(captions_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def format_timestamp(dt):
+    return dt.strftime(TIMESTAMP_FORMAT)[:-3]
+
+
+def fts_query(text):
+    """Converte texto livre em consulta FTS5: cada palavra entre aspas (todas obrigatórias)."""
+    words = [w for w in text.split() if w]
+    return " ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+class CaptionArchive:
+    """
+    Backend de arquivo de legendas em SQLite.
+    """
+
+    RETENTION_EVERY_BATCHES = 200  # Aplica a retenção a cada N lotes gravados
+
+    def __init__(self, db_path=None, retention_days=None, max_rows=None,
+                 durability=DURABILITY_INTERVAL, source="live"):
+        """
+        :param db_path: Caminho do banco (padrão: captions_archive.db na pasta de captions).
+        :param retention_days: Remove frases mais antigas que isso (None/0 = mantém tudo).
+        :param max_rows: Mantém no máximo este número de frases (None/0 = sem limite).
+        :param durability: "always" usa synchronous=FULL; as demais, NORMAL (seguro em WAL).
+        :param source: Origem registrada na sessão (ex.: "live", "import"). A sessão só é
+                       criada na primeira frase gravada (buscas não abrem sessões).
+        """
+        self.db_path = db_path or os.path.join(get_captions_dir(), ARCHIVE_FILE)
+        self.retention_days = retention_days or None
+        self.max_rows = max_rows or None
+        self._synchronous = "FULL" if durability == DURABILITY_ALWAYS else "NORMAL"
+        self.source = source
+        self.session_id = None  # Criada na thread do escritor, no primeiro lote
+        self._write_conn = None  # Criada na thread do escritor
+        self._batches_since_retention = 0
+        self._read_local = threading.local()
+
+        conn = self._connect()
+        try:
+            self.fts_enabled = self._create_schema(conn)
+            self._apply_retention(conn)
+        finally:
+            conn.close()
+
+        self._writer = GroupCommitWriter(
+            write_batch=self._insert_batch,
+            sync=lambda: None,  # Cada lote já é uma transação commitada
+            durability=DURABILITY_OS,
+            name="CaptionArchiveWriter"
+        )
+
+    def _connect(self, check_same_thread=True):
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self._synchronous}")
+        return conn
+
+    @staticmethod
+    def _create_schema(conn):
+        """Cria as tabelas. Retorna False se o SQLite não tiver FTS5 (busca cai para LIKE)."""
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"[ARCHIVE] FTS5 indisponível, usando busca simples: {e}")
+            return False
+
+    @staticmethod
+    def _start_session(conn, source, started_at=None):
+        """Insere uma sessão (dentro da transação de quem chama) e retorna o id."""
+        return conn.execute("INSERT INTO sessions(started_at, source) VALUES (?, ?)",
+                            (started_at or format_timestamp(datetime.datetime.now()), source)).lastrowid
+
+    # --- Escrita ---
+
+    def append(self, text, timestamp=None):
+        """
+        Enfileira uma frase para gravação em lote (não bloqueia).
+
+        :param timestamp: datetime da frase (padrão: agora).
+        :return: False se a fila estava cheia e a frase foi descartada.
+        """
+        if not text:
+            return True
+        ts = format_timestamp(timestamp or datetime.datetime.now())
+        return self._writer.submit((ts, text))
+
+    def flush(self, timeout=5.0):
+        """Espera as frases enfileiradas serem gravadas."""
+        return self._writer.flush(timeout)
+
+    def _insert_batch(self, rows):
+        """Grava um lote em uma única transação (roda na thread do escritor)."""
+        if self._write_conn is None:
+            # Usada só pelo escritor; fechada em close() depois que a thread terminou
+            self._write_conn = self._connect(check_same_thread=False)
+        with self._write_conn:
+            if self.session_id is None:
+                self.session_id = self._start_session(self._write_conn, self.source)
+            self._write_conn.executemany("INSERT INTO captions(session_id, ts, text) VALUES (?, ?, ?)",
+                                         [(self.session_id, ts, text) for ts, text in rows])
+
+        self._batches_since_retention += 1
+        if self._batches_since_retention >= self.RETENTION_EVERY_BATCHES:
+            self._batches_since_retention = 0
+            self._apply_retention(self._write_conn)
+
+    def _apply_retention(self, conn):
+        """Remove frases fora da política de retenção (idade e/ou quantidade)."""
+        try:
+            with conn:
+                if self.retention_days:
+                    cutoff = datetime.datetime.now() - datetime.timedelta(days=self.retention_days)
+                    conn.execute("DELETE FROM captions WHERE ts < ?", (format_timestamp(cutoff),))
+                if self.max_rows:
+                    conn.execute("DELETE FROM captions WHERE id <= "
+                                 "(SELECT id FROM captions ORDER BY id DESC LIMIT 1 OFFSET ?)", (self.max_rows,))
+        except sqlite3.Error as e:
+            print(f"[ARCHIVE] Erro ao aplicar retenção: {e}")
+
+    def import_text_files(self, paths, date=None):
+        """
+        Importa em lote arquivos no formato do FileManager ("[HH:MM:SS] texto").
+
+        As datas vêm de caption_reader.iter_captions (virada da meia-noite incluída);
+        `date` fixa a data da primeira linha de cada arquivo. Frases já arquivadas (mesmo
+        segundo e mesmo texto, ex.: gravadas ao vivo ou importadas antes) são ignoradas,
+        então importar de novo não duplica. Cada arquivo com frases novas vira uma sessão
+        com origem "import". Roda na thread de quem chama, com conexão própria e uma
+        transação por arquivo.
+
+        :param paths: Arquivos a importar (.txt, .cdelta ou os mesmos comprimidos em .gz).
+        :param date: datetime.date da primeira linha de cada arquivo (opcional).
+        :return: Número de frases importadas.
+        """
+        total = 0
+        conn = self._connect()
+        try:
+            for path in paths:
+                rows = []
+                seen = set()
+                for dt, text in iter_captions([path], start_date=date):
+                    second = dt.replace(microsecond=0)
+                    if not text or (second, text) in seen or self._is_archived(conn, second, text):
+                        continue
+                    seen.add((second, text))
+                    rows.append((format_timestamp(second), text))
+                if not rows:
+                    continue
+                with conn:
+                    session_id = self._start_session(conn, "import", started_at=rows[0][0])
+                    conn.executemany("INSERT INTO captions(session_id, ts, text) VALUES (?, ?, ?)",
+                                     [(session_id, ts, text) for ts, text in rows])
+                total += len(rows)
+                print(f"[ARCHIVE] {len(rows)} frase(s) importada(s) de {path}")
+        finally:
+            conn.close()
+        return total
+
+    @staticmethod
+    def _is_archived(conn, second, text):
+        """Já existe a frase no mesmo segundo (frases ao vivo têm milissegundos; usa o índice de ts)."""
+        start = format_timestamp(second)
+        end = format_timestamp(second + datetime.timedelta(seconds=1))
+        return conn.execute("SELECT 1 FROM captions WHERE ts >= ? AND ts < ? AND text = ? LIMIT 1",
+                            (start, end, text)).fetchone() is not None
+
+    def clear(self, timeout=5.0):
+        """
+        Apaga todas as frases e sessões anteriores ("Limpar Captions"), depois de gravar o
+        que estava na fila. O banco é compactado (VACUUM) para o texto apagado não
+        continuar no arquivo.
+
+        :return: True se concluiu.
+        """
+        self._writer.flush(timeout)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM captions")  # O trigger remove do índice FTS
+                if self.session_id is None:
+                    conn.execute("DELETE FROM sessions")
+                else:
+                    conn.execute("DELETE FROM sessions WHERE id != ?", (self.session_id,))
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return True
+        except sqlite3.Error as e:
+            print(f"[ARCHIVE] Erro ao limpar o arquivo: {e}")
+            return False
+        finally:
+            conn.close()
+
+    # --- Leitura ---
+
+    def _read_conn(self):
+        """Conexão de leitura por thread (leituras não bloqueiam o escritor no modo WAL)."""
+        conn = getattr(self._read_local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            self._read_local.conn = conn
+        return conn
+
+    def search(self, text, limit=50, session_id=None):
+        """
+        Busca frases que contenham todas as palavras de `text`.
+
+        :return: Lista de tuplas (ts, session_id, texto), mais recentes primeiro; vazia se
+                 `text` não tiver nenhuma palavra (o FTS5 rejeita consulta vazia).
+        """
+        if not text.split():
+            return []
+        conn = self._read_conn()
+        params = []
+        if self.fts_enabled:
+            sql = ("SELECT c.ts, c.session_id, c.text FROM captions_fts f "
+                   "JOIN captions c ON c.id = f.rowid WHERE captions_fts MATCH ?")
+            params.append(fts_query(text))
+        else:
+            sql = "SELECT c.ts, c.session_id, c.text FROM captions c WHERE 1=1"
+            for word in text.split():
+                sql += " AND c.text LIKE ?"
+                params.append(f"%{word}%")
+        if session_id is not None:
+            sql += " AND c.session_id = ?"
+            params.append(session_id)
+        sql += " ORDER BY c.ts DESC, c.id DESC LIMIT ?"
+        params.append(limit)
+        return conn.execute(sql, params).fetchall()
+
+    def captions_between(self, start, end):
+        """Frases com start <= ts < end (strings "YYYY-MM-DD HH:MM:SS"), em ordem cronológica."""
+        return self._read_conn().execute(
+            "SELECT ts, session_id, text FROM captions WHERE ts >= ? AND ts < ? ORDER BY ts, id",
+            (start, end)).fetchall()
+
+    def count(self):
+        return self._read_conn().execute("SELECT COUNT(*) FROM captions").fetchone()[0]
+
+    def close(self, timeout=5.0):
+        """Grava o que estiver na fila (espera limitada) e fecha as conexões."""
+        if not self._writer.close(timeout):
+            print(f"[ARCHIVE] Escritor não terminou em {timeout}s; {self._writer.pending_count()} frase(s) perdida(s)")
+        if self._write_conn is not None:
+            self._write_conn.close()
+            self._write_conn = None
+        conn = getattr(self._read_local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._read_local.conn = None
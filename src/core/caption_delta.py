@@ -0,0 +1,158 @@
+"""
+Formato compacto de legendas com codificação delta de prefixo (.cdelta).
+
+Frases consecutivas costumam repetir um prefixo longo (expansões e correções que
+passam pelo estabilizador). Cada linha guarda só o tamanho do prefixo comum com a
+frase anterior e o sufixo novo; a cada N linhas vai um keyframe com o texto completo,
+de onde a decodificação pode começar (acesso aleatório via índice de tempo).
+
+Formato (UTF-8, uma frase por linha, cabeçalho opcional iniciado por "#"):
+    HH:MM:SS<TAB>K<TAB>texto completo        (keyframe)
+    HH:MM:SS<TAB>n<TAB>sufixo                (n = caracteres reaproveitados da frase anterior)
+"""
+import os
+
+from src.utils.compression import open_text
+
+DELTA_EXTENSION = ".cdelta"
+FORMAT_HEADER = "#caption-delta v1"
+KEYFRAME = "K"
+DEFAULT_KEYFRAME_EVERY = 32
+MIN_SHARED_PREFIX = 4  # Prefixos menores não compensam: grava keyframe
+
+
+def is_delta_path(path):
+    """Verifica se o caminho é de um arquivo .cdelta (comprimido ou não)."""
+    if path.endswith(".gz"):
+        path = path[:-3]
+    return path.endswith(DELTA_EXTENSION)
+
+
+def shared_prefix_len(a, b):
+    return len(os.path.commonprefix((a, b)))
+
+
+class DeltaEncoder:
+    """Codifica frases em registros delta; o estado é a frase anterior do mesmo arquivo."""
+
+    def __init__(self, keyframe_every=DEFAULT_KEYFRAME_EVERY):
+        self.keyframe_every = max(1, keyframe_every)
+        self.reset()
+
+    def reset(self):
+        """Recomeça do zero (novo arquivo): a próxima frase será keyframe."""
+        self._previous = None
+        self._since_keyframe = 0
+
+    def encode(self, clock, text):
+        """
+        :param clock: Horário "HH:MM:SS".
+        :return: Tupla (registro sem "\\n", é_keyframe).
+        """
+        text = text.replace("\n", " ")
+        prefix = 0
+        if self._previous is not None and self._since_keyframe < self.keyframe_every - 1:
+            prefix = shared_prefix_len(self._previous, text)
+        self._previous = text
+        if prefix < MIN_SHARED_PREFIX:
+            self._since_keyframe = 0
+            return f"{clock}\t{KEYFRAME}\t{text}", True
+        self._since_keyframe += 1
+        return f"{clock}\t{prefix}\t{text[prefix:]}", False
+
+
+def parse_record(record):
+    """
+    :return: Tupla (segundos desde 00:00, prefixo ou None se keyframe, texto/sufixo),
+             ou None se a linha não for um registro (cabeçalho, linha vazia ou inválida).
+    """
+    record = record.rstrip("\r\n")
+    if not record or record.startswith("#"):
+        return None
+    parts = record.split("\t", 2)
+    if len(parts) != 3:
+        return None
+    clock, marker, payload = parts
+    try:
+        h, m, s = (int(x) for x in clock.split(":"))
+        prefix = None if marker == KEYFRAME else int(marker)
+    except ValueError:
+        return None
+    return h * 3600 + m * 60 + s, prefix, payload
+
+
+class DeltaDecoder:
+    """Reconstrói as frases; deve começar em um keyframe (início do arquivo ou offset do índice)."""
+
+    def __init__(self):
+        self._previous = None
+
+    def decode(self, record):
+        """
+        :return: Tupla (segundos desde 00:00, texto, é_keyframe) ou None se não for registro.
+        :raises ValueError: Delta sem keyframe anterior.
+        """
+        parsed = parse_record(record)
+        if parsed is None:
+            return None
+        seconds, prefix, payload = parsed
+        if prefix is None:
+            text = payload
+        elif self._previous is None:
+            raise ValueError("Registro delta sem keyframe anterior")
+        else:
+            text = self._previous[:prefix] + payload
+        self._previous = text
+        return seconds, text, prefix is None
+
+
+def format_clock(seconds):
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def iter_text_lines(records):
+    """Converte registros .cdelta em linhas no formato .txt ("[HH:MM:SS] texto\\n")."""
+    decoder = DeltaDecoder()
+    for record in records:
+        decoded = decoder.decode(record)
+        if decoded is not None:
+            seconds, text, _ = decoded
+            yield f"[{format_clock(seconds)}] {text}\n"
+
+
+def txt_to_delta(src_path, dst_path, keyframe_every=DEFAULT_KEYFRAME_EVERY):
+    """
+    Converte um arquivo .txt (ou .txt.gz) do FileManager para .cdelta.
+    Linhas sem timestamp são ignoradas.
+
+    :return: Número de frases convertidas.
+    """
+    from src.core.caption_reader import parse_line
+
+    encoder = DeltaEncoder(keyframe_every)
+    count = 0
+    with open_text(src_path) as src, open(dst_path, "w", encoding="utf-8", newline="\n") as dst:
+        dst.write(FORMAT_HEADER + "\n")
+        for line in src:
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            seconds, text = parsed
+            record, _ = encoder.encode(format_clock(seconds), text)
+            dst.write(record + "\n")
+            count += 1
+    return count
+
+
+def delta_to_txt(src_path, dst_path):
+    """
+    Converte um arquivo .cdelta (ou .cdelta.gz) para o formato .txt do FileManager.
+
+    :return: Número de frases convertidas.
+    """
+    count = 0
+    with open_text(src_path) as src, open(dst_path, "w", encoding="utf-8") as dst:
+        for line in iter_text_lines(src):
+            dst.write(line)
+            count += 1
+    return count
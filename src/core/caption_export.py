@@ -0,0 +1,113 @@
+"""
+Exportação em streaming das legendas para SRT, WebVTT e JSON Lines.
+
+Uma única passada pelos arquivos alimenta todos os formatos pedidos. O fim de
+cada cue é o início do próximo, limitado por uma duração máxima; só uma cue fica
+em memória por vez.
+"""
+import datetime
+import json
+
+DEFAULT_MAX_CUE_S = 6.0  # Duração máxima de uma cue (frase seguida de silêncio longo)
+MIN_CUE_S = 1.0  # Timestamps têm resolução de 1s: frases no mesmo segundo ganham 1s
+
+
+def _clock(delta, separator):
+    total_ms = int(round(delta.total_seconds() * 1000))
+    hours, rest = divmod(total_ms, 3600 * 1000)
+    minutes, rest = divmod(rest, 60 * 1000)
+    seconds, ms = divmod(rest, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{ms:03d}"
+
+
+class SrtWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write_cue(self, index, start, end, text, origin):
+        self.f.write(f"{index}\n{_clock(start - origin, ',')} --> {_clock(end - origin, ',')}\n{text}\n\n")
+
+
+class VttWriter:
+    def __init__(self, f):
+        self.f = f
+        self.f.write("WEBVTT\n\n")
+
+    def write_cue(self, index, start, end, text, origin):
+        self.f.write(f"{_clock(start - origin, '.')} --> {_clock(end - origin, '.')}\n{text}\n\n")
+
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write_cue(self, index, start, end, text, origin):
+        self.f.write(json.dumps({
+            "index": index,
+            "start": start.isoformat(timespec="milliseconds"),
+            "end": end.isoformat(timespec="milliseconds"),
+            "text": text
+        }, ensure_ascii=False) + "\n")
+
+
+WRITERS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "jsonl": JsonlWriter,
+}
+
+
+def iter_cues(captions, max_cue_s=DEFAULT_MAX_CUE_S):
+    """
+    Converte (datetime, texto) em (início, fim, texto) olhando uma frase à frente.
+
+    :param captions: Iterável em ordem cronológica (ex.: caption_reader.iter_captions).
+    :param max_cue_s: Duração máxima de cada cue em segundos.
+    """
+    max_duration = datetime.timedelta(seconds=max_cue_s)
+    min_duration = datetime.timedelta(seconds=min(MIN_CUE_S, max_cue_s))
+    pending = None
+    for start, text in captions:
+        if pending is not None:
+            prev_start, prev_text = pending
+            end = start if start - prev_start >= min_duration else prev_start + min_duration
+            yield prev_start, min(end, prev_start + max_duration), prev_text
+        pending = (start, text)
+    if pending is not None:
+        yield pending[0], pending[0] + max_duration, pending[1]
+
+
+def export_captions(captions, outputs, max_cue_s=DEFAULT_MAX_CUE_S, origin=None):
+    """
+    Escreve as legendas em vários formatos numa única passada.
+
+    :param captions: Iterável de (datetime, texto) em ordem cronológica.
+    :param outputs: Dict formato -> caminho (formatos: "srt", "vtt", "jsonl").
+    :param max_cue_s: Duração máxima de cada cue em segundos.
+    :param origin: Instante que vira 00:00:00 nas legendas SRT/VTT (padrão: meia-noite
+                   do dia da primeira frase, o que mantém o horário real para sessões de um dia).
+    :return: Número de cues escritas.
+    """
+    unknown = set(outputs) - set(WRITERS)
+    if unknown:
+        raise ValueError(f"Formato(s) de exportação desconhecido(s): {', '.join(sorted(unknown))}")
+
+    files = []
+    try:
+        writers = []
+        for fmt, path in outputs.items():
+            f = open(path, "w", encoding="utf-8")
+            files.append(f)
+            writers.append(WRITERS[fmt](f))
+
+        count = 0
+        for start, end, text in iter_cues(captions, max_cue_s):
+            if origin is None:
+                origin = datetime.datetime.combine(start.date(), datetime.time())
+            count += 1
+            for writer in writers:
+                writer.write_cue(count, start, end, text, origin)
+        return count
+    finally:
+        for f in files:
+            f.close()
@@ -0,0 +1,216 @@
+"""
+Acesso aleatório às linhas de todo o histórico de legendas, com memória limitada.
+
+Uma varredura em streaming registra só o início de cada bloco de linhas (arquivo,
+offset, primeira linha). Para mostrar a linha N, o bloco que a contém é lido a partir
+do offset e guardado em um cache LRU pequeno; o resto do arquivo nunca é carregado.
+Funciona com .txt, .cdelta e os históricos comprimidos (.gz).
+
+Ler um bloco pode custar caro (num .gz a leitura descomprime desde o início do
+arquivo); a GUI usa peek() e pede os blocos ausentes a uma thread (HistoryBlockLoader).
+"""
+import bisect
+import threading
+from collections import OrderedDict
+
+from src.core.caption_delta import format_clock
+from src.core.caption_reader import resolve_caption_path
+from src.core.time_index import iter_parsed
+
+BLOCK_LINES = 64  # Linhas por bloco do índice
+CACHE_BLOCKS = 32  # Blocos decodificados mantidos em memória
+
+
+class CaptionLineStore:
+    """
+    Índice esparso de linhas sobre uma lista de arquivos de legenda (ordem cronológica).
+
+    row(i) é seguro para chamar de uma thread (ex.: a GUI) enquanto outra usa iter_rows().
+    """
+
+    def __init__(self, paths, block_lines=BLOCK_LINES, cache_blocks=CACHE_BLOCKS):
+        self.paths = list(paths)
+        self.block_lines = block_lines
+        self.cache_blocks = cache_blocks
+        self._block_rows = []  # Primeira linha de cada bloco (para bisect)
+        self._blocks = []  # (índice do arquivo, offset, quantidade de linhas)
+        self.row_count = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.row_count
+
+    def build(self, should_stop=None):
+        """
+        Varre os arquivos e monta o índice de blocos.
+
+        :param should_stop: Função opcional; se retornar True a varredura para (índice parcial).
+        """
+        for file_index in range(len(self.paths)):
+            if should_stop is not None and should_stop():
+                return
+            self._scan_file(file_index)
+
+    def refresh_last_file(self):
+        """Revarre só o último arquivo (o atual, que continua crescendo)."""
+        if not self.paths:
+            return
+        last = len(self.paths) - 1
+        with self._lock:
+            while self._blocks and self._blocks[-1][0] == last:
+                self._blocks.pop()
+                self.row_count = self._block_rows.pop()
+            self._cache = OrderedDict((k, v) for k, v in self._cache.items() if k < len(self._blocks))
+        self._scan_file(last)
+
+    def _scan_file(self, file_index):
+        path = resolve_caption_path(self.paths[file_index])
+        self.paths[file_index] = path
+        try:
+            block_start = None  # (offset, primeira linha) do bloco aberto
+            block_count = 0
+            for offset, _, _, anchor in iter_parsed(path, 0):
+                # Blocos só começam em linhas onde a leitura pode começar (keyframes no .cdelta)
+                if block_start is None or (block_count >= self.block_lines and anchor):
+                    if block_start is not None:
+                        self._append_block(file_index, block_start, block_count)
+                    block_start = (offset, self.row_count)
+                    block_count = 0
+                block_count += 1
+                self.row_count += 1
+            if block_start is not None:
+                self._append_block(file_index, block_start, block_count)
+        except (OSError, ValueError) as e:
+            print(f"[LINE_STORE] Erro ao indexar {path}: {e}")
+
+    def _append_block(self, file_index, block_start, count):
+        offset, first_row = block_start
+        with self._lock:
+            self._block_rows.append(first_row)
+            self._blocks.append((file_index, offset, count))
+
+    def _load_block(self, block_index):
+        with self._lock:
+            rows = self._cache.get(block_index)
+            if rows is not None:
+                self._cache.move_to_end(block_index)
+                return rows
+            file_index, offset, count = self._blocks[block_index]
+            path = self.paths[file_index]
+
+        rows = []
+        try:
+            for _, seconds, text, _ in iter_parsed(resolve_caption_path(path), offset):
+                rows.append((seconds, text))
+                if len(rows) >= count:
+                    break
+        except (OSError, ValueError) as e:
+            print(f"[LINE_STORE] Erro ao ler {path}: {e}")
+
+        with self._lock:
+            self._cache[block_index] = rows
+            while len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+        return rows
+
+    def row(self, index):
+        """
+        :return: Tupla (segundos desde 00:00, texto) da linha `index`, ou None se fora do intervalo.
+                 Lê o bloco do disco se ele não estiver no cache.
+        """
+        if index < 0 or index >= self.row_count:
+            return None
+        block_index = self.block_of(index)
+        rows = self._load_block(block_index)
+        position = index - self._block_rows[block_index]
+        return rows[position] if position < len(rows) else None
+
+    def block_of(self, index):
+        """Índice do bloco que contém a linha `index`."""
+        return bisect.bisect_right(self._block_rows, index) - 1
+
+    def block_bounds(self, block_index):
+        """Tupla (primeira linha, quantidade de linhas) do bloco."""
+        with self._lock:
+            return self._block_rows[block_index], self._blocks[block_index][2]
+
+    def peek(self, index):
+        """
+        Como row(), mas sem ler o disco: None se o bloco da linha não estiver no cache
+        (ver is_cached). Para a thread da GUI; o bloco ausente é carregado em outra thread.
+        """
+        if index < 0 or index >= self.row_count:
+            return None
+        block_index = self.block_of(index)
+        with self._lock:
+            rows = self._cache.get(block_index)
+            if rows is None:
+                return None
+            self._cache.move_to_end(block_index)
+        position = index - self._block_rows[block_index]
+        return rows[position] if position < len(rows) else None
+
+    def is_cached(self, index):
+        """True se o bloco da linha `index` já está no cache (peek não depende do disco)."""
+        if index < 0 or index >= self.row_count:
+            return False
+        with self._lock:
+            return self.block_of(index) in self._cache
+
+    def row_file(self, index):
+        """Caminho do arquivo que contém a linha `index`."""
+        block_index = self.block_of(index)
+        return self.paths[self._blocks[block_index][0]] if block_index >= 0 else None
+
+    def iter_rows(self, start=0):
+        """
+        Gera (índice, segundos, texto) em streaming a partir da linha `start`, sem usar o cache
+        (para buscas em outra thread). Usa uma cópia do índice tirada no início.
+        """
+        with self._lock:
+            blocks = list(self._blocks)
+            block_rows = list(self._block_rows)
+        if not blocks or start >= self.row_count:
+            return
+        i = max(0, bisect.bisect_right(block_rows, start) - 1)
+        while i < len(blocks):
+            file_index, offset, _ = blocks[i]
+            # Blocos seguidos do mesmo arquivo são lidos em uma única passada
+            j = i
+            file_rows = 0
+            while j < len(blocks) and blocks[j][0] == file_index:
+                file_rows += blocks[j][2]
+                j += 1
+            row = block_rows[i]
+            path = resolve_caption_path(self.paths[file_index])
+            try:
+                for _, seconds, text, _ in iter_parsed(path, offset):
+                    if row >= block_rows[i] + file_rows:
+                        break  # Linhas gravadas depois da indexação ficam de fora
+                    if row >= start:
+                        yield row, seconds, text
+                    row += 1
+            except (OSError, ValueError) as e:
+                print(f"[LINE_STORE] Erro ao ler {path}: {e}")
+            i = j
+
+
+def format_row(row):
+    """Formata (segundos, texto) como "[HH:MM:SS] texto"."""
+    seconds, text = row
+    return f"[{format_clock(seconds)}] {text}"
+
+
+def iter_matches(store, query, start=0):
+    """
+    Busca incremental: gera (índice, segundos, texto) das linhas que contêm todas as
+    palavras de `query` (sem diferenciar maiúsculas), em streaming.
+    """
+    words = [w.casefold() for w in query.split()]
+    if not words:
+        return
+    for index, seconds, text in store.iter_rows(start):
+        folded = text.casefold()
+        if all(w in folded for w in words):
+            yield index, seconds, text
@@ -0,0 +1,179 @@
+"""
+Leitura em streaming dos arquivos de legenda do FileManager.
+
+Os arquivos guardam só "[HH:MM:SS] texto". Este módulo percorre histórico e
+arquivo atual em ordem cronológica, linha a linha (memória constante), e
+reconstrói data e hora completas: a data inicial de cada arquivo vem do seu índice
+de tempo (.tidx) ou, sem índice, do fim do arquivo (modificação / data no nome do
+histórico); dentro do arquivo, cada volta do relógio (ex.: 23:59:58 -> 00:00:03)
+avança um dia.
+Arquivos no formato compacto (.cdelta) são decodificados de forma transparente.
+"""
+import datetime
+import glob
+import os
+import re
+
+from src.core.caption_delta import DELTA_EXTENSION, is_delta_path, iter_text_lines
+from src.utils.compression import open_text
+
+LINE_RE = re.compile(r'\[(\d{2}):(\d{2}):(\d{2})\]\s?(.*)')
+
+# Recuo maior que isso entre linhas consecutivas é considerado virada do dia
+# (recuos menores são relógio ajustado/NTP e não mudam a data)
+ROLLOVER_THRESHOLD_S = 12 * 3600
+
+# captions_hist_<sequência>_<AAAAMMDD>: data da rotação (fim do arquivo)
+_HISTORY_DATE_RE = re.compile(r"captions_hist_\d+_(\d{8})")
+
+CURRENT_PREFIX = "captions_current"
+# Formatos gravados pelo FileManager; a troca de formato deixa arquivos dos dois na pasta
+CAPTION_EXTENSIONS = (".txt", DELTA_EXTENSION)
+
+
+def parse_line(line):
+    """
+    :return: Tupla (segundos desde 00:00, texto) ou None se a linha não tiver timestamp.
+    """
+    match = LINE_RE.match(line)
+    if not match:
+        return None
+    h, m, s, text = match.groups()
+    return int(h) * 3600 + int(m) * 60 + int(s), text.rstrip("\r\n")
+
+
+def caption_lines(f, path):
+    """Linhas de um arquivo aberto com open_text, sempre no formato "[HH:MM:SS] texto"."""
+    return iter_text_lines(f) if is_delta_path(path) else f
+
+
+def list_caption_files(output_dir, current_file="captions_current.txt"):
+    """
+    Arquivos de legenda em ordem cronológica: históricos (do mais antigo) e depois o atual.
+    Inclui históricos comprimidos (.gz) e os dois formatos (.txt e .cdelta): depois de uma
+    troca de formato, os arquivos do formato anterior continuam na leitura e na exportação.
+    """
+    current = os.path.join(output_dir, current_file)
+    history = []
+    for extension in CAPTION_EXTENSIONS:
+        pattern = os.path.join(output_dir, "captions_hist*" + extension)
+        plain = glob.glob(pattern)
+        # Se a compressão ainda não removeu o original, o .gz fica de fora (evita frases duplicadas)
+        history += plain + [p for p in glob.glob(pattern + ".gz") if p[:-3] not in plain]
+        # Atual do outro formato ainda não rotacionado (o FileManager o move para o histórico)
+        stale = os.path.join(output_dir, CURRENT_PREFIX + extension)
+        if stale != current and os.path.exists(stale):
+            history.append(stale)
+    history.sort(key=os.path.getmtime)
+    if os.path.exists(current):
+        history.append(current)
+    return history
+
+
+def resolve_caption_path(path):
+    """O histórico pode ter sido comprimido depois de listado: usa o .gz se o original sumiu."""
+    if not os.path.exists(path) and os.path.exists(path + ".gz"):
+        return path + ".gz"
+    return path
+
+
+def _line_span(path):
+    """(segundos da primeira linha, segundos da última, viradas do dia entre elas) ou (None, None, 0)."""
+    first = last = None
+    rollovers = 0
+    with open_text(path) as f:
+        for line in caption_lines(f, path):
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            seconds = parsed[0]
+            if first is None:
+                first = seconds
+            elif last - seconds > ROLLOVER_THRESHOLD_S:
+                rollovers += 1
+            last = seconds
+    return first, last, rollovers
+
+
+def history_name_date(path):
+    """Data no nome do histórico (captions_hist_<seq>_<AAAAMMDD>), ou None (atual, nomes antigos)."""
+    match = _HISTORY_DATE_RE.match(os.path.basename(path))
+    if not match:
+        return None
+    try:
+        return datetime.datetime.strptime(match.group(1), "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def _indexed_start_date(path):
+    """Data do primeiro registro do índice de tempo (data completa da primeira linha), ou None."""
+    from src.core import time_index  # time_index importa este módulo
+    try:
+        records = time_index.load_index(path)
+        if records and time_index.is_index_valid(path, records):
+            return datetime.date.fromtimestamp(records[0][0])
+    except (OSError, ValueError, OverflowError):
+        pass
+    return None
+
+
+def guess_start_date(path, use_index=True):
+    """
+    Data da primeira linha de um arquivo.
+
+    Com índice de tempo válido, é a data do primeiro registro. Sem ele, parte do fim do
+    arquivo: a data de modificação, limitada ao fim do dia do nome nos históricos (a
+    modificação muda ao copiar os arquivos), recuando um dia por virada do relógio
+    entre a primeira linha e esse fim.
+
+    :param use_index: False para ignorar o .tidx (ex.: ao reconstruí-lo).
+    """
+    if use_index:
+        indexed = _indexed_start_date(path)
+        if indexed is not None:
+            return indexed
+    end = datetime.datetime.fromtimestamp(os.path.getmtime(path))
+    name_date = history_name_date(path)
+    if name_date is not None:
+        end = min(end, datetime.datetime.combine(name_date, datetime.time(23, 59, 59)))
+    first, last, rollovers = _line_span(path)
+    if first is None:
+        return end.date()
+    end_seconds = end.hour * 3600 + end.minute * 60 + end.second
+    # Última linha com horário posterior ao fim: ela foi escrita no dia anterior ao fim
+    days = rollovers + (1 if last > end_seconds else 0)
+    return end.date() - datetime.timedelta(days=days)
+
+
+def iter_captions(paths, start_date=None):
+    """
+    Gera (datetime, texto) para cada linha com timestamp, em todos os arquivos, em ordem.
+
+    :param paths: Arquivos em ordem cronológica (ex.: list_caption_files()).
+    :param start_date: Força a data da primeira linha; as seguintes (em todos os arquivos)
+                       só avançam nas viradas do relógio. Padrão: guess_start_date de cada
+                       arquivo, então lacunas entre arquivos (dias sem legenda) são respeitadas.
+    """
+    current_date = start_date
+    last_seconds = None
+    for path in paths:
+        path = resolve_caption_path(path)
+        try:
+            if start_date is None:
+                current_date = guess_start_date(path)
+                last_seconds = None
+            f = open_text(path)
+        except OSError as e:
+            print(f"[CAPTION_READER] Erro ao abrir {path}: {e}")
+            continue
+        with f:
+            for line in caption_lines(f, path):
+                parsed = parse_line(line)
+                if parsed is None:
+                    continue
+                seconds, text = parsed
+                if last_seconds is not None and last_seconds - seconds > ROLLOVER_THRESHOLD_S:
+                    current_date += datetime.timedelta(days=1)
+                last_seconds = seconds
+                yield datetime.datetime.combine(current_date, datetime.time()) + datetime.timedelta(seconds=seconds), text
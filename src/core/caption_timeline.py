@@ -0,0 +1,160 @@
+"""
+Linha do tempo de legendas sintéticas: qual texto está na tela em cada instante.
+
+É a parte "sem imagem" do gerador sintético (ver src/utils/synthetic_captions.py):
+decide palavra a palavra o que aparece, aplica cintilação (flicker) determinística
+e fornece a transcrição de referência (ground truth) para medir o pipeline.
+
+Modos:
+- "expanding": a frase cresce palavra a palavra, fica na tela por `hold_s` e é
+  substituída pela próxima (Zoom, YouTube, Teams).
+- "scrolling": o texto corre continuamente e as linhas antigas sobem (Live Captions).
+"""
+import bisect
+import random
+
+MODE_EXPANDING = "expanding"
+MODE_SCROLLING = "scrolling"
+MODES = (MODE_EXPANDING, MODE_SCROLLING)
+
+MAX_SCROLL_WORDS = 60  # No modo rolante, só as últimas palavras cabem na tela
+
+# Trocas de letras parecidas, como um frame mal renderizado/capturado
+_TYPO_MAP = {"e": "c", "o": "0", "l": "1", "a": "o", "i": "l", "s": "5", "m": "rn"}
+
+DEFAULT_SENTENCES = (
+    "Bom dia a todos e obrigado por participarem da reuniao",
+    "Hoje vamos revisar o andamento do projeto e os proximos passos",
+    "A equipe terminou a integracao com o servidor na semana passada",
+    "Ainda temos dois bugs abertos que precisam de atencao",
+    "O deploy da nova versao esta previsto para sexta feira",
+    "Alguem tem alguma duvida sobre o cronograma",
+    "Vamos combinar uma revisao de codigo para amanha de manha",
+    "Os testes automatizados estao passando no ambiente de homologacao",
+    "Precisamos atualizar a documentacao antes da entrega",
+    "Obrigado pessoal e ate a proxima reuniao",
+)
+
+
+class CaptionTimeline:
+    """Texto visível em função do tempo (segundos desde o início), com transcrição de referência."""
+
+    def __init__(self, sentences=DEFAULT_SENTENCES, words_per_second=3.0, hold_s=1.5,
+                 mode=MODE_EXPANDING, flicker_rate=0.0, seed=0, loop=True):
+        """
+        :param sentences: Frases da transcrição, em ordem.
+        :param words_per_second: Velocidade com que as palavras aparecem.
+        :param hold_s: Tempo que a frase completa fica parada antes da próxima.
+        :param mode: "expanding" ou "scrolling".
+        :param flicker_rate: Probabilidade (0-1) de um frame sair com defeito
+                             (sem a última palavra, em branco ou com letra trocada).
+        :param seed: Semente da cintilação (mesma semente = mesmos defeitos).
+        :param loop: Recomeça a transcrição ao chegar ao fim.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Modo desconhecido: {mode}")
+        if words_per_second <= 0:
+            raise ValueError("words_per_second deve ser positivo")
+        self.sentences = [s.split() for s in sentences if s.split()]
+        if not self.sentences:
+            raise ValueError("A transcrição não tem nenhuma frase")
+        self.words_per_second = words_per_second
+        self.hold_s = hold_s
+        self.mode = mode
+        self.flicker_rate = flicker_rate
+        self.seed = seed
+        self.loop = loop
+
+        # Instante em que a primeira palavra de cada frase aparece
+        self._starts = []
+        start = 0.0
+        for words in self.sentences:
+            self._starts.append(start)
+            start += (len(words) - 1) / words_per_second + hold_s
+        self.duration = start
+
+    def _locate(self, t):
+        """(ciclo, índice da frase, palavras visíveis da frase) no instante t (None antes do início)."""
+        if t < 0:
+            return None
+        cycle = 0
+        if t >= self.duration:
+            if not self.loop:
+                last = len(self.sentences) - 1
+                return 0, last, len(self.sentences[last])
+            cycle, t = divmod(t, self.duration)
+        index = bisect.bisect_right(self._starts, t) - 1
+        words = self.sentences[index]
+        shown = min(len(words), int((t - self._starts[index]) * self.words_per_second) + 1)
+        return int(cycle), index, shown
+
+    def text_at(self, t):
+        """Texto limpo (sem defeitos) visível no instante t."""
+        position = self._locate(t)
+        if position is None:
+            return ""
+        cycle, index, shown = position
+        if self.mode == MODE_EXPANDING:
+            return " ".join(self.sentences[index][:shown])
+
+        # Rolante: frases anteriores continuam na tela até saírem por cima
+        visible = list(self.sentences[index][:shown])
+        before = cycle * len(self.sentences) + index  # Frases já completas antes desta
+        back = 1
+        while len(visible) < MAX_SCROLL_WORDS and back <= before:
+            visible[:0] = self.sentences[(index - back) % len(self.sentences)]
+            back += 1
+        return " ".join(visible[-MAX_SCROLL_WORDS:])
+
+    def frame_text(self, t, frame_index):
+        """
+        Texto do frame `frame_index` no instante t, com cintilação determinística.
+
+        :return: (texto, teve_defeito)
+        """
+        text = self.text_at(t)
+        if not text or self.flicker_rate <= 0:
+            return text, False
+        rng = random.Random(self.seed * 1000003 + frame_index)
+        if rng.random() >= self.flicker_rate:
+            return text, False
+        kind = rng.randrange(3)
+        if kind == 0:
+            words = text.split()
+            return " ".join(words[:-1]), True
+        if kind == 1:
+            return "", True
+        positions = [i for i, ch in enumerate(text) if ch in _TYPO_MAP]
+        if not positions:
+            return text, False
+        i = rng.choice(positions)
+        return text[:i] + _TYPO_MAP[text[i]] + text[i + 1:], True
+
+    def events(self, seconds, fps=5.0):
+        """
+        Fluxo de texto "como o OCR veria": (instante, texto do frame) a `fps` quadros
+        por segundo durante `seconds` (com a cintilação), no formato de process_batch.
+        """
+        frames = int(seconds * fps)
+        return [(index / fps, self.frame_text(index / fps, index)[0]) for index in range(frames)]
+
+    def transcript(self, duration=None):
+        """
+        Transcrição de referência: frases completas até `duration` (padrão: um ciclo).
+
+        :return: Lista de dicts {"start", "end", "text"}: a frase começa a aparecer em
+                 `start` e está completa (pronta para ser commitada) em `end`.
+        """
+        duration = self.duration if duration is None else duration
+        entries = []
+        cycle = 0
+        while True:
+            offset = cycle * self.duration
+            for start, words in zip(self._starts, self.sentences):
+                end = offset + start + (len(words) - 1) / self.words_per_second
+                if end > duration:
+                    return entries
+                entries.append({"start": offset + start, "end": end, "text": " ".join(words)})
+            if not self.loop:
+                return entries
+            cycle += 1
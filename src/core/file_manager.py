@@ -1,18 +1,54 @@
 import os
+import re
 import datetime
 import glob
+import threading
+import time
 from src.utils.paths import get_captions_dir
+from src.core.group_commit_writer import GroupCommitWriter, DURABILITY_INTERVAL
+from src.core.caption_reader import (CAPTION_EXTENSIONS, CURRENT_PREFIX, iter_captions, list_caption_files,
+                                     resolve_caption_path)
+from src.core.caption_export import export_captions, DEFAULT_MAX_CUE_S
+from src.core import time_index
+from src.core.perf_stats import COMMIT_TO_DISK
+from src.core.frame_trace import PERSISTED
+from src.core.caption_delta import DeltaEncoder, DELTA_EXTENSION, FORMAT_HEADER, DEFAULT_KEYFRAME_EVERY
+from src.utils.compression import GZ_SUFFIX, apply_retention, compress_file, is_compressed
+
+# captions_hist_<sequência>_<AAAAMMDD>.txt[.gz]; históricos antigos (captions_hist1..4) não têm sequência
+_HISTORY_SEQ_RE = re.compile(r"captions_hist_(\d+)_\d{8}")
+
 
 class FileManager:
-    MAX_FILES = 5  # 1 atual + 4 históricos
     CURRENT_FILE = "captions_current.txt"
+    FORMAT_TXT = "txt"
+    FORMAT_DELTA = "delta"  # Compacto: prefixo comum + sufixo (ver caption_delta)
     
-    def __init__(self, output_dir=None):
+    def __init__(self, output_dir=None, durability=DURABILITY_INTERVAL,
+                 fsync_interval_ms=1000, fsync_every_lines=50, index_every=time_index.DEFAULT_EVERY,
+                 caption_format=FORMAT_TXT, keyframe_every=DEFAULT_KEYFRAME_EVERY,
+                 compress_history=True, history_max_bytes=100 * 1024 * 1024):
         """
         Gerencia a escrita de legendas em arquivo.
-        Mantém apenas 5 arquivos (1 atual + 4 históricos).
         Não cria novo arquivo a cada inicialização - reutiliza o arquivo atual.
-        Rola automaticamente para novo arquivo quando atinge 2MB.
+        Rola automaticamente para novo arquivo quando atinge 2MB: o arquivo que sai vira
+        captions_hist_<sequência>_<data> e é comprimido (gzip) em segundo plano; os
+        históricos mais antigos são removidos quando o total passa de history_max_bytes.
+
+        A gravação acontece em uma thread própria (GroupCommitWriter): append_text só
+        enfileira a linha, e várias linhas são gravadas e sincronizadas de uma vez.
+
+        :param output_dir: Pasta dos arquivos (padrão: pasta de captions do usuário).
+        :param durability: "always" (fsync a cada linha), "interval" (fsync a cada
+                           fsync_interval_ms ou fsync_every_lines) ou "os" (sem fsync).
+        :param fsync_interval_ms: Intervalo máximo entre fsyncs na política "interval".
+        :param fsync_every_lines: Linhas que forçam um fsync (só na política "interval").
+        :param index_every: Linhas entre registros do índice de tempo (.tidx) de cada arquivo.
+        :param caption_format: "txt" ("[HH:MM:SS] texto") ou "delta" (.cdelta, bem menor
+                               quando frases seguidas repetem o começo).
+        :param keyframe_every: No formato "delta", linhas entre frases gravadas por inteiro.
+        :param compress_history: Comprime os históricos rotacionados em segundo plano.
+        :param history_max_bytes: Tamanho total máximo dos históricos (None = sem limite).
         """
         self.output_dir = output_dir or get_captions_dir()
         self.MAX_FILE_SIZE = 2 * 1024 * 1024  # 2MB
@@ -20,94 +56,241 @@ class FileManager:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
+        if caption_format not in (self.FORMAT_TXT, self.FORMAT_DELTA):
+            raise ValueError(f"Formato de legenda desconhecido: {caption_format}")
+        self.caption_format = caption_format
+        self.extension = DELTA_EXTENSION if caption_format == self.FORMAT_DELTA else ".txt"
+        self.current_name = CURRENT_PREFIX + self.extension
+        self._encoder = DeltaEncoder(keyframe_every) if caption_format == self.FORMAT_DELTA else None
+
+        # Sequência dos históricos (dos dois formatos: a numeração é uma só)
+        self._history_seq = max([self._history_seq_of(f) for f in self._get_historical_files()] + [0])
+        # Atual deixado no outro formato (troca de formato nas configurações) vira histórico
+        self._retire_other_current_files()
+
         # Usa arquivo fixo para o atual (não cria novo a cada inicialização)
-        self.filepath = os.path.join(self.output_dir, self.CURRENT_FILE)
-        
-        # Abre o arquivo atual em modo append (cria se não existir)
-        self.file = open(self.filepath, "a", encoding="utf-8")
+        self.filepath = os.path.join(self.output_dir, self.current_name)
+        self.index_every = index_every
+        self.perf_stats = None  # PerfStats: latência append_text -> arquivo (painel de desempenho)
+        self.on_persisted = None  # Callback(lista de FrameTrace) após gravar um lote (thread do escritor)
+        self._open_current_file()
         print(f"Arquivo de legenda aberto: {self.filepath}")
+
+        # Manutenção (compressão + retenção) dos históricos, fora da thread de escrita
+        self.compress_history = compress_history
+        self.history_max_bytes = history_max_bytes
+        self._maintenance_lock = threading.Lock()
+        self._maintenance_threads = []
+        historical_files = self._get_historical_files()
+
+        # Protege o handle do arquivo (usado pela thread do escritor e por limpar/fechar)
+        self._file_lock = threading.Lock()
+        self._writer = GroupCommitWriter(
+            write_batch=self._write_lines,
+            sync=self._sync_file,
+            durability=durability,
+            fsync_interval_ms=fsync_interval_ms,
+            fsync_every_lines=fsync_every_lines,
+            name="CaptionWriter",
+            on_exit=self._close_files
+        )
+
+        # Históricos deixados sem comprimir (sessão interrompida ou nomes antigos)
+        self._start_maintenance([f for f in historical_files if not is_compressed(f)])
     
+    def _open_current_file(self):
+        """
+        Abre o arquivo atual em modo append (cria se não existir), com tamanho em memória
+        (um único stat na abertura, nenhum por linha) e índice de tempo, reconstruído se
+        faltar ou estiver inconsistente.
+        """
+        self.file = open(self.filepath, "a", encoding="utf-8")
+        self._current_size = os.path.getsize(self.filepath)
+        if self._encoder is not None:
+            # Cada arquivo começa em keyframe: decodificável sem os anteriores
+            self._encoder.reset()
+            if self._current_size == 0:
+                self.file.write(FORMAT_HEADER + "\n")
+                self._current_size += len(FORMAT_HEADER) + len(os.linesep)
+                self.file.flush()
+        self._index = self._open_index()
+
+    def _open_index(self):
+        try:
+            if not time_index.is_index_valid(self.filepath):
+                time_index.rebuild_index(self.filepath, every=self.index_every)
+            return time_index.TimeIndexWriter(self.filepath, every=self.index_every)
+        except Exception as e:
+            print(f"[FILE_MANAGER] Erro ao abrir índice de tempo: {e}")
+            return None
+
+    def _close_index(self):
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    @staticmethod
+    def _remove_index(caption_path):
+        index_path = time_index.index_path_for(caption_path)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
     def _get_historical_files(self):
-        """Retorna lista de arquivos históricos ordenados por data de modificação (mais antigo primeiro)."""
-        pattern = os.path.join(self.output_dir, "captions_hist*.txt")
-        files = glob.glob(pattern)
-        # Ordena por data de modificação (mais antigo primeiro)
+        """
+        Retorna lista de arquivos históricos (comprimidos ou não, .txt e .cdelta) ordenados
+        por data de modificação (mais antigo primeiro).
+        """
+        files = []
+        for extension in CAPTION_EXTENSIONS:
+            pattern = os.path.join(self.output_dir, "captions_hist*" + extension)
+            files += glob.glob(pattern) + glob.glob(pattern + GZ_SUFFIX)
+        # Ordena por data de modificação (mais antigo primeiro); a compressão preserva a data
         files.sort(key=lambda f: os.path.getmtime(f))
         return files
+
+    @staticmethod
+    def _history_seq_of(path):
+        match = _HISTORY_SEQ_RE.match(os.path.basename(path))
+        return int(match.group(1)) if match else 0
+
+    def _next_history_path(self, extension=None, date=None):
+        """Nome do próximo histórico: sequência crescente (nunca reutilizada) + data da rotação."""
+        self._history_seq += 1
+        date = (date or datetime.date.today()).strftime("%Y%m%d")
+        return os.path.join(self.output_dir,
+                            f"captions_hist_{self._history_seq:06d}_{date}{extension or self.extension}")
+
+    def _retire_other_current_files(self):
+        """
+        Move para o histórico o arquivo atual de outro formato (com o seu índice), para que
+        ele continue na retenção, na limpeza e na leitura depois da troca de formato.
+        A data do nome é a da última gravação nele.
+        """
+        for extension in CAPTION_EXTENSIONS:
+            if extension == self.extension:
+                continue
+            path = os.path.join(self.output_dir, CURRENT_PREFIX + extension)
+            if not os.path.exists(path):
+                continue
+            try:
+                if os.path.getsize(path) == 0:
+                    os.remove(path)
+                    self._remove_index(path)
+                    continue
+                date = datetime.date.fromtimestamp(os.path.getmtime(path))
+                hist_path = self._next_history_path(extension, date)
+                os.rename(path, hist_path)
+                index_path = time_index.index_path_for(path)
+                if os.path.exists(index_path):
+                    os.replace(index_path, time_index.index_path_for(hist_path))
+                print(f"[FILE_MANAGER] Arquivo atual no formato anterior movido para o histórico: {hist_path}")
+            except Exception as e:
+                print(f"[FILE_MANAGER] Erro ao mover {path} para o histórico: {e}")
     
     def _rotate_file_if_needed(self):
-        """Verifica se o arquivo atingiu 2MB e rotaciona se necessário."""
+        """
+        Verifica se o arquivo atingiu 2MB e rotaciona se necessário (usa o tamanho em memória).
+        Aqui só há fechar/renomear/abrir; compressão e retenção rodam em outra thread.
+        """
         try:
-            if not os.path.exists(self.filepath):
-                return
-            
-            current_size = os.path.getsize(self.filepath)
+            current_size = self._current_size
             if current_size >= self.MAX_FILE_SIZE:
                 print(f"Arquivo atingiu {current_size / (1024*1024):.2f}MB. Rotacionando...")
                 
-                # Fecha o arquivo atual
+                # Fecha o arquivo atual e o seu índice
                 self.file.close()
-                
-                # Obtém arquivos históricos existentes
-                historical_files = self._get_historical_files()
-                
-                # Se já temos 4 históricos, remove o mais antigo
-                if len(historical_files) >= (self.MAX_FILES - 1):
-                    oldest_file = historical_files[0]
-                    try:
-                        os.remove(oldest_file)
-                        print(f"Arquivo histórico mais antigo removido: {oldest_file}")
-                    except Exception as e:
-                        print(f"Erro ao remover arquivo histórico: {e}")
-                    # Remove da lista para não contar
-                    historical_files = historical_files[1:]
+                self._close_index()
                 
                 # Renomeia o arquivo atual para histórico
-                # Encontra o próximo número disponível (1 a 4)
-                # Se já temos 4 históricos, o mais antigo foi removido, então temos espaço
-                next_hist_num = len(historical_files) + 1
-                # Garante que não exceda 4
-                if next_hist_num > (self.MAX_FILES - 1):
-                    next_hist_num = (self.MAX_FILES - 1)
-                
-                new_hist_path = os.path.join(self.output_dir, f"captions_hist{next_hist_num}.txt")
-                
+                new_hist_path = self._next_history_path()
+                rotated = False
                 try:
                     os.rename(self.filepath, new_hist_path)
+                    rotated = True
                     print(f"Arquivo atual renomeado para histórico: {new_hist_path}")
+                    # O índice acompanha o arquivo (offsets continuam válidos)
+                    index_path = time_index.index_path_for(self.filepath)
+                    if os.path.exists(index_path):
+                        os.replace(index_path, time_index.index_path_for(new_hist_path))
                 except Exception as e:
                     print(f"Erro ao renomear arquivo: {e}")
                 
                 # Cria novo arquivo atual
-                self.filepath = os.path.join(self.output_dir, self.CURRENT_FILE)
-                self.file = open(self.filepath, "a", encoding="utf-8")
+                self.filepath = os.path.join(self.output_dir, self.current_name)
+                self._open_current_file()
                 print(f"Novo arquivo atual criado: {self.filepath}")
+
+                if rotated:
+                    self._start_maintenance([new_hist_path])
         except Exception as e:
             print(f"Erro ao verificar/rotacionar arquivo: {e}")
             import traceback
             traceback.print_exc()
     
+    def _start_maintenance(self, closed_files):
+        """Comprime os históricos recém-fechados e aplica a retenção, em uma thread separada."""
+        if not closed_files:
+            return
+        if not self.compress_history and self.history_max_bytes is None:
+            return
+        self._maintenance_threads = [t for t in self._maintenance_threads if t.is_alive()]
+        thread = threading.Thread(target=self._run_maintenance, args=(list(closed_files),),
+                                  name="CaptionHistoryMaintenance", daemon=True)
+        self._maintenance_threads.append(thread)
+        thread.start()
+
+    def _run_maintenance(self, closed_files):
+        with self._maintenance_lock:
+            try:
+                if self.compress_history:
+                    for path in closed_files:
+                        if os.path.exists(path) and not is_compressed(path):
+                            compress_file(path)  # O .tidx continua válido (offsets do texto descomprimido)
+                if self.history_max_bytes is not None:
+                    removed = apply_retention(self._get_historical_files(), self.history_max_bytes,
+                                              companions=(time_index.INDEX_SUFFIX,))
+                    if removed:
+                        print(f"[FILE_MANAGER] Retenção removeu {len(removed)} histórico(s) antigo(s)")
+            except Exception as e:
+                print(f"[FILE_MANAGER] Erro na manutenção dos históricos: {e}")
+
+    def _wait_maintenance(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._maintenance_threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
     def clear_all_files(self):
         """Remove todos os arquivos de captions (atual e históricos)."""
+        # Grava o que ainda estiver na fila antes de apagar
+        self._writer.flush()
+        with self._file_lock:
+            # Com o lock nenhuma rotação nova começa; espera a compressão em andamento
+            self._wait_maintenance()
+            return self._clear_all_files_locked()
+
+    def _clear_all_files_locked(self):
         try:
             # Remove arquivo atual se existir
+            self._close_index()
             if os.path.exists(self.filepath):
                 self.file.close()
                 os.remove(self.filepath)
                 print(f"Arquivo atual removido: {self.filepath}")
+            self._remove_index(self.filepath)
             
             # Remove todos os arquivos históricos
             historical_files = self._get_historical_files()
             for hist_file in historical_files:
                 try:
                     os.remove(hist_file)
+                    self._remove_index(hist_file)
                     print(f"Arquivo histórico removido: {hist_file}")
                 except Exception as e:
                     print(f"Erro ao remover arquivo histórico {hist_file}: {e}")
             
             # Cria novo arquivo atual vazio
-            self.filepath = os.path.join(self.output_dir, self.CURRENT_FILE)
-            self.file = open(self.filepath, "a", encoding="utf-8")
+            self.filepath = os.path.join(self.output_dir, self.current_name)
+            self._open_current_file()
             print(f"Novo arquivo atual criado: {self.filepath}")
             return True
         except Exception as e:
@@ -116,122 +299,152 @@ class FileManager:
             traceback.print_exc()
             return False
 
-    def append_text(self, text):
+    def append_text(self, text, trace=None):
         """
-        Escreve uma linha de texto no arquivo com timestamp atual e força o flush.
+        Enfileira uma linha de texto com o timestamp atual para gravação.
+        Não bloqueia: a escrita e o fsync acontecem na thread do escritor.
+
+        :param trace: FrameTrace da frase (opcional); recebe o instante da gravação.
+        :return: False se a fila estava cheia e a linha foi descartada.
         """
         if not text:
-            return
+            return True
+
+        now = datetime.datetime.now()
+        if not self._writer.submit((now.timestamp(), now.strftime("%H:%M:%S"), text, trace)):
+            print(f"[FILE_MANAGER] Fila de gravação cheia, linha descartada: {text[:50]}...")
+            return False
+        return True
+
+    def flush(self, timeout=5.0):
+        """Espera as linhas enfileiradas serem gravadas (e sincronizadas, conforme a política)."""
+        return self._writer.flush(timeout)
+
+    def _format_line(self, clock, text):
+        """Linha no formato do arquivo. Retorna (linha, pode_iniciar_leitura)."""
+        if self._encoder is None:
+            return f"[{clock}] {text}\n", True
+        record, keyframe = self._encoder.encode(clock, text)
+        return record + "\n", keyframe
 
-        # Verifica e rotaciona arquivo antes de escrever
-        self._rotate_file_if_needed()
+    def _write_lines(self, entries):
+        """Grava um lote de (timestamp, HH:MM:SS, texto, trace) e atualiza o índice de tempo (roda na thread do escritor)."""
+        with self._file_lock:
+            for timestamp, clock, text, _ in entries:
+                # Verifica e rotaciona arquivo antes de escrever (antes de codificar: delta é por arquivo)
+                self._rotate_file_if_needed()
+                line, anchor = self._format_line(clock, text)
+                if self._index is not None:
+                    self._index.note_line(timestamp, self._current_size, anchor)
+                self.file.write(line)
+                # Em modo texto, cada "\n" vira os.linesep no disco
+                self._current_size += len(line.encode("utf-8")) + len(os.linesep) - 1
+            self.file.flush()
+            if self._index is not None:
+                self._index.flush()
+        written_at = time.time()
+        if self.perf_stats is not None and self.perf_stats.enabled:
+            for timestamp, _, _, _ in entries:
+                self.perf_stats.observe(COMMIT_TO_DISK, (written_at - timestamp) * 1000)
+        traces = [trace for _, _, _, trace in entries if trace is not None]
+        if traces:
+            for trace in traces:
+                trace.mark(PERSISTED, written_at)
+            if self.on_persisted is not None:
+                try:
+                    self.on_persisted(traces)
+                except Exception as e:
+                    print(f"[FILE_MANAGER] Erro no callback de gravação: {e}")
+        print(f"[FILE_MANAGER] {len(entries)} linha(s) gravada(s) no arquivo")
+
+    def _sync_file(self):
+        """Força os dados gravados ao disco (roda na thread do escritor)."""
+        with self._file_lock:
+            if self.file and not self.file.closed:
+                os.fsync(self.file.fileno())
+
+    def read_range(self, start, end):
+        """
+        Gera (datetime, texto) das legendas com start <= horário < end, em todos os arquivos.
 
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        line = f"[{timestamp}] {text}\n"
+        Usa o índice de tempo de cada arquivo: arquivos fora da janela são pulados e,
+        nos demais, a leitura começa no registro mais próximo do início (busca binária).
+        Arquivos sem índice válido (ex.: antigos) têm o índice reconstruído antes.
+        """
+        self._writer.flush()
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        paths = list_caption_files(self.output_dir, self.current_name)
+        bounds = []
+        for path in paths:
+            try:
+                records = time_index.load_index(path)
+                # O índice do arquivo atual é mantido pelo escritor; os demais são imutáveis
+                if path != self.filepath and not time_index.is_index_valid(path, records):
+                    time_index.rebuild_index(path, every=self.index_every)
+                    records = time_index.load_index(path)
+            except Exception as e:
+                print(f"[FILE_MANAGER] Erro ao carregar índice de {path}: {e}")
+                records = []
+            bounds.append((path, records))
+        for i, (path, records) in enumerate(bounds):
+            if not records or records[0][0] >= end_ts:
+                continue
+            # O arquivo termina antes do primeiro registro do arquivo seguinte
+            next_records = bounds[i + 1][1] if i + 1 < len(bounds) else None
+            if next_records and next_records[0][0] < start_ts:
+                continue
+            yield from time_index.iter_range(resolve_caption_path(path), start, end, records)
+
+    def export(self, outputs, max_cue_s=DEFAULT_MAX_CUE_S):
+        """
+        Exporta todas as legendas (históricos + atual) em uma única passada, em streaming.
 
+        :param outputs: Dict formato -> caminho (ex.: {"srt": "a.srt", "jsonl": "a.jsonl"}).
+        :param max_cue_s: Duração máxima de cada cue; o fim é o início da frase seguinte.
+        :return: Número de cues exportadas, ou None em caso de erro.
+        """
+        self._writer.flush()
         try:
-            self.file.write(line)
-            self.file.flush() # Garante escrita imediata no disco
-            os.fsync(self.file.fileno()) # Força extra para o SO salvar
-            print(f"[FILE_MANAGER] Texto gravado no arquivo: {text[:50]}...")
+            captions = iter_captions(list_caption_files(self.output_dir, self.current_name))
+            return export_captions(captions, outputs, max_cue_s=max_cue_s)
         except Exception as e:
-            print(f"Erro ao escrever no arquivo: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"Erro ao exportar legendas: {e}")
+            return None
 
     def export_as_srt(self, output_path=None):
         """
-        Exporta as captions do arquivo atual no formato SRT.
-        Lê o arquivo atual e converte timestamps para formato SRT.
+        Exporta as captions (históricos + atual) no formato SRT.
         Retorna o caminho do arquivo gerado.
         """
-        import re
         if output_path is None:
             output_path = os.path.join(self.output_dir, "captions_export.srt")
-        
-        try:
-            current_file = os.path.join(self.output_dir, self.CURRENT_FILE)
-            if not os.path.exists(current_file):
-                return None
-            
-            with open(current_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            with open(output_path, 'w', encoding='utf-8') as out:
-                index = 1
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Parse timestamp e texto: [HH:MM:SS] texto
-                    match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*(.*)', line)
-                    if match:
-                        timestamp = match.group(1)
-                        text = match.group(2)
-                        
-                        # SRT precisa de start --> end
-                        start_time = f"{timestamp},000"
-                        # End time: +3 segundos (estimativa)
-                        h, m, s = map(int, timestamp.split(':'))
-                        total_secs = h * 3600 + m * 60 + s + 3
-                        eh, em, es = total_secs // 3600, (total_secs % 3600) // 60, total_secs % 60
-                        end_time = f"{eh:02d}:{em:02d}:{es:02d},000"
-                        
-                        out.write(f"{index}\n")
-                        out.write(f"{start_time} --> {end_time}\n")
-                        out.write(f"{text}\n\n")
-                        index += 1
-            
-            return output_path
-        except Exception as e:
-            print(f"Erro ao exportar SRT: {e}")
+        if self.export({"srt": output_path}) is None:
             return None
+        return output_path
 
     def export_as_vtt(self, output_path=None):
         """
-        Exporta as captions do arquivo atual no formato WebVTT.
+        Exporta as captions (históricos + atual) no formato WebVTT.
         """
-        import re
         if output_path is None:
             output_path = os.path.join(self.output_dir, "captions_export.vtt")
-        
-        try:
-            current_file = os.path.join(self.output_dir, self.CURRENT_FILE)
-            if not os.path.exists(current_file):
-                return None
-            
-            with open(current_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            with open(output_path, 'w', encoding='utf-8') as out:
-                out.write("WEBVTT\n\n")
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    match = re.match(r'\[(\d{2}:\d{2}:\d{2})\]\s*(.*)', line)
-                    if match:
-                        timestamp = match.group(1)
-                        text = match.group(2)
-                        
-                        start_time = f"{timestamp}.000"
-                        h, m, s = map(int, timestamp.split(':'))
-                        total_secs = h * 3600 + m * 60 + s + 3
-                        eh, em, es = total_secs // 3600, (total_secs % 3600) // 60, total_secs % 60
-                        end_time = f"{eh:02d}:{em:02d}:{es:02d}.000"
-                        
-                        out.write(f"{start_time} --> {end_time}\n")
-                        out.write(f"{text}\n\n")
-            
-            return output_path
-        except Exception as e:
-            print(f"Erro ao exportar VTT: {e}")
+        if self.export({"vtt": output_path}) is None:
             return None
+        return output_path
 
-    def close(self):
-        """Fecha o arquivo com segurança."""
-        if self.file:
-            self.file.close()
+    def _close_files(self):
+        """Fecha o arquivo atual e o índice quando o escritor termina (roda na thread do escritor)."""
+        with self._file_lock:
+            if self.file:
+                self.file.close()
+            self._close_index()
+
+    def close(self, timeout=5.0):
+        """
+        Grava o que estiver na fila (espera limitada por `timeout`). O arquivo é fechado pela
+        thread do escritor ao terminar, nunca no meio de uma gravação atrasada.
+        """
+        if not self._writer.close(timeout):
+            print(f"[FILE_MANAGER] Escritor não terminou em {timeout}s; {self._writer.pending_count()} linha(s) "
+                  f"pendente(s), o arquivo será fechado quando ele terminar")
+        self._wait_maintenance(timeout)
@@ -0,0 +1,321 @@
+"""
+Gravação dos frames capturados num arquivo em anel (tamanho fixo, via mmap).
+
+Quando o OCR devolve lixo, o anel guarda como a tela estava: os últimos minutos de
+frames (em escala de cinza ou binarizados) com o instante de captura, para inspeção
+e para reprocessar com outro pré-processamento/OCR (ver src/tools/frame_reocr.py).
+
+Formato (.ring):
+    cabeçalho (64 bytes): magic, versão, número de slots, tamanho do slot, próximo seq
+    slots de tamanho fixo: cabeçalho do slot (seq, instante, largura, altura, formato,
+    flags, tamanho) + bytes do frame
+O frame de número `seq` (a partir de 1) fica no slot (seq - 1) % slots; os mais
+antigos são sobrescritos. O cabeçalho do slot é gravado por último (seq zerado
+durante a escrita), então um slot interrompido no meio nunca parece válido.
+
+A captura só enfileira o frame (FrameRecorder, sobre o GroupCommitWriter): codificar
+e copiar para o mmap acontece na thread do gravador, fora do laço de captura. Um anel
+de sessão anterior com a mesma geometria continua sendo usado; um incompatível (ou o
+anel atual, se os slots precisarem crescer) é movido para <nome>.prev.ring, não apagado.
+"""
+import mmap
+import os
+import struct
+
+from src.core.group_commit_writer import GroupCommitWriter, DURABILITY_OS
+
+RING_EXTENSION = ".ring"
+MAGIC = b"LCAFRING"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIQ")  # magic, versão, slots, tamanho do slot, próximo seq
+HEADER_SIZE = 64
+SLOT_HEADER = struct.Struct("<QdIIBBHI")  # seq, instante, largura, altura, formato, flags, -, bytes
+
+FORMAT_GRAY8 = 1  # Um byte por pixel
+FORMAT_BINARY1 = 2  # Um bit por pixel (np.packbits da imagem binarizada)
+FORMAT_NAMES = {FORMAT_GRAY8: "gray", FORMAT_BINARY1: "binary"}
+
+FLAG_INVERTED = 1  # Frame binarizado depois de inverter as cores
+
+SLOT_ALIGN = 4096
+SLOT_MARGIN = 1.25  # Folga sobre o primeiro frame (variações de tamanho da região)
+MIN_SLOTS = 16  # Abaixo disso o anel guarda pouco histórico (avisa, mas respeita o tamanho pedido)
+PREVIOUS_SUFFIX = ".prev"  # frames.ring -> frames.prev.ring (anel anterior, mantido para inspeção)
+DEFAULT_QUEUE = 8  # Frames aguardando o gravador; além disso são descartados
+
+
+class RingFrame:
+    """Metadados de um frame gravado (os bytes são lidos com FrameRing.read_payload)."""
+    __slots__ = ("seq", "timestamp", "width", "height", "frame_format", "flags", "size", "slot")
+
+    def __init__(self, seq, timestamp, width, height, frame_format, flags, size, slot):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.width = width
+        self.height = height
+        self.frame_format = frame_format
+        self.flags = flags
+        self.size = size
+        self.slot = slot
+
+    def to_dict(self):
+        return {"seq": self.seq, "timestamp": self.timestamp, "width": self.width, "height": self.height,
+                "format": FORMAT_NAMES.get(self.frame_format, self.frame_format),
+                "inverted": bool(self.flags & FLAG_INVERTED)}
+
+
+class FrameRing:
+    """Arquivo em anel mapeado em memória. Use FrameRing.create ou FrameRing.open."""
+
+    def __init__(self, path, file, mm, slot_count, slot_size, next_seq, readonly):
+        self.path = path
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.next_seq = next_seq
+        self.readonly = readonly
+        self.oversized_count = 0  # Frames maiores que o slot (não gravados)
+        self._file = file
+        self._mm = mm
+
+    @classmethod
+    def create(cls, path, slot_size, slot_count):
+        """Cria (ou recria, apagando o conteúdo) um anel com a geometria dada."""
+        if slot_size <= SLOT_HEADER.size or slot_count < 1:
+            raise ValueError("Geometria de anel inválida")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        f = open(path, "w+b")
+        try:
+            f.truncate(HEADER_SIZE + slot_size * slot_count)  # Slots zerados = vazios
+            f.write(HEADER.pack(MAGIC, VERSION, slot_count, slot_size, 1))
+            f.flush()
+            mm = mmap.mmap(f.fileno(), 0)
+        except Exception:
+            f.close()
+            raise
+        return cls(path, f, mm, slot_count, slot_size, 1, readonly=False)
+
+    @classmethod
+    def open(cls, path, readonly=True):
+        """Abre um anel existente (somente leitura por padrão; o app pode estar gravando)."""
+        f = open(path, "rb" if readonly else "r+b")
+        try:
+            magic, version, slot_count, slot_size, next_seq = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Arquivo não é um anel de frames: {path}")
+            if os.fstat(f.fileno()).st_size < HEADER_SIZE + slot_size * slot_count:
+                raise ValueError(f"Anel de frames truncado: {path}")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        except Exception:
+            f.close()
+            raise
+        return cls(path, f, mm, slot_count, slot_size, next_seq, readonly)
+
+    @property
+    def payload_capacity(self):
+        """Maior frame (em bytes) que cabe num slot."""
+        return self.slot_size - SLOT_HEADER.size
+
+    def _slot_offset(self, slot):
+        return HEADER_SIZE + slot * self.slot_size
+
+    def append(self, timestamp, width, height, frame_format, payload, flags=0):
+        """
+        Grava um frame no próximo slot (sobrescrevendo o mais antigo).
+
+        :param timestamp: Instante da captura (epoch, time.time()).
+        :param payload: Bytes do frame no formato `frame_format` (FORMAT_*).
+        :return: seq do frame, ou None se ele não cabe no slot.
+        """
+        if len(payload) > self.payload_capacity:
+            self.oversized_count += 1
+            return None
+        seq = self.next_seq
+        offset = self._slot_offset((seq - 1) % self.slot_count)
+        self._mm[offset:offset + 8] = b"\0" * 8  # Slot inválido enquanto é reescrito
+        start = offset + SLOT_HEADER.size
+        self._mm[start:start + len(payload)] = payload
+        SLOT_HEADER.pack_into(self._mm, offset, seq, timestamp, width, height, frame_format, flags, 0, len(payload))
+        self.next_seq = seq + 1
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self.slot_count, self.slot_size, self.next_seq)
+        return seq
+
+    def _frame_at(self, slot):
+        seq, timestamp, width, height, frame_format, flags, _, size = SLOT_HEADER.unpack_from(
+            self._mm, self._slot_offset(slot))
+        if not seq or size > self.payload_capacity or (seq - 1) % self.slot_count != slot:
+            return None
+        return RingFrame(seq, timestamp, width, height, frame_format, flags, size, slot)
+
+    def frames(self, start=None, end=None):
+        """
+        Frames válidos em ordem de gravação, opcionalmente só os capturados em [start, end].
+
+        :param start: Instante inicial (epoch) ou None.
+        :param end: Instante final (epoch) ou None.
+        """
+        result = []
+        for slot in range(self.slot_count):
+            frame = self._frame_at(slot)
+            if frame is None:
+                continue
+            if (start is not None and frame.timestamp < start) or (end is not None and frame.timestamp > end):
+                continue
+            result.append(frame)
+        result.sort(key=lambda f: f.seq)
+        return result
+
+    def read_payload(self, frame):
+        """
+        Bytes do frame, ou None se o slot já foi sobrescrito por um frame mais novo
+        (anel lido enquanto o app grava).
+        """
+        offset = self._slot_offset(frame.slot)
+        start = offset + SLOT_HEADER.size
+        payload = self._mm[start:start + frame.size]
+        if struct.unpack_from("<Q", self._mm, offset)[0] != frame.seq:
+            return None
+        return payload
+
+    def flush(self):
+        if not self.readonly:
+            self._mm.flush()
+
+    def close(self):
+        if self._mm is not None:
+            self.flush()
+            self._mm.close()
+            self._mm = None
+            self._file.close()
+
+
+def slot_size_for(payload_size):
+    """Tamanho de slot (alinhado) para frames de até ~payload_size bytes, com folga."""
+    needed = SLOT_HEADER.size + int(payload_size * SLOT_MARGIN)
+    return -(-needed // SLOT_ALIGN) * SLOT_ALIGN
+
+
+def previous_ring_path(path):
+    """Onde fica o anel anterior (ex.: frames.ring -> frames.prev.ring)."""
+    base, ext = os.path.splitext(path)
+    return base + PREVIOUS_SUFFIX + (ext or RING_EXTENSION)
+
+
+class FrameRecorder:
+    """
+    Grava frames no anel a partir de uma thread própria. `submit` só enfileira a
+    referência do frame (nunca bloqueia a captura); com a fila cheia o frame é
+    descartado e contado.
+
+    No primeiro frame, o anel da sessão anterior é reaproveitado se tiver a geometria
+    que `capacity_bytes` daria aos seus slots e o frame couber neles; senão um anel novo
+    é criado, com slots dimensionados para o frame. Se a região crescer e um frame não
+    couber, o anel atual é movido para previous_ring_path() e um com slots maiores o
+    substitui. O arquivo nunca passa de `capacity_bytes` (além do cabeçalho).
+    """
+
+    def __init__(self, path, encode, capacity_bytes, max_queue=DEFAULT_QUEUE):
+        """
+        :param path: Arquivo do anel (.ring).
+        :param encode: Função(frame) -> (largura, altura, formato, flags, bytes), chamada
+                       na thread do gravador (ex.: src/utils/frame_codec.make_encoder).
+        :param capacity_bytes: Tamanho total do anel em disco.
+        :param max_queue: Frames aguardando gravação antes de descartar.
+        """
+        self.path = path
+        self.encode = encode
+        self.capacity_bytes = capacity_bytes
+        self.ring = None
+        self.recorded_count = 0
+        self.skipped_count = 0  # Frames que não cabem em `capacity_bytes` nem num único slot
+        self._warned_small = False
+        self._writer = GroupCommitWriter(self._write_batch, self._sync, durability=DURABILITY_OS,
+                                         max_queue=max_queue, max_batch=max_queue, name="FrameRecorder")
+
+    @property
+    def dropped_count(self):
+        """Frames descartados por fila cheia."""
+        return self._writer.dropped_count
+
+    def submit(self, frame, timestamp):
+        """
+        :param frame: O que `encode` recebe (as imagens não devem ser alteradas depois de enviadas).
+        :param timestamp: Instante da captura (epoch).
+        :return: False se o frame foi descartado.
+        """
+        return self._writer.submit((timestamp, frame))
+
+    def flush(self, timeout=5.0):
+        return self._writer.flush(timeout)
+
+    def _open_ring(self, payload_size):
+        """Abre o anel para frames de `payload_size` bytes. Retorna False se nem um slot cabe na capacidade."""
+        if self.ring is None and self._reuse_ring(payload_size):
+            return True
+        slot_size = slot_size_for(payload_size)
+        slot_count = self.capacity_bytes // slot_size
+        if slot_count < 1:
+            if not self._warned_small:
+                print(f"[FRAME_RECORDER] Frame de {payload_size // 1024} KB não cabe no anel de "
+                      f"{self.capacity_bytes // (1024 * 1024)} MB; frames descartados")
+                self._warned_small = True
+            return False
+        if slot_count < MIN_SLOTS:
+            print(f"[FRAME_RECORDER] Anel pequeno para a região: só {slot_count} frame(s) cabem em "
+                  f"{self.capacity_bytes // (1024 * 1024)} MB")
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+            print(f"[FRAME_RECORDER] Frame maior que o slot; anel atual movido para "
+                  f"{previous_ring_path(self.path)}, novo com slots de {slot_size // 1024} KB")
+        self._move_aside()
+        self.ring = FrameRing.create(self.path, slot_size, slot_count)
+        return True
+
+    def _reuse_ring(self, payload_size):
+        """Reabre o anel de uma sessão anterior, se compatível (mesma capacidade e o frame cabe)."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            ring = FrameRing.open(self.path, readonly=False)
+        except (OSError, ValueError) as e:
+            print(f"[FRAME_RECORDER] Anel existente ilegível ({e}); será substituído")
+            return False
+        if ring.slot_count == self.capacity_bytes // ring.slot_size and payload_size <= ring.payload_capacity:
+            self.ring = ring
+            return True
+        ring.close()
+        return False
+
+    def _move_aside(self):
+        """Preserva o anel existente (o anterior a ele é descartado)."""
+        if os.path.exists(self.path):
+            try:
+                os.replace(self.path, previous_ring_path(self.path))
+            except OSError as e:
+                print(f"[FRAME_RECORDER] Erro ao mover o anel anterior: {e}")
+
+    def _write_batch(self, items):
+        for timestamp, frame in items:
+            try:
+                width, height, frame_format, flags, payload = self.encode(frame)
+                if self.ring is None or len(payload) > self.ring.payload_capacity:
+                    if not self._open_ring(len(payload)):
+                        self.skipped_count += 1
+                        continue
+                self.ring.append(timestamp, width, height, frame_format, payload, flags)
+                self.recorded_count += 1
+            except Exception as e:
+                print(f"[FRAME_RECORDER] Erro ao gravar frame: {e}")
+
+    def _sync(self):
+        # Só em flush()/close(): no resto do tempo o sistema operacional grava as páginas do mmap
+        if self.ring is not None:
+            self.ring.flush()
+
+    def close(self, timeout=5.0):
+        """Grava os frames pendentes e fecha o anel. Retorna o caminho, ou None se nada foi gravado."""
+        self._writer.close(timeout)
+        if self.ring is None:
+            return None
+        self.ring.close()
+        return self.path
@@ -0,0 +1,72 @@
+"""
+Rastreamento ponta a ponta da latência de uma legenda: da captura da tela à gravação.
+
+Cada frame capturado pelo OCRWorker ganha um FrameTrace, que acompanha o texto até
+o CaptionStabilizer e, se virar (parte de) uma frase commitada, até o FileManager.
+Os instantes são de `time.time()` (o mesmo relógio dos timestamps do FileManager),
+para poderem ser marcados em threads diferentes.
+"""
+import itertools
+import time
+
+CAPTURED = "captured"
+PREPROCESSED = "preprocessed"
+OCR_DONE = "ocr_done"
+DECIDED = "decided"  # Stabilizer decidiu commitar a frase
+PERSISTED = "persisted"  # Linha gravada no arquivo (write + flush)
+
+STAGES = (CAPTURED, PREPROCESSED, OCR_DONE, DECIDED, PERSISTED)
+
+# Histogramas de latência por etapa (nome -> (etapa inicial, etapa final))
+STAGE_HISTOGRAMS = {
+    "trace_preprocess_ms": (CAPTURED, PREPROCESSED),
+    "trace_ocr_ms": (PREPROCESSED, OCR_DONE),
+    "trace_stabilizer_ms": (OCR_DONE, DECIDED),  # Inclui a espera pelo silêncio
+    "trace_write_ms": (DECIDED, PERSISTED),
+    "trace_capture_to_commit_ms": (CAPTURED, DECIDED),
+    "trace_total_ms": (CAPTURED, PERSISTED),
+}
+
+_frame_ids = itertools.count(1)
+
+
+class FrameTrace:
+    """Instantes de cada etapa de um frame (None enquanto a etapa não aconteceu)."""
+    __slots__ = ("frame_id",) + STAGES
+
+    def __init__(self, captured=None):
+        self.frame_id = next(_frame_ids)
+        for stage in STAGES:
+            setattr(self, stage, None)
+        self.captured = time.time() if captured is None else captured
+
+    def mark(self, stage, when=None):
+        """Marca o instante de uma etapa (agora, se `when` não for informado)."""
+        setattr(self, stage, time.time() if when is None else when)
+
+    def elapsed_ms(self, start, end):
+        """Milissegundos entre duas etapas, ou None se alguma ainda não foi marcada."""
+        begin, finish = getattr(self, start), getattr(self, end)
+        if begin is None or finish is None:
+            return None
+        return (finish - begin) * 1000
+
+    def capture_to_commit_ms(self):
+        return self.elapsed_ms(CAPTURED, DECIDED)
+
+    def stage_latencies(self):
+        """Dict {nome do histograma: ms} só com as etapas já marcadas."""
+        latencies = {}
+        for name, (start, end) in STAGE_HISTOGRAMS.items():
+            value = self.elapsed_ms(start, end)
+            if value is not None:
+                latencies[name] = value
+        return latencies
+
+    def to_dict(self):
+        return {"frame_id": self.frame_id, **{stage: getattr(self, stage) for stage in STAGES}}
+
+
+def format_latency(ms):
+    """Anotação curta para uma linha: '+850ms' ou '+2.4s'."""
+    return f"+{ms:.0f}ms" if ms < 1000 else f"+{ms / 1000:.1f}s"
@@ -0,0 +1,280 @@
+"""
+Escritor em lote (group commit) para arquivos de texto.
+
+Quem produz as linhas só enfileira; uma thread dedicada esvazia a fila, grava
+tudo que acumulou de uma vez e decide quando chamar fsync segundo a política
+de durabilidade. Assim um único fsync cobre várias linhas e a thread produtora
+nunca espera pelo disco.
+"""
+import queue
+import threading
+import time
+
+DURABILITY_ALWAYS = "always"  # fsync após cada item (linha) gravado, antes do item seguinte
+DURABILITY_INTERVAL = "interval"  # fsync a cada N ms ou N linhas, o que vier primeiro
+DURABILITY_OS = "os"  # Só flush; o sistema operacional decide quando ir ao disco
+
+DURABILITY_POLICIES = (DURABILITY_ALWAYS, DURABILITY_INTERVAL, DURABILITY_OS)
+
+
+class GroupCommitWriter:
+    """
+    Thread de escrita com fila limitada.
+
+    A gravação real é delegada a dois callbacks, chamados sempre na thread do escritor:
+    `write_batch(items)` grava uma lista de itens e `sync()` força os dados ao disco.
+
+    Em "always" cada item é gravado e sincronizado sozinho (lotes de um item): nenhum
+    item gravado fica sem fsync. Nas demais políticas um único fsync cobre vários itens.
+    """
+
+    _STOP = object()
+
+    def __init__(self, write_batch, sync, durability=DURABILITY_INTERVAL,
+                 fsync_interval_ms=1000, fsync_every_lines=50, max_queue=10000,
+                 max_batch=500, name="GroupCommitWriter", on_exit=None,
+                 periodic=None, periodic_interval_s=None):
+        """
+        :param write_batch: Callback que recebe a lista de itens a gravar.
+        :param sync: Callback que força os dados gravados ao disco (fsync).
+        :param durability: Uma de DURABILITY_POLICIES.
+        :param fsync_interval_ms: Intervalo máximo entre fsyncs (política "interval").
+        :param fsync_every_lines: Itens gravados que forçam um fsync (só na política "interval").
+        :param max_queue: Tamanho máximo da fila; além disso os itens são descartados e contados.
+        :param max_batch: Máximo de itens gravados em uma única chamada de write_batch
+                          (sempre 1 na política "always").
+        :param name: Nome da thread (aparece em tracebacks).
+        :param on_exit: Callback chamado na thread do escritor ao parar, depois do último
+                        lote e do fsync final (ex.: fechar o arquivo). Assim o arquivo nunca
+                        é fechado enquanto a thread ainda grava, mesmo se close() expirar.
+        :param periodic: Callback chamado na thread do escritor a cada `periodic_interval_s`,
+                         mesmo sem itens chegando; os itens que ele retornar são gravados
+                         como um lote (ex.: snapshot de métricas).
+        :param periodic_interval_s: Intervalo entre as chamadas de `periodic`.
+        """
+        if durability not in DURABILITY_POLICIES:
+            print(f"[WRITER] Política de durabilidade inválida '{durability}', usando '{DURABILITY_INTERVAL}'")
+            durability = DURABILITY_INTERVAL
+
+        self._write_batch = write_batch
+        self._sync = sync
+        self.durability = durability
+        self.fsync_interval_s = max(0, fsync_interval_ms) / 1000.0
+        self.fsync_every_lines = max(1, fsync_every_lines)
+        # "always" = fsync por item: cada lote tem um único item
+        self.max_batch = 1 if durability == DURABILITY_ALWAYS else max(1, max_batch)
+
+        self._on_exit = on_exit
+        self._periodic = periodic if periodic_interval_s else None
+        self.periodic_interval_s = periodic_interval_s
+        self._next_periodic = time.monotonic() + (periodic_interval_s or 0)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        # Estatísticas (lidas por outras threads apenas para exibição)
+        self.written_count = 0
+        self.dropped_count = 0  # Incrementado por várias threads produtoras (sob _drop_lock)
+        self._drop_lock = threading.Lock()
+        self.sync_count = 0
+        self.batch_count = 0
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item, timeout=None):
+        """
+        Enfileira um item. Por padrão não bloqueia.
+
+        :param timeout: Se informado, espera até `timeout` segundos por espaço na fila.
+        :return: False se a fila estava cheia (ou o escritor fechado) e o item foi descartado.
+        """
+        if self._closed:
+            self._count_drop()
+            return False
+        try:
+            if timeout is None:
+                self._queue.put_nowait(item)
+            else:
+                self._queue.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            self._count_drop()
+            return False
+
+    def _count_drop(self):
+        with self._drop_lock:
+            self.dropped_count += 1
+
+    def flush(self, timeout=5.0):
+        """
+        Espera tudo que já foi enfileirado ser gravado e sincronizado (fsync).
+
+        :return: True se concluiu dentro do timeout.
+        """
+        if self._closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """
+        Encerra o escritor: grava o que estiver na fila, faz o fsync final e para a thread.
+        A espera é limitada por `timeout`; o que não couber nele é perdido.
+
+        :return: True se a fila foi esvaziada dentro do timeout.
+        """
+        if self._closed:
+            return not self._thread.is_alive()
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(self._STOP, timeout=timeout)
+        except queue.Full:
+            print("[WRITER] Fila cheia ao encerrar; itens pendentes serão descartados")
+            return False
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        return not self._thread.is_alive()
+
+    def pending_count(self):
+        """Itens aguardando gravação."""
+        return self._queue.qsize()
+
+    def is_running(self):
+        """True enquanto a thread do escritor não terminou (on_exit ainda não foi chamado)."""
+        return self._thread.is_alive()
+
+    # --- Thread do escritor ---
+
+    def _run(self):
+        try:
+            self._loop()
+        finally:
+            if self._on_exit is not None:
+                try:
+                    self._on_exit()
+                except Exception as e:
+                    print(f"[WRITER] Erro ao encerrar: {e}")
+
+    def _loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                self._run_periodic_if_due()
+                self._sync_if_due()
+                continue
+
+            batch = []
+            waiters = []
+            stop = False
+            item = first
+            while True:
+                if item is self._STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            self._run_periodic_if_due()
+
+            if waiters or stop:
+                self._do_sync()
+                for waiter in waiters:
+                    waiter.set()
+            else:
+                self._sync_if_due()
+
+            if stop:
+                self._drain_after_stop()
+                return
+
+    def _drain_after_stop(self):
+        """Grava itens que chegaram entre o pedido de parada e a saída da thread."""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not self._STOP:
+                batch.append(item)
+        if batch:
+            self._write(batch)
+            self._do_sync()
+
+    def _write(self, batch):
+        try:
+            self._write_batch(batch)
+            self.written_count += len(batch)
+            self.batch_count += 1
+            self._unsynced += len(batch)
+        except Exception as e:
+            print(f"[WRITER] Erro ao gravar lote de {len(batch)} item(ns): {e}")
+            import traceback
+            traceback.print_exc()
+
+    def _next_timeout(self):
+        """
+        Espera até o próximo fsync devido ou a próxima chamada de `periodic`; sem nenhum
+        dos dois, bloqueia até o próximo item (sem wakeups ociosos).
+        """
+        deadlines = []
+        if self.durability == DURABILITY_INTERVAL and self._unsynced:
+            deadlines.append(self._last_sync + self.fsync_interval_s)
+        if self._periodic is not None:
+            deadlines.append(self._next_periodic)
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _run_periodic_if_due(self):
+        if self._periodic is None or time.monotonic() < self._next_periodic:
+            return
+        self._next_periodic = time.monotonic() + self.periodic_interval_s
+        try:
+            items = self._periodic()
+        except Exception as e:
+            print(f"[WRITER] Erro na tarefa periódica: {e}")
+            return
+        if items:
+            self._write(list(items))
+
+    def _sync_if_due(self):
+        if not self._unsynced:
+            return
+        if self.durability == DURABILITY_ALWAYS:
+            self._do_sync()
+        elif self.durability == DURABILITY_INTERVAL:
+            if (self._unsynced >= self.fsync_every_lines
+                    or time.monotonic() - self._last_sync >= self.fsync_interval_s):
+                self._do_sync()
+
+    def _do_sync(self):
+        if self.durability == DURABILITY_OS:
+            self._unsynced = 0
+            return
+        try:
+            self._sync()
+            self.sync_count += 1
+        except Exception as e:
+            print(f"[WRITER] Erro no fsync: {e}")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
@@ -0,0 +1,129 @@
+"""
+Rastreamento linha a linha de regiões de legenda com várias linhas.
+
+Quando a região capturada mostra duas ou mais linhas, comparar o bloco inteiro a cada
+frame faz com que uma única linha alterada (normalmente a de baixo) force o diff do
+bloco todo e, muitas vezes, um novo commit de tudo. Aqui cada linha é rastreada de
+forma independente: linhas idênticas às do frame anterior custam apenas uma busca em
+dicionário, e o difflib só roda para as linhas que mudaram.
+"""
+import difflib
+
+
+class TrackedLine:
+    """Uma linha visível na região de captura."""
+    __slots__ = ("text", "last_update", "committed")
+
+    def __init__(self, text, last_update):
+        self.text = text
+        self.last_update = last_update
+        self.committed = False
+
+
+class LineTracker:
+    """
+    Mantém as linhas visíveis e decide quando cada uma deve ser commitada:
+    ao sair da tela (rolou para fora) ou ao vencer o timeout de silêncio.
+    """
+
+    def __init__(self, similarity_threshold=0.6):
+        """
+        :param similarity_threshold: Similaridade mínima para considerar que uma linha nova
+                                     é a mesma linha (corrigida/expandida) de antes.
+        """
+        self.similarity_threshold = similarity_threshold
+        self.lines = []  # Em ordem de exibição (de cima para baixo)
+
+    def reset(self):
+        """Esquece todas as linhas rastreadas."""
+        self.lines = []
+
+    def update(self, new_texts, now):
+        """
+        Atualiza o rastreamento com as linhas do frame atual.
+
+        :param new_texts: Lista de linhas lidas no frame (de cima para baixo).
+        :param now: Instante atual (no relógio do stabilizer).
+        :return: Tupla (scrolled_off, new_count, updated_count): `scrolled_off` são os textos
+                 pendentes de linhas que saíram da tela e devem ser commitados agora.
+        """
+        # Caminho rápido: linhas idênticas às já rastreadas (sem nenhuma comparação)
+        unmatched_old = {}
+        for line in self.lines:
+            unmatched_old.setdefault(line.text, []).append(line)
+
+        result = [None] * len(new_texts)
+        pending = []
+        for i, text in enumerate(new_texts):
+            same = unmatched_old.get(text)
+            if same:
+                result[i] = same.pop(0)
+            else:
+                pending.append(i)
+
+        candidates = [line for group in unmatched_old.values() for line in group]
+        new_count = 0
+        updated_count = 0
+
+        # Apenas linhas alteradas passam pelo difflib, e só contra linhas também não casadas
+        for i in pending:
+            text = new_texts[i]
+            best = None
+            best_ratio = 0.0
+            for line in candidates:
+                # Atalho só quando a linha nova estende a antiga: um prefixo curto (linha
+                # parcial que acabou de surgir embaixo) não pode tomar o lugar de uma linha longa
+                if text.startswith(line.text):
+                    best, best_ratio = line, 1.0
+                    break
+                matcher = difflib.SequenceMatcher(None, line.text, text)
+                if matcher.real_quick_ratio() <= best_ratio or matcher.quick_ratio() <= best_ratio:
+                    continue
+                ratio = matcher.ratio()
+                if ratio > best_ratio:
+                    best, best_ratio = line, ratio
+
+            if best is not None and best_ratio > self.similarity_threshold:
+                candidates.remove(best)
+                if not best.text.startswith(text):
+                    best.text = text  # Encolher (leitura parcial) mantém o texto pendente mais longo
+                best.last_update = now
+                best.committed = False
+                result[i] = best
+                updated_count += 1
+            else:
+                result[i] = TrackedLine(text, now)
+                new_count += 1
+
+        # O que sobrou não está mais visível: rolou para fora da tela
+        scrolled_off = [line.text for line in candidates if not line.committed]
+        self.lines = result
+        return scrolled_off, new_count, updated_count
+
+    def pop_expired(self, now, timeout_s):
+        """
+        Marca como commitadas as linhas paradas há pelo menos `timeout_s` e retorna seus textos.
+        As linhas continuam rastreadas (ainda estão visíveis), mas só voltam a ser
+        commitadas se mudarem.
+        """
+        expired = []
+        for line in self.lines:
+            if not line.committed and line.last_update + timeout_s <= now:
+                line.committed = True
+                expired.append(line.text)
+        return expired
+
+    def pop_pending(self):
+        """Marca todas as linhas pendentes como commitadas e retorna seus textos."""
+        pending = [line.text for line in self.lines if not line.committed]
+        for line in self.lines:
+            line.committed = True
+        return pending
+
+    def next_deadline(self, timeout_s):
+        """Próximo instante em que alguma linha pendente vence, ou None se não há pendentes."""
+        deadlines = [line.last_update + timeout_s for line in self.lines if not line.committed]
+        return min(deadlines) if deadlines else None
+
+    def has_pending(self):
+        return any(not line.committed for line in self.lines)
@@ -0,0 +1,325 @@
+"""
+Índice de consulta para os logs de uso (NDJSON).
+
+Cada arquivo `usage_*_partN.log` (ou `.log.gz`, depois de rotacionado) ganha um
+índice ao lado (`.log.idx`, JSON) com:
+- por minuto: offset inicial/final em bytes e contagem de entradas por categoria;
+- por categoria: offset de cada entrada.
+
+Com isso, "AUTO_ADJUST de similarity_threshold entre 14:00 e 15:00" vira um seek
+direto nas linhas certas (via mmap), e contagens por minuto saem do próprio índice,
+sem ler o log. O log só é varrido uma vez; depois o índice é estendido
+incrementalmente a partir do último byte indexado (os logs só crescem).
+
+Partes comprimidas usam o mesmo índice (offsets do conteúdo descomprimido) e são
+lidas em streaming: os offsets ordenados permitem avançar no gzip sem voltar atrás.
+"""
+import bisect
+import glob
+import json
+import mmap
+import os
+from src.utils.compression import companion_path, is_compressed, open_binary
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+_TS_PREFIX = b'"timestamp": "'
+_CATEGORY_PREFIX = b'"category": "'
+
+
+def index_path_for(log_path):
+    return companion_path(log_path, INDEX_SUFFIX)
+
+
+def _extract(line, prefix):
+    """Extrai o valor string que segue `prefix` em uma linha JSON, sem decodificar a linha toda."""
+    start = line.find(prefix)
+    if start < 0:
+        return None
+    start += len(prefix)
+    end = line.find(b'"', start)
+    if end < 0:
+        return None
+    return line[start:end].decode("utf-8", "replace")
+
+
+class TimeRange:
+    """
+    Intervalo [start, end) sobre os timestamps do log ("YYYY-MM-DD HH:MM:SS.mmm").
+
+    Aceita datas completas ("2026-10-19 14:00") ou só horário ("14:00"); neste caso,
+    o intervalo vale para qualquer dia.
+    """
+
+    def __init__(self, start=None, end=None):
+        self.start = start
+        self.end = end
+        bounds = [b for b in (start, end) if b]
+        self.time_of_day = bool(bounds) and all(len(b) <= 8 and b[2:3] == ":" for b in bounds)
+
+    def _key(self, timestamp):
+        return timestamp[11:] if self.time_of_day else timestamp
+
+    def contains(self, timestamp):
+        key = self._key(timestamp)
+        if self.start and key < self.start:
+            return False
+        if self.end and key >= self.end:
+            return False
+        return True
+
+    def overlaps_minute(self, minute):
+        """Se algum instante do minuto ("YYYY-MM-DD HH:MM") pode estar no intervalo."""
+        key = self._key(minute)
+        if self.start and key + ":59.999" < self.start:
+            return False
+        if self.end and key >= self.end:
+            return False
+        return True
+
+
+class LogIndex:
+    """Índice (sidecar) de um arquivo de log de uso."""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.indexed_size = 0
+        self.compressed_size = None  # Tamanho do .gz quando o índice cobre o arquivo comprimido inteiro
+        self.minutes = {}  # "YYYY-MM-DD HH:MM" -> {"start", "end", "counts": {categoria: n}}
+        self.categories = {}  # categoria -> [offsets]
+
+    @classmethod
+    def load_or_build(cls, log_path, rebuild=False):
+        """
+        Carrega o índice do disco e o estende se o log cresceu.
+        O índice é (re)gravado apenas quando algo mudou.
+        """
+        index = cls(log_path)
+        if not rebuild:
+            index._load()
+
+        if is_compressed(log_path):
+            # Parte comprimida é imutável: basta completar o índice uma vez
+            compressed_size = os.path.getsize(log_path)
+            if index.compressed_size != compressed_size:
+                index._scan(None)
+                index.compressed_size = compressed_size
+                index.save()
+            return index
+
+        log_size = os.path.getsize(log_path)
+        if log_size < index.indexed_size:
+            # Log truncado ou substituído: recomeça
+            index = cls(log_path)
+        if log_size > index.indexed_size:
+            if index._scan(log_size):
+                index.save()
+        return index
+
+    def _load(self):
+        try:
+            with open(index_path_for(self.log_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != INDEX_VERSION:
+                return
+            self.indexed_size = data["indexed_size"]
+            self.compressed_size = data.get("compressed_size")
+            self.minutes = data["minutes"]
+            self.categories = data["categories"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[LOG_INDEX] Índice inválido, reconstruindo: {e}")
+            self.indexed_size = 0
+            self.minutes = {}
+            self.categories = {}
+
+    def save(self):
+        """Grava o índice de forma atômica (arquivo temporário + os.replace)."""
+        path = index_path_for(self.log_path)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "indexed_size": self.indexed_size,
+                    "compressed_size": self.compressed_size,
+                    "minutes": self.minutes,
+                    "categories": self.categories
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[LOG_INDEX] Erro ao salvar índice de {self.log_path}: {e}")
+
+    def _scan(self, log_size):
+        """
+        Indexa as linhas completas entre indexed_size e log_size (None = até o fim).
+        Retorna True se avançou.
+        """
+        with open_binary(self.log_path) as f:
+            f.seek(self.indexed_size)
+            offset = self.indexed_size
+            for line in f:
+                if (log_size is not None and offset + len(line) > log_size) or not line.endswith(b"\n"):
+                    break  # Linha ainda sendo escrita: fica para a próxima vez
+                timestamp = _extract(line, _TS_PREFIX)
+                category = _extract(line, _CATEGORY_PREFIX)
+                if timestamp and category:
+                    minute = timestamp[:16]
+                    bucket = self.minutes.get(minute)
+                    if bucket is None:
+                        bucket = {"start": offset, "end": offset, "counts": {}}
+                        self.minutes[minute] = bucket
+                    bucket["end"] = offset + len(line)
+                    bucket["counts"][category] = bucket["counts"].get(category, 0) + 1
+                    self.categories.setdefault(category, []).append(offset)
+                offset += len(line)
+        advanced = offset > self.indexed_size
+        self.indexed_size = offset
+        return advanced
+
+    def _spans(self, time_range):
+        """Intervalos de bytes [start, end) dos minutos que tocam o intervalo, ordenados e unidos."""
+        spans = sorted((b["start"], b["end"]) for minute, b in self.minutes.items()
+                       if time_range.overlaps_minute(minute))
+        merged = []
+        for start, end in spans:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    def offsets(self, category=None, time_range=None):
+        """Offsets das linhas candidatas (ordenados), usando só o índice."""
+        if category is not None:
+            lists = [self.categories.get(category, [])]
+        else:
+            lists = list(self.categories.values())
+
+        if time_range is None:
+            selected = [o for offsets in lists for o in offsets]
+        else:
+            spans = self._spans(time_range)
+            selected = []
+            for offsets in lists:
+                # Offsets já estão ordenados: cada minuto vira uma fatia via busca binária
+                for start, end in spans:
+                    selected.extend(offsets[bisect.bisect_left(offsets, start):bisect.bisect_left(offsets, end)])
+
+        if len(lists) > 1:
+            selected.sort()
+        return selected
+
+    def read_entries(self, offsets):
+        """Lê e decodifica as linhas nos offsets dados, via mmap (sem varrer o arquivo)."""
+        if not offsets or not self.indexed_size:
+            return
+        if is_compressed(self.log_path):
+            yield from self._read_compressed_entries(offsets)
+            return
+        with open(self.log_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in offsets:
+                    end = mm.find(b"\n", offset)
+                    if end < 0:
+                        end = len(mm)
+                    try:
+                        yield json.loads(mm[offset:end])
+                    except ValueError:
+                        continue
+
+    def _read_compressed_entries(self, offsets):
+        """Leitura em streaming de uma parte .gz: avança até cada offset (sempre para frente)."""
+        with open_binary(self.log_path) as f:
+            for offset in offsets:
+                if f.tell() != offset:
+                    f.seek(offset)
+                line = f.readline()
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def find_log_files(log_dir):
+    """Arquivos de log de uso em ordem de criação (nome contém data e número da parte)."""
+    def sort_key(path):
+        name = os.path.basename(path)
+        stem = name.rsplit("_part", 1)
+        part = stem[1].split(".", 1)[0] if len(stem) == 2 else "0"
+        return stem[0], int(part) if part.isdigit() else 0
+    plain = glob.glob(os.path.join(log_dir, "usage_*.log"))
+    plain_set = set(plain)
+    # Durante a compressão, o .log e o .gz coexistem por um instante: fica só o .log
+    compressed = [p for p in glob.glob(os.path.join(log_dir, "usage_*.log.gz")) if p[:-3] not in plain_set]
+    return sorted(plain + compressed, key=sort_key)
+
+
+def _get_path(data, dotted):
+    for part in dotted.split("."):
+        if not isinstance(data, dict) or part not in data:
+            return None
+        data = data[part]
+    return data
+
+
+def matches(entry, where):
+    """
+    Verifica filtros simples de igualdade sobre o campo `data` da entrada.
+    As chaves podem ser caminhos com ponto ("statistics.repetition_rate") e
+    são procuradas também dentro de details/context.
+    """
+    data = entry.get("data", {})
+    for key, expected in (where or {}).items():
+        value = _get_path(data, key)
+        if value is None:
+            value = _get_path(data, f"details.{key}")
+        if value is None:
+            value = _get_path(data, f"context.{key}")
+        if str(value) != str(expected):
+            return False
+    return True
+
+
+def query(log_paths, category=None, start=None, end=None, where=None, rebuild=False):
+    """
+    Gera as entradas que atendem aos filtros, em ordem, em todos os arquivos.
+
+    :param log_paths: Arquivos de log (ex.: find_log_files(pasta)).
+    :param category: Categoria exata (ex.: "AUTO_ADJUST").
+    :param start: Início inclusivo ("YYYY-MM-DD HH:MM[:SS]" ou "HH:MM").
+    :param end: Fim exclusivo, no mesmo formato.
+    :param where: Filtros de igualdade sobre `data` (ex.: {"parameter": "similarity_threshold"}).
+    """
+    time_range = TimeRange(start, end) if (start or end) else None
+    for path in log_paths:
+        index = LogIndex.load_or_build(path, rebuild=rebuild)
+        for entry in index.read_entries(index.offsets(category, time_range)):
+            if time_range is not None and not time_range.contains(entry.get("timestamp", "")):
+                continue
+            if where and not matches(entry, where):
+                continue
+            yield entry
+
+
+def count_by_minute(log_paths, category=None, start=None, end=None, rebuild=False):
+    """
+    Contagem por minuto e categoria, calculada só a partir dos índices (sem ler os logs).
+    Minutos parcialmente dentro do intervalo entram inteiros.
+
+    :return: Gerador de tuplas (minuto, categoria, contagem), em ordem.
+    """
+    time_range = TimeRange(start, end) if (start or end) else None
+    totals = {}
+    for path in log_paths:
+        index = LogIndex.load_or_build(path, rebuild=rebuild)
+        for minute, bucket in index.minutes.items():
+            if time_range is not None and not time_range.overlaps_minute(minute):
+                continue
+            for cat, count in bucket["counts"].items():
+                if category is None or cat == category:
+                    totals[(minute, cat)] = totals.get((minute, cat), 0) + count
+    for (minute, cat) in sorted(totals):
+        yield minute, cat, totals[(minute, cat)]
@@ -0,0 +1,114 @@
+"""
+Métricas agregadas em memória (contadores e histogramas).
+
+Decisões que só importam no agregado (duplicatas, repetições, atualizações da
+mesma frase, similaridades, latência do OCR, intervalo entre commits) são somadas
+aqui e gravadas periodicamente como um único registro compacto, em vez de uma
+linha de log por evento.
+"""
+import threading
+
+# Limites superiores dos buckets (o último bucket, "+inf", pega o resto)
+SIMILARITY_BOUNDS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+LATENCY_MS_BOUNDS = (10, 25, 50, 100, 200, 400, 800, 1600, 3200)
+INTERVAL_MS_BOUNDS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+DEFAULT_BOUNDS = {
+    "similarity": SIMILARITY_BOUNDS,
+    "ocr_latency_ms": LATENCY_MS_BOUNDS,
+    "commit_interval_ms": INTERVAL_MS_BOUNDS,
+    # Latências por etapa do FrameTrace (captura -> disco)
+    "trace_preprocess_ms": LATENCY_MS_BOUNDS,
+    "trace_ocr_ms": LATENCY_MS_BOUNDS,
+    "trace_stabilizer_ms": INTERVAL_MS_BOUNDS,
+    "trace_write_ms": LATENCY_MS_BOUNDS,
+    "trace_capture_to_commit_ms": INTERVAL_MS_BOUNDS,
+    "trace_total_ms": INTERVAL_MS_BOUNDS,
+}
+
+
+class Histogram:
+    """Histograma de buckets fixos com contagem, soma, mínimo e máximo."""
+    __slots__ = ("bounds", "buckets", "count", "total", "min", "max")
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_dict(self):
+        """Representação compacta: só buckets não vazios, chaveados pelo limite superior."""
+        labels = [str(b) for b in self.bounds] + ["+inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {labels[i]: n for i, n in enumerate(self.buckets) if n}
+        }
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas nomeados, seguros para uso de várias threads.
+    `snapshot(reset=True)` devolve os valores acumulados e começa uma nova janela.
+    """
+
+    def __init__(self, bounds=None):
+        """
+        :param bounds: Limites dos buckets por nome de histograma (somados a DEFAULT_BOUNDS).
+        """
+        self._bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = Histogram(self._bounds.get(name, LATENCY_MS_BOUNDS))
+                self._histograms[name] = histogram
+            histogram.observe(value)
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def is_empty(self):
+        with self._lock:
+            return not self._counters and not self._histograms
+
+    def snapshot(self, reset=True):
+        """
+        :param reset: Se True, zera os valores após copiá-los.
+        :return: Dict {"counters": {...}, "histograms": {nome: {...}}}.
+        """
+        with self._lock:
+            data = {
+                "counters": dict(self._counters),
+                "histograms": {name: h.to_dict() for name, h in self._histograms.items()}
+            }
+            if reset:
+                self._counters = {}
+                self._histograms = {}
+        return data
@@ -0,0 +1,162 @@
+"""
+Gravação compacta do fluxo bruto do OCR (texto de cada frame, antes do Stabilizer).
+
+Serve para reproduzir uma sessão real no CaptionStabilizer quantas vezes for preciso
+(ajuste de similarity_threshold, repetition_threshold, smart adjust...), sem precisar
+de uma reunião ao vivo (ver src/tools/ocr_replay.py).
+
+Formato (.ocrtrace, UTF-8, um frame por linha):
+    #ocr-trace v1<TAB><epoch do primeiro frame>
+    <ms desde o frame anterior><TAB><n><TAB><sufixo>
+onde n é quantos caracteres do começo repetem o texto do frame anterior (frames
+seguidos quase sempre repetem o texto inteiro ou só o estendem). Os instantes vêm de
+time.monotonic(). Quebras de linha (modo por linha) e "\\" são escapadas no sufixo.
+Ao fechar, o arquivo é comprimido (gzip); a leitura aceita as duas formas.
+"""
+import datetime
+import os
+import threading
+import time
+
+from src.core.caption_delta import shared_prefix_len
+from src.utils.compression import GZ_SUFFIX, compress_file, open_text
+
+TRACE_EXTENSION = ".ocrtrace"
+FORMAT_HEADER = "#ocr-trace v1"
+
+
+def is_trace_path(path):
+    """Verifica se o caminho é de um .ocrtrace (comprimido ou não)."""
+    if path.endswith(GZ_SUFFIX):
+        path = path[:-len(GZ_SUFFIX)]
+    return path.endswith(TRACE_EXTENSION)
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            out.append({"n": "\n", "r": "\r"}.get(nxt, nxt))
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+class OCRTraceWriter:
+    """
+    Grava os textos do OCR com o instante de chegada. Thread-safe; o arquivo só é
+    criado no primeiro frame (sessões sem gravação não deixam arquivo vazio).
+    """
+
+    def __init__(self, path, compress_on_close=True):
+        """
+        :param path: Arquivo de saída (.ocrtrace).
+        :param compress_on_close: Comprime (gzip) o arquivo ao fechar.
+        """
+        self.path = path
+        self.compress_on_close = compress_on_close
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._previous_text = ""
+        self._previous_time = None
+
+    def record(self, text, timestamp=None):
+        """
+        :param text: Texto bruto do frame (como veio do OCR).
+        :param timestamp: Instante em time.monotonic() (padrão: agora).
+        """
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self._file = open(self.path, "w", encoding="utf-8", newline="\n")
+                    self._file.write(f"{FORMAT_HEADER}\t{time.time():.3f}\n")
+                    self._previous_time = timestamp
+                delta_ms = max(0, int(round((timestamp - self._previous_time) * 1000)))
+                prefix = shared_prefix_len(self._previous_text, text)
+                self._file.write(f"{delta_ms}\t{prefix}\t{_escape(text[prefix:])}\n")
+                # Acumula os arredondamentos no instante anterior (sem deriva ao longo de horas)
+                self._previous_time += delta_ms / 1000
+                self._previous_text = text
+                self.count += 1
+            except OSError as e:
+                print(f"[OCR_TRACE] Erro ao gravar frame: {e}")
+
+    def close(self):
+        """Fecha (e comprime) o arquivo. Retorna o caminho final ou None se nada foi gravado."""
+        with self._lock:
+            if self._file is None:
+                return None
+            self._file.close()
+            self._file = None
+        if self.compress_on_close:
+            return compress_file(self.path) or self.path
+        return self.path
+
+
+def new_trace_path(directory):
+    """Caminho de uma gravação nova na pasta: ocr_AAAAMMDD_HHMMSS.ocrtrace."""
+    return os.path.join(directory, datetime.datetime.now().strftime("ocr_%Y%m%d_%H%M%S") + TRACE_EXTENSION)
+
+
+def read_trace(path):
+    """
+    Lê um .ocrtrace (ou .ocrtrace.gz).
+
+    :return: Iterador de (segundos desde o primeiro frame, texto).
+    """
+    with open_text(path) as f:
+        header = f.readline().rstrip("\n")
+        if not header.startswith(FORMAT_HEADER):
+            raise ValueError(f"Arquivo não é um {TRACE_EXTENSION}: {path}")
+        elapsed_ms = 0
+        previous = ""
+        for number, line in enumerate(f, start=2):
+            line = line.rstrip("\n")
+            if not line:
+                continue
+            try:
+                delta_ms, prefix, suffix = line.split("\t", 2)
+                elapsed_ms += int(delta_ms)
+                text = previous[:int(prefix)] + _unescape(suffix)
+            except ValueError:
+                raise ValueError(f"Registro inválido em {path}:{number}: {line[:50]}")
+            previous = text
+            yield elapsed_ms / 1000, text
+
+
+def trace_start_epoch(path):
+    """Horário (epoch) do primeiro frame, do cabeçalho; None se ausente."""
+    with open_text(path) as f:
+        parts = f.readline().rstrip("\n").split("\t")
+    try:
+        return float(parts[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def load_events(path):
+    """Lista de (segundos, texto) pronta para CaptionStabilizer.process_batch."""
+    return list(read_trace(path))
+
+
+def write_events(path, events):
+    """Grava eventos (segundos, texto) já existentes (ex.: fluxo sintético) como .ocrtrace."""
+    compress = path.endswith(GZ_SUFFIX)
+    writer = OCRTraceWriter(path[:-len(GZ_SUFFIX)] if compress else path, compress_on_close=compress)
+    for timestamp, text in events:
+        writer.record(text, timestamp)
+    return writer.close()
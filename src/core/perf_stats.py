@@ -0,0 +1,124 @@
+"""
+Estatísticas de desempenho ao vivo do pipeline de captura (painel de desempenho).
+
+Diferente do MetricsRegistry (janelas de 60s gravadas no log de uso), aqui ficam
+só as últimas amostras de cada medida, para percentis e FPS "de agora". Gravar uma
+amostra é barato e, com o painel fechado (enabled=False), é só um teste de flag.
+Os percentis são calculados em `snapshot()`, chamado fora da thread da GUI.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+from src.utils.process_stats import ProcessStats
+
+WINDOW_SAMPLES = 512  # Amostras mantidas por medida
+FPS_WINDOW_S = 5.0  # Janela para o FPS efetivo
+
+OCR_LATENCY = "ocr_latency_ms"
+STABILIZER_UPDATE = "stabilizer_update_ms"
+COMMIT_TO_DISK = "commit_to_disk_ms"
+FRAMES_SKIPPED = "frames_skipped"
+QUEUE_DEPTH = "queue_depth"
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por vizinho mais próximo de uma lista já ordenada (None se vazia)."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class PerfStats:
+    """Coletor thread-safe: OCRWorker, CaptionProcessor e FileManager gravam; o monitor lê."""
+
+    def __init__(self, window_samples=WINDOW_SAMPLES, clock=time.monotonic, process_stats=None):
+        self.enabled = False
+        self.window_samples = window_samples
+        self.clock = clock
+        self.process_stats = process_stats or ProcessStats()
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counters = {}
+        self._frame_times = deque()
+        self._gauges = {}
+
+    def set_gauge(self, name, read):
+        """Registra um valor instantâneo (ex.: tamanho de fila), lido só em `snapshot()`."""
+        self._gauges[name] = read
+
+    def set_enabled(self, enabled):
+        """Liga/desliga a coleta; ao ligar, começa do zero (nada de amostras antigas)."""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+            self._counters = {}
+            self._frame_times = deque()
+
+    def observe(self, name, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window_samples)
+            samples.append(value)
+
+    def increment(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def record_frame(self, latency_ms):
+        """Um frame capturado e processado pelo OCR (alimenta FPS e latência)."""
+        if not self.enabled:
+            return
+        now = self.clock()
+        with self._lock:
+            self._frame_times.append(now)
+            while self._frame_times and now - self._frame_times[0] > FPS_WINDOW_S:
+                self._frame_times.popleft()
+        self.observe(OCR_LATENCY, latency_ms)
+
+    def _fps(self, now):
+        times = self._frame_times
+        while times and now - times[0] > FPS_WINDOW_S:
+            times.popleft()
+        if len(times) < 2:
+            return 0.0
+        span = times[-1] - times[0]
+        return (len(times) - 1) / span if span > 0 else 0.0
+
+    def snapshot(self):
+        """
+        :return: Dict com fps, percentis (p50/p95/p99) por medida, contadores,
+                 gauges e rss_mb/cpu_percent do processo.
+        """
+        with self._lock:
+            fps = self._fps(self.clock())
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            counters = dict(self._counters)
+        result = {"fps": fps, "counters": counters}
+        for name, read in list(self._gauges.items()):
+            try:
+                result[name] = read()
+            except Exception as e:
+                print(f"[PERF_STATS] Erro ao ler {name}: {e}")
+                result[name] = None
+        for name, values in samples.items():
+            result[name] = {
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "count": len(values)
+            }
+        result["rss_mb"] = self.process_stats.rss_mb()
+        result["cpu_percent"] = self.process_stats.cpu_percent()
+        return result
@@ -0,0 +1,340 @@
+"""
+Ajuste automático dos parâmetros do Stabilizer a partir de fluxos de OCR gravados.
+
+Cada combinação de parâmetros (timeout, similaridade, intervalo mínimo e limiares de
+jitter/estabilidade) é reproduzida em tempo virtual sobre os fluxos (ver replay.py)
+e pontuada contra a transcrição de referência: latência do commit, duplicatas e
+frases perdidas (quanto menor a pontuação, melhor).
+
+As avaliações rodam em paralelo num ProcessPoolExecutor. Os fluxos vão para cada
+processo uma única vez (initializer), e não a cada combinação, então sessões de horas
+não pesam no envio das tarefas.
+
+Estratégias de busca:
+- "grid": todas as combinações de SEARCH_SPACE;
+- "random": amostras aleatórias do espaço seguidas de rodadas de refinamento em torno
+  das melhores (vizinhos na grade), que chegam perto do ótimo com bem menos avaliações.
+"""
+import difflib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.caption_timeline import CaptionTimeline, MODE_SCROLLING
+from src.core.perf_stats import percentile
+from src.core.presets import get_preset
+from src.core.replay import count_duplicates, load_reference, normalize_words, run_stabilizer
+
+STRATEGIES = ("grid", "random")
+
+# Valores testados por parâmetro (dentro dos limites aceitos pelo Stabilizer)
+SEARCH_SPACE = {
+    "timeout_ms": [1000, 1500, 2000, 2500, 3000, 4000],
+    "similarity_threshold": [0.4, 0.5, 0.6, 0.7, 0.8],
+    "min_update_interval": [20, 50, 100, 150, 200],
+    "jitter_detection_threshold": [30, 40, 50, 60, 80],
+    "stability_detection_threshold": [10, 15, 20, 25, 30],
+}
+
+# Ajustes automáticos do Stabilizer mudam timeout, similaridade e intervalo durante a
+# execução (o smart adjust limita o intervalo a 100 ms): ficam desligados na busca e no
+# preset gravado, senão os valores avaliados não seriam os usados
+PINNED_FLAGS = {"auto_timeout": False, "auto_smart_adjust": False}
+
+# Pesos da pontuação: uma frase perdida custa mais que uma duplicata, que custa mais
+# que um segundo de atraso no commit
+WEIGHTS = {"missed_rate": 10.0, "duplicate_rate": 5.0, "spurious_rate": 2.0, "latency_s": 1.0}
+
+MATCH_COVERAGE = 0.8  # Fração das palavras da frase de referência que o commit precisa conter
+MATCH_LOOKAHEAD = 8  # Commits examinados à frente ao procurar a próxima frase
+REFINE_TOP = 4  # Melhores combinações usadas como ponto de partida do refinamento
+
+
+def load_reference_entries(path):
+    """
+    Transcrição de referência como lista de {"text", "end"}. O .truth.json do gerador
+    sintético traz o instante em que cada frase fica completa ("end", usado na latência);
+    nos demais formatos (ver replay.load_reference) "end" é None.
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [{"text": entry["text"], "end": entry.get("end")} for entry in json.load(f)["captions"]]
+    return [{"text": text, "end": None} for text in load_reference(path)]
+
+
+def make_dataset(name, events, reference, config=None):
+    """
+    :param events: Lista de (segundos, texto) do fluxo do OCR.
+    :param reference: Lista de {"text", "end"} (ver load_reference_entries).
+    :param config: Chaves fixas para este fluxo (ex.: {"rolling_mode": True}).
+    """
+    return {"name": name, "events": events, "reference": reference, "config": config or {}}
+
+
+def synthetic_dataset(mode, seconds, flicker_rate=0.1, seed=0, fps=5.0):
+    """Fluxo sintético (CaptionTimeline) com a transcrição de referência exata."""
+    timeline = CaptionTimeline(mode=mode, flicker_rate=flicker_rate, seed=seed)
+    reference = [{"text": entry["text"], "end": entry["end"]} for entry in timeline.transcript(seconds)]
+    return make_dataset(f"synthetic-{mode}", timeline.events(seconds, fps), reference,
+                        {"rolling_mode": mode == MODE_SCROLLING})
+
+
+def _coverage(reference_words, commit_words):
+    """Fração das palavras da referência que aparecem, em ordem, no commit."""
+    if not reference_words:
+        return 0.0
+    matcher = difflib.SequenceMatcher(None, reference_words, commit_words, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(reference_words)
+
+
+def match_commits(commits, reference):
+    """
+    Alinha as frases de referência aos commits, em ordem. Um commit pode cobrir mais de
+    uma frase (modo rolante); cada frase procura o commit que melhor a contém entre os
+    próximos MATCH_LOOKAHEAD.
+
+    :param commits: Lista de (segundos, texto).
+    :param reference: Lista de {"text", "end"}.
+    :return: (frases perdidas, commits sem frase correspondente, latências em segundos).
+    """
+    commit_words = [normalize_words(text) for _, text in commits]
+    used = [False] * len(commits)
+    latencies = []
+    missed = 0
+    pointer = 0
+    for entry in reference:
+        words = normalize_words(entry["text"])
+        best, best_coverage = None, 0.0
+        for j in range(pointer, min(len(commits), pointer + MATCH_LOOKAHEAD)):
+            coverage = _coverage(words, commit_words[j])
+            if coverage > best_coverage:
+                best, best_coverage = j, coverage
+                if coverage == 1.0:
+                    break
+        if best is None or best_coverage < MATCH_COVERAGE:
+            missed += 1
+            continue
+        used[best] = True
+        pointer = best
+        if entry.get("end") is not None:
+            latencies.append(max(0.0, commits[best][0] - entry["end"]))
+    return missed, used.count(False), latencies
+
+
+def evaluate(params, datasets, base_config=None, pin_flags=True):
+    """
+    Reproduz todos os fluxos com `params` sobre `base_config` e calcula as métricas.
+
+    :param pin_flags: Desliga os ajustes automáticos (PINNED_FLAGS); False avalia
+                      `base_config` como está (ex.: o preset atual, para comparação).
+    :return: Dict com "params", "score" e as métricas agregadas dos fluxos.
+    """
+    reference_lines = commits_total = missed = duplicates = spurious = 0
+    latencies = []
+    for dataset in datasets:
+        config = dict(base_config or {})
+        config.update(dataset["config"])
+        config.update(params)
+        if pin_flags:
+            config.update(PINNED_FLAGS)
+        commits, _ = run_stabilizer(dataset["events"], config)
+        lost, unmatched, commit_latencies = match_commits(commits, dataset["reference"])
+        reference_lines += len(dataset["reference"])
+        commits_total += len(commits)
+        missed += lost
+        spurious += unmatched
+        duplicates += count_duplicates([text for _, text in commits])
+        latencies.extend(commit_latencies)
+
+    latencies.sort()
+    metrics = {
+        "reference_lines": reference_lines,
+        "commits": commits_total,
+        "missed": missed,
+        "duplicates": duplicates,
+        "spurious": spurious,
+        "missed_rate": missed / reference_lines if reference_lines else 0.0,
+        "duplicate_rate": duplicates / commits_total if commits_total else 0.0,
+        "spurious_rate": spurious / commits_total if commits_total else 0.0,
+        "latency_s": sum(latencies) / len(latencies) if latencies else None,
+        "latency_p95_s": percentile(latencies, 0.95),
+    }
+    score = sum(weight * (metrics[key] or 0.0) for key, weight in WEIGHTS.items())
+    return {"params": dict(params), "score": score, **metrics}
+
+
+# --- Avaliação em processos ---
+
+_worker_datasets = None
+_worker_base_config = None
+
+
+def _init_worker(datasets, base_config):
+    global _worker_datasets, _worker_base_config
+    _worker_datasets = datasets
+    _worker_base_config = base_config
+
+
+def _evaluate_in_worker(params):
+    return evaluate(params, _worker_datasets, _worker_base_config)
+
+
+def grid_candidates(space):
+    """Todas as combinações do espaço (dict parâmetro -> valores)."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def _neighbors(params, space):
+    """Combinações que diferem de `params` em um passo da grade de um único parâmetro."""
+    result = []
+    for key, values in space.items():
+        index = values.index(params[key]) if params[key] in values else 0
+        for step in (-1, 1):
+            if 0 <= index + step < len(values):
+                result.append({**params, key: values[index + step]})
+    return result
+
+
+def _key(params):
+    return tuple(sorted(params.items()))
+
+
+class PresetTuner:
+    """Busca a combinação de parâmetros com menor pontuação sobre os fluxos."""
+
+    def __init__(self, datasets, base_config=None, space=None, workers=None):
+        """
+        :param datasets: Fluxos com referência (ver make_dataset / synthetic_dataset).
+        :param base_config: Configuração de partida (ex.: um preset); os parâmetros
+                            buscados a sobrescrevem.
+        :param space: Dict parâmetro -> valores (padrão: SEARCH_SPACE).
+        :param workers: Processos paralelos (padrão: núcleos da máquina; 1 = sem pool).
+        """
+        if not datasets:
+            raise ValueError("Nenhum fluxo para avaliar")
+        self.datasets = datasets
+        self.base_config = base_config or {}
+        self.space = space or SEARCH_SPACE
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.results = {}
+        self._executor = None
+
+    def _evaluate_batch(self, candidates, progress=None):
+        candidates = [c for c in candidates if _key(c) not in self.results]
+        if self._executor is None:
+            evaluated = (evaluate(c, self.datasets, self.base_config) for c in candidates)
+        else:
+            chunksize = max(1, len(candidates) // (self.workers * 4))
+            evaluated = self._executor.map(_evaluate_in_worker, candidates, chunksize=chunksize)
+        for result in evaluated:
+            self.results[_key(result["params"])] = result
+            if progress:
+                progress(len(self.results), self.best())
+
+    def ranked(self, count=None):
+        """Resultados avaliados, do melhor para o pior (só os `count` primeiros, se dado)."""
+        return sorted(self.results.values(), key=lambda r: r["score"])[:count]
+
+    def best(self):
+        """Melhor resultado avaliado até agora (None antes da primeira avaliação)."""
+        ranked = self.ranked(1)
+        return ranked[0] if ranked else None
+
+    def run(self, strategy="random", budget=100, seed=0, progress=None):
+        """
+        Executa a busca.
+
+        :param strategy: "grid" (todas as combinações) ou "random" (amostragem + refinamento).
+        :param budget: Máximo de combinações avaliadas na estratégia "random".
+        :param progress: Função(avaliadas, melhor_resultado) chamada a cada avaliação.
+        :return: Resultados ordenados pela pontuação (melhor primeiro).
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia desconhecida: {strategy}")
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self.datasets, self.base_config))
+        try:
+            if strategy == "grid":
+                self._evaluate_batch(grid_candidates(self.space), progress)
+            else:
+                self._random_search(budget, random.Random(seed), progress)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        return self.ranked()
+
+    def _random_search(self, budget, rng, progress):
+        total = 1
+        for values in self.space.values():
+            total *= len(values)
+        budget = min(budget, total)
+
+        def sample():
+            return {key: rng.choice(values) for key, values in self.space.items()}
+
+        initial = {}
+        while len(initial) < max(1, budget // 2):
+            candidate = sample()
+            initial[_key(candidate)] = candidate
+        self._evaluate_batch(list(initial.values()), progress)
+
+        while len(self.results) < budget:
+            candidates = {}
+            for result in self.ranked(REFINE_TOP):
+                for neighbor in _neighbors(result["params"], self.space):
+                    if _key(neighbor) not in self.results:
+                        candidates[_key(neighbor)] = neighbor
+            while not candidates:  # Vizinhança esgotada: volta a amostrar
+                candidate = sample()
+                if _key(candidate) not in self.results:
+                    candidates[_key(candidate)] = candidate
+            self._evaluate_batch(list(candidates.values())[:budget - len(self.results)], progress)
+
+
+def base_config_for(preset_key):
+    """Configuração de um preset sem os campos descritivos ({} se o preset não existir)."""
+    preset = get_preset(preset_key) or {}
+    return {k: v for k, v in preset.items() if k not in ("name", "description")}
+
+
+def preset_entry(result, base_preset=None, name=None, description=None):
+    """
+    Entrada no formato de presets.PRESETS: o preset base com os parâmetros ajustados
+    e os ajustes automáticos desligados (como na busca).
+
+    :param result: Resultado de `evaluate` (normalmente o melhor da busca).
+    """
+    base = (get_preset(base_preset) or {}) if base_preset else {}
+    entry = {
+        "name": name or (f"{base['name']} (ajustado)" if base.get("name") else "Ajustado"),
+        "description": description or "Parâmetros ajustados automaticamente sobre fluxos de OCR gravados",
+    }
+    if base_preset:
+        entry.update(base_config_for(base_preset))
+    entry.update(result["params"])
+    entry.update(PINNED_FLAGS)
+    return entry
+
+
+def save_preset_entry(path, key, entry, metrics=None):
+    """
+    Grava (ou substitui) `key` no JSON de presets ajustados, preservando as demais
+    entradas. As métricas da avaliação ficam em "_tuning" para referência.
+    """
+    presets = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            presets = json.load(f)
+    presets[key] = dict(entry)
+    if metrics:
+        presets[key]["_tuning"] = metrics
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(presets, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return presets
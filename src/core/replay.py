@@ -0,0 +1,131 @@
+"""
+Replay de um fluxo de OCR gravado no CaptionStabilizer, mais rápido que o tempo real,
+e métricas do resultado (vazão, commits, duplicatas e distância de edição contra uma
+transcrição de referência). Usado por src/tools/ocr_replay.py e pelo ajuste de presets.
+"""
+import difflib
+import json
+import re
+import time
+
+from src.core.caption_reader import caption_lines, parse_line
+from src.core.stabilizer import CaptionStabilizer, ManualClock
+from src.utils.compression import open_text
+
+DUPLICATE_SIMILARITY = 0.9  # Commit tão parecido com um recente conta como duplicata
+DUPLICATE_WINDOW = 5  # Commits recentes comparados
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_words(text):
+    """Palavras em minúsculas, sem pontuação (comparação tolerante a detalhes do OCR)."""
+    return _WORD_RE.findall(text.casefold())
+
+
+def load_reference(path):
+    """
+    Frases da transcrição de referência. Aceita o .truth.json do gerador sintético,
+    arquivos de legenda ("[HH:MM:SS] texto", .txt/.cdelta, opcionalmente .gz) e texto
+    puro (uma frase por linha).
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [entry["text"] for entry in json.load(f)["captions"]]
+    sentences = []
+    with open_text(path) as f:
+        for line in caption_lines(f, path):
+            parsed = parse_line(line)
+            text = parsed[1] if parsed else line.strip()
+            if text and not text.startswith("#"):
+                sentences.append(text)
+    return sentences
+
+
+def edit_distance(hypothesis, reference):
+    """
+    Distância de edição em palavras (substituições + inserções + remoções), a partir do
+    alinhamento do difflib (linear na prática para textos parecidos, ao contrário da
+    matriz completa de Levenshtein em transcrições de horas).
+    """
+    matcher = difflib.SequenceMatcher(None, hypothesis, reference, autojunk=False)
+    distance = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            distance += max(i2 - i1, j2 - j1)
+    return distance
+
+
+def run_stabilizer(events, config=None):
+    """
+    Processa os eventos em tempo virtual.
+
+    :param events: Lista de (segundos, texto) em ordem.
+    :param config: Chaves de configuração (as mesmas dos presets) aplicadas antes.
+    :return: (commits como lista de (segundos, texto), stabilizer).
+    """
+    commits = []
+    stabilizer = CaptionStabilizer(lambda text: commits.append((stabilizer.clock(), text)),
+                                   clock=ManualClock(events[0][0] if events else 0.0))
+    if config:
+        stabilizer.apply_config(config)
+    stabilizer.process_batch(events)
+    return commits, stabilizer
+
+
+def count_duplicates(texts, similarity=DUPLICATE_SIMILARITY, window=DUPLICATE_WINDOW):
+    """Commits iguais, contidos ou muito parecidos com um dos `window` anteriores."""
+    duplicates = 0
+    recent = []
+    for text in texts:
+        normalized = " ".join(normalize_words(text))
+        for previous in recent:
+            if normalized in previous:
+                duplicates += 1
+                break
+            # quick_ratio/real_quick_ratio são limites superiores baratos de ratio():
+            # descartam a maioria dos pares sem o alinhamento completo
+            matcher = difflib.SequenceMatcher(None, normalized, previous)
+            if (matcher.real_quick_ratio() >= similarity and matcher.quick_ratio() >= similarity
+                    and matcher.ratio() >= similarity):
+                duplicates += 1
+                break
+        recent.append(normalized)
+        if len(recent) > window:
+            recent.pop(0)
+    return duplicates
+
+
+def replay(events, config=None, reference=None):
+    """
+    Reproduz o fluxo e mede o resultado.
+
+    :param reference: Frases de referência (opcional) para a distância de edição.
+    :return: Dict com o relatório (e "commits" com os (segundos, texto) gerados).
+    """
+    start = time.perf_counter()
+    commits, stabilizer = run_stabilizer(events, config)
+    elapsed = time.perf_counter() - start
+    duration = events[-1][0] - events[0][0] if events else 0.0
+    texts = [text for _, text in commits]
+    duplicates = count_duplicates(texts)
+    report = {
+        "events": len(events),
+        "trace_duration_s": duration,
+        "elapsed_s": elapsed,
+        "events_per_s": len(events) / elapsed if elapsed > 0 else None,
+        "speedup": duration / elapsed if elapsed > 0 else None,
+        "commits": len(commits),
+        "duplicates": duplicates,
+        "duplicate_rate": duplicates / len(commits) if commits else 0.0,
+        "exact_duplicates_skipped": stabilizer.exact_duplicate_count,
+        "repetitions_blocked": stabilizer.repetition_count,
+    }
+    if reference is not None:
+        reference_words = [w for sentence in reference for w in normalize_words(sentence)]
+        hypothesis_words = [w for text in texts for w in normalize_words(text)]
+        distance = edit_distance(hypothesis_words, reference_words)
+        report["reference_words"] = len(reference_words)
+        report["edit_distance"] = distance
+        report["word_error_rate"] = distance / len(reference_words) if reference_words else None
+    report["commit_list"] = commits
+    return report
@@ -0,0 +1,178 @@
+"""
+Mesclagem de legendas rolantes.
+
+Fontes como o Windows Live Captions mostram uma janela deslizante de texto:
+cada leitura do OCR repete boa parte da anterior e acrescenta algumas palavras
+no final. Em vez de comparar a janela inteira a cada frame (difflib), este módulo
+encontra a maior sobreposição sufixo/prefixo entre o fim da transcrição já emitida
+e o novo texto, em tempo linear (função de prefixo do KMP), e devolve apenas as
+palavras realmente novas.
+
+Quando a sobreposição exata é curta demais (o OCR errou uma palavra na emenda), tenta
+uma sobreposição aproximada e, depois, uma de uma só palavra longa; sem nenhuma, a
+leitura é descartada até algumas seguidas confirmarem que o texto mudou de fato.
+"""
+import difflib
+import math
+from collections import deque
+
+_STRIP_CHARS = ".,;:!?\"'()[]{}…-–—"
+
+FUZZY_MIN_MATCH = 0.75  # Fração das palavras da sobreposição aproximada que precisam casar
+FUZZY_WORD_RATIO = 0.8  # Semelhança mínima entre duas palavras lidas com erro de OCR
+LONG_WORD = 5  # Tamanho mínimo para uma única palavra bastar como sobreposição
+RESYNC_FRAMES = 3  # Leituras seguidas sem sobreposição para aceitar a janela como texto novo
+
+
+def normalize_word(word):
+    """Normaliza uma palavra para comparação (minúsculas, sem pontuação nas bordas)."""
+    return word.strip(_STRIP_CHARS).lower()
+
+
+def longest_suffix_prefix_overlap(tail, new):
+    """
+    Calcula a maior sobreposição entre o sufixo de `tail` e o prefixo de `new`.
+
+    Usa a função de prefixo do KMP sobre `new` e percorre `tail` uma única vez:
+    O(len(tail) + len(new)).
+
+    :param tail: Sequência (ex.: palavras normalizadas) já emitida.
+    :param new: Sequência recém-lida.
+    :return: Tupla (overlap, contained): `overlap` é o maior k tal que
+             tail[-k:] == new[:k]; `contained` indica se `new` inteiro aparece
+             em algum ponto de `tail`.
+    """
+    m = len(new)
+    if not tail or not m:
+        return 0, False
+
+    # Função de prefixo: fail[i] = maior borda própria de new[:i + 1]
+    fail = [0] * m
+    k = 0
+    for i in range(1, m):
+        while k and new[i] != new[k]:
+            k = fail[k - 1]
+        if new[i] == new[k]:
+            k += 1
+        fail[i] = k
+
+    k = 0
+    contained = False
+    for item in tail:
+        while k and (k == m or item != new[k]):
+            k = fail[k - 1]
+        if k < m and item == new[k]:
+            k += 1
+        if k == m:
+            contained = True
+    return k, contained
+
+
+def words_match(a, b):
+    """Palavras normalizadas iguais ou (se longas) parecidas o bastante para serem erro de OCR."""
+    if a == b:
+        return True
+    if min(len(a), len(b)) < 4 or abs(len(a) - len(b)) > 2:
+        return False
+    return difflib.SequenceMatcher(None, a, b).ratio() >= FUZZY_WORD_RATIO
+
+
+def fuzzy_suffix_prefix_overlap(tail, new, min_overlap, min_match=FUZZY_MIN_MATCH):
+    """
+    Maior k >= min_overlap em que tail[-k:] e new[:k] casam em ao menos `min_match` das
+    posições (words_match), com a primeira e a última palavra casando. Tolera palavras
+    trocadas pelo OCR na emenda. O(len(tail) * len(new)) no pior caso, mas cada k para
+    no primeiro erro além do permitido.
+
+    :return: k, ou 0 se não houver sobreposição aproximada.
+    """
+    for k in range(min(len(tail), len(new)), min_overlap - 1, -1):
+        start = len(tail) - k
+        if not (words_match(tail[start], new[0]) and words_match(tail[-1], new[k - 1])):
+            continue
+        allowed = k - math.ceil(k * min_match)
+        misses = 0
+        for i in range(1, k - 1):
+            if not words_match(tail[start + i], new[i]):
+                misses += 1
+                if misses > allowed:
+                    break
+        if misses <= allowed:
+            return k
+    return 0
+
+
+class RollingMerger:
+    """
+    Mantém o fim da transcrição emitida e extrai as palavras novas de cada leitura.
+    """
+
+    def __init__(self, tail_words=64, min_overlap=2, resync_frames=RESYNC_FRAMES):
+        """
+        :param tail_words: Quantas palavras do fim da transcrição guardar para comparação.
+        :param min_overlap: Sobreposição mínima (em palavras) para considerar que a janela
+                            continua a transcrição. Evita casar por acaso palavras curtas
+                            como "a" ou "de".
+        :param resync_frames: Leituras seguidas sem sobreposição até a janela ser aceita
+                              inteira (a tela mudou de verdade); as anteriores são descartadas.
+        """
+        self.tail = deque(maxlen=tail_words)
+        self.min_overlap = min_overlap
+        self.resync_frames = max(1, resync_frames)
+        self.skipped_count = 0  # Leituras descartadas por falta de sobreposição
+        self._misses = 0
+
+    def reset(self):
+        """Esquece a transcrição emitida (ex.: ao trocar de modo ou limpar arquivos)."""
+        self.tail.clear()
+        self._misses = 0
+
+    def merge(self, text):
+        """
+        Compara o texto lido com o fim da transcrição e registra as palavras novas.
+
+        :param text: Texto cru vindo do OCR (janela deslizante).
+        :return: Tupla (replaced, new_words): `replaced` é quantas palavras já emitidas
+                 no fim da transcrição foram corrigidas pela nova leitura (ex.: "progra"
+                 virou "programar"); `new_words` são as palavras a acrescentar, na forma
+                 original.
+        """
+        words = text.split()
+        normalized = [normalize_word(w) for w in words]
+        if not words:
+            return 0, []
+
+        tail = list(self.tail)
+        min_overlap = min(self.min_overlap, len(words))
+        replaced = 0
+
+        overlap, contained = longest_suffix_prefix_overlap(tail, normalized)
+        if contained:
+            # A janela inteira já foi emitida (leitura repetida ou atrasada)
+            return 0, []
+
+        if overlap < min_overlap and len(tail) > 1:
+            # A última palavra emitida pode ter sido parcial e corrigida nesta leitura
+            retry, _ = longest_suffix_prefix_overlap(tail[:-1], normalized)
+            if retry >= min_overlap and retry < len(words) and normalized[retry] != tail[-1]:
+                overlap = retry
+                replaced = 1
+                self.tail.pop()
+
+        if overlap < min_overlap and tail:
+            fuzzy = fuzzy_suffix_prefix_overlap(tail, normalized, min_overlap)
+            if fuzzy:
+                overlap = fuzzy
+            elif not (overlap == 1 and len(normalized[0]) >= LONG_WORD):
+                # Sem emenda: erro de OCR na junção ou texto novo; só aceita a janela
+                # inteira depois de algumas leituras seguidas assim (evita repetir a transcrição)
+                self._misses += 1
+                if self._misses < self.resync_frames:
+                    self.skipped_count += 1
+                    return 0, []
+                overlap = 0
+        self._misses = 0
+
+        new_words = words[overlap:]
+        self.tail.extend(normalized[overlap:])
+        return replaced, new_words
@@ -1,16 +1,29 @@
+import atexit
 import json
 import os
+import threading
 from src.utils.paths import get_settings_path
 
 class SettingsManager:
     """Gerencia persistência de configurações do usuário em JSON."""
     
-    def __init__(self, settings_file=None):
+    def __init__(self, settings_file=None, debounce_ms=0):
         """
         :param settings_file: Caminho do arquivo de configurações (padrão: auto-detectado via paths.py)
+        :param debounce_ms: Se > 0, grava em segundo plano (write-behind): alterações feitas dentro
+                            da janela viram uma única gravação. flush()/close() gravam na hora, e
+                            a gravação final é garantida no encerramento do processo (atexit).
         """
         self.settings_file = settings_file or get_settings_path()
         self.settings = self._load_settings()
+
+        self.debounce_ms = debounce_ms
+        self._lock = threading.RLock()  # Protege settings, _dirty e _timer
+        self._write_lock = threading.Lock()  # Serializa gravações (timer x flush)
+        self._dirty = False
+        self._timer = None
+        if self.debounce_ms > 0:
+            atexit.register(self.flush)
     
     def _load_settings(self):
         """Carrega configurações do arquivo JSON, mesclando com defaults para garantir campos novos."""
@@ -45,19 +58,93 @@ class SettingsManager:
             "jitter_detection_threshold": 50,
             "stability_detection_threshold": 20,
             "repetition_threshold": 0.8,
+            "rolling_mode": False,
+            "line_mode": False,
+            "caption_durability": "interval",  # "always" (fsync por linha), "interval" ou "os"
+            "caption_fsync_interval_ms": 1000,
+            "caption_fsync_every_lines": 50,  # Linhas que forçam um fsync antes do intervalo ("interval")
+            "caption_format": "txt",  # "txt" ou "delta" (.cdelta compacto)
+            "caption_history_compress": True,  # Comprime (gzip) os históricos rotacionados
+            "caption_history_max_mb": 100,  # Tamanho total máximo dos históricos
+            "caption_latency_annotation": False,  # Mostra no log de captura a latência captura -> commit
+            "ocr_trace_record": False,  # Grava o texto bruto do OCR (.ocrtrace) para replay/ajuste offline
+            "frame_recorder": False,  # Grava os frames capturados num anel em disco (logs/frames.ring) para re-OCR
+            "frame_recorder_mode": "gray",  # "gray" (captura em cinza) ou "binary" (imagem do OCR, ~8x menor)
+            "frame_recorder_size_mb": 256,  # Tamanho fixo do anel; os frames mais antigos são sobrescritos
+            "caption_archive": False,  # Também grava as frases no arquivo SQLite (busca full-text)
+            "caption_archive_retention_days": 0,  # 0 = mantém tudo
+            "caption_archive_max_rows": 0,  # 0 = sem limite
+            "usage_log_debug": False,  # Grava toda decisão individualmente (senão só métricas agregadas)
+            "metrics_interval_s": 60,
+            "usage_log_compress": True,  # Comprime (gzip) partes de log rotacionadas
+            "usage_log_max_total_mb": 200,  # Retenção: tamanho total das partes antigas
+            "usage_log_max_age_days": 30,  # Retenção: idade máxima das partes antigas
+            "usage_log_levels": {},  # ex.: {"TEXT_PROCESSING": "count", "EVENT:TEXT_DETECTED": "sample:50"}
             "ocr_languages": ["pt", "en"],
             "use_gpu": True,
             "preset": "custom"
         }
     
     def save_settings(self):
-        """Salva configurações atuais no arquivo JSON."""
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
-            print(f"Configurações salvas em {self.settings_file}")
-        except Exception as e:
-            print(f"Erro ao salvar configurações: {e}")
+        """
+        Salva configurações atuais no arquivo JSON.
+        No modo write-behind só agenda a gravação (no máximo debounce_ms depois).
+        """
+        if self.debounce_ms <= 0:
+            self._write_now()
+            return
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce_ms / 1000.0, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        self._write_now()
+
+    def flush(self):
+        """Grava imediatamente alterações pendentes do modo write-behind."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending = self._dirty
+        if pending:
+            self._write_now()
+
+    def close(self):
+        """Grava o que estiver pendente; chamado no encerramento do app."""
+        self.flush()
+        if self.debounce_ms > 0:
+            atexit.unregister(self.flush)
+
+    def _write_now(self):
+        """
+        Grava de forma atômica: arquivo temporário na mesma pasta + os.replace.
+        Uma interrupção no meio nunca deixa o JSON truncado.
+        """
+        with self._write_lock:
+            with self._lock:
+                self._dirty = False
+                data = json.dumps(self.settings, indent=2, ensure_ascii=False)
+            tmp_path = self.settings_file + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.settings_file)
+                print(f"Configurações salvas em {self.settings_file}")
+            except Exception as e:
+                print(f"Erro ao salvar configurações: {e}")
+                try:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                except OSError:
+                    pass
     
     def get(self, key, default=None):
         """Retorna uma configuração específica."""
@@ -70,7 +157,8 @@ class SettingsManager:
         :param key: Chave da configuração
         :param value: Valor a ser definido
         """
-        self.settings[key] = value
+        with self._lock:
+            self.settings[key] = value
         self.save_settings()
     
     def set_multiple(self, settings_dict):
@@ -79,14 +167,17 @@ class SettingsManager:
         
         :param settings_dict: Dicionário com as configurações a serem definidas
         """
-        self.settings.update(settings_dict)
+        with self._lock:
+            self.settings.update(settings_dict)
         self.save_settings()
     
     def get_all(self):
         """Retorna todas as configurações atuais."""
-        return self.settings.copy()
+        with self._lock:
+            return self.settings.copy()
     
     def reset_to_defaults(self):
         """Restaura configurações para os valores padrão."""
-        self.settings = self._get_default_settings()
+        with self._lock:
+            self.settings = self._get_default_settings()
         self.save_settings()
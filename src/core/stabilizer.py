@@ -2,18 +2,48 @@ import difflib
 import time
 import statistics
 from collections import deque
+from src.core.rolling_merge import RollingMerger
+from src.core.line_tracker import LineTracker
+from src.core.frame_trace import DECIDED
+
+
+class ManualClock:
+    """
+    Relógio virtual controlado manualmente.
+    Usado em testes e no replay de sessões gravadas, onde o tempo deve avançar
+    de forma determinística (sem time.sleep).
+    """
+
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """Avança o relógio em `seconds` segundos."""
+        self.now += seconds
+
+    def advance_to(self, timestamp):
+        """Avança o relógio até `timestamp` (nunca volta no tempo)."""
+        if timestamp > self.now:
+            self.now = float(timestamp)
+
 
 class CaptionStabilizer:
-    def __init__(self, on_commit_callback, initial_timeout_ms=1500, usage_logger=None):
+    def __init__(self, on_commit_callback, initial_timeout_ms=1500, usage_logger=None, clock=None):
         """
         :param on_commit_callback: Função para chamar quando uma frase é finalizada (str).
         :param initial_timeout_ms: Tempo inicial em ms para considerar silêncio.
         :param usage_logger: Instância de UsageLogger para registrar eventos (opcional).
+        :param clock: Função sem argumentos que retorna o tempo atual em segundos
+                      (padrão: time.time). Use ManualClock para tempo virtual.
         """
         self.on_commit = on_commit_callback
         self.usage_logger = usage_logger
+        self.clock = clock or time.time
         self.current_buffer = ""
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock()
 
         # Configurações de Timeout
         self.silence_timeout_ms = initial_timeout_ms
@@ -42,18 +72,37 @@ class CaptionStabilizer:
         self.consecutive_repetition_count = 0  # Contador de repetições consecutivas
         self.last_text_hash = None  # Hash do último texto para detecção rápida de duplicatas exatas
 
+        # Modo rolante (janela deslizante, ex.: Live Captions)
+        self.is_rolling_mode = False
+        self.rolling_merger = RollingMerger()
+        self.rolling_max_words = 40  # Commita o buffer rolante ao atingir este tamanho
+        self.rolling_duplicate_count = 0  # Leituras rolantes sem nenhuma palavra nova
+
+        # Modo por linha (regiões com várias linhas de legenda)
+        self.is_line_mode = False
+        self.line_tracker = LineTracker(self.similarity_threshold)
+
         # Ajuste Inteligente
         self.is_auto_smart_adjust = False
         self.auto_adjust_callback = None  # Callback para notificar UI sobre ajustes
         self.debug_log_callback = None  # Callback para enviar logs de debug
+        self.deadline_callback = None  # Callback para publicar o próximo deadline de silêncio
+        self._published_deadline = None
+
+        # Rastreamento de latência (FrameTrace): o frame mais antigo ainda não commitado
+        # e o frame sendo processado agora. on_commit lê `last_commit_trace`.
+        self._pending_trace = None
+        self._current_trace = None
+        self.last_commit_trace = None
 
         # Para estatísticas dinâmicas
         self.update_deltas = deque(maxlen=50) # Guarda os últimos 50 intervalos entre updates da MESMA frase
         self.similarity_history = deque(maxlen=20)  # Histórico de similaridades
-        self.last_recalc_time = time.time()
+        self.last_recalc_time = self.clock()
         
         # Contadores para análise
         self.commit_count = 0
+        self.last_commit_time = None  # Para o histograma de intervalo entre commits
         self.repetition_count = 0
         self.same_phrase_count = 0
         self.new_phrase_count = 0
@@ -71,11 +120,41 @@ class CaptionStabilizer:
         """Define callback para enviar logs de debug."""
         self.debug_log_callback = callback
 
+    def set_deadline_callback(self, callback):
+        """
+        Define callback chamado quando o próximo deadline de silêncio muda.
+        Recebe o instante (no relógio do stabilizer) em que o buffer vence,
+        ou None quando não há buffer pendente (nada a agendar).
+        """
+        self.deadline_callback = callback
+
+    def get_next_deadline(self):
+        """
+        Retorna o instante (no relógio do stabilizer) em que o buffer atual será
+        commitado por silêncio: last_update_time + silence_timeout_ms.
+        Retorna None se não há buffer pendente.
+        """
+        if self.is_line_mode:
+            return self.line_tracker.next_deadline(self.silence_timeout_ms / 1000.0)
+        if not self.current_buffer:
+            return None
+        return self._timeout_deadline()
+
+    def _publish_deadline(self, force=False):
+        """Notifica o callback de deadline se o próximo deadline mudou (ou se force=True)."""
+        deadline = self.get_next_deadline()
+        if not force and deadline == self._published_deadline:
+            return
+        self._published_deadline = deadline
+        if self.deadline_callback:
+            self.deadline_callback(deadline)
+
     def set_timeout_ms(self, ms):
         old = self.silence_timeout_ms
         self.silence_timeout_ms = ms
         if self.usage_logger:
             self.usage_logger.log_config_change("timeout_ms", old, ms, "Manual")
+        self._publish_deadline()
 
     def set_auto_timeout(self, enabled):
         old = self.is_auto_timeout
@@ -124,6 +203,75 @@ class CaptionStabilizer:
         if self.usage_logger:
             self.usage_logger.log_config_change("auto_smart_adjust", old, enabled, "Manual")
 
+    def set_rolling_mode(self, enabled):
+        """
+        Ativa/desativa o modo rolante.
+        Para fontes que mostram uma janela deslizante de texto: em vez de comparar a
+        janela inteira, apenas as palavras novas (após a sobreposição com o fim da
+        transcrição) são acrescentadas ao buffer.
+        """
+        old = self.is_rolling_mode
+        if old == enabled:
+            return
+        self._commit_buffer()
+        self.is_rolling_mode = enabled
+        self.rolling_merger.reset()
+        self.last_text_hash = None
+        if self.usage_logger:
+            self.usage_logger.log_config_change("rolling_mode", old, enabled, "Manual")
+        self._publish_deadline()
+
+    def set_line_mode(self, enabled):
+        """
+        Ativa/desativa o modo por linha.
+        O texto recebido é dividido em linhas ("\n") e cada linha é rastreada e commitada
+        de forma independente, ao sair da tela ou ao vencer o timeout de silêncio.
+        """
+        old = self.is_line_mode
+        if old == enabled:
+            return
+        self.flush()
+        self.is_line_mode = enabled
+        self.line_tracker.reset()
+        self.last_text_hash = None
+        if self.usage_logger:
+            self.usage_logger.log_config_change("line_mode", old, enabled, "Manual")
+        self._publish_deadline()
+
+    def apply_config(self, config):
+        """
+        Aplica as chaves de configuração presentes em `config` (mesmas chaves das
+        configurações do app e dos presets); chaves ausentes ou desconhecidas são ignoradas.
+        """
+        if 'timeout_ms' in config:
+            self.set_timeout_ms(config['timeout_ms'])
+        if 'auto_timeout' in config:
+            self.set_auto_timeout(config['auto_timeout'])
+        if 'similarity_threshold' in config:
+            self.set_similarity_threshold(config['similarity_threshold'])
+        if 'min_update_interval' in config:
+            self.set_min_update_interval(config['min_update_interval'])
+        if 'auto_recalc_interval' in config:
+            self.set_auto_recalc_interval(config['auto_recalc_interval'])
+        if 'auto_smart_adjust' in config:
+            self.set_auto_smart_adjust(config['auto_smart_adjust'])
+        if 'rolling_mode' in config:
+            self.set_rolling_mode(config['rolling_mode'])
+        if 'line_mode' in config:
+            self.set_line_mode(config['line_mode'])
+
+        # Parâmetros avançados de jitter
+        jitter_params = {}
+        if 'jitter_detection_threshold' in config:
+            jitter_params['jitter_detection_threshold'] = config['jitter_detection_threshold']
+        if 'stability_detection_threshold' in config:
+            jitter_params['stability_detection_threshold'] = config['stability_detection_threshold']
+        if 'repetition_threshold' in config:
+            jitter_params['repetition_threshold'] = config['repetition_threshold']
+
+        if jitter_params:
+            self.set_jitter_parameters(jitter_params)
+
     def set_jitter_parameters(self, params):
         """
         Define parâmetros avançados de jitter de uma vez.
@@ -154,19 +302,35 @@ class CaptionStabilizer:
         if 'repetition_threshold' in params:
             self.repetition_threshold = max(0.5, min(0.95, params['repetition_threshold']))
 
-    def process_new_text(self, raw_text):
+    def process_new_text(self, raw_text, trace=None):
         """
         Processa o texto cru vindo do OCR.
         Deve ser chamado frequentemente pelo loop principal.
+
+        :param trace: FrameTrace do frame de origem (opcional). A frase commitada leva
+                      o trace do frame mais antigo recebido desde o commit anterior.
         """
-        now = time.time()
+        self._current_trace = trace
+        try:
+            self._process_text(raw_text)
+        finally:
+            if trace is not None and trace.decided is None and self._pending_trace is None:
+                self._pending_trace = trace
+            self._current_trace = None
+
+    def _process_text(self, raw_text):
+        now = self.clock()
 
         # Remove espaços extras e normaliza
         raw_text = raw_text.strip()
+        if not self.is_line_mode and "\n" in raw_text:
+            # Fora do modo por linha, o bloco é tratado como uma frase só
+            raw_text = " ".join(line.strip() for line in raw_text.splitlines() if line.strip())
         
         # Se texto vazio, apenas checa timeout
         if not raw_text:
             self._check_timeout(now)
+            self._publish_deadline()
             return
 
         # Hash simples para detecção rápida de duplicatas exatas
@@ -186,6 +350,16 @@ class CaptionStabilizer:
         
         self.last_text_hash = text_hash
 
+        if self.is_line_mode:
+            self._process_lines(raw_text, now)
+            self._publish_deadline()
+            return
+
+        if self.is_rolling_mode:
+            self._process_rolling_text(raw_text, now)
+            self._publish_deadline()
+            return
+
         # Verifica se o texto é expansão/correção do buffer atual ANTES de checar repetição.
         # Isso evita falsos positivos: "Ola" → "Ola tudo" não é repetição, é construção.
         is_expanding_buffer = False
@@ -237,6 +411,8 @@ class CaptionStabilizer:
         matcher = difflib.SequenceMatcher(None, self.current_buffer, raw_text)
         similarity = matcher.ratio()
         self.similarity_history.append(similarity)
+        if self.usage_logger and self.current_buffer:
+            self.usage_logger.observe("similarity", similarity)
 
         # Lógica de decisão
         is_same_phrase = similarity > self.similarity_threshold
@@ -277,6 +453,68 @@ class CaptionStabilizer:
         if self.is_auto_timeout or self.is_auto_smart_adjust:
             self._recalculate_if_needed(now)
 
+        self._publish_deadline()
+
+    def _process_rolling_text(self, raw_text, now):
+        """
+        Processa uma leitura no modo rolante: acrescenta ao buffer apenas as palavras
+        que vêm depois da sobreposição com o fim da transcrição (KMP, tempo linear).
+        """
+        replaced, new_words = self.rolling_merger.merge(raw_text)
+
+        buffer_words = self.current_buffer.split()
+        if replaced and buffer_words:
+            # Correção da última palavra ainda pendente (ex.: "progra" -> "programar")
+            del buffer_words[-min(replaced, len(buffer_words)):]
+
+        if not new_words:
+            self.rolling_duplicate_count += 1
+            return
+
+        time_since_last = (now - self.last_update_time) * 1000  # ms
+        if self.current_buffer and time_since_last > self.min_update_interval:
+            self.update_deltas.append(time_since_last)
+
+        buffer_words.extend(new_words)
+        self.current_buffer = " ".join(buffer_words)
+        self.last_update_time = now
+        self.same_phrase_count += 1
+
+        if self.usage_logger:
+            self.usage_logger.log_text_processing("ROLLING_APPEND", " ".join(new_words),
+                                                 decision=f"{len(new_words)} palavra(s) nova(s) na janela rolante")
+
+        if len(buffer_words) >= self.rolling_max_words:
+            self._commit_buffer()
+
+        if self.is_auto_timeout or self.is_auto_smart_adjust:
+            self._recalculate_if_needed(now)
+
+    def _process_lines(self, raw_text, now):
+        """
+        Processa um bloco com várias linhas: cada linha é rastreada separadamente e
+        apenas as linhas alteradas são comparadas (ver LineTracker).
+        """
+        lines = [line.strip() for line in raw_text.splitlines() if line.strip()]
+        self.line_tracker.similarity_threshold = self.similarity_threshold
+        scrolled_off, new_count, updated_count = self.line_tracker.update(lines, now)
+
+        self.new_phrase_count += new_count
+        self.same_phrase_count += updated_count
+        if new_count or updated_count:
+            time_since_last = (now - self.last_update_time) * 1000  # ms
+            if time_since_last > self.min_update_interval:
+                self.update_deltas.append(time_since_last)
+            self.last_update_time = now
+
+        for text in scrolled_off:
+            if self.debug_log_callback:
+                self.debug_log_callback(f"[LINHA] Linha saiu da tela: {text[:40]}...")
+            self._commit_text(text)
+
+        if self.is_auto_timeout or self.is_auto_smart_adjust:
+            self._recalculate_if_needed(now)
+
     def _is_repetition(self, text, check_recent_texts=True):
         """
         Verifica se o texto é uma repetição recente.
@@ -343,61 +581,93 @@ class CaptionStabilizer:
 
     def _check_timeout(self, now):
         """Verifica se excedeu o tempo de silêncio."""
+        if self.is_line_mode:
+            for text in self.line_tracker.pop_expired(now, self.silence_timeout_ms / 1000.0):
+                self._commit_text(text)
+            return
+
         if not self.current_buffer:
             return
 
         elapsed_ms = (now - self.last_update_time) * 1000
         
-        if elapsed_ms > self.silence_timeout_ms:
-            if self.debug_log_callback:
-                self.debug_log_callback(f"[TIMEOUT] Silêncio detectado ({elapsed_ms:.0f}ms > {self.silence_timeout_ms}ms), commitando frase")
-            if self.usage_logger:
-                self.usage_logger.log_decision("TIMEOUT_COMMIT", "Timeout de silêncio atingido", {
-                    "elapsed_ms": elapsed_ms,
-                    "timeout_ms": self.silence_timeout_ms,
-                    "buffer_length": len(self.current_buffer)
-                })
-            
-            self._commit_buffer()
+        if elapsed_ms >= self.silence_timeout_ms:
+            self._commit_on_timeout(elapsed_ms)
+
+    def _commit_on_timeout(self, elapsed_ms):
+        """Commita o buffer atual por silêncio, registrando a decisão."""
+        if self.debug_log_callback:
+            self.debug_log_callback(f"[TIMEOUT] Silêncio detectado ({elapsed_ms:.0f}ms >= {self.silence_timeout_ms}ms), commitando frase")
+        if self.usage_logger:
+            self.usage_logger.log_decision("TIMEOUT_COMMIT", "Timeout de silêncio atingido", {
+                "elapsed_ms": elapsed_ms,
+                "timeout_ms": self.silence_timeout_ms,
+                "buffer_length": len(self.current_buffer)
+            })
+        
+        self._commit_buffer()
 
     def _commit_buffer(self):
         """Salva a frase atual e limpa o buffer."""
         if self.current_buffer:
-            # Verifica se não é repetição antes de commitar
-            # IMPORTANTE: Não verifica recent_texts aqui, pois o texto atual pode estar lá
-            # e causaria bloqueio incorreto. Só verifica last_committed_texts.
-            repetition_info = self._is_repetition(self.current_buffer, check_recent_texts=False)
-            
-            if not repetition_info['is_repetition']:
-                # Log de debug antes de commitar
-                if self.debug_log_callback:
-                    self.debug_log_callback(f"[COMMIT] Commitando frase ({self.commit_count + 1}): {self.current_buffer[:50]}...")
-                
-                self.on_commit(self.current_buffer)
-                self.last_committed_texts.append(self.current_buffer)
-                self.commit_count += 1
-                # Limpa textos recentes após commit bem-sucedido
-                self.recent_texts.clear()
-                
-                if self.usage_logger:
-                    self.usage_logger.log_event("TEXT_COMMITTED", "Frase commitada", {
-                        "text_length": len(self.current_buffer),
-                        "total_commits": self.commit_count,
-                        "repetitions_blocked": self.repetition_count
-                    })
-            else:
-                self.repetition_count += 1
-                similarity = repetition_info.get('similarity', 0)
-                if self.debug_log_callback:
-                    self.debug_log_callback(f"[PREVENÇÃO] Commit de repetição bloqueado (sim: {similarity:.2f}): {self.current_buffer[:40]}...")
-                if self.usage_logger:
-                    self.usage_logger.log_decision("REPETITION_PREVENTED", "Commit de repetição prevenido", {
-                        "text_preview": self.current_buffer[:50],
-                        "similarity": similarity,
-                        "matched_text": repetition_info.get('matched_text', '')[:50]
-                    })
+            self._commit_text(self.current_buffer)
             self.current_buffer = ""
 
+    def _commit_text(self, text):
+        """Commita um texto finalizado, a menos que seja repetição de um commit recente."""
+        # Verifica se não é repetição antes de commitar
+        # IMPORTANTE: Não verifica recent_texts aqui, pois o texto atual pode estar lá
+        # e causaria bloqueio incorreto. Só verifica last_committed_texts.
+        # No modo rolante o buffer já contém só palavras novas, então não há o que checar.
+        if self.is_rolling_mode:
+            repetition_info = {'is_repetition': False}
+        else:
+            repetition_info = self._is_repetition(text, check_recent_texts=False)
+
+        if not repetition_info['is_repetition']:
+            # Log de debug antes de commitar
+            if self.debug_log_callback:
+                self.debug_log_callback(f"[COMMIT] Commitando frase ({self.commit_count + 1}): {text[:50]}...")
+
+            self._take_commit_trace()
+            self.on_commit(text)
+            self.last_committed_texts.append(text)
+            self.commit_count += 1
+            # Limpa textos recentes após commit bem-sucedido
+            self.recent_texts.clear()
+
+            now = self.clock()
+            if self.usage_logger and self.last_commit_time is not None:
+                self.usage_logger.observe("commit_interval_ms", (now - self.last_commit_time) * 1000)
+            self.last_commit_time = now
+
+            if self.usage_logger:
+                self.usage_logger.log_event("TEXT_COMMITTED", "Frase commitada", {
+                    "text_length": len(text),
+                    "total_commits": self.commit_count,
+                    "repetitions_blocked": self.repetition_count
+                })
+        else:
+            self.repetition_count += 1
+            similarity = repetition_info.get('similarity', 0)
+            if self.debug_log_callback:
+                self.debug_log_callback(f"[PREVENÇÃO] Commit de repetição bloqueado (sim: {similarity:.2f}): {text[:40]}...")
+            if self.usage_logger:
+                self.usage_logger.log_decision("REPETITION_PREVENTED", "Commit de repetição prevenido", {
+                    "text_preview": text[:50],
+                    "similarity": similarity,
+                    "matched_text": repetition_info.get('matched_text', '')[:50]
+                })
+
+    def _take_commit_trace(self):
+        """Define o trace da frase sendo commitada e marca o instante da decisão."""
+        trace = self._pending_trace or self._current_trace
+        if trace is not None:
+            trace.mark(DECIDED)
+        # O frame atual (se não foi ele o usado) ainda pode ter texto no buffer
+        self._pending_trace = self._current_trace if self._current_trace is not trace else None
+        self.last_commit_trace = trace
+
     def _recalculate_if_needed(self, now):
         """
         Recalcula parâmetros automaticamente se necessário.
@@ -648,5 +918,92 @@ class CaptionStabilizer:
         self.consecutive_repetition_count = 0
 
     def force_check(self):
-        """Método auxiliar para forçar checagem de timeout (usado por timers externos se necessário)."""
-        self._check_timeout(time.time())
+        """
+        Checa o timeout de silêncio agora (chamado pelo timer externo ao vencer o deadline).
+        Se o buffer ainda não venceu (timer disparou cedo), republica o deadline
+        para que o timer seja rearmado.
+        """
+        self._check_timeout(self.clock())
+        self._publish_deadline(force=True)
+
+    def flush(self):
+        """Commita imediatamente o buffer pendente (ex.: ao encerrar o app)."""
+        self._commit_buffer()
+        for text in self.line_tracker.pop_pending():
+            self._commit_text(text)
+        self._publish_deadline()
+
+    def process_batch(self, events, flush=True):
+        """
+        Processa uma sequência de eventos (timestamp, texto) em tempo virtual.
+        Os timeouts de silêncio disparam exatamente no instante em que venceriam,
+        então o replay de uma sessão gravada produz sempre os mesmos commits,
+        independente do tempo real gasto.
+
+        Se o relógio atual não for um ManualClock, um é usado só durante o lote
+        (iniciando no primeiro timestamp); no fim o relógio original volta, com os
+        intervalos decorridos preservados (um buffer pendente continua a vencer no
+        tempo real).
+
+        :param events: Iterável de tuplas (timestamp em segundos, texto), em ordem crescente.
+        :param flush: Se True, avança o tempo até o timeout final e commita o buffer pendente.
+        :return: Número de frases commitadas durante o lote.
+        """
+        commits_before = self.commit_count
+        previous_clock = None  # Relógio a restaurar, se este lote instalou um ManualClock
+
+        try:
+            for timestamp, text in events:
+                if not isinstance(self.clock, ManualClock):
+                    previous_clock = self.clock
+                    self._switch_clock(ManualClock(timestamp))
+                self._advance_virtual_time(timestamp)
+                self.process_new_text(text)
+
+            if flush and isinstance(self.clock, ManualClock):
+                deadline = self.get_next_deadline()
+                while deadline is not None:
+                    self._advance_virtual_time(deadline)
+                    deadline = self.get_next_deadline()
+                self._publish_deadline()
+        finally:
+            if previous_clock is not None:
+                self._switch_clock(previous_clock)
+                self._publish_deadline(force=True)
+
+        return self.commit_count - commits_before
+
+    def _switch_clock(self, clock):
+        """
+        Troca o relógio, preservando os intervalos já decorridos: os instantes guardados
+        (última atualização, último recálculo, último commit, linhas do modo por linha)
+        são deslocados para a escala do novo relógio.
+        """
+        shift = clock() - self.clock()
+        self.last_update_time += shift
+        self.last_recalc_time += shift
+        if self.last_commit_time is not None:
+            self.last_commit_time += shift
+        for line in self.line_tracker.lines:
+            line.last_update += shift
+        self.clock = clock
+
+    def _timeout_deadline(self):
+        """Instante (no relógio do stabilizer) em que o buffer atual vence por silêncio."""
+        return self.last_update_time + self.silence_timeout_ms / 1000.0
+
+    def _advance_virtual_time(self, timestamp):
+        """Avança o ManualClock até `timestamp`, disparando cada timeout no instante exato em que vence."""
+        if self.is_line_mode:
+            # Cada linha tem seu próprio deadline: dispara em ordem, um de cada vez
+            deadline = self.get_next_deadline()
+            while deadline is not None and deadline <= timestamp:
+                self.clock.advance_to(deadline)
+                self._check_timeout(deadline)
+                deadline = self.get_next_deadline()
+        elif self.current_buffer:
+            deadline = self._timeout_deadline()
+            if deadline <= timestamp:
+                self.clock.advance_to(deadline)
+                self._commit_on_timeout(self.silence_timeout_ms)
+        self.clock.advance_to(timestamp)
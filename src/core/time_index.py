@@ -0,0 +1,187 @@
+"""
+Índice de tempo (sidecar) para os arquivos de legenda.
+
+Ao lado de cada `captions_*.txt` fica um `.tidx` binário com um registro
+(timestamp epoch, offset em bytes) a cada N linhas, gravado junto com o texto.
+Para ler uma janela de tempo, o leitor faz busca binária no índice, posiciona no
+offset do registro anterior ao início (via mmap) e lê só até o fim da janela.
+
+Os registros guardam data e hora completas, então a virada do dia (o .txt só
+tem HH:MM:SS) é resolvida a partir do registro mais próximo.
+
+Em arquivos .cdelta só keyframes recebem registro, já que a decodificação
+precisa começar em um deles.
+"""
+import bisect
+import datetime
+import mmap
+import os
+import struct
+
+from src.core.caption_delta import DeltaDecoder, is_delta_path
+from src.core.caption_reader import parse_line, guess_start_date, ROLLOVER_THRESHOLD_S
+from src.utils.compression import companion_path, is_compressed, open_binary
+
+INDEX_SUFFIX = ".tidx"
+RECORD = struct.Struct("<qQ")  # (segundos epoch, offset da linha)
+DEFAULT_EVERY = 32  # Linhas entre registros
+
+
+def index_path_for(caption_path):
+    return companion_path(caption_path, INDEX_SUFFIX)
+
+
+class TimeIndexWriter:
+    """Acrescenta registros ao índice de um arquivo de legenda enquanto ele é escrito."""
+
+    def __init__(self, caption_path, every=DEFAULT_EVERY):
+        self.path = index_path_for(caption_path)
+        self.every = max(1, every)
+        self._lines_since_record = None  # None: o próximo registro é obrigatório (índice recém-aberto)
+        self.file = open(self.path, "ab")
+
+    def note_line(self, timestamp, offset, anchor=True):
+        """
+        Registra a linha que começa em `offset` se for a vez (uma a cada `every`).
+
+        :param anchor: Se a leitura pode começar nesta linha (em .cdelta, só keyframes).
+        """
+        due = self._lines_since_record is None or self._lines_since_record >= self.every - 1
+        if due and anchor:
+            self.file.write(RECORD.pack(int(timestamp), offset))
+            self._lines_since_record = 0
+        elif self._lines_since_record is not None:
+            self._lines_since_record += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def load_index(caption_path):
+    """Lê os registros do índice: lista de (timestamp epoch, offset), em ordem."""
+    try:
+        with open(index_path_for(caption_path), "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    usable = len(data) - len(data) % RECORD.size  # Ignora registro incompleto no fim
+    return [RECORD.unpack_from(data, i) for i in range(0, usable, RECORD.size)]
+
+
+def is_index_valid(caption_path, records=None):
+    """O índice existe, não aponta além do fim do arquivo e está em ordem."""
+    records = load_index(caption_path) if records is None else records
+    if not records:
+        return os.path.getsize(caption_path) == 0 if os.path.exists(caption_path) else True
+    if is_compressed(caption_path):
+        return True  # Histórico comprimido é imutável; o índice veio do .txt
+    if records[-1][1] >= os.path.getsize(caption_path):
+        return False
+    offsets = [offset for _, offset in records]
+    return offsets == sorted(offsets)
+
+
+def rebuild_index(caption_path, every=DEFAULT_EVERY, start_date=None):
+    """
+    Reconstrói o índice varrendo o arquivo (ex.: arquivos antigos, sem índice).
+    A data vem de `start_date` ou de guess_start_date (fim do arquivo; o índice é ignorado).
+    """
+    start_date = start_date or guess_start_date(caption_path, use_index=False)
+    base = datetime.datetime.combine(start_date, datetime.time())
+    day = 0
+    last_seconds = None
+    since_record = None
+    tmp_path = index_path_for(caption_path) + ".tmp"
+    with open(tmp_path, "wb") as out:
+        for offset, seconds, _, anchor in iter_parsed(caption_path, 0):
+            if last_seconds is not None and last_seconds - seconds > ROLLOVER_THRESHOLD_S:
+                day += 1
+            last_seconds = seconds
+            if anchor and (since_record is None or since_record >= every - 1):
+                ts = (base + datetime.timedelta(days=day, seconds=seconds)).timestamp()
+                out.write(RECORD.pack(int(ts), offset))
+                since_record = 0
+            elif since_record is not None:
+                since_record += 1
+    os.replace(tmp_path, index_path_for(caption_path))
+
+
+def _iter_lines_from(caption_path, offset):
+    """Gera (offset, linha em bytes) a partir de `offset` (mmap; streaming para .gz)."""
+    if is_compressed(caption_path):
+        with open_binary(caption_path) as f:
+            f.seek(offset)
+            for raw in f:
+                yield offset, raw
+                offset += len(raw)
+        return
+    if os.path.getsize(caption_path) == 0:
+        return
+    with open(caption_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            while offset < size:
+                end = mm.find(b"\n", offset)
+                end = size if end < 0 else end + 1
+                yield offset, mm[offset:end]
+                offset = end
+
+
+def iter_parsed(caption_path, offset):
+    """
+    Gera (offset, segundos desde 00:00, texto, é_âncora) das linhas com timestamp a partir
+    de `offset`. Em .cdelta, `offset` deve ser o de um keyframe.
+    """
+    decoder = DeltaDecoder() if is_delta_path(caption_path) else None
+    for line_offset, raw in _iter_lines_from(caption_path, offset):
+        line = raw.decode("utf-8", "replace")
+        if decoder is None:
+            parsed = parse_line(line)
+            if parsed is not None:
+                yield line_offset, parsed[0], parsed[1], True
+            continue
+        decoded = decoder.decode(line)
+        if decoded is not None:
+            yield (line_offset,) + decoded
+
+
+def iter_range(caption_path, start, end, records=None):
+    """
+    Gera (datetime, texto) das linhas com start <= horário < end.
+
+    :param start: datetime inicial (inclusivo).
+    :param end: datetime final (exclusivo).
+    :param records: Registros já carregados (opcional).
+    """
+    records = load_index(caption_path) if records is None else records
+    if not records:
+        return
+    start_ts = start.timestamp()
+    # Último registro com timestamp <= início (ou o primeiro, se o início for anterior a tudo)
+    i = max(0, bisect.bisect_right([ts for ts, _ in records], start_ts) - 1)
+    anchor_ts, offset = records[i]
+    anchor = datetime.datetime.fromtimestamp(anchor_ts)
+    current_date = anchor.date()
+    last_seconds = anchor.hour * 3600 + anchor.minute * 60 + anchor.second
+
+    for _, seconds, text, _ in iter_parsed(caption_path, offset):
+        if last_seconds - seconds > ROLLOVER_THRESHOLD_S:
+            current_date += datetime.timedelta(days=1)
+        last_seconds = seconds
+        moment = datetime.datetime.combine(current_date, datetime.time()) + datetime.timedelta(seconds=seconds)
+        if moment >= end:
+            return
+        if moment >= start:
+            yield moment, text
+
+
+def time_bounds(caption_path, records=None):
+    """(primeiro, último) timestamp epoch registrados no índice, ou None."""
+    records = load_index(caption_path) if records is None else records
+    if not records:
+        return None
+    return records[0][0], records[-1][0]
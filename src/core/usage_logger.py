@@ -1,7 +1,50 @@
 import os
 import datetime
+import glob
 import json
+import threading
+import time
 from src.utils.paths import get_logs_dir
+from src.core.group_commit_writer import GroupCommitWriter, DURABILITY_INTERVAL
+from src.core.metrics import MetricsRegistry
+from src.utils.compression import apply_retention, compress_file
+
+LEVEL_FULL = "full"  # Toda entrada é gravada
+LEVEL_SAMPLE = "sample"  # Grava 1 a cada N entradas; as demais só são contadas
+LEVEL_COUNT = "count"  # Nenhuma entrada é gravada, só contada (aparece no snapshot de métricas)
+LEVEL_OFF = "off"  # Descarta sem contar
+
+# Categorias que nunca são filtradas nem descartadas por fila cheia
+PROTECTED_CATEGORIES = ("SYSTEM", "CONFIG", "AUTO_ADJUST", "METRICS")
+
+# Entradas que só importam no agregado: por padrão viram contadores no snapshot de métricas.
+# A chave pode ser a categoria ("TEXT_PROCESSING") ou categoria:tipo ("EVENT:TEXT_DETECTED").
+# Com debug_events=True, esses padrões são ignorados e tudo é gravado.
+DEFAULT_LEVELS = {
+    "TEXT_PROCESSING": LEVEL_COUNT,
+    "EVENT:TEXT_DETECTED": LEVEL_COUNT,
+    "EVENT:TEXT_SAVED": LEVEL_COUNT,
+    "DECISION:EXACT_DUPLICATE_DETECTED": LEVEL_COUNT,
+    "DECISION:REPETITION_DETECTED": LEVEL_COUNT,
+}
+
+
+def parse_level(spec):
+    """
+    Converte a especificação de nível ("full", "count", "off", "sample:N") em (nível, N).
+    Especificações inválidas viram LEVEL_FULL.
+    """
+    if isinstance(spec, str) and spec.startswith(LEVEL_SAMPLE):
+        _, _, every = spec.partition(":")
+        try:
+            return LEVEL_SAMPLE, max(1, int(every or 10))
+        except ValueError:
+            return LEVEL_SAMPLE, 10
+    if spec in (LEVEL_FULL, LEVEL_COUNT, LEVEL_OFF):
+        return spec, 1
+    print(f"[USAGE_LOGGER] Nível de log inválido: {spec!r}, usando '{LEVEL_FULL}'")
+    return LEVEL_FULL, 1
+
 
 class UsageLogger:
     """
@@ -10,12 +53,27 @@ class UsageLogger:
     - Funcionamento das configurações
     - Autoajustes e suas razões
     - Mudanças de parâmetros
+
+    Quem registra só enfileira a entrada: formatação (timestamp + JSON), escrita,
+    rotação e fsync acontecem em lote na thread do GroupCommitWriter.
     """
     
-    def __init__(self, log_dir=None, max_file_size=10 * 1024 * 1024):  # 10MB
+    def __init__(self, log_dir=None, max_file_size=10 * 1024 * 1024,  # 10MB
+                 levels=None, durability=DURABILITY_INTERVAL, fsync_interval_ms=1000, max_queue=10000,
+                 metrics_interval_s=60, debug_events=False,
+                 compress_rotated=True, max_total_bytes=200 * 1024 * 1024, max_age_days=30):
         """
         :param log_dir: Diretório onde os logs serão salvos (padrão: auto-detectado via paths.py)
         :param max_file_size: Tamanho máximo do arquivo em bytes (padrão: 10MB)
+        :param levels: Níveis por categoria (ex.: {"TEXT_PROCESSING": "sample:20"}), somados a DEFAULT_LEVELS.
+        :param durability: Política de fsync ("always", "interval" ou "os").
+        :param fsync_interval_ms: Intervalo máximo entre fsyncs na política "interval".
+        :param max_queue: Entradas pendentes além disso são descartadas (e contadas).
+        :param metrics_interval_s: Intervalo entre snapshots de métricas (registro METRICS).
+        :param debug_events: Se True, grava todas as entradas individualmente (ignora DEFAULT_LEVELS).
+        :param compress_rotated: Comprime (gzip) as partes rotacionadas em segundo plano.
+        :param max_total_bytes: Tamanho total máximo das partes antigas (None = sem limite).
+        :param max_age_days: Idade máxima das partes antigas em dias (None = sem limite).
         """
         self.log_dir = log_dir or get_logs_dir()
         self.MAX_FILE_SIZE = max_file_size
@@ -24,50 +82,227 @@ class UsageLogger:
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
         
+        # Partes deixadas por sessões anteriores (a última parte de cada sessão nunca é rotacionada)
+        pattern = os.path.join(self.log_dir, "usage_*.log")
+        leftover_parts = glob.glob(pattern) + glob.glob(pattern + ".gz")
+
         self.filepath = self._create_new_filepath()
         self.file = open(self.filepath, "a", encoding="utf-8")
+        self._current_size = os.path.getsize(self.filepath)
+
+        # Manutenção (compressão + retenção) das partes antigas, fora da thread de escrita.
+        # Só partes já fechadas entram aqui: a parte atual nunca é comprimida nem removida.
+        self.compress_rotated = compress_rotated
+        self.max_total_bytes = max_total_bytes
+        self.max_age_days = max_age_days
+        self._maintenance_lock = threading.Lock()
+        self._maintenance_threads = []
+        self._closed_parts = []
+
+        # Métricas agregadas (gravadas como um snapshot a cada metrics_interval_s, pelo
+        # temporizador da thread do escritor: sai mesmo se nenhum evento novo chegar)
+        self.metrics = MetricsRegistry()
+        self.metrics_interval_s = metrics_interval_s
+        self._last_snapshot = time.monotonic()
+        self._last_dropped = 0  # dropped_count do último snapshot (o contador é cumulativo)
+        self._closing = False
+
+        # Filtro por categoria
+        self.debug_events = debug_events
+        self._levels = {}
+        self._lock = threading.Lock()
+        self._seen_counts = {}  # chave -> entradas vistas (para amostragem)
+        base_levels = {} if debug_events else DEFAULT_LEVELS
+        for key, spec in {**base_levels, **(levels or {})}.items():
+            self.set_level(key, spec)
+
+        self._writer = GroupCommitWriter(
+            write_batch=self._write_entries,
+            sync=self._sync_file,
+            durability=durability,
+            fsync_interval_ms=fsync_interval_ms,
+            max_queue=max_queue,
+            name="UsageLogWriter",
+            on_exit=self._close_file,
+            periodic=self._periodic_metrics,
+            periodic_interval_s=metrics_interval_s
+        )
         self._log("SYSTEM", "UsageLogger inicializado", {"max_file_size_mb": self.MAX_FILE_SIZE / (1024*1024)})
-    
+
+        self._start_maintenance(leftover_parts)
+
+    @property
+    def dropped_count(self):
+        """Entradas descartadas porque a fila do escritor estava cheia."""
+        return self._writer.dropped_count
+
+    def set_level(self, key, spec):
+        """
+        Define o nível de uma categoria ("TEXT_PROCESSING") ou de um tipo ("EVENT:TEXT_DETECTED").
+        Categorias protegidas (SYSTEM, CONFIG, AUTO_ADJUST, METRICS) sempre ficam em "full".
+
+        :param spec: "full", "count", "off" ou "sample:N".
+        """
+        if key.split(":", 1)[0] in PROTECTED_CATEGORIES:
+            print(f"[USAGE_LOGGER] Categoria protegida, nível ignorado: {key}")
+            return
+        with self._lock:
+            self._levels[key] = parse_level(spec)
+
+    def increment(self, name, amount=1):
+        """Soma em um contador de métricas (gravado no próximo snapshot)."""
+        self.metrics.increment(name, amount)
+
+    def observe(self, name, value):
+        """Registra um valor em um histograma de métricas (ex.: "similarity", "ocr_latency_ms")."""
+        self.metrics.observe(name, value)
+
+    def _should_log(self, category, subtype=None):
+        """Aplica o nível da categoria e conta a entrada nas métricas (exceto nível "off")."""
+        if category in PROTECTED_CATEGORIES:
+            return True
+        metric_key = f"{category}:{subtype}" if subtype else category
+        key = metric_key
+        level = self._levels.get(key)
+        if level is None:
+            key = category
+            level = self._levels.get(category)
+        if level is not None and level[0] == LEVEL_OFF:
+            return False
+
+        self.metrics.increment(metric_key)
+        if level is None or level[0] == LEVEL_FULL:
+            return True
+
+        with self._lock:
+            seen = self._seen_counts.get(key, 0)
+            self._seen_counts[key] = seen + 1
+        return level[0] == LEVEL_SAMPLE and seen % level[1] == 0
+
     def _create_new_filepath(self):
         """Cria um novo caminho de arquivo com timestamp e contador."""
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         return os.path.join(self.log_dir, f"usage_{timestamp}_part{self.file_counter}.log")
     
     def _rotate_file_if_needed(self):
-        """Verifica se o arquivo atingiu o tamanho máximo e cria um novo se necessário."""
+        """Verifica se o arquivo atingiu o tamanho máximo e cria um novo se necessário (roda na thread do escritor)."""
         try:
-            current_size = os.path.getsize(self.filepath)
+            current_size = self._current_size
             if current_size >= self.MAX_FILE_SIZE:
-                self._log("SYSTEM", "Rotacionando arquivo de log", {"size_mb": current_size / (1024*1024)})
+                self._write_line(self._format_entry(time.time(), "SYSTEM", "Rotacionando arquivo de log",
+                                                    {"size_mb": current_size / (1024*1024)}))
                 self.file.close()
+                rotated_path = self.filepath
                 self.file_counter += 1
                 self.filepath = self._create_new_filepath()
                 self.file = open(self.filepath, "a", encoding="utf-8")
-                self._log("SYSTEM", "Novo arquivo de log criado", {"filepath": self.filepath})
+                self._current_size = os.path.getsize(self.filepath)
+                self._write_line(self._format_entry(time.time(), "SYSTEM", "Novo arquivo de log criado",
+                                                    {"filepath": self.filepath}))
+                self._start_maintenance([rotated_path])
         except Exception as e:
             print(f"Erro ao verificar tamanho do arquivo de log: {e}")
-    
+
+    def _start_maintenance(self, closed_parts):
+        """Comprime e aplica retenção às partes já fechadas, em uma thread separada."""
+        if not closed_parts:
+            return
+        if not self.compress_rotated and self.max_total_bytes is None and self.max_age_days is None:
+            return
+        self._maintenance_threads = [t for t in self._maintenance_threads if t.is_alive()]
+        thread = threading.Thread(target=self._run_maintenance, args=(list(closed_parts),),
+                                  name="UsageLogMaintenance", daemon=True)
+        self._maintenance_threads.append(thread)
+        thread.start()
+
+    def _run_maintenance(self, closed_parts):
+        with self._maintenance_lock:
+            try:
+                for path in closed_parts:
+                    if self.compress_rotated and path.endswith(".log"):
+                        path = compress_file(path) or path
+                    self._closed_parts.append(path)
+                removed = apply_retention(self._closed_parts, self.max_total_bytes, self.max_age_days,
+                                          companions=(".idx",))
+                if removed:
+                    self._closed_parts = [p for p in self._closed_parts if p not in removed]
+                    print(f"[USAGE_LOGGER] Retenção removeu {len(removed)} parte(s) antiga(s) de log")
+            except Exception as e:
+                print(f"[USAGE_LOGGER] Erro na manutenção dos logs: {e}")
+
     def _log(self, category, message, data=None):
-        """Método interno para escrever no log."""
-        try:
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            log_entry = {
-                "timestamp": timestamp,
-                "category": category,
-                "message": message,
-                "data": data or {}
-            }
-            
+        """Método interno: enfileira a entrada (timestamp capturado agora, formatação no escritor)."""
+        entry = (time.time(), category, message, data)
+        # Categorias protegidas esperam um pouco por espaço na fila em vez de serem descartadas
+        timeout = 1.0 if category in PROTECTED_CATEGORIES else None
+        if not self._writer.submit(entry, timeout=timeout) and timeout:
+            print(f"Erro ao escrever no log de uso: fila cheia ({category})")
+
+    def _metrics_entry(self):
+        """Entrada METRICS com as métricas acumuladas desde o último snapshot (None se não há nada)."""
+        with self._lock:
+            now = time.monotonic()
+            interval = now - self._last_snapshot
+            self._last_snapshot = now
+            dropped = self._writer.dropped_count
+            if self.metrics.is_empty() and dropped == self._last_dropped:
+                return None
+            self._last_dropped = dropped
+        snapshot = self.metrics.snapshot(reset=True)
+        snapshot["interval_s"] = round(interval, 3)
+        snapshot["dropped_total"] = dropped
+        return (time.time(), "METRICS", "Snapshot de métricas", snapshot)
+
+    def _periodic_metrics(self):
+        """Temporizador do escritor (roda na thread dele): o snapshot é gravado direto, sem a fila."""
+        entry = self._metrics_entry()
+        return [entry] if entry else []
+
+    def flush_metrics(self):
+        """Grava as métricas acumuladas desde o último snapshot como um único registro METRICS."""
+        entry = self._metrics_entry()
+        if entry:
+            self._log(*entry[1:])
+
+    @staticmethod
+    def _format_entry(ts, category, message, data):
+        timestamp = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        log_entry = {
+            "timestamp": timestamp,
+            "category": category,
+            "message": message,
+            "data": data or {}
+        }
+        # Formato JSON (uma linha por entrada - NDJSON)
+        return json.dumps(log_entry, ensure_ascii=False, default=str) + "\n"
+
+    def _write_line(self, line):
+        self.file.write(line)
+        # Em modo texto, cada "\n" vira os.linesep no disco
+        self._current_size += len(line.encode("utf-8")) + len(os.linesep) - 1
+
+    def _write_entries(self, entries):
+        """Formata e grava um lote de entradas (roda na thread do escritor)."""
+        for ts, category, message, data in entries:
+            try:
+                line = self._format_entry(ts, category, message, data)
+            except Exception as e:
+                print(f"Erro ao escrever no log de uso: {e}")
+                continue
             # Verifica e rotaciona antes de escrever
             self._rotate_file_if_needed()
-            
-            # Escreve em formato JSON (uma linha por entrada - NDJSON)
-            self.file.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-            self.file.flush()
+            self._write_line(line)
+        self.file.flush()
+
+    def _sync_file(self):
+        if self.file and not self.file.closed:
             os.fsync(self.file.fileno())
-        except Exception as e:
-            print(f"Erro ao escrever no log de uso: {e}")
-    
+
+    def _close_file(self):
+        """Fecha o arquivo quando o escritor termina (roda na thread do escritor)."""
+        if self.file and not self.file.closed:
+            self.file.close()
+
     def log_config_change(self, config_name, old_value, new_value, reason=None):
         """Registra mudança de configuração."""
         self._log("CONFIG", f"Configuração '{config_name}' alterada", {
@@ -89,6 +324,8 @@ class UsageLogger:
     
     def log_decision(self, decision_type, decision, context=None):
         """Registra uma decisão tomada pelo sistema."""
+        if not self._should_log("DECISION", decision_type):
+            return
         self._log("DECISION", f"Decisão: {decision_type}", {
             "decision_type": decision_type,
             "decision": decision,
@@ -97,6 +334,8 @@ class UsageLogger:
     
     def log_event(self, event_type, description, details=None):
         """Registra um evento do sistema."""
+        if not self._should_log("EVENT", event_type):
+            return
         self._log("EVENT", f"Evento: {event_type}", {
             "event_type": event_type,
             "description": description,
@@ -105,6 +344,8 @@ class UsageLogger:
     
     def log_text_processing(self, action, text, similarity=None, decision=None):
         """Registra processamento de texto."""
+        if not self._should_log("TEXT_PROCESSING", action):
+            return
         data = {
             "action": action,
             "text_length": len(text) if text else 0,
@@ -116,8 +357,19 @@ class UsageLogger:
             data["decision"] = decision
         self._log("TEXT_PROCESSING", f"Processamento: {action}", data)
     
-    def close(self):
-        """Fecha o arquivo com segurança."""
-        if self.file:
-            self._log("SYSTEM", "UsageLogger finalizado")
-            self.file.close()
+    def close(self, timeout=5.0):
+        """
+        Grava o resumo final e esvazia a fila (espera limitada por `timeout`). O arquivo é
+        fechado pela própria thread do escritor ao terminar: se ela não terminar a tempo,
+        continua gravando e fecha o arquivo depois, em vez de gravar num arquivo fechado.
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self.flush_metrics()
+        self._log("SYSTEM", "UsageLogger finalizado")
+        deadline = time.monotonic() + timeout
+        if not self._writer.close(timeout):
+            print(f"[USAGE_LOGGER] Escritor não terminou em {timeout}s; o arquivo será fechado quando ele terminar")
+        for thread in self._maintenance_threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
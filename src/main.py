@@ -12,43 +12,84 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ui.main_window import MainWindow
 from src.ui.system_tray import SystemTrayManager
+from src.ui.history_browser import HistoryBrowserDialog
 from src.workers.ocr_worker import OCRWorker
-from src.core.stabilizer import CaptionStabilizer
+from src.workers.caption_processor import CaptionProcessor
+from src.workers.perf_monitor import PerfMonitor
 from src.core.file_manager import FileManager
+from src.core.caption_archive import CaptionArchive
 from src.core.settings_manager import SettingsManager
 from src.core.usage_logger import UsageLogger
+from src.core.caption_reader import list_caption_files
+from src.core.perf_stats import PerfStats
+from src.core.ocr_trace import OCRTraceWriter, new_trace_path
+from src.core.frame_ring import FrameRecorder
+from src.utils.frame_codec import make_encoder
+from src.utils.paths import get_logs_dir
 
 class LiveCaptionApp:
     def __init__(self):
         self.app = QApplication(sys.argv)
 
         # 0. Settings (Configurações Persistidas)
-        self.settings = SettingsManager()
+        # Write-behind: arrastar um spin box gera uma gravação, não dezenas por segundo
+        self.settings = SettingsManager(debounce_ms=500)
 
         # 0.5. Usage Logger (Log de uso detalhado)
-        self.usage_logger = UsageLogger()
-        self.usage_logger.log_event("APP_START", "Aplicativo iniciado")
-
-        # 1. Model
-        self.file_manager = FileManager()
-        
-        # Carrega configurações salvas para o Stabilizer
-        stabilizer_config = {
-            'timeout_ms': self.settings.get('timeout_ms', 1500),
-            'auto_timeout': self.settings.get('auto_timeout', False)
-        }
-        self.stabilizer = CaptionStabilizer(
-            on_commit_callback=self.on_stabilizer_commit,
-            initial_timeout_ms=stabilizer_config['timeout_ms'],
-            usage_logger=self.usage_logger
+        usage_logger = UsageLogger(
+            levels=self.settings.get('usage_log_levels'),
+            metrics_interval_s=self.settings.get('metrics_interval_s', 60),
+            debug_events=self.settings.get('usage_log_debug', False),
+            compress_rotated=self.settings.get('usage_log_compress', True),
+            max_total_bytes=self.settings.get('usage_log_max_total_mb', 200) * 1024 * 1024,
+            max_age_days=self.settings.get('usage_log_max_age_days', 30)
+        )
+        usage_logger.log_event("APP_START", "Aplicativo iniciado")
+
+        # 1. Model — Stabilizer, FileManager e UsageLogger pertencem à thread de processamento.
+        # A GUI nunca os acessa diretamente: conversa com eles pela fila do CaptionProcessor.
+        archive = None
+        if self.settings.get('caption_archive', False):
+            archive = CaptionArchive(
+                retention_days=self.settings.get('caption_archive_retention_days', 0),
+                max_rows=self.settings.get('caption_archive_max_rows', 0),
+                durability=self.settings.get('caption_durability', 'interval')
+            )
+        # Estatísticas do painel de desempenho: compartilhadas por OCR, processador e
+        # FileManager; desligadas (só um teste de flag) enquanto o painel está fechado.
+        self.perf_stats = PerfStats()
+        ocr_recorder = None
+        if self.settings.get('ocr_trace_record', False):
+            ocr_recorder = OCRTraceWriter(new_trace_path(os.path.join(get_logs_dir(), "ocr_traces")))
+        self.processor = CaptionProcessor(
+            file_manager=FileManager(
+                durability=self.settings.get('caption_durability', 'interval'),
+                fsync_interval_ms=self.settings.get('caption_fsync_interval_ms', 1000),
+                fsync_every_lines=self.settings.get('caption_fsync_every_lines', 50),
+                caption_format=self.settings.get('caption_format', 'txt'),
+                compress_history=self.settings.get('caption_history_compress', True),
+                history_max_bytes=self.settings.get('caption_history_max_mb', 100) * 1024 * 1024
+            ),
+            usage_logger=usage_logger,
+            initial_timeout_ms=self.settings.get('timeout_ms', 1500),
+            archive=archive,
+            perf_stats=self.perf_stats,
+            ocr_recorder=ocr_recorder
         )
-        
-        # Conecta callbacks
-        self.stabilizer.set_auto_adjust_callback(self.on_auto_adjust)
-        self.stabilizer.set_debug_log_callback(self.on_debug_log)
 
-        # 2. Worker
+        # 2. Workers
         self.ocr_worker = OCRWorker()
+        self.ocr_worker.perf_stats = self.perf_stats
+        if self.settings.get('frame_recorder', False):
+            try:
+                self.ocr_worker.frame_recorder = FrameRecorder(
+                    os.path.join(get_logs_dir(), "frames.ring"),
+                    make_encoder(self.settings.get('frame_recorder_mode', 'gray')),
+                    self.settings.get('frame_recorder_size_mb', 256) * 1024 * 1024
+                )
+            except ValueError as e:
+                print(f"[MAIN] Erro ao iniciar gravação de frames: {e}")
+        self.perf_monitor = PerfMonitor(self.perf_stats)
 
         # 3. View
         self.main_window = MainWindow()
@@ -59,10 +100,11 @@ class LiveCaptionApp:
         # 4. Wiring (Conexões)
         self._connect_signals()
 
-        # 5. Timer para "ticks" do Stabilizer (verificar timeouts)
-        self.stabilizer_timer = QTimer()
-        self.stabilizer_timer.timeout.connect(self.stabilizer.force_check)
-        self.stabilizer_timer.start(100) # Checa a cada 100ms
+        # 5. Thread de processamento (estabilização + persistência).
+        # Os timeouts de silêncio são agendados pelo próprio processador a partir do
+        # deadline do Stabilizer: sem buffer pendente, a thread fica bloqueada (sem wakeups).
+        self.processor.start()
+        self.perf_monitor.start()
 
         # 6. Carregar configurações salvas na UI
         self._load_ui_settings()
@@ -127,14 +169,25 @@ class LiveCaptionApp:
         
         # Clear Captions
         self.main_window.clear_captions_requested.connect(self.on_clear_captions_requested)
+        self.main_window.history_requested.connect(self.on_history_requested)
+        self.main_window.perf_panel_toggled.connect(self.perf_monitor.set_active)
+        self.perf_monitor.stats_updated.connect(self.main_window.update_perf_stats)
 
         # Worker -> UI (Erros e Status)
         self.ocr_worker.error_occurred.connect(self.on_worker_error)
         self.ocr_worker.dependency_status.connect(self.on_dependency_status)
         self.ocr_worker.installation_progress.connect(self.main_window.update_status)
 
-        # Worker -> Model (Fluxo de dados)
-        self.ocr_worker.text_detected.connect(self.on_text_detected)
+        # Worker -> Processador (Fluxo de dados)
+        # DirectConnection: o texto é enfileirado direto da thread do OCR, sem passar pela GUI
+        self.ocr_worker.text_detected.connect(self.processor.submit_text, Qt.ConnectionType.DirectConnection)
+        self.ocr_worker.frame_processed.connect(self.processor.observe_ocr_latency, Qt.ConnectionType.DirectConnection)
+
+        # Processador -> UI (atualizações coalescidas)
+        self.processor.captions_committed.connect(self.on_captions_committed)
+        self.processor.debug_messages.connect(self.on_debug_messages)
+        self.processor.auto_adjusted.connect(self.on_auto_adjust)
+        self.processor.clear_finished.connect(self.on_clear_finished)
 
     def _load_ui_settings(self):
         """Carrega configurações salvas na UI e aplica ao Stabilizer."""
@@ -147,39 +200,15 @@ class LiveCaptionApp:
         all_settings = self.settings.get_all()
         self.main_window.load_settings(all_settings)
         
-        # Aplicar configurações ao Stabilizer
-        if 'timeout_ms' in all_settings:
-            self.stabilizer.set_timeout_ms(all_settings['timeout_ms'])
-        if 'auto_timeout' in all_settings:
-            self.stabilizer.set_auto_timeout(all_settings['auto_timeout'])
-        if 'similarity_threshold' in all_settings:
-            self.stabilizer.set_similarity_threshold(all_settings['similarity_threshold'])
-        if 'min_update_interval' in all_settings:
-            self.stabilizer.set_min_update_interval(all_settings['min_update_interval'])
-        if 'auto_recalc_interval' in all_settings:
-            self.stabilizer.set_auto_recalc_interval(all_settings['auto_recalc_interval'])
-        if 'auto_smart_adjust' in all_settings:
-            self.stabilizer.set_auto_smart_adjust(all_settings['auto_smart_adjust'])
-        
-        # Aplicar novos parâmetros avançados de jitter
-        jitter_params = {}
-        if 'jitter_detection_threshold' in all_settings:
-            jitter_params['jitter_detection_threshold'] = all_settings['jitter_detection_threshold']
-        if 'stability_detection_threshold' in all_settings:
-            jitter_params['stability_detection_threshold'] = all_settings['stability_detection_threshold']
-        if 'repetition_threshold' in all_settings:
-            jitter_params['repetition_threshold'] = all_settings['repetition_threshold']
-        
-        if jitter_params:
-            self.stabilizer.set_jitter_parameters(jitter_params)
+        # Aplicar configurações ao Stabilizer (na thread de processamento)
+        self.processor.update_config(all_settings)
 
     def on_region_saved(self, x, y, w, h):
         """Chamado quando usuário salva uma nova região."""
         region = {'x': x, 'y': y, 'width': w, 'height': h}
         self.settings.set('capture_region', region)
         self.ocr_worker.set_region(x, y, w, h)
-        if self.usage_logger:
-            self.usage_logger.log_event("REGION_SAVED", "Região de captura salva", region)
+        self.processor.log_event("REGION_SAVED", "Região de captura salva", region)
 
     def on_config_saved(self, config):
         """Chamado quando configurações devem ser salvas."""
@@ -194,12 +223,13 @@ class LiveCaptionApp:
             'auto_smart_adjust': config.get('auto_smart_adjust', False),
             'jitter_detection_threshold': config.get('jitter_detection_threshold', 50),
             'stability_detection_threshold': config.get('stability_detection_threshold', 20),
-            'repetition_threshold': config.get('repetition_threshold', 0.8)
+            'repetition_threshold': config.get('repetition_threshold', 0.8),
+            'rolling_mode': config.get('rolling_mode', False),
+            'line_mode': config.get('line_mode', False)
         }
         self.settings.set_multiple(settings_to_save)
         
-        if self.usage_logger:
-            self.usage_logger.log_event("CONFIG_SAVED", "Configurações salvas", settings_to_save)
+        self.processor.log_event("CONFIG_SAVED", "Configurações salvas", settings_to_save)
         
         # Aplica as configurações ao Stabilizer imediatamente (mesmo quando não está gravando)
         # Isso garante que as configurações estejam ativas quando a gravação começar
@@ -220,15 +250,13 @@ class LiveCaptionApp:
                 # Isso é verificado em restore_region ou quando região é selecionada
                 if self.main_window.capture_region:
                     self.main_window.btn_record.setEnabled(True)
-            if self.usage_logger:
-                self.usage_logger.log_event("DEPENDENCIES_READY", "Dependências verificadas e prontas")
+            self.processor.log_event("DEPENDENCIES_READY", "Dependências verificadas e prontas")
         else:
             self.main_window.set_dependencies_missing()
             # Mantém o botão desabilitado se dependências não estiverem prontas
             if hasattr(self.main_window, 'btn_record'):
                 self.main_window.btn_record.setEnabled(False)
-            if self.usage_logger:
-                self.usage_logger.log_event("DEPENDENCIES_MISSING", "Dependências não encontradas", {"message": message})
+            self.processor.log_event("DEPENDENCIES_MISSING", "Dependências não encontradas", {"message": message})
             # Só mostra popup se for uma mensagem de erro real vinda da instalação
             if "Erro" in message:
                 self.main_window.show_error("Erro de Dependência", message)
@@ -241,85 +269,48 @@ class LiveCaptionApp:
         if not self.ocr_worker.region:
             QMessageBox.warning(self.main_window, "Atenção", "Selecione uma região primeiro!")
             self.main_window.toggle_recording() # Reverte botão
-            if self.usage_logger:
-                self.usage_logger.log_event("RECORDING_START_FAILED", "Tentativa de iniciar sem região selecionada")
+            self.processor.log_event("RECORDING_START_FAILED", "Tentativa de iniciar sem região selecionada")
             return
 
         self.ocr_worker.start()
         if hasattr(self, 'tray'):
             self.tray.update_recording_state(True)
-        if self.usage_logger:
-            self.usage_logger.log_event("RECORDING_STARTED", "Gravação iniciada", {
-                "timeout_ms": config.get('timeout_ms'),
-                "auto_timeout": config.get('auto_timeout'),
-                "auto_smart_adjust": config.get('auto_smart_adjust')
-            })
+        self.processor.log_event("RECORDING_STARTED", "Gravação iniciada", {
+            "timeout_ms": config.get('timeout_ms'),
+            "auto_timeout": config.get('auto_timeout'),
+            "auto_smart_adjust": config.get('auto_smart_adjust')
+        })
 
     def on_stop_requested(self):
         """Chamado quando usuário para a gravação."""
         self.ocr_worker.stop()
         if hasattr(self, 'tray'):
             self.tray.update_recording_state(False)
-        if self.usage_logger:
-            self.usage_logger.log_event("RECORDING_STOPPED", "Gravação parada")
+        self.processor.log_event("RECORDING_STOPPED", "Gravação parada")
 
     def on_config_changed(self, config):
         self.update_stabilizer_config(config)
         self.ocr_worker.update_config(config)
 
     def update_stabilizer_config(self, config):
-        self.stabilizer.set_timeout_ms(config['timeout_ms'])
-        self.stabilizer.set_auto_timeout(config['auto_timeout'])
-        
-        # Parâmetros avançados de jitter
-        if 'similarity_threshold' in config:
-            self.stabilizer.set_similarity_threshold(config['similarity_threshold'])
-        if 'min_update_interval' in config:
-            self.stabilizer.set_min_update_interval(config['min_update_interval'])
-        if 'auto_recalc_interval' in config:
-            self.stabilizer.set_auto_recalc_interval(config['auto_recalc_interval'])
-        if 'auto_smart_adjust' in config:
-            self.stabilizer.set_auto_smart_adjust(config['auto_smart_adjust'])
-        
-        # Novos parâmetros avançados de jitter
-        jitter_params = {}
-        if 'jitter_detection_threshold' in config:
-            jitter_params['jitter_detection_threshold'] = config['jitter_detection_threshold']
-        if 'stability_detection_threshold' in config:
-            jitter_params['stability_detection_threshold'] = config['stability_detection_threshold']
-        if 'repetition_threshold' in config:
-            jitter_params['repetition_threshold'] = config['repetition_threshold']
-        
-        if jitter_params:
-            self.stabilizer.set_jitter_parameters(jitter_params)
-
-    def on_text_detected(self, text):
-        if self.usage_logger:
-            self.usage_logger.log_event("TEXT_DETECTED", "Texto detectado pelo OCR", {"text_length": len(text) if text else 0})
-        self.stabilizer.process_new_text(text)
-
-    def on_stabilizer_commit(self, final_text):
-        """Chamado quando uma frase é finalizada e estabilizada."""
-        if final_text and final_text.strip():  # Verifica se há texto válido
-            # Log de debug para verificar se está chegando aqui
+        """Envia as configurações para o Stabilizer (aplicadas na thread de processamento)."""
+        self.processor.update_config(config)
+
+    def on_captions_committed(self, captions):
+        """Recebe em lote as frases gravadas desde a última atualização da UI."""
+        try:
+            self.main_window.append_logs(captions)
+        except Exception as e:
+            print(f"[MAIN] Erro ao adicionar ao log de captura: {e}")
+            import traceback
+            traceback.print_exc()
+            # Tenta adicionar ao log de debug também
             if hasattr(self.main_window, 'append_debug_log'):
-                self.main_window.append_debug_log(f"[COMMIT] Frase commitada: {final_text[:50]}...")
-            
-            # Salva no arquivo
-            self.file_manager.append_text(final_text)
-            
-            # Adiciona ao log de captura (frases gravadas)
-            try:
-                self.main_window.append_log(final_text)
-                if self.usage_logger:
-                    self.usage_logger.log_event("TEXT_SAVED", "Texto salvo no arquivo", {"text_length": len(final_text)})
-            except Exception as e:
-                print(f"[MAIN] Erro ao adicionar ao log de captura: {e}")
-                import traceback
-                traceback.print_exc()
-                # Tenta adicionar ao log de debug também
-                if hasattr(self.main_window, 'append_debug_log'):
-                    self.main_window.append_debug_log(f"[ERRO] Falha ao adicionar ao log de captura: {e}")
+                self.main_window.append_debug_log(f"[ERRO] Falha ao adicionar ao log de captura: {e}")
+
+    def on_debug_messages(self, messages):
+        """Recebe em lote as mensagens de debug desde a última atualização da UI."""
+        self.main_window.append_debug_logs(messages)
 
     def on_auto_adjust(self, parameter, old_value, new_value, reason=None):
         """Chamado quando o autoajuste modifica um parâmetro."""
@@ -348,14 +339,27 @@ class LiveCaptionApp:
         log_message = f"[AUTO-AJUSTE] {param_name}: {old_display} → {new_display}{reason_text}"
         self.main_window.append_debug_log(log_message)
         
-        if self.usage_logger:
-            self.usage_logger.log_event("AUTO_ADJUST_UI_NOTIFIED", f"UI notificada sobre ajuste de {parameter}", {
-                "parameter": parameter,
-                "old_value": old_value,
-                "new_value": new_value,
-                "reason": reason
-            })
+        self.processor.log_event("AUTO_ADJUST_UI_NOTIFIED", f"UI notificada sobre ajuste de {parameter}", {
+            "parameter": parameter,
+            "old_value": old_value,
+            "new_value": new_value,
+            "reason": reason
+        })
     
+    def on_history_requested(self):
+        """Abre (ou traz para frente) o navegador do histórico de legendas."""
+        if getattr(self, 'history_dialog', None) is None:
+            file_manager = self.processor.file_manager
+            self.history_dialog = HistoryBrowserDialog(
+                lambda: list_caption_files(file_manager.output_dir, file_manager.current_name),
+                parent=self.main_window
+            )
+        else:
+            self.history_dialog.reload()
+        self.history_dialog.show()
+        self.history_dialog.raise_()
+        self.history_dialog.activateWindow()
+
     def on_clear_captions_requested(self):
         """Chamado quando usuário solicita limpar todos os arquivos de captions."""
         from PyQt6.QtWidgets import QMessageBox
@@ -373,29 +377,26 @@ class LiveCaptionApp:
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            success = self.file_manager.clear_all_files()
-            if success:
-                self.main_window.status_bar.showMessage("✓ Todos os arquivos de captions foram removidos.", 5000)
-                if hasattr(self.main_window, 'append_debug_log'):
-                    self.main_window.append_debug_log("[INFO] Todos os arquivos de captions foram limpos.")
-                if self.usage_logger:
-                    self.usage_logger.log_event("CAPTIONS_CLEARED", "Todos os arquivos de captions foram removidos")
-            else:
-                QMessageBox.warning(
-                    self.main_window,
-                    "Erro",
-                    "Ocorreu um erro ao tentar limpar os arquivos de captions."
-                )
-    
-    def on_debug_log(self, message):
-        """Chamado quando há uma mensagem de debug para exibir."""
-        self.main_window.append_debug_log(message)
+            # A limpeza roda na thread de processamento; o resultado chega em on_clear_finished
+            self.processor.clear_files()
+
+    def on_clear_finished(self, success):
+        """Chamado quando a limpeza dos arquivos de captions termina."""
+        if success:
+            self.main_window.status_bar.showMessage("✓ Todos os arquivos de captions foram removidos.", 5000)
+            if hasattr(self.main_window, 'append_debug_log'):
+                self.main_window.append_debug_log("[INFO] Todos os arquivos de captions foram limpos.")
+        else:
+            QMessageBox.warning(
+                self.main_window,
+                "Erro",
+                "Ocorreu um erro ao tentar limpar os arquivos de captions."
+            )
 
     def on_worker_error(self, title, message):
         self.main_window.show_error(title, message)
         self.main_window.toggle_recording() # Para a UI
-        if self.usage_logger:
-            self.usage_logger.log_event("ERROR", f"Erro: {title}", {"message": message})
+        self.processor.log_event("ERROR", f"Erro: {title}", {"message": message})
 
     def run(self):
         self.main_window.show()
@@ -408,10 +409,19 @@ class LiveCaptionApp:
             # Garante limpeza
             if hasattr(self, 'tray') and self.tray:
                 self.tray.hide()
-            if hasattr(self, 'usage_logger') and self.usage_logger:
-                self.usage_logger.close()
-            if hasattr(self, 'file_manager') and self.file_manager:
-                self.file_manager.close()
+            if hasattr(self, 'perf_monitor') and self.perf_monitor:
+                self.perf_monitor.stop()
+            # Para o OCR antes do processador, para não enfileirar frames após o STOP
+            if hasattr(self, 'ocr_worker') and self.ocr_worker:
+                self.ocr_worker.stop()
+                if self.ocr_worker.frame_recorder:
+                    self.ocr_worker.frame_recorder.close()
+            # Commita o buffer pendente e fecha arquivo/log na thread de processamento
+            if hasattr(self, 'processor') and self.processor:
+                self.processor.stop()
+            # Grava configurações ainda pendentes da janela de debounce
+            if hasattr(self, 'settings') and self.settings:
+                self.settings.close()
 
 if __name__ == "__main__":
     app = LiveCaptionApp()
@@ -0,0 +1,261 @@
+"""
+Benchmarks dos caminhos críticos: pré-processamento, OCR, Stabilizer e persistência.
+
+Os resultados vão para um JSON; `compare` aponta regressões contra uma base gravada.
+Casos que dependem de algo ausente (OpenCV, EasyOCR/modelos) aparecem como pulados.
+
+Exemplos:
+    python -m src.tools.benchmark run --output base.json
+    python -m src.tools.benchmark run --quick --only stabilizer,file_manager --output atual.json
+    python -m src.tools.benchmark run --trace sessao.ocrtrace.gz --compare base.json
+    python -m src.tools.benchmark compare base.json atual.json --threshold 0.2
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+
+from src.core.benchmark import (BenchmarkCase, SkipBenchmark, DEFAULT_THRESHOLD, compare_results,
+                                format_us, load_results, run_cases, save_results)
+from src.core.caption_timeline import CaptionTimeline, MODE_EXPANDING, MODE_SCROLLING
+from src.core.file_manager import FileManager
+from src.core.ocr_trace import is_trace_path, load_events
+from src.core.presets import get_preset
+from src.core.stabilizer import CaptionStabilizer, ManualClock
+from src.core.usage_logger import UsageLogger
+
+GROUPS = ("preprocess", "ocr", "stabilizer", "file_manager", "usage_logger")
+REGION_SIZES = ((400, 60), (800, 120), (1280, 200), (1920, 360))
+OCR_PROFILES = {
+    "paragraph": {"detail": 0, "paragraph": True},  # Modo bloco do OCRWorker
+    "lines": {"detail": 1, "paragraph": False},  # Modo por linha (line_mode)
+}
+
+
+def _synthetic_frame(style, width, height):
+    try:
+        from src.utils.synthetic_captions import SyntheticCaptionSource
+    except ImportError as e:
+        raise SkipBenchmark(f"OpenCV/numpy indisponível: {e}")
+    source = SyntheticCaptionSource(style, width=width, height=height)
+    return source.render(source.timeline.duration / 3, frame_index=7)
+
+
+def preprocess_cases(quick):
+    ops = 10 if quick else 50
+
+    def make(width, height):
+        def setup():
+            frame = _synthetic_frame("youtube", width, height)
+            from src.utils.image_processing import process_image_for_ocr
+            return frame, process_image_for_ocr
+
+        def run(state):
+            frame, process = state
+            for _ in range(ops):
+                process(frame)
+        return BenchmarkCase(f"preprocess/{width}x{height}", run, ops, setup=setup)
+
+    return [make(w, h) for w, h in REGION_SIZES]
+
+
+def ocr_cases(quick):
+    ops = 1 if quick else 5
+    cache = {}
+
+    def reader(gpu):
+        if gpu not in cache:
+            try:
+                import easyocr
+                cache[gpu] = easyocr.Reader(['pt', 'en'], gpu=gpu, download_enabled=False, verbose=False)
+            except Exception as e:
+                cache[gpu] = SkipBenchmark(f"EasyOCR/modelos indisponíveis: {e}")
+        if isinstance(cache[gpu], SkipBenchmark):
+            raise cache[gpu]
+        return cache[gpu]
+
+    def gpu_available():
+        try:
+            import torch
+            return torch.cuda.is_available()
+        except Exception:
+            return False
+
+    def make(profile, kwargs, gpu):
+        def setup():
+            if gpu and not gpu_available():
+                raise SkipBenchmark("GPU CUDA indisponível")
+            frame = _synthetic_frame("zoom", 800, 120)
+            from src.utils.image_processing import process_image_for_ocr
+            return reader(gpu), process_image_for_ocr(frame)
+
+        def run(state):
+            ocr, image = state
+            for _ in range(ops):
+                ocr.readtext(image, **kwargs)
+        device = "gpu" if gpu else "cpu"
+        return BenchmarkCase(f"ocr/{profile}-{device}", run, ops, setup=setup, repeat=3)
+
+    return [make(profile, kwargs, gpu) for profile, kwargs in OCR_PROFILES.items() for gpu in (False, True)]
+
+
+def _stabilizer_case(name, events, config):
+    def run(state):
+        stabilizer = CaptionStabilizer(lambda text: None, clock=ManualClock(0.0))
+        stabilizer.apply_config(config)
+        stabilizer.process_batch(events)
+    return BenchmarkCase(name, run, max(1, len(events)), repeat=3)
+
+
+def load_trace_events(path):
+    """Eventos (instante, texto) de um .ocrtrace gravado ou de um JSONL com {"t": segundos, "text": ...}."""
+    if is_trace_path(path):
+        return load_events(path)
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                events.append((float(record["t"]), record["text"]))
+    return events
+
+
+def stabilizer_cases(quick, traces=()):
+    seconds = 120 if quick else 900
+    cases = []
+    for preset, mode in (("zoom", MODE_EXPANDING), ("windows_live_captions", MODE_SCROLLING)):
+        config = {k: v for k, v in get_preset(preset).items() if k not in ("name", "description")}
+        config["rolling_mode"] = mode == MODE_SCROLLING
+        events = CaptionTimeline(mode=mode, flicker_rate=0.1, seed=1).events(seconds)
+        cases.append(_stabilizer_case(f"stabilizer/synthetic-{mode}", events, config))
+    for path in traces:
+        events = load_trace_events(path)
+        name = path.replace("\\", "/").rsplit("/", 1)[-1]
+        cases.append(_stabilizer_case(f"stabilizer/trace-{name}", events, {}))
+    return cases
+
+
+def file_manager_cases(quick):
+    lines = 500 if quick else 5000
+
+    def make(durability):
+        def setup():
+            tmpdir = tempfile.mkdtemp(prefix="bench_fm_")
+            return tmpdir, FileManager(output_dir=tmpdir, durability=durability)
+
+        def run(state):
+            fm = state[1]
+            for i in range(lines):
+                fm.append_text(f"Frase de benchmark numero {i} com algumas palavras a mais")
+            fm.flush()
+
+        def teardown(state):
+            state[1].close()
+            shutil.rmtree(state[0], ignore_errors=True)
+        return BenchmarkCase(f"file_manager/append_text-{durability}", run, lines, setup=setup, teardown=teardown)
+
+    return [make("os"), make("interval")]
+
+
+def usage_logger_cases(quick):
+    entries = 1000 if quick else 5000
+
+    def setup():
+        tmpdir = tempfile.mkdtemp(prefix="bench_log_")
+        return tmpdir, UsageLogger(log_dir=tmpdir, max_queue=entries * 4)
+
+    def run(state):
+        logger = state[1]
+        for i in range(entries):
+            logger._log("EVENT", "Evento: BENCHMARK", {"event_type": "BENCHMARK", "index": i})
+
+    def teardown(state):
+        state[1].close()
+        shutil.rmtree(state[0], ignore_errors=True)
+    return [BenchmarkCase("usage_logger/_log", run, entries, setup=setup, teardown=teardown)]
+
+
+def build_cases(groups=GROUPS, quick=False, traces=()):
+    builders = {
+        "preprocess": lambda: preprocess_cases(quick),
+        "ocr": lambda: ocr_cases(quick),
+        "stabilizer": lambda: stabilizer_cases(quick, traces),
+        "file_manager": lambda: file_manager_cases(quick),
+        "usage_logger": lambda: usage_logger_cases(quick),
+    }
+    cases = []
+    for group in groups:
+        cases.extend(builders[group]())
+    return cases
+
+
+def print_comparison(rows, threshold):
+    labels = {"regression": "REGRESSÃO", "improvement": "melhora", "ok": "ok"}
+    for row in rows:
+        print(f"{row['name']:<40} {format_us(row['baseline_us']):>10} -> {format_us(row['current_us']):>10}"
+              f"  x{row['ratio']:.2f}  {labels[row['status']]}")
+    regressions = [r for r in rows if r["status"] == "regression"]
+    print(f"{len(rows)} caso(s) comparado(s), {len(regressions)} regressão(ões) (limite: +{threshold:.0%}).")
+    return regressions
+
+
+def _print_progress(name, result):
+    if "skipped" in result:
+        print(f"{name:<40} pulado: {result['skipped']}")
+    else:
+        print(f"{name:<40} {format_us(result['per_op_us']):>10}/op  ({result['ops']} op x {result['repeat']})")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.benchmark",
+        description="Benchmarks de pré-processamento, OCR, Stabilizer e persistência."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Executa os benchmarks")
+    run.add_argument("--output", help="Grava os resultados neste JSON")
+    run.add_argument("--only", help=f"Grupos separados por vírgula ({', '.join(GROUPS)})")
+    run.add_argument("--quick", action="store_true", help="Menos operações (verificação rápida)")
+    run.add_argument("--trace", action="append", default=[],
+                     help="Fluxo de OCR gravado (.ocrtrace ou JSONL com t/text) para o Stabilizer; repetível")
+    run.add_argument("--compare", metavar="BASE", help="Compara com esta base ao terminar")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help=f"Fração de lentidão considerada regressão (padrão: {DEFAULT_THRESHOLD})")
+
+    compare = sub.add_parser("compare", help="Compara dois resultados")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "compare":
+        rows = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+
+    groups = GROUPS
+    if args.only:
+        groups = [g.strip() for g in args.only.split(",") if g.strip()]
+        unknown = [g for g in groups if g not in GROUPS]
+        if unknown:
+            print(f"Grupo(s) desconhecido(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+
+    document = run_cases(build_cases(groups, args.quick, args.trace), progress=_print_progress)
+    document["quick"] = args.quick
+    if args.output:
+        save_results(document, args.output)
+        print(f"Resultados gravados em {args.output}")
+    if args.compare:
+        rows = compare_results(load_results(args.compare), document, args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Arquivo de legendas em SQLite: importação em lote dos .txt e busca full-text.
+
+Exemplos:
+    python -m src.tools.caption_archive import
+    python -m src.tools.caption_archive import legendas_antigas.txt --date 2026-10-18
+    python -m src.tools.caption_archive search "reunião de planejamento" --limit 20
+"""
+import argparse
+import datetime
+import sys
+
+from src.core.caption_archive import CaptionArchive
+from src.core.caption_reader import list_caption_files
+from src.utils.paths import get_captions_dir
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.caption_archive",
+        description="Arquivo de legendas em SQLite (importação e busca)."
+    )
+    parser.add_argument("--db", default=None, help="Caminho do banco (padrão: captions_archive.db na pasta de captions)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = sub.add_parser("import", help="Importa arquivos .txt no formato [HH:MM:SS] texto")
+    import_parser.add_argument("paths", nargs="*",
+                               help="Arquivos a importar (padrão: históricos, inclusive .gz, e captions_current.txt)")
+    import_parser.add_argument("--date", help="Data da primeira linha de cada arquivo (YYYY-MM-DD); padrão: deduzida do arquivo")
+
+    search_parser = sub.add_parser("search", help="Busca frases que contenham todas as palavras")
+    search_parser.add_argument("text")
+    search_parser.add_argument("--limit", type=int, default=50)
+    return parser
+
+
+def _default_import_paths():
+    return list_caption_files(get_captions_dir())
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    archive = CaptionArchive(db_path=args.db, source="cli")
+    try:
+        if args.command == "import":
+            date = datetime.date.fromisoformat(args.date) if args.date else None
+            paths = args.paths or _default_import_paths()
+            total = archive.import_text_files(paths, date=date)
+            print(f"{total} frase(s) importada(s) de {len(paths)} arquivo(s).")
+        elif args.command == "search":
+            if not args.text.split():
+                print("Informe ao menos uma palavra para buscar", file=sys.stderr)
+                return 2
+            for ts, session_id, text in archive.search(args.text, limit=args.limit):
+                print(f"[{ts}] (sessão {session_id}) {text}")
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
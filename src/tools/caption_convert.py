@@ -0,0 +1,41 @@
+"""
+Conversão entre o formato texto das legendas (.txt) e o formato compacto (.cdelta).
+
+A direção é deduzida pela extensão da entrada (.txt/.txt.gz -> .cdelta; .cdelta/.cdelta.gz -> .txt).
+
+Exemplos:
+    python -m src.tools.caption_convert captions_current.txt legendas.cdelta
+    python -m src.tools.caption_convert captions_current.cdelta legendas.txt
+"""
+import argparse
+import os
+import sys
+
+from src.core.caption_delta import DEFAULT_KEYFRAME_EVERY, delta_to_txt, is_delta_path, txt_to_delta
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.caption_convert",
+        description="Converte legendas entre .txt e .cdelta (delta de prefixo)."
+    )
+    parser.add_argument("source", help="Arquivo de entrada (.txt ou .cdelta, opcionalmente .gz)")
+    parser.add_argument("target", help="Arquivo de saída")
+    parser.add_argument("--keyframe-every", type=int, default=DEFAULT_KEYFRAME_EVERY,
+                        help=f"Linhas entre keyframes ao gerar .cdelta (padrão: {DEFAULT_KEYFRAME_EVERY})")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if is_delta_path(args.source):
+        count = delta_to_txt(args.source, args.target)
+    else:
+        count = txt_to_delta(args.source, args.target, keyframe_every=args.keyframe_every)
+    before, after = os.path.getsize(args.source), os.path.getsize(args.target)
+    print(f"{count} frase(s) convertida(s): {before} -> {after} bytes.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
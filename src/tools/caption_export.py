@@ -0,0 +1,50 @@
+"""
+Exportação das legendas (históricos + atual) para SRT, WebVTT e/ou JSON Lines em uma passada.
+
+Exemplo:
+    python -m src.tools.caption_export --srt legendas.srt --vtt legendas.vtt --jsonl legendas.jsonl
+"""
+import argparse
+import datetime
+import sys
+
+from src.core.caption_delta import DELTA_EXTENSION
+from src.core.caption_export import DEFAULT_MAX_CUE_S, export_captions
+from src.core.caption_reader import iter_captions, list_caption_files
+from src.utils.paths import get_captions_dir
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.caption_export",
+        description="Exporta todas as legendas gravadas em streaming."
+    )
+    parser.add_argument("--dir", default=None, help="Pasta das legendas (padrão: pasta de captions do app)")
+    parser.add_argument("--srt", help="Arquivo SRT de saída")
+    parser.add_argument("--vtt", help="Arquivo WebVTT de saída")
+    parser.add_argument("--jsonl", help="Arquivo JSON Lines de saída")
+    parser.add_argument("--max-cue", type=float, default=DEFAULT_MAX_CUE_S,
+                        help=f"Duração máxima de cada cue em segundos (padrão: {DEFAULT_MAX_CUE_S})")
+    parser.add_argument("--start-date", help="Data da primeira frase (YYYY-MM-DD); padrão: estimada pelos arquivos")
+    parser.add_argument("--format", choices=("txt", "delta"), default="txt",
+                        help="Formato dos arquivos gravados (caption_format); padrão: txt")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    outputs = {fmt: path for fmt, path in (("srt", args.srt), ("vtt", args.vtt), ("jsonl", args.jsonl)) if path}
+    if not outputs:
+        parser.error("informe ao menos um de --srt, --vtt ou --jsonl")
+
+    start_date = datetime.date.fromisoformat(args.start_date) if args.start_date else None
+    current_file = "captions_current" + (DELTA_EXTENSION if args.format == "delta" else ".txt")
+    paths = list_caption_files(args.dir or get_captions_dir(), current_file)
+    count = export_captions(iter_captions(paths, start_date), outputs, max_cue_s=args.max_cue)
+    print(f"{count} legenda(s) exportada(s) de {len(paths)} arquivo(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Inspeciona e reprocessa os frames gravados pelo OCRWorker no anel em disco (.ring).
+
+Um trecho do anel pode ser reprocessado com outro pré-processamento (inversão,
+escala, sem binarização) ou outras configurações de OCR (idiomas, modo por linha,
+GPU), em processos paralelos, cada um com seu próprio EasyOCR. O resultado sai
+como legendas, JSONL ou .ocrtrace (para o ocr_replay / preset_tuner).
+
+Exemplos:
+    python -m src.tools.frame_reocr logs/frames.ring --info
+    python -m src.tools.frame_reocr logs/frames.ring --from 14:02:00 --to 14:03:30 --export-dir frames/
+    python -m src.tools.frame_reocr logs/frames.ring --last 120 --invert --scale 2 --workers 4
+    python -m src.tools.frame_reocr logs/frames.ring --line-mode --ocrtrace reocr.ocrtrace.gz --jsonl reocr.jsonl
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.frame_ring import FORMAT_GRAY8, FORMAT_NAMES, FrameRing
+from src.core.ocr_trace import write_events
+
+
+def parse_time(value, reference_epoch):
+    """
+    Instante (epoch) de "HH:MM:SS" (no dia de `reference_epoch`) ou "AAAA-MM-DD HH:MM:SS".
+    """
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            pass
+    try:
+        clock = datetime.datetime.strptime(value, "%H:%M:%S").time()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Horário inválido (use HH:MM:SS): {value}")
+    day = datetime.datetime.fromtimestamp(reference_epoch).date()
+    return datetime.datetime.combine(day, clock).timestamp()
+
+
+def select_frames(ring, start=None, end=None, last=None, every=1):
+    """Frames do anel no intervalo (ou nos últimos `last` segundos), um a cada `every`."""
+    frames = ring.frames()
+    if last is not None and frames:
+        start = frames[-1].timestamp - last
+    frames = [f for f in frames
+              if (start is None or f.timestamp >= start) and (end is None or f.timestamp <= end)]
+    return frames[::max(1, every)]
+
+
+def _clock(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+
+
+def print_info(ring, frames):
+    print(f"Anel: {ring.path}")
+    print(f"  {ring.slot_count} slots de {ring.slot_size // 1024} KB "
+          f"({ring.slot_count * ring.slot_size / (1024 * 1024):.0f} MB), próximo seq {ring.next_seq}")
+    if not frames:
+        print("  Nenhum frame gravado")
+        return
+    first, last = frames[0], frames[-1]
+    span = last.timestamp - first.timestamp
+    formats = sorted({FORMAT_NAMES.get(f.frame_format, str(f.frame_format)) for f in frames})
+    sizes = sorted({(f.width, f.height) for f in frames})
+    print(f"  {len(frames)} frame(s) de {datetime.datetime.fromtimestamp(first.timestamp):%Y-%m-%d %H:%M:%S} "
+          f"a {_clock(last.timestamp)} ({span:.0f}s, {len(frames) / span if span > 0 else 0:.1f} frames/s)")
+    print(f"  Formato: {', '.join(formats)} | tamanhos: {', '.join(f'{w}x{h}' for w, h in sizes)}")
+
+
+# --- Pré-processamento e OCR (processos de trabalho) ---
+
+def prepare_image(image, frame, invert=False, raw=False, scale=1.0):
+    """
+    Imagem para o OCR a partir de um frame decodificado. Frames em cinza passam pelo
+    pré-processamento do app (process_image_for_ocr); binarizados já são o que o OCR viu.
+    """
+    import cv2
+    from src.utils.image_processing import process_image_for_ocr
+
+    if scale != 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    if frame.frame_format == FORMAT_GRAY8:
+        if raw:
+            return cv2.bitwise_not(image) if invert else image
+        return process_image_for_ocr(cv2.cvtColor(image, cv2.COLOR_GRAY2BGR), invert=invert)
+    return cv2.bitwise_not(image) if invert else image
+
+
+def read_text(reader, image, line_mode=False):
+    """Texto do frame, como o OCRWorker extrairia."""
+    from src.utils.ocr_lines import group_results_into_lines
+
+    if line_mode:
+        results = reader.readtext(image, detail=1, paragraph=False)
+        return "\n".join(group_results_into_lines(results)).strip()
+    return " ".join(reader.readtext(image, detail=0, paragraph=True)).strip()
+
+
+_worker = {}
+
+
+def _init_worker(ring_path, options):
+    import easyocr
+
+    _worker["ring"] = FrameRing.open(ring_path)
+    _worker["options"] = options
+    _worker["reader"] = easyocr.Reader(options["languages"], gpu=options["gpu"],
+                                       download_enabled=False, verbose=False)
+
+
+def _reocr_chunk(frames):
+    from src.utils.frame_codec import decode_frame
+
+    ring, options, reader = _worker["ring"], _worker["options"], _worker["reader"]
+    results = []
+    for frame in frames:
+        payload = ring.read_payload(frame)
+        if payload is None:  # Sobrescrito pelo app enquanto reprocessávamos
+            continue
+        image = prepare_image(decode_frame(frame, payload), frame, options["invert"],
+                              options["raw"], options["scale"])
+        results.append((frame.seq, frame.timestamp, read_text(reader, image, options["line_mode"])))
+    return results
+
+
+def reocr_frames(ring_path, frames, options, workers):
+    """
+    Reprocessa os frames em `workers` processos.
+
+    :param options: Dict com languages, gpu, invert, raw, scale e line_mode.
+    :return: Lista de (seq, instante, texto) em ordem de captura.
+    """
+    if not frames:
+        return []
+    chunk = max(1, len(frames) // (workers * 4))
+    chunks = [frames[i:i + chunk] for i in range(0, len(frames), chunk)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(ring_path, options)) as executor:
+        for chunk_results in executor.map(_reocr_chunk, chunks):
+            results.extend(chunk_results)
+    results.sort()
+    return results
+
+
+def export_frames(ring, frames, directory):
+    """Grava os frames como PNG (nome: seq_HHMMSS.png). Retorna quantos foram gravados."""
+    import cv2
+    from src.utils.frame_codec import decode_frame
+
+    os.makedirs(directory, exist_ok=True)
+    written = 0
+    for frame in frames:
+        payload = ring.read_payload(frame)
+        if payload is None:
+            continue
+        name = f"{frame.seq:08d}_{_clock(frame.timestamp).replace(':', '')}.png"
+        if cv2.imwrite(os.path.join(directory, name), decode_frame(frame, payload)):
+            written += 1
+    return written
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.frame_reocr",
+        description="Inspeciona e reprocessa (re-OCR) os frames gravados no anel em disco."
+    )
+    parser.add_argument("ring", help="Arquivo do anel (ex.: logs/frames.ring)")
+    parser.add_argument("--info", action="store_true", help="Só mostra o conteúdo do anel")
+    parser.add_argument("--from", dest="start", help="Início do trecho (HH:MM:SS ou AAAA-MM-DD HH:MM:SS)")
+    parser.add_argument("--to", dest="end", help="Fim do trecho")
+    parser.add_argument("--last", type=float, help="Só os últimos N segundos gravados")
+    parser.add_argument("--every", type=int, default=1, help="Um frame a cada N (padrão: todos)")
+    parser.add_argument("--export-dir", help="Grava os frames do trecho como PNG nesta pasta")
+
+    ocr = parser.add_argument_group("re-OCR")
+    ocr.add_argument("--invert", action="store_true", help="Inverte as cores antes do OCR")
+    ocr.add_argument("--raw", action="store_true", help="Não binariza frames em cinza (OCR na imagem em cinza)")
+    ocr.add_argument("--scale", type=float, default=1.0, help="Redimensiona antes do OCR (ex.: 2)")
+    ocr.add_argument("--languages", default="pt,en", help="Idiomas do EasyOCR (padrão: pt,en)")
+    ocr.add_argument("--line-mode", action="store_true", help="Uma linha por linha visual (como line_mode)")
+    ocr.add_argument("--gpu", action="store_true", help="Usa a GPU (CUDA) no EasyOCR")
+    ocr.add_argument("--workers", type=int, help="Processos paralelos (padrão: núcleos da máquina)")
+    ocr.add_argument("--output", help="Grava o texto como legendas ([HH:MM:SS] texto) neste arquivo")
+    ocr.add_argument("--jsonl", help="Grava {seq, timestamp, text} por frame neste arquivo")
+    ocr.add_argument("--ocrtrace", help="Grava o resultado como .ocrtrace (replay no Stabilizer)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        ring = FrameRing.open(args.ring)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao abrir o anel: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        all_frames = ring.frames()
+        if args.info:
+            print_info(ring, all_frames)
+            return 0
+        if not all_frames:
+            print("Nenhum frame gravado no anel", file=sys.stderr)
+            return 1
+        reference = all_frames[0].timestamp
+        try:
+            start = parse_time(args.start, reference) if args.start else None
+            end = parse_time(args.end, reference) if args.end else None
+        except argparse.ArgumentTypeError as e:
+            print(e, file=sys.stderr)
+            return 2
+        frames = select_frames(ring, start, end, args.last, args.every)
+        if not frames:
+            print("Nenhum frame no trecho pedido", file=sys.stderr)
+            return 1
+
+        if args.export_dir:
+            written = export_frames(ring, frames, args.export_dir)
+            print(f"{written} frame(s) exportado(s) para {args.export_dir}")
+            return 0
+    finally:
+        ring.close()
+
+    options = {
+        "languages": [lang.strip() for lang in args.languages.split(",") if lang.strip()],
+        "gpu": args.gpu,
+        "invert": args.invert,
+        "raw": args.raw,
+        "scale": args.scale,
+        "line_mode": args.line_mode,
+    }
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    begin = time.perf_counter()
+    try:
+        results = reocr_frames(args.ring, frames, options, workers)
+    except Exception as e:
+        print(f"Erro no re-OCR (EasyOCR e modelos instalados?): {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - begin
+
+    lines = [f"[{_clock(timestamp)}] {text}" for _, timestamp, text in results if text]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in lines)
+    if args.jsonl:
+        with open(args.jsonl, "w", encoding="utf-8") as f:
+            for seq, timestamp, text in results:
+                f.write(json.dumps({"seq": seq, "timestamp": timestamp, "text": text}, ensure_ascii=False) + "\n")
+    if args.ocrtrace:
+        path = write_events(args.ocrtrace, [(timestamp, text) for _, timestamp, text in results if text])
+        print(f"Fluxo gravado em {path}")
+    if not (args.output or args.jsonl or args.ocrtrace):
+        for line in lines:
+            print(line)
+    print(f"{len(results)} frame(s) reprocessado(s) em {elapsed:.1f}s com {workers} processo(s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
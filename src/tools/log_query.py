@@ -0,0 +1,75 @@
+"""
+Consulta aos logs de uso usando o índice por minuto/categoria (src/core/log_index.py).
+
+Exemplos:
+    python -m src.tools.log_query --category AUTO_ADJUST --where parameter=similarity_threshold --start 14:00 --end 15:00
+    python -m src.tools.log_query --count-by-minute --category DECISION --start "2026-10-19 09:00"
+"""
+import argparse
+import json
+import sys
+
+from src.core.log_index import find_log_files, query, count_by_minute
+from src.utils.paths import get_logs_dir
+
+
+def _parse_where(items):
+    where = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Filtro inválido (use chave=valor): {item}")
+        where[key] = value
+    return where
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.log_query",
+        description="Consulta indexada aos logs de uso (usage_*_partN.log)."
+    )
+    parser.add_argument("--dir", default=None, help="Pasta dos logs (padrão: pasta de logs do app)")
+    parser.add_argument("--category", help="Categoria exata (ex.: AUTO_ADJUST, CONFIG, DECISION, METRICS)")
+    parser.add_argument("--start", help='Início inclusivo: "HH:MM" (qualquer dia) ou "YYYY-MM-DD HH:MM"')
+    parser.add_argument("--end", help="Fim exclusivo, no mesmo formato de --start")
+    parser.add_argument("--where", action="append", metavar="CHAVE=VALOR",
+                        help="Filtro de igualdade sobre data (ex.: parameter=similarity_threshold); repetível")
+    parser.add_argument("--count-by-minute", action="store_true",
+                        help="Só contagens por minuto e categoria (calculadas a partir do índice)")
+    parser.add_argument("--rebuild", action="store_true", help="Reconstrói os índices do zero")
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de entradas exibidas (0 = sem limite)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        where = _parse_where(args.where)
+    except argparse.ArgumentTypeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    log_paths = find_log_files(args.dir or get_logs_dir())
+    if not log_paths:
+        print("Nenhum arquivo de log encontrado.", file=sys.stderr)
+        return 1
+
+    if args.count_by_minute:
+        if where:
+            print("--where é ignorado com --count-by-minute (contagens vêm só do índice)", file=sys.stderr)
+        for minute, category, count in count_by_minute(log_paths, args.category, args.start, args.end,
+                                                       rebuild=args.rebuild):
+            print(f"{minute}\t{category}\t{count}")
+        return 0
+
+    shown = 0
+    for entry in query(log_paths, args.category, args.start, args.end, where, rebuild=args.rebuild):
+        print(json.dumps(entry, ensure_ascii=False))
+        shown += 1
+        if args.limit and shown >= args.limit:
+            break
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Reproduz no CaptionStabilizer um fluxo de OCR gravado (.ocrtrace), em tempo virtual.
+
+Mostra vazão, commits, taxa de duplicatas e, com --reference, a distância de edição
+contra a transcrição correta. Útil para testar parâmetros sem uma reunião ao vivo.
+
+Exemplos:
+    python -m src.tools.ocr_replay ocr_20261019_140000.ocrtrace.gz
+    python -m src.tools.ocr_replay sessao.ocrtrace.gz --preset zoom --set similarity_threshold=0.7
+    python -m src.tools.ocr_replay sessao.ocrtrace.gz --reference correta.txt --commits saida.txt --json
+"""
+import argparse
+import json
+import sys
+
+from src.core.caption_delta import format_clock
+from src.core.ocr_trace import load_events
+from src.core.presets import PRESETS
+from src.core.replay import load_reference, replay
+
+
+def _parse_value(value):
+    try:
+        return json.loads(value)  # números, true/false
+    except ValueError:
+        return value
+
+
+def parse_settings(items):
+    config = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Parâmetro inválido (use chave=valor): {item}")
+        config[key.strip()] = _parse_value(value.strip())
+    return config
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.ocr_replay",
+        description="Reproduz um fluxo de OCR gravado no Stabilizer e mede o resultado."
+    )
+    parser.add_argument("trace", help="Arquivo .ocrtrace (ou .ocrtrace.gz)")
+    parser.add_argument("--preset", choices=[k for k in PRESETS if k != "custom"],
+                        help="Parte da configuração de um preset")
+    parser.add_argument("--set", action="append", metavar="CHAVE=VALOR",
+                        help="Sobrescreve um parâmetro (ex.: similarity_threshold=0.7); repetível")
+    parser.add_argument("--reference", help="Transcrição correta (.txt, legendas ou .truth.json)")
+    parser.add_argument("--commits", help="Grava as frases commitadas neste arquivo")
+    parser.add_argument("--json", action="store_true", help="Relatório em JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        overrides = parse_settings(args.set)
+    except argparse.ArgumentTypeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    config = {}
+    if args.preset:
+        config.update({k: v for k, v in PRESETS[args.preset].items() if k not in ("name", "description")})
+    config.update(overrides)
+
+    events = load_events(args.trace)
+    if not events:
+        print(f"Nenhum frame em {args.trace}", file=sys.stderr)
+        return 1
+    reference = load_reference(args.reference) if args.reference else None
+    report = replay(events, config, reference)
+    commits = report.pop("commit_list")
+
+    if args.commits:
+        with open(args.commits, "w", encoding="utf-8") as f:
+            for seconds, text in commits:
+                f.write(f"[{format_clock(int(seconds))}] {text}\n")
+
+    if args.json:
+        print(json.dumps({"config": config, **report}, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{report['events']} frame(s), {report['trace_duration_s']:.1f}s de sessão "
+          f"reproduzidos em {report['elapsed_s']:.2f}s (x{report['speedup'] or 0:.0f}, "
+          f"{report['events_per_s'] or 0:.0f} frames/s)")
+    print(f"Commits: {report['commits']} | duplicatas: {report['duplicates']} "
+          f"({report['duplicate_rate']:.1%}) | repetições bloqueadas: {report['repetitions_blocked']}")
+    if reference is not None:
+        wer = report["word_error_rate"]
+        print(f"Distância de edição: {report['edit_distance']} palavra(s) de {report['reference_words']}"
+              + (f" (WER {wer:.1%})" if wer is not None else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Ajuste automático de presets: busca em paralelo os parâmetros do Stabilizer que
+minimizam latência, duplicatas e frases perdidas sobre fluxos de OCR gravados.
+
+Cada .ocrtrace precisa de uma transcrição de referência (--reference, na mesma ordem);
+com o .truth.json do gerador sintético a latência do commit também entra na pontuação.
+--synthetic usa fluxos gerados na hora (CaptionTimeline), sem precisar de gravação.
+
+Exemplos:
+    python -m src.tools.preset_tuner sessao.ocrtrace.gz --reference correta.txt --base zoom
+    python -m src.tools.preset_tuner --synthetic expanding --synthetic scrolling --seconds 1800
+    python -m src.tools.preset_tuner a.ocrtrace.gz b.ocrtrace.gz --reference a.txt --reference b.txt \\
+        --strategy grid --param timeout_ms=1500,2000,3000 --output presets_ajustados.json --key zoom_ajustado
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from src.core.caption_timeline import MODES
+from src.core.ocr_trace import load_events
+from src.core.preset_tuner import (SEARCH_SPACE, STRATEGIES, PresetTuner, base_config_for, evaluate,
+                                   load_reference_entries, make_dataset, preset_entry, save_preset_entry, synthetic_dataset)
+from src.core.presets import PRESETS
+
+
+def parse_space(items):
+    """--param chave=v1,v2,... sobrescreve os valores testados daquele parâmetro."""
+    space = dict(SEARCH_SPACE)
+    for item in items or []:
+        key, sep, values = item.partition("=")
+        key = key.strip()
+        if not sep or key not in SEARCH_SPACE:
+            raise argparse.ArgumentTypeError(
+                f"Parâmetro inválido: {item} (use chave=v1,v2 com chave em {', '.join(SEARCH_SPACE)})")
+        try:
+            space[key] = [json.loads(v) for v in values.split(",") if v.strip()]
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Valores inválidos para {key}: {values}")
+        if not space[key]:
+            raise argparse.ArgumentTypeError(f"Nenhum valor para {key}")
+    return space
+
+
+def _format_result(result):
+    latency = result["latency_s"]
+    return (f"pontuação {result['score']:.3f} | perdidas {result['missed']}/{result['reference_lines']} | "
+            f"duplicatas {result['duplicates']}/{result['commits']} | "
+            f"latência {'-' if latency is None else f'{latency:.2f}s'}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.preset_tuner",
+        description="Busca em paralelo os parâmetros do Stabilizer sobre fluxos de OCR gravados."
+    )
+    parser.add_argument("traces", nargs="*", help="Arquivos .ocrtrace (ou .ocrtrace.gz)")
+    parser.add_argument("--reference", action="append", default=[],
+                        help="Transcrição correta de cada fluxo, na mesma ordem (.txt, legendas ou .truth.json)")
+    parser.add_argument("--synthetic", action="append", default=[], choices=MODES,
+                        help="Inclui um fluxo sintético neste modo; repetível")
+    parser.add_argument("--seconds", type=float, default=600, help="Duração dos fluxos sintéticos (padrão: 600)")
+    parser.add_argument("--flicker", type=float, default=0.1, help="Cintilação dos fluxos sintéticos (padrão: 0.1)")
+    parser.add_argument("--base", choices=[k for k in PRESETS if k != "custom"],
+                        help="Preset de partida (as demais chaves dele são mantidas)")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="random")
+    parser.add_argument("--budget", type=int, default=100,
+                        help="Combinações avaliadas na estratégia random (padrão: 100)")
+    parser.add_argument("--param", action="append", metavar="CHAVE=V1,V2",
+                        help="Valores testados para um parâmetro; repetível")
+    parser.add_argument("--workers", type=int, help="Processos paralelos (padrão: núcleos da máquina)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=5, help="Melhores combinações listadas (padrão: 5)")
+    parser.add_argument("--output", help="JSON de presets ajustados onde gravar a melhor entrada")
+    parser.add_argument("--key", help="Chave da entrada gravada (padrão: <base>_tuned)")
+    parser.add_argument("--name", help="Nome exibido do preset gravado")
+    parser.add_argument("--json", action="store_true", help="Resultado em JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        space = parse_space(args.param)
+    except argparse.ArgumentTypeError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if not args.traces and not args.synthetic:
+        print("Informe ao menos um .ocrtrace ou --synthetic", file=sys.stderr)
+        return 2
+    if len(args.reference) != len(args.traces):
+        print("Cada fluxo gravado precisa de uma --reference (na mesma ordem)", file=sys.stderr)
+        return 2
+
+    datasets = []
+    for trace, reference in zip(args.traces, args.reference):
+        datasets.append(make_dataset(os.path.basename(trace), load_events(trace), load_reference_entries(reference)))
+    for index, mode in enumerate(args.synthetic):
+        datasets.append(synthetic_dataset(mode, args.seconds, args.flicker, seed=args.seed + index))
+
+    base_config = base_config_for(args.base) if args.base else {}
+    tuner = PresetTuner(datasets, base_config, space, args.workers)
+    baseline = evaluate({}, datasets, base_config, pin_flags=False) if args.base else None
+
+    def progress(done, best):
+        if not args.json and done % 10 == 0:
+            print(f"  {done} combinação(ões) avaliada(s); melhor: {best['score']:.3f}", flush=True)
+
+    start = time.perf_counter()
+    ranked = tuner.run(args.strategy, args.budget, args.seed, progress)
+    elapsed = time.perf_counter() - start
+    best = ranked[0]
+
+    key = args.key or f"{args.base or 'custom'}_tuned"
+    entry = preset_entry(best, args.base, name=args.name)
+    if args.output:
+        metrics = {k: v for k, v in best.items() if k != "params"}
+        save_preset_entry(args.output, key, entry, metrics)
+
+    if args.json:
+        print(json.dumps({"elapsed_s": elapsed, "evaluated": len(ranked), "baseline": baseline,
+                          "top": ranked[:args.top], "preset": {key: entry}}, ensure_ascii=False, indent=2))
+        return 0
+
+    events = sum(len(d["events"]) for d in datasets)
+    print(f"{len(ranked)} combinação(ões) x {len(datasets)} fluxo(s) ({events} frames) "
+          f"em {elapsed:.1f}s com {tuner.workers} processo(s)")
+    if baseline:
+        print(f"Preset {args.base} atual: {_format_result(baseline)}")
+    for position, result in enumerate(ranked[:args.top], start=1):
+        print(f"{position}. {_format_result(result)}")
+        print("   " + ", ".join(f"{k}={v}" for k, v in result["params"].items()))
+    if args.output:
+        print(f"Preset '{key}' gravado em {args.output}")
+    else:
+        print(f"'{key}': " + json.dumps(entry, ensure_ascii=False, indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Gera um vídeo de legendas sintéticas + a transcrição de referência (JSON).
+
+O vídeo imita o visual de um preset (Live Captions, Zoom, YouTube, Teams), com frases
+que crescem/rolam e cintilação configurável; serve para testes de carga e comparação
+de configurações de OCR sem depender de uma reunião real.
+
+Exemplos:
+    python -m src.tools.synthetic_captions zoom.avi --style zoom --seconds 120
+    python -m src.tools.synthetic_captions live.avi --style windows_live_captions --flicker 0.1 --wps 4
+"""
+import argparse
+import json
+import os
+import sys
+
+import cv2
+
+from src.core.caption_timeline import MODES
+from src.utils.synthetic_captions import STYLES, SyntheticCaptionSource
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.tools.synthetic_captions",
+        description="Gera um vídeo de legendas sintéticas e sua transcrição de referência."
+    )
+    parser.add_argument("output", help="Arquivo de vídeo (.avi = MJPG, .mp4 = mp4v)")
+    parser.add_argument("--style", choices=sorted(STYLES), default="windows_live_captions")
+    parser.add_argument("--mode", choices=MODES, default=None, help="Padrão: o modo do estilo")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Duração do vídeo (padrão: 60)")
+    parser.add_argument("--fps", type=float, default=5.0, help="Quadros por segundo (padrão: 5, como o OCRWorker)")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=120)
+    parser.add_argument("--wps", type=float, default=3.0, help="Palavras por segundo (padrão: 3)")
+    parser.add_argument("--hold", type=float, default=1.5, help="Segundos com a frase completa na tela")
+    parser.add_argument("--flicker", type=float, default=0.0, help="Probabilidade de frame com defeito (0-1)")
+    parser.add_argument("--transcript", help="Arquivo texto com uma frase por linha (padrão: frases de exemplo)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sentences = None
+    if args.transcript:
+        with open(args.transcript, "r", encoding="utf-8") as f:
+            sentences = [line.strip() for line in f if line.strip()]
+
+    source = SyntheticCaptionSource(
+        args.style, sentences=sentences, width=args.width, height=args.height,
+        words_per_second=args.wps, hold_s=args.hold, mode=args.mode,
+        flicker_rate=args.flicker, seed=args.seed
+    )
+    fourcc = cv2.VideoWriter_fourcc(*("mp4v" if args.output.lower().endswith(".mp4") else "MJPG"))
+    writer = cv2.VideoWriter(args.output, fourcc, args.fps, (args.width, args.height))
+    if not writer.isOpened():
+        print(f"Não foi possível criar o vídeo: {args.output}", file=sys.stderr)
+        return 1
+
+    frames = int(args.seconds * args.fps)
+    flickered = 0
+    try:
+        for index in range(frames):
+            t = index / args.fps
+            flickered += source.timeline.frame_text(t, index)[1]
+            frame = source.render(t, frame_index=index)
+            writer.write(cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR))
+    finally:
+        writer.release()
+
+    truth_path = os.path.splitext(args.output)[0] + ".truth.json"
+    with open(truth_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "style": args.style,
+            "mode": source.timeline.mode,
+            "fps": args.fps,
+            "seconds": args.seconds,
+            "words_per_second": args.wps,
+            "flicker_rate": args.flicker,
+            "seed": args.seed,
+            "captions": source.ground_truth(args.seconds)
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"{frames} quadro(s) ({flickered} com defeito) em {args.output}; transcrição em {truth_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
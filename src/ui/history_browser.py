@@ -0,0 +1,241 @@
+"""
+Navegador do histórico completo de legendas.
+
+A tabela usa um modelo Qt virtual: só as linhas visíveis são pedidas ao
+CaptionLineStore, que lê do disco o bloco correspondente (memória constante,
+qualquer tamanho de histórico). O índice, a leitura dos blocos e a busca rodam em
+threads próprias; a GUI só mostra o que já está em memória.
+"""
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QTableView,
+                             QListView, QLabel, QPushButton, QSplitter, QAbstractItemView,
+                             QHeaderView)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QAbstractListModel, QModelIndex, QTimer
+from src.core.caption_delta import format_clock
+from src.workers.history_worker import HistoryBlockLoader, HistoryIndexWorker, HistorySearchWorker
+
+
+class CaptionHistoryModel(QAbstractTableModel):
+    """Modelo de tabela (Hora, Texto) que carrega as linhas sob demanda do CaptionLineStore."""
+
+    HEADERS = ("Hora", "Texto")
+    LOADING_TEXT = "…"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = None
+        self.loader = None
+
+    def set_store(self, store, loader=None):
+        """
+        :param loader: HistoryBlockLoader que lê os blocos ausentes do cache (sem ele,
+                       a leitura acontece aqui mesmo, na thread da GUI).
+        """
+        self.beginResetModel()
+        self.store = store
+        self.loader = loader
+        if loader is not None:
+            loader.block_loaded.connect(self._on_block_loaded)
+        self.endResetModel()
+
+    def _on_block_loaded(self, first, last):
+        if self.sender() is self.loader and last < self.rowCount():
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.HEADERS) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.store is None:
+            return 0
+        return len(self.store)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.store.row_file(index.row())
+        if self.loader is None:
+            row = self.store.row(index.row())
+        elif self.store.is_cached(index.row()):
+            row = self.store.peek(index.row())
+        else:
+            self.loader.request(index.row())
+            return self.LOADING_TEXT
+        if row is None:
+            return None
+        seconds, text = row
+        return format_clock(seconds) if index.column() == 0 else text
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class SearchResultsModel(QAbstractListModel):
+    """Resultados da busca, acrescentados em lotes enquanto a busca roda."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matches = []  # (índice da linha, segundos, texto)
+
+    def clear(self):
+        self.beginResetModel()
+        self.matches = []
+        self.endResetModel()
+
+    def append_matches(self, matches):
+        if not matches:
+            return
+        first = len(self.matches)
+        self.beginInsertRows(QModelIndex(), first, first + len(matches) - 1)
+        self.matches.extend(matches)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.matches)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        _, seconds, text = self.matches[index.row()]
+        return f"[{format_clock(seconds)}] {text}"
+
+
+class HistoryBrowserDialog(QDialog):
+    """Janela de navegação e busca no histórico de legendas."""
+
+    SEARCH_DEBOUNCE_MS = 250  # Espera o usuário parar de digitar antes de buscar
+
+    def __init__(self, paths_provider, parent=None):
+        """
+        :param paths_provider: Função que retorna os arquivos de legenda em ordem cronológica.
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Histórico de Legendas")
+        self.resize(900, 600)
+        self.paths_provider = paths_provider
+        self.store = None
+        self._index_worker = None
+        self._block_loader = None
+        self._search_worker = None
+        self._finished_workers = []
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._start_search)
+
+        self._setup_ui()
+        self.reload()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Buscar no histórico (todas as palavras)...")
+        self.search_edit.textChanged.connect(lambda _: self._search_timer.start())
+        search_layout.addWidget(self.search_edit)
+        self.btn_reload = QPushButton("⟳  Atualizar")
+        self.btn_reload.clicked.connect(self.reload)
+        search_layout.addWidget(self.btn_reload)
+        layout.addLayout(search_layout)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.model = CaptionHistoryModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        splitter.addWidget(self.table)
+
+        self.results_model = SearchResultsModel(self)
+        self.results_view = QListView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setUniformItemSizes(True)
+        self.results_view.clicked.connect(self._on_result_clicked)
+        splitter.addWidget(self.results_view)
+        splitter.setSizes([400, 200])
+        layout.addWidget(splitter)
+
+        self.lbl_status = QLabel("")
+        layout.addWidget(self.lbl_status)
+
+    def reload(self):
+        """(Re)monta o índice do histórico em segundo plano."""
+        self._cancel_search()
+        if self._index_worker is not None:
+            self._index_worker.cancel()
+            self._finished_workers.append(self._index_worker)
+        self.lbl_status.setText("Indexando histórico...")
+        self._index_worker = HistoryIndexWorker(self.paths_provider())
+        self._index_worker.index_ready.connect(self._on_index_ready)
+        self._index_worker.start()
+
+    def _on_index_ready(self, store):
+        if self.sender() is not self._index_worker:
+            return  # Resultado de uma indexação já substituída
+        self.store = store
+        self._stop_block_loader()
+        self._block_loader = HistoryBlockLoader(store)
+        self._block_loader.start()
+        self.model.set_store(store, self._block_loader)
+        self.table.scrollToBottom()
+        self.lbl_status.setText(f"{len(store)} linha(s) em {len(store.paths)} arquivo(s)")
+        if self.search_edit.text().strip():
+            self._start_search()
+
+    def _stop_block_loader(self):
+        if self._block_loader is not None:
+            self._block_loader.cancel()
+            self._finished_workers.append(self._block_loader)
+            self._block_loader = None
+
+    def _cancel_search(self):
+        if self._search_worker is not None:
+            self._search_worker.cancel()
+            self._finished_workers.append(self._search_worker)
+            self._search_worker = None
+        self._finished_workers = [w for w in self._finished_workers if w.isRunning()]
+
+    def _start_search(self):
+        self._cancel_search()
+        self.results_model.clear()
+        query = self.search_edit.text().strip()
+        if not query or self.store is None:
+            return
+        self.lbl_status.setText(f"Buscando \"{query}\"...")
+        self._search_worker = HistorySearchWorker(self.store, query)
+        self._search_worker.matches_found.connect(self._on_matches_found)
+        self._search_worker.search_finished.connect(self._on_search_finished)
+        self._search_worker.start()
+
+    def _on_matches_found(self, matches):
+        if self.sender() is self._search_worker:
+            self.results_model.append_matches(matches)
+
+    def _on_search_finished(self, total, cancelled):
+        if self.sender() is self._search_worker and not cancelled:
+            self.lbl_status.setText(f"{total} resultado(s) para \"{self._search_worker.query}\"")
+
+    def _on_result_clicked(self, index):
+        row = self.results_model.matches[index.row()][0]
+        target = self.model.index(row, 1)
+        self.table.scrollTo(target, QAbstractItemView.ScrollHint.PositionAtCenter)
+        self.table.selectRow(row)
+
+    def closeEvent(self, event):
+        self._cancel_search()
+        self._stop_block_loader()
+        if self._index_worker is not None:
+            self._index_worker.cancel()
+        for worker in [self._index_worker] + self._finished_workers:
+            if worker is not None:
+                worker.wait(2000)
+        super().closeEvent(event)
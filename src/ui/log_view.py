@@ -0,0 +1,67 @@
+"""
+Visualização de log incremental e limitada para a janela principal.
+
+Cada linha vira um bloco acrescentado ao fim do documento (sem reler nem reconstruir
+o texto), e o QPlainTextEdit descarta sozinho os blocos mais antigos acima do limite.
+Com coalescência, as linhas recebidas entre duas atualizações são acrescentadas de
+uma vez, em uma única atualização por intervalo.
+"""
+from collections import deque
+
+from PyQt6.QtWidgets import QPlainTextEdit
+from PyQt6.QtCore import QTimer
+
+
+class BoundedLogView(QPlainTextEdit):
+    """QPlainTextEdit somente leitura com limite de linhas e atualização em lote."""
+
+    def __init__(self, max_lines=15, coalesce_ms=0, parent=None):
+        """
+        :param max_lines: Máximo de linhas mantidas (as mais antigas saem primeiro).
+        :param coalesce_ms: Se > 0, junta as linhas recebidas e atualiza a tela no máximo
+                            uma vez a cada coalesce_ms; 0 acrescenta na hora.
+        """
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        self.max_lines = max_lines
+
+        # Só as últimas max_lines pendentes podem aparecer; as demais são descartadas já aqui
+        self._pending = deque(maxlen=max_lines)
+        self._flush_timer = None
+        if coalesce_ms > 0:
+            self._flush_timer = QTimer(self)
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setInterval(coalesce_ms)
+            self._flush_timer.timeout.connect(self.flush)
+
+    def append_line(self, text):
+        """Acrescenta uma linha (texto vazio é ignorado)."""
+        if not text or not text.strip():
+            return
+        self.append_lines([text])
+
+    def append_lines(self, lines):
+        """Acrescenta várias linhas com uma única atualização do documento."""
+        cleaned = [line.strip() for line in lines if line and line.strip()]
+        if not cleaned:
+            return
+        self._pending.extend(cleaned)
+        if self._flush_timer is None:
+            self.flush()
+        elif not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Escreve as linhas pendentes e rola para o final."""
+        if not self._pending:
+            return
+        text = "\n".join(self._pending)
+        self._pending.clear()
+        self.appendPlainText(text)
+        sb = self.verticalScrollBar()
+        sb.setValue(sb.maximum())
@@ -1,12 +1,18 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QPushButton, QTextEdit, QLabel, QSpinBox, QCheckBox,
+                             QPushButton, QLabel, QSpinBox, QCheckBox,
                              QGroupBox, QStatusBar, QMessageBox, QProgressBar)
 from PyQt6.QtCore import pyqtSignal, Qt, pyqtSlot, QTimer
 from PyQt6.QtGui import QAction
 from src.ui.overlay import OverlaySelector
+from src.ui.log_view import BoundedLogView
+from src.ui.perf_panel import PerfPanel
 from src.ui.theme import get_stylesheet
 from src import __version__
 
+MAX_LOG_LINES = 15
+DEBUG_LOG_COALESCE_MS = 100  # No máximo uma atualização do log de debug por intervalo
+
+
 class MainWindow(QMainWindow):
     # Sinais para o Controller
     start_requested = pyqtSignal(dict) # Envia config atual
@@ -17,6 +23,8 @@ class MainWindow(QMainWindow):
     region_saved = pyqtSignal(int, int, int, int) # Emite quando região é salva manualmente
     config_saved = pyqtSignal(dict) # Emite quando configurações devem ser salvas
     clear_captions_requested = pyqtSignal() # Solicita limpeza de todos os arquivos de captions
+    history_requested = pyqtSignal() # Solicita abrir o navegador do histórico
+    perf_panel_toggled = pyqtSignal(bool) # Painel de desempenho aberto/fechado
 
     def __init__(self):
         super().__init__()
@@ -78,6 +86,14 @@ class MainWindow(QMainWindow):
         self.btn_open_logs.setMinimumWidth(120)
         controls_layout.addWidget(self.btn_open_logs)
 
+        # Botão de Histórico (todas as legendas gravadas, com busca)
+        self.btn_history = QPushButton("🕘  Histórico")
+        self.btn_history.setObjectName("btn_history")
+        self.btn_history.clicked.connect(self.history_requested.emit)
+        self.btn_history.setMinimumWidth(120)
+        self.btn_history.setToolTip("Navega e busca em todo o histórico de legendas")
+        controls_layout.addWidget(self.btn_history)
+
         # Botão de Limpar Captions
         self.btn_clear_captions = QPushButton("🗑  Limpar Captions")
         self.btn_clear_captions.setObjectName("btn_clear_captions")
@@ -289,6 +305,34 @@ class MainWindow(QMainWindow):
         smart_adjust_layout.addStretch()
         advanced_layout.addLayout(smart_adjust_layout)
 
+        # Modo Rolante
+        rolling_layout = QHBoxLayout()
+        self.chk_rolling_mode = QCheckBox("Modo Rolante (Janela Deslizante)")
+        self.chk_rolling_mode.setToolTip("Para legendas que rolam (ex.: Live Captions): grava apenas as palavras novas de cada leitura.")
+        self.chk_rolling_mode.toggled.connect(self.emit_config_update)
+        rolling_layout.addWidget(self.chk_rolling_mode)
+
+        # Explicação
+        rolling_explanation = QLabel("Evita gravar trechos sobrepostos de legendas rolantes")
+        rolling_explanation.setStyleSheet("color: #666; font-size: 9pt; font-style: italic;")
+        rolling_layout.addWidget(rolling_explanation)
+        rolling_layout.addStretch()
+        advanced_layout.addLayout(rolling_layout)
+
+        # Modo por Linha
+        line_mode_layout = QHBoxLayout()
+        self.chk_line_mode = QCheckBox("Modo por Linha (Várias Linhas)")
+        self.chk_line_mode.setToolTip("Para regiões com duas ou mais linhas de legenda: cada linha é estabilizada e gravada separadamente.")
+        self.chk_line_mode.toggled.connect(self.emit_config_update)
+        line_mode_layout.addWidget(self.chk_line_mode)
+
+        # Explicação
+        line_mode_explanation = QLabel("Evita regravar o bloco inteiro quando só uma linha muda")
+        line_mode_explanation.setStyleSheet("color: #666; font-size: 9pt; font-style: italic;")
+        line_mode_layout.addWidget(line_mode_explanation)
+        line_mode_layout.addStretch()
+        advanced_layout.addLayout(line_mode_layout)
+
         advanced_group.setLayout(advanced_layout)
         advanced_container_layout = QVBoxLayout(self.advanced_container)
         advanced_container_layout.setContentsMargins(0, 0, 0, 0)
@@ -296,6 +340,20 @@ class MainWindow(QMainWindow):
         self.advanced_container.setVisible(False)  # Inicia colapsado
         layout.addWidget(self.advanced_container)
 
+        # --- Painel de Desempenho (Colapsável; sem coleta enquanto fechado) ---
+        perf_header_layout = QHBoxLayout()
+        self.btn_toggle_perf = QPushButton("▶  📊 Desempenho")
+        self.btn_toggle_perf.setObjectName("btn_toggle_perf")
+        self.btn_toggle_perf.clicked.connect(self._toggle_perf_panel)
+        self.btn_toggle_perf.setMinimumWidth(220)
+        perf_header_layout.addWidget(self.btn_toggle_perf)
+        perf_header_layout.addStretch()
+        layout.addLayout(perf_header_layout)
+
+        self.perf_panel = PerfPanel()
+        self.perf_panel.setVisible(False)  # Inicia colapsado
+        layout.addWidget(self.perf_panel)
+
         # --- Logs Separados ---
         logs_layout = QHBoxLayout()
         
@@ -304,8 +362,7 @@ class MainWindow(QMainWindow):
         capture_log_layout = QVBoxLayout(capture_log_widget)
         capture_log_layout.setContentsMargins(0, 0, 0, 0)
         capture_log_layout.addWidget(QLabel("Log de Captura (15 linhas):"))
-        self.log_area = QTextEdit()
-        self.log_area.setReadOnly(True)
+        self.log_area = BoundedLogView(max_lines=MAX_LOG_LINES)
         self.log_area.setMinimumHeight(120)
         # Background escuro com texto claro
         self.log_area.setStyleSheet("background-color: #2b2b2b; color: #e0e0e0; font-size: 10pt;")
@@ -317,8 +374,7 @@ class MainWindow(QMainWindow):
         debug_log_layout = QVBoxLayout(debug_log_widget)
         debug_log_layout.setContentsMargins(0, 0, 0, 0)
         debug_log_layout.addWidget(QLabel("Log de Debug (15 linhas):"))
-        self.debug_log_area = QTextEdit()
-        self.debug_log_area.setReadOnly(True)
+        self.debug_log_area = BoundedLogView(max_lines=MAX_LOG_LINES, coalesce_ms=DEBUG_LOG_COALESCE_MS)
         self.debug_log_area.setMinimumHeight(120)
         # Background escuro como o log de captura, com texto claro para contraste
         self.debug_log_area.setStyleSheet("background-color: #2b2b2b; color: #e0e0e0; font-family: 'Courier New', monospace; font-size: 9pt;")
@@ -401,6 +457,18 @@ class MainWindow(QMainWindow):
         else:
             self.btn_toggle_advanced.setText("▼  Configurações Avançadas")
 
+    def _toggle_perf_panel(self):
+        """Mostra/esconde o painel de desempenho (e liga/desliga a coleta)."""
+        visible = not self.perf_panel.isVisible()
+        self.perf_panel.setVisible(visible)
+        self.btn_toggle_perf.setText("▼  📊 Desempenho" if visible else "▶  📊 Desempenho")
+        self.perf_panel_toggled.emit(visible)
+
+    def update_perf_stats(self, stats):
+        """Recebe o snapshot do PerfMonitor (no máximo um por segundo)."""
+        if self.perf_panel.isVisible():
+            self.perf_panel.update_stats(stats)
+
     def toggle_recording(self):
         if self.btn_record.isChecked():
             # Iniciar
@@ -432,7 +500,9 @@ class MainWindow(QMainWindow):
             "auto_smart_adjust": self.chk_smart_adjust.isChecked(),
             "jitter_detection_threshold": self.spin_jitter_threshold.value(),
             "stability_detection_threshold": self.spin_stability_threshold.value(),
-            "repetition_threshold": self.spin_repetition_threshold.value() / 100.0
+            "repetition_threshold": self.spin_repetition_threshold.value() / 100.0,
+            "rolling_mode": self.chk_rolling_mode.isChecked(),
+            "line_mode": self.chk_line_mode.isChecked()
         }
 
     def emit_config_update(self):
@@ -456,6 +526,8 @@ class MainWindow(QMainWindow):
         self.spin_jitter_threshold.blockSignals(True)
         self.spin_stability_threshold.blockSignals(True)
         self.spin_repetition_threshold.blockSignals(True)
+        self.chk_rolling_mode.blockSignals(True)
+        self.chk_line_mode.blockSignals(True)
         
         # Carrega valores salvos (usa valores padrão se não existirem)
         self.spin_timeout.setValue(settings.get('timeout_ms', 1500))
@@ -474,6 +546,8 @@ class MainWindow(QMainWindow):
         self.spin_stability_threshold.setValue(settings.get('stability_detection_threshold', 20))
         repetition = settings.get('repetition_threshold', 0.8)
         self.spin_repetition_threshold.setValue(int(repetition * 100) if isinstance(repetition, float) else int(repetition * 100))
+        self.chk_rolling_mode.setChecked(settings.get('rolling_mode', False))
+        self.chk_line_mode.setChecked(settings.get('line_mode', False))
         
         # Reconecta os sinais
         self.spin_timeout.blockSignals(False)
@@ -486,6 +560,8 @@ class MainWindow(QMainWindow):
         self.spin_jitter_threshold.blockSignals(False)
         self.spin_stability_threshold.blockSignals(False)
         self.spin_repetition_threshold.blockSignals(False)
+        self.chk_rolling_mode.blockSignals(False)
+        self.chk_line_mode.blockSignals(False)
 
     def save_current_region(self):
         """Salva a região de captura atual. Se o overlay estiver aberto, confirma a seleção."""
@@ -531,92 +607,21 @@ class MainWindow(QMainWindow):
 
     @pyqtSlot(str)
     def append_log(self, text):
-        """Adiciona texto ao log de captura mantendo apenas as últimas 15 linhas."""
-        if not text or not text.strip():
-            return  # Ignora texto vazio
-        
-        text_cleaned = text.strip()
-        MAX_LOG_LINES = 15
-        
-        try:
-            # Verifica se o widget existe
-            if not hasattr(self, 'log_area') or self.log_area is None:
-                return
-            
-            # Obtém o conteúdo atual
-            content = self.log_area.toPlainText()
-            lines = []
-            
-            if content and content.strip():
-                # Separa linhas e remove vazias
-                all_lines = content.split('\n')
-                lines = [line for line in all_lines if line.strip()]
-            
-            # Adiciona a nova linha
-            lines.append(text_cleaned)
-            
-            # Mantém apenas as últimas MAX_LOG_LINES linhas (substitui as antigas)
-            if len(lines) > MAX_LOG_LINES:
-                lines = lines[-MAX_LOG_LINES:]
-            
-            # Atualiza o conteúdo do log
-            new_content = '\n'.join(lines)
-            
-            # Atualiza diretamente
-            self.log_area.setPlainText(new_content)
-            self.log_area.repaint()
-            
-            # Scroll para o final após um pequeno delay
-            QTimer.singleShot(50, self._scroll_log_to_bottom)
-        except Exception as e:
-            print(f"[UI] Erro ao atualizar log de captura: {e}")
-            import traceback
-            traceback.print_exc()
-            # Tenta adicionar ao log de debug
-            if hasattr(self, 'append_debug_log'):
-                try:
-                    self.append_debug_log(f"[ERRO] Falha ao atualizar log de captura: {e}")
-                except:
-                    pass
-    
-    def _scroll_log_to_bottom(self):
-        """Scroll o log de captura para o final."""
-        try:
-            sb = self.log_area.verticalScrollBar()
-            if sb:
-                sb.setValue(sb.maximum())
-        except:
-            pass
+        """Adiciona texto ao log de captura (mantém apenas as últimas 15 linhas)."""
+        self.log_area.append_line(text)
+
+    def append_logs(self, texts):
+        """Adiciona várias frases ao log de captura com uma única atualização."""
+        self.log_area.append_lines(texts)
     
     @pyqtSlot(str)
     def append_debug_log(self, text):
-        """Adiciona texto ao log de debug mantendo apenas as últimas 15 linhas."""
-        if not text or not text.strip():
-            return  # Ignora texto vazio
-        
-        MAX_LOG_LINES = 15
-        
-        # Obtém o conteúdo atual (mantém todas as linhas, incluindo vazias)
-        content = self.debug_log_area.toPlainText()
-        lines = content.split('\n')
-        
-        # Remove linhas vazias do final
-        while lines and not lines[-1].strip():
-            lines.pop()
-        
-        # Adiciona a nova linha
-        lines.append(text.strip())
-        
-        # Mantém apenas as últimas MAX_LOG_LINES linhas (substitui as antigas)
-        if len(lines) > MAX_LOG_LINES:
-            lines = lines[-MAX_LOG_LINES:]
-        
-        # Atualiza o conteúdo do log
-        self.debug_log_area.setPlainText('\n'.join(lines))
-        
-        # Scroll para o final
-        sb = self.debug_log_area.verticalScrollBar()
-        sb.setValue(sb.maximum())
+        """Adiciona texto ao log de debug (coalescido: uma atualização por intervalo)."""
+        self.debug_log_area.append_line(text)
+
+    def append_debug_logs(self, texts):
+        """Adiciona várias mensagens ao log de debug."""
+        self.debug_log_area.append_lines(texts)
 
     @pyqtSlot(str)
     def update_status(self, text):
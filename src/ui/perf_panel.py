@@ -0,0 +1,59 @@
+"""
+Painel de desempenho do pipeline de captura (FPS, latências, fila, memória e CPU).
+
+Só exibe: os números chegam prontos do PerfMonitor (thread própria), no máximo
+uma vez por intervalo.
+"""
+from PyQt6.QtWidgets import QGroupBox, QGridLayout, QLabel
+from src.core.perf_stats import OCR_LATENCY, STABILIZER_UPDATE, COMMIT_TO_DISK, FRAMES_SKIPPED, QUEUE_DEPTH
+
+
+def _fmt_ms(value):
+    return "—" if value is None else f"{value:.0f} ms" if value >= 10 else f"{value:.1f} ms"
+
+
+def _fmt_percentiles(stats):
+    if not stats:
+        return "—"
+    return f"p50 {_fmt_ms(stats['p50'])} · p95 {_fmt_ms(stats['p95'])} · p99 {_fmt_ms(stats['p99'])}"
+
+
+class PerfPanel(QGroupBox):
+    """Grade de rótulos com as estatísticas mais recentes."""
+
+    ROWS = (
+        ("fps", "FPS de captura"),
+        (OCR_LATENCY, "Latência do OCR"),
+        (FRAMES_SKIPPED, "Frames perdidos"),
+        (STABILIZER_UPDATE, "Stabilizer por atualização"),
+        (QUEUE_DEPTH, "Fila do processador"),
+        (COMMIT_TO_DISK, "Commit → disco"),
+        ("rss_mb", "Memória (RSS)"),
+        ("cpu_percent", "CPU do processo"),
+    )
+
+    def __init__(self, parent=None):
+        super().__init__("Desempenho", parent)
+        layout = QGridLayout()
+        self.value_labels = {}
+        for row, (key, title) in enumerate(self.ROWS):
+            layout.addWidget(QLabel(title + ":"), row, 0)
+            value = QLabel("—")
+            value.setStyleSheet("font-family: 'Consolas', 'Courier New', monospace;")
+            layout.addWidget(value, row, 1)
+            self.value_labels[key] = value
+        layout.setColumnStretch(1, 1)
+        self.setLayout(layout)
+
+    def update_stats(self, stats):
+        """Atualiza os rótulos a partir de PerfStats.snapshot()."""
+        self.value_labels["fps"].setText(f"{stats.get('fps', 0.0):.1f}")
+        for key in (OCR_LATENCY, STABILIZER_UPDATE, COMMIT_TO_DISK):
+            self.value_labels[key].setText(_fmt_percentiles(stats.get(key)))
+        self.value_labels[FRAMES_SKIPPED].setText(str(stats.get("counters", {}).get(FRAMES_SKIPPED, 0)))
+        depth = stats.get(QUEUE_DEPTH)
+        self.value_labels[QUEUE_DEPTH].setText("—" if depth is None else str(depth))
+        rss = stats.get("rss_mb")
+        self.value_labels["rss_mb"].setText("—" if rss is None else f"{rss:.0f} MB")
+        cpu = stats.get("cpu_percent")
+        self.value_labels["cpu_percent"].setText("—" if cpu is None else f"{cpu:.0f}%")
@@ -179,7 +179,7 @@ def get_stylesheet():
     }}
 
     /* ===== TEXT EDIT (Logs) ===== */
-    QTextEdit {{
+    QTextEdit, QPlainTextEdit {{
         background-color: #0d1117;
         color: {c['text_primary']};
         border: 1px solid {c['border']};
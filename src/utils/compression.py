@@ -0,0 +1,109 @@
+"""
+Compressão e retenção de arquivos rotacionados (logs e históricos).
+
+Usa gzip da biblioteca padrão. Arquivos comprimidos ganham o sufixo ".gz" e
+continuam legíveis de forma transparente por `open_text`, em streaming.
+"""
+import gzip
+import os
+import shutil
+import time
+
+GZ_SUFFIX = ".gz"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def is_compressed(path):
+    return path.endswith(GZ_SUFFIX)
+
+
+def open_text(path, encoding="utf-8"):
+    """Abre um arquivo texto para leitura, descomprimindo em streaming se for .gz."""
+    if is_compressed(path):
+        return gzip.open(path, "rt", encoding=encoding)
+    return open(path, "r", encoding=encoding)
+
+
+def open_binary(path):
+    """Abre um arquivo para leitura binária, descomprimindo em streaming se for .gz."""
+    if is_compressed(path):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def compress_file(path, remove_source=True, compresslevel=6):
+    """
+    Comprime `path` para `path + ".gz"`.
+
+    Grava em um arquivo temporário e só então o renomeia, para que uma interrupção
+    nunca deixe um .gz truncado no lugar. Preserva a data de modificação.
+
+    :return: Caminho do arquivo comprimido, ou None em caso de erro.
+    """
+    target = path + GZ_SUFFIX
+    tmp_path = target + ".tmp"
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=compresslevel) as dst:
+            shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+        os.replace(tmp_path, target)
+        os.utime(target, (stat.st_atime, stat.st_mtime))
+        if remove_source:
+            os.remove(path)
+        return target
+    except Exception as e:
+        print(f"[COMPRESSION] Erro ao comprimir {path}: {e}")
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+
+
+def apply_retention(paths, max_total_bytes=None, max_age_days=None, now=None, companions=()):
+    """
+    Remove os arquivos mais antigos até respeitar o limite de idade e de tamanho total.
+
+    :param paths: Arquivos candidatos (o arquivo em uso não deve estar na lista).
+    :param max_total_bytes: Tamanho total máximo dos candidatos (None = sem limite).
+    :param max_age_days: Idade máxima pela data de modificação (None = sem limite).
+    :param now: Instante atual (time.time() por padrão).
+    :param companions: Sufixos de arquivos auxiliares removidos junto (ex.: (".idx",)).
+    :return: Lista de arquivos removidos.
+    """
+    now = now if now is not None else time.time()
+    files = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()  # Mais antigo primeiro
+
+    total = sum(size for _, size, _ in files)
+    removed = []
+    for mtime, size, path in files:
+        too_old = max_age_days is not None and now - mtime > max_age_days * 86400
+        too_big = max_total_bytes is not None and total > max_total_bytes
+        if not (too_old or too_big):
+            continue
+        try:
+            os.remove(path)
+            total -= size
+            removed.append(path)
+            for suffix in companions:
+                companion = companion_path(path, suffix)
+                if os.path.exists(companion):
+                    os.remove(companion)
+        except OSError as e:
+            print(f"[COMPRESSION] Erro ao remover {path}: {e}")
+    return removed
+
+
+def companion_path(path, suffix):
+    """Caminho de um arquivo auxiliar, ignorando o .gz (ex.: a.log.gz -> a.log.idx)."""
+    if is_compressed(path):
+        path = path[:-len(GZ_SUFFIX)]
+    return path + suffix
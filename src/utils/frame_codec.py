@@ -0,0 +1,61 @@
+"""
+Conversão entre as imagens da captura (numpy) e os bytes gravados no anel de frames
+(src/core/frame_ring.py): escala de cinza (1 byte/pixel) ou binarizada (1 bit/pixel).
+"""
+import cv2
+import numpy as np
+
+from src.core.frame_ring import FORMAT_BINARY1, FORMAT_GRAY8, FLAG_INVERTED
+
+MODE_GRAY = "gray"  # Imagem capturada em cinza: permite testar outro pré-processamento
+MODE_BINARY = "binary"  # Imagem que o OCR recebeu: ~8x menor, mais tempo no mesmo anel
+MODES = (MODE_GRAY, MODE_BINARY)
+
+
+def to_gray(image):
+    """Escala de cinza de uma captura BGRA/BGR (imagens já em cinza passam direto)."""
+    if image.ndim == 2:
+        return image
+    code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(image, code)
+
+
+def encode_gray(image):
+    gray = np.ascontiguousarray(to_gray(image))
+    height, width = gray.shape
+    return width, height, FORMAT_GRAY8, 0, gray.tobytes()
+
+
+def encode_binary(image, inverted=False):
+    """:param image: Imagem binarizada (0/255), como a de process_image_for_ocr."""
+    binary = to_gray(image)
+    height, width = binary.shape
+    flags = FLAG_INVERTED if inverted else 0
+    return width, height, FORMAT_BINARY1, flags, np.packbits(binary > 127).tobytes()
+
+
+def make_encoder(mode):
+    """
+    Função de codificação para o FrameRecorder. Os frames chegam do OCRWorker como
+    (captura, imagem pré-processada, cores invertidas); o modo escolhe qual é gravada.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Modo de gravação desconhecido: {mode}")
+    if mode == MODE_GRAY:
+        return lambda frame: encode_gray(frame[0])
+    return lambda frame: encode_binary(frame[1], frame[2])
+
+
+def decode_frame(frame, payload):
+    """
+    Imagem (uint8, height x width, 0-255) de um frame do anel.
+
+    :param frame: RingFrame com as dimensões e o formato.
+    :param payload: Bytes lidos com FrameRing.read_payload.
+    """
+    if frame.frame_format == FORMAT_GRAY8:
+        return np.frombuffer(payload, dtype=np.uint8).reshape(frame.height, frame.width)
+    if frame.frame_format == FORMAT_BINARY1:
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=frame.width * frame.height)
+        return (bits * 255).astype(np.uint8).reshape(frame.height, frame.width)
+    raise ValueError(f"Formato de frame desconhecido: {frame.frame_format}")
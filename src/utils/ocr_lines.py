@@ -0,0 +1,45 @@
+"""
+Agrupamento dos resultados do OCR em linhas visuais.
+"""
+
+
+def group_results_into_lines(results):
+    """
+    Agrupa as caixas do EasyOCR (readtext com detail=1) em linhas, de cima para baixo.
+
+    Duas caixas ficam na mesma linha quando o centro vertical de uma está a menos de
+    meia altura média do centro da linha atual. Dentro de cada linha, as caixas são
+    ordenadas da esquerda para a direita.
+
+    :param results: Lista de tuplas (bbox, texto, confiança), com bbox = 4 pontos (x, y).
+    :return: Lista de strings, uma por linha.
+    """
+    boxes = []
+    for bbox, text, _confidence in results:
+        text = text.strip()
+        if not text:
+            continue
+        ys = [point[1] for point in bbox]
+        xs = [point[0] for point in bbox]
+        top, bottom = min(ys), max(ys)
+        boxes.append(((top + bottom) / 2.0, bottom - top, min(xs), text))
+
+    if not boxes:
+        return []
+
+    boxes.sort(key=lambda box: box[0])
+    avg_height = sum(box[1] for box in boxes) / len(boxes)
+    tolerance = max(avg_height / 2.0, 1.0)
+
+    lines = []
+    current = [boxes[0]]
+    for box in boxes[1:]:
+        line_center = sum(b[0] for b in current) / len(current)
+        if abs(box[0] - line_center) <= tolerance:
+            current.append(box)
+        else:
+            lines.append(current)
+            current = [box]
+    lines.append(current)
+
+    return [" ".join(box[3] for box in sorted(line, key=lambda b: b[2])) for line in lines]
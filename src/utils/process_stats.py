@@ -0,0 +1,76 @@
+"""
+Uso de memória (RSS) e CPU do próprio processo.
+
+Usa psutil se estiver instalado (opcional). Sem ele: CPU pelo tempo de CPU do
+processo (time.process_time) e RSS por /proc (Linux) ou pela API do Windows.
+"""
+import os
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _rss_bytes_fallback():
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            return None
+    return None
+
+
+class ProcessStats:
+    """Leituras de RSS e CPU do processo atual; cpu_percent() é relativo à chamada anterior."""
+
+    def __init__(self):
+        self._process = psutil.Process() if psutil is not None else None
+        self._last_wall = time.monotonic()
+        self._last_cpu = time.process_time()
+
+    def rss_mb(self):
+        """Memória residente em MB, ou None se não for possível medir."""
+        if self._process is not None:
+            try:
+                return self._process.memory_info().rss / (1024 * 1024)
+            except Exception:
+                pass
+        rss = _rss_bytes_fallback()
+        return rss / (1024 * 1024) if rss is not None else None
+
+    def cpu_percent(self):
+        """CPU usada desde a última chamada (100 = um núcleo inteiro)."""
+        if self._process is not None:
+            try:
+                return self._process.cpu_percent(interval=None)
+            except Exception:
+                pass
+        now_wall = time.monotonic()
+        now_cpu = time.process_time()
+        elapsed = now_wall - self._last_wall
+        used = now_cpu - self._last_cpu
+        self._last_wall, self._last_cpu = now_wall, now_cpu
+        return 100.0 * used / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,218 @@
+"""
+Gerador de legendas sintéticas e backend de captura falso (no lugar do mss).
+
+Desenha com cv2.putText o texto da CaptionTimeline imitando o visual de cada preset
+(src/core/presets.py), para exercitar o OCRWorker e o pipeline inteiro sem tela e
+sem uma reunião de verdade. Os frames saem em BGRA, como o mss entrega.
+
+Uso no OCRWorker:
+    source = SyntheticCaptionSource("zoom", flicker_rate=0.1)
+    worker.capture_backend_factory = lambda: SyntheticCapture(source)
+    worker.set_region(0, 0, 800, 160)
+"""
+import time
+import unicodedata
+
+import cv2
+import numpy as np
+
+from src.core.caption_timeline import CaptionTimeline, DEFAULT_SENTENCES, MODE_EXPANDING, MODE_SCROLLING
+
+# Estilos por preset. Cores em BGR.
+STYLES = {
+    "windows_live_captions": {
+        "mode": MODE_SCROLLING,
+        "background": "solid", "background_color": (32, 32, 32),
+        "text_color": (255, 255, 255), "align": "left", "anchor": "top",
+        "box": None, "font_scale": 0.8, "thickness": 2, "max_lines": 2,
+    },
+    "zoom": {
+        "mode": MODE_EXPANDING,
+        "background": "video", "background_color": (60, 70, 80),
+        "text_color": (255, 255, 255), "align": "center", "anchor": "bottom",
+        "box": "bar", "box_color": (0, 0, 0), "box_alpha": 0.65,
+        "font_scale": 0.75, "thickness": 2, "max_lines": 2,
+    },
+    "youtube": {
+        "mode": MODE_EXPANDING,
+        "background": "video", "background_color": (90, 110, 70),
+        "text_color": (255, 255, 255), "align": "center", "anchor": "bottom",
+        "box": "lines", "box_color": (8, 8, 8), "box_alpha": 0.75,
+        "font_scale": 0.8, "thickness": 2, "max_lines": 2,
+    },
+    "teams": {
+        "mode": MODE_EXPANDING,
+        "background": "solid", "background_color": (41, 31, 31),
+        "text_color": (240, 240, 240), "align": "left", "anchor": "bottom",
+        "box": None, "font_scale": 0.7, "thickness": 1, "max_lines": 3,
+    },
+}
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+PADDING = 12
+NOISE_BANK_SIZE = 8  # Quadros de ruído pré-gerados (reusados em ciclo)
+
+
+def to_renderable(text):
+    """Remove acentos (as fontes Hershey do OpenCV só têm ASCII)."""
+    normalized = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in normalized if not unicodedata.combining(ch) and ord(ch) < 128)
+
+
+class SyntheticCaptionSource:
+    """Desenha os frames de legenda de um estilo a partir de uma CaptionTimeline."""
+
+    def __init__(self, style="windows_live_captions", sentences=None, width=800, height=120,
+                 words_per_second=3.0, hold_s=1.5, mode=None, flicker_rate=0.0, seed=0, loop=True):
+        """
+        :param style: Chave de STYLES (mesmas chaves dos presets).
+        :param sentences: Frases da transcrição (padrão: DEFAULT_SENTENCES).
+        :param width: Largura padrão dos frames.
+        :param height: Altura padrão dos frames.
+        :param mode: "expanding"/"scrolling" (padrão: o do estilo).
+        Os demais parâmetros vão para a CaptionTimeline.
+        """
+        if style not in STYLES:
+            raise ValueError(f"Estilo desconhecido: {style} (disponíveis: {', '.join(STYLES)})")
+        self.style_name = style
+        self.style = STYLES[style]
+        self.width = width
+        self.height = height
+        self.seed = seed
+        sentences = [to_renderable(s) for s in (sentences or DEFAULT_SENTENCES)]
+        self.timeline = CaptionTimeline(
+            sentences, words_per_second=words_per_second, hold_s=hold_s,
+            mode=mode or self.style["mode"], flicker_rate=flicker_rate, seed=seed, loop=loop
+        )
+        self._wrap_cache = {}
+        self._scene = None
+        self._noise_bank = None
+
+    def ground_truth(self, duration=None):
+        """Transcrição de referência (ver CaptionTimeline.transcript)."""
+        return self.timeline.transcript(duration)
+
+    def _line_height(self):
+        (_, text_h), baseline = cv2.getTextSize("Ag", FONT, self.style["font_scale"], self.style["thickness"])
+        return text_h + baseline + 8
+
+    def wrap(self, text, width):
+        """Quebra o texto em linhas que cabem na largura (só as últimas max_lines ficam visíveis)."""
+        key = (text, width)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            lines = []
+            current = ""
+            limit = width - 2 * PADDING
+            for word in text.split():
+                candidate = f"{current} {word}" if current else word
+                (w, _), _ = cv2.getTextSize(candidate, FONT, self.style["font_scale"], self.style["thickness"])
+                if current and w > limit:
+                    lines.append(current)
+                    current = word
+                else:
+                    current = candidate
+            if current:
+                lines.append(current)
+            lines = lines[-self.style["max_lines"]:]
+            if len(self._wrap_cache) > 256:
+                self._wrap_cache.clear()
+            self._wrap_cache[key] = lines
+        return lines
+
+    def visible_lines(self, t, frame_index=0, width=None):
+        """Linhas na tela no instante t (com a cintilação do frame)."""
+        text, _ = self.timeline.frame_text(t, frame_index)
+        return self.wrap(text, width or self.width)
+
+    def _background(self, width, height, frame_index):
+        color = self.style["background_color"]
+        if self.style["background"] == "solid":
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[:] = color
+            return frame
+        # "Vídeo": manchas de baixa frequência que mudam devagar + ruído de sensor
+        # (o ruído vem de um banco pré-gerado: gerar por frame custaria mais que o resto)
+        scene = frame_index // 5
+        key = (width, height, scene)
+        if self._scene is None or self._scene[0] != key:
+            rng = np.random.default_rng(self.seed * 7919 + scene)
+            blobs = rng.integers(-60, 60, size=(4, 8, 3)).astype(np.float32)
+            base = cv2.resize(blobs, (width, height), interpolation=cv2.INTER_CUBIC)
+            self._scene = (key, (np.asarray(color, dtype=np.float32) + base).astype(np.int16))
+        if self._noise_bank is None or self._noise_bank.shape[1:3] != (height, width):
+            rng = np.random.default_rng(self.seed * 104729)
+            self._noise_bank = rng.normal(0, 12, size=(NOISE_BANK_SIZE, height, width, 1)).astype(np.int16)
+        frame = self._scene[1] + self._noise_bank[frame_index % NOISE_BANK_SIZE]
+        return np.clip(frame, 0, 255).astype(np.uint8)
+
+    def _blend_rect(self, frame, x0, y0, x1, y1):
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(frame.shape[1], x1), min(frame.shape[0], y1)
+        if x1 <= x0 or y1 <= y0:
+            return
+        alpha = self.style.get("box_alpha", 1.0)
+        region = frame[y0:y1, x0:x1].astype(np.float32)
+        box = np.asarray(self.style["box_color"], dtype=np.float32)
+        frame[y0:y1, x0:x1] = (region * (1 - alpha) + box * alpha).astype(np.uint8)
+
+    def render(self, t, width=None, height=None, frame_index=0):
+        """
+        Desenha o frame do instante t.
+
+        :return: numpy array BGRA (altura x largura x 4), como np.array(mss.grab(...)).
+        """
+        width = width or self.width
+        height = height or self.height
+        style = self.style
+        frame = self._background(width, height, frame_index)
+        lines = self.visible_lines(t, frame_index, width)
+        line_h = self._line_height()
+
+        if lines:
+            block_h = line_h * len(lines)
+            top = PADDING if style["anchor"] == "top" else height - PADDING - block_h
+            if style["box"] == "bar":
+                self._blend_rect(frame, 0, top - PADDING // 2, width, top + block_h + PADDING // 2)
+            for i, line in enumerate(lines):
+                (text_w, text_h), _ = cv2.getTextSize(line, FONT, style["font_scale"], style["thickness"])
+                x = PADDING if style["align"] == "left" else (width - text_w) // 2
+                y = top + i * line_h + text_h + 4
+                if style["box"] == "lines":
+                    self._blend_rect(frame, x - 6, y - text_h - 6, x + text_w + 6, y + 8)
+                cv2.putText(frame, line, (x, y), FONT, style["font_scale"], style["text_color"],
+                            style["thickness"], cv2.LINE_AA)
+
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+
+
+class SyntheticCapture:
+    """
+    Backend de captura com a mesma interface usada do mss (`grab(region)`), que entrega
+    frames do SyntheticCaptionSource no lugar da tela.
+    """
+
+    def __init__(self, source, speed=1.0, clock=time.monotonic):
+        """
+        :param source: SyntheticCaptionSource.
+        :param speed: Multiplicador do tempo da legenda (2.0 = legendas duas vezes mais rápidas).
+        :param clock: Relógio usado para o tempo desde o primeiro grab.
+        """
+        self.source = source
+        self.speed = speed
+        self.clock = clock
+        self.start = None
+        self.frame_index = 0
+        self.last_time = None  # Instante (na linha do tempo) do último frame entregue
+
+    def grab(self, region):
+        now = self.clock()
+        if self.start is None:
+            self.start = now
+        self.last_time = (now - self.start) * self.speed
+        frame = self.source.render(self.last_time, region["width"], region["height"], self.frame_index)
+        self.frame_index += 1
+        return frame
+
+    def close(self):
+        pass
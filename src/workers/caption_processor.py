@@ -0,0 +1,305 @@
+import queue
+import time
+from collections import deque
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.core.stabilizer import CaptionStabilizer
+from src.core.perf_stats import STABILIZER_UPDATE, QUEUE_DEPTH
+from src.core.frame_trace import format_latency
+
+
+class CaptionProcessor(QThread):
+    """
+    Thread dedicada ao processamento das legendas.
+
+    É a única dona do CaptionStabilizer, do FileManager e do UsageLogger:
+    o diff (difflib) e o log de uso rodam aqui, nunca na thread da GUI
+    (a gravação em disco e o fsync ficam na thread de escrita do FileManager).
+    A comunicação acontece por uma fila de comandos (entrada) e por sinais Qt
+    com atualizações de exibição coalescidas (saída).
+    """
+    captions_committed = pyqtSignal(list)  # Frases gravadas desde a última atualização
+    debug_messages = pyqtSignal(list)  # Mensagens de debug desde a última atualização
+    auto_adjusted = pyqtSignal(str, object, object, object)  # parâmetro, antigo, novo, razão
+    clear_finished = pyqtSignal(bool)  # Resultado da limpeza dos arquivos
+
+    DISPLAY_INTERVAL_S = 0.1  # No máximo uma atualização de UI a cada 100ms
+    MAX_PENDING_DEBUG = 50  # Entre duas atualizações, só as mais recentes vão para a UI (as demais são contadas)
+    STOP_TIMEOUT_S = 15.0  # Espera máxima pelo encerramento (inclui fechar log, arquivo e arquivo SQLite)
+
+    _TEXT = "text"
+    _CONFIG = "config"
+    _CLEAR = "clear"
+    _LOG = "log"
+    _METRIC = "metric"
+    _STOP = "stop"
+
+    def __init__(self, file_manager, usage_logger=None, initial_timeout_ms=1500, archive=None, perf_stats=None,
+                 annotate_latency=False, ocr_recorder=None):
+        """
+        :param file_manager: FileManager usado para gravar as frases commitadas.
+        :param usage_logger: UsageLogger para registrar eventos (opcional).
+        :param archive: CaptionArchive (SQLite) que também recebe as frases (opcional).
+        :param perf_stats: PerfStats do painel de desempenho (opcional).
+        :param annotate_latency: Mostra no log de captura a latência captura -> commit de cada frase.
+        :param ocr_recorder: OCRTraceWriter que grava o texto bruto de cada frame (opcional).
+        :param initial_timeout_ms: Timeout de silêncio inicial do Stabilizer.
+        """
+        super().__init__()
+        self.file_manager = file_manager
+        self.usage_logger = usage_logger
+        self.archive = archive
+        self.perf_stats = perf_stats
+        self.annotate_latency = annotate_latency
+        self.ocr_recorder = ocr_recorder
+        self._queue = queue.Queue()
+        # Histogramas de latência por etapa (captura -> disco), a partir da thread do escritor
+        file_manager.on_persisted = self._on_traces_persisted
+        if perf_stats is not None:
+            file_manager.perf_stats = perf_stats
+            perf_stats.set_gauge(QUEUE_DEPTH, self._queue.qsize)
+
+        self.stabilizer = CaptionStabilizer(
+            on_commit_callback=self._on_commit,
+            initial_timeout_ms=initial_timeout_ms,
+            usage_logger=usage_logger
+        )
+        self.stabilizer.set_auto_adjust_callback(self._on_auto_adjust)
+        self.stabilizer.set_debug_log_callback(self._on_debug_log)
+
+        # Atualizações de exibição pendentes (enviadas em lote para a UI)
+        self._pending_captions = []
+        self._pending_debug = deque(maxlen=self.MAX_PENDING_DEBUG)
+        self._debug_dropped = 0  # Descartadas desde a última atualização
+        self.dropped_debug_count = 0  # Total descartado na sessão
+        self._last_display_flush = 0.0
+
+    # --- API thread-safe (pode ser chamada de qualquer thread) ---
+
+    def submit_text(self, text, trace=None):
+        """
+        Enfileira texto vindo do OCR. Seguro para chamar direto da thread do OCRWorker.
+
+        :param trace: FrameTrace do frame (opcional), levado até a gravação da frase.
+        """
+        self._queue.put((self._TEXT, (text, trace, time.monotonic())))
+
+    def update_config(self, config):
+        """Enfileira novas configurações para o Stabilizer."""
+        self._queue.put((self._CONFIG, dict(config)))
+
+    def clear_files(self):
+        """Enfileira a limpeza de todos os arquivos de captions (resultado via clear_finished)."""
+        self._queue.put((self._CLEAR, None))
+
+    def log_event(self, event_type, description, details=None):
+        """Enfileira um evento para o UsageLogger."""
+        self._queue.put((self._LOG, (event_type, description, details)))
+
+    def observe_metric(self, name, value):
+        """Enfileira um valor para um histograma de métricas (ex.: latência do OCR)."""
+        self._queue.put((self._METRIC, (name, value)))
+
+    def observe_ocr_latency(self, latency_ms):
+        """Slot para OCRWorker.frame_processed (conectado com DirectConnection)."""
+        self.observe_metric("ocr_latency_ms", latency_ms)
+
+    def stop(self, timeout=STOP_TIMEOUT_S):
+        """
+        Commita o buffer pendente, fecha arquivo e log, e encerra a thread.
+
+        :param timeout: Espera máxima (s) pela thread; o encerramento não trava a saída do app.
+        :return: False se a thread não terminou a tempo (frases pendentes podem se perder).
+        """
+        if self.isRunning():
+            self._queue.put((self._STOP, None))
+            if not self.wait(int(timeout * 1000)):
+                print(f"[PROCESSOR] Thread de processamento não terminou em {timeout}s; "
+                      f"{self._queue.qsize()} comando(s) pendente(s) podem ter se perdido")
+                return False
+        else:
+            self._shutdown()
+        return True
+
+    # --- Loop da thread ---
+
+    def run(self):
+        while True:
+            try:
+                kind, payload = self._queue.get(timeout=self._next_wakeup_timeout())
+            except queue.Empty:
+                kind, payload = None, None
+
+            if kind == self._STOP:
+                break
+
+            try:
+                if kind is not None:
+                    self._handle_command(kind, payload)
+
+                deadline = self.stabilizer.get_next_deadline()
+                if deadline is not None and self.stabilizer.clock() >= deadline:
+                    self.stabilizer.force_check()
+            except Exception as e:
+                print(f"[PROCESSOR] Erro ao processar comando {kind}: {e}")
+                import traceback
+                traceback.print_exc()
+
+            self._flush_display_if_due()
+
+        self._shutdown()
+
+    def _next_wakeup_timeout(self):
+        """
+        Quanto tempo esperar por um comando antes de acordar sozinho.
+        Só acorda para o deadline de silêncio ou para entregar atualizações pendentes;
+        sem nada pendente, bloqueia até o próximo comando (zero wakeups ociosos).
+        """
+        now = self.stabilizer.clock()
+        wakeups = []
+
+        deadline = self.stabilizer.get_next_deadline()
+        if deadline is not None:
+            wakeups.append(deadline - now)
+
+        if self._pending_captions or self._pending_debug:
+            wakeups.append(self._last_display_flush + self.DISPLAY_INTERVAL_S - now)
+
+        if not wakeups:
+            return None
+        return max(0.0, min(wakeups))
+
+    def _handle_command(self, kind, payload):
+        if kind == self._TEXT:
+            text, trace, received_at = payload
+            if self.ocr_recorder:
+                self.ocr_recorder.record(text, received_at)
+            if self.usage_logger:
+                self.usage_logger.log_event("TEXT_DETECTED", "Texto detectado pelo OCR",
+                                            {"text_length": len(text) if text else 0})
+            if self.perf_stats is not None and self.perf_stats.enabled:
+                start = time.perf_counter()
+                self.stabilizer.process_new_text(text, trace)
+                self.perf_stats.observe(STABILIZER_UPDATE, (time.perf_counter() - start) * 1000)
+            else:
+                self.stabilizer.process_new_text(text, trace)
+        elif kind == self._CONFIG:
+            self._apply_config(payload)
+        elif kind == self._CLEAR:
+            success = self.file_manager.clear_all_files()
+            if self.archive:
+                # As frases apagadas não podem continuar aparecendo na busca do arquivo SQLite
+                success = self.archive.clear() and success
+            if success and self.usage_logger:
+                self.usage_logger.log_event("CAPTIONS_CLEARED", "Todos os arquivos de captions foram removidos")
+            self.clear_finished.emit(success)
+        elif kind == self._LOG:
+            if self.usage_logger:
+                event_type, description, details = payload
+                self.usage_logger.log_event(event_type, description, details)
+        elif kind == self._METRIC:
+            if self.usage_logger:
+                name, value = payload
+                self.usage_logger.observe(name, value)
+
+    def _apply_config(self, config):
+        """Aplica ao Stabilizer (e ao próprio processador) as chaves presentes em `config`."""
+        self.stabilizer.apply_config(config)
+        if 'caption_latency_annotation' in config:
+            self.annotate_latency = bool(config['caption_latency_annotation'])
+
+    def _flush_display_if_due(self, force=False):
+        """Envia para a UI, em um único sinal, tudo que acumulou desde a última atualização."""
+        now = self.stabilizer.clock()
+        if not force and now - self._last_display_flush < self.DISPLAY_INTERVAL_S:
+            return
+
+        if self._pending_captions:
+            captions, self._pending_captions = self._pending_captions, []
+            self.captions_committed.emit(captions)
+        if self._pending_debug:
+            messages = list(self._pending_debug)
+            self._pending_debug.clear()
+            if self._debug_dropped:
+                messages.insert(0, f"[DEBUG] {self._debug_dropped} mensagem(ns) anterior(es) omitida(s)")
+                if self.usage_logger:
+                    self.usage_logger.increment("debug_messages_dropped", self._debug_dropped)
+                self._debug_dropped = 0
+            self.debug_messages.emit(messages)
+        self._last_display_flush = now
+
+    def _shutdown(self):
+        """Commita o que estiver pendente e fecha os recursos (na thread do processador)."""
+        try:
+            self.stabilizer.flush()
+            self._flush_display_if_due(force=True)
+        except Exception as e:
+            print(f"[PROCESSOR] Erro ao finalizar: {e}")
+        # O FileManager fecha antes do log de uso: o último lote gravado ainda
+        # enfileira suas latências por etapa (on_persisted), drenadas a seguir
+        if self.file_manager:
+            self.file_manager.close()
+        if self.usage_logger:
+            self._drain_metrics()
+            self.usage_logger.close()
+        if self.archive:
+            self.archive.close()
+        if self.ocr_recorder:
+            path = self.ocr_recorder.close()
+            if path:
+                print(f"[PROCESSOR] Fluxo do OCR gravado em {path} ({self.ocr_recorder.count} frame(s))")
+
+    def _drain_metrics(self):
+        """Aplica ao log de uso as métricas e eventos que ficaram na fila após o STOP."""
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if kind in (self._METRIC, self._LOG):
+                try:
+                    self._handle_command(kind, payload)
+                except Exception as e:
+                    print(f"[PROCESSOR] Erro ao processar comando {kind}: {e}")
+
+    # --- Callbacks do Stabilizer (rodam na thread do processador) ---
+
+    def _on_commit(self, final_text):
+        """Chamado quando uma frase é finalizada e estabilizada."""
+        if not final_text or not final_text.strip():
+            return
+
+        trace = self.stabilizer.last_commit_trace
+        latency_ms = trace.capture_to_commit_ms() if trace is not None else None
+
+        self._add_debug(f"[COMMIT] Frase commitada: {final_text[:50]}...")
+        self.file_manager.append_text(final_text, trace)
+        if self.archive:
+            self.archive.append(final_text)
+        if self.annotate_latency and latency_ms is not None:
+            self._pending_captions.append(f"({format_latency(latency_ms)}) {final_text}")
+        else:
+            self._pending_captions.append(final_text)
+        if self.usage_logger:
+            details = {"text_length": len(final_text)}
+            if latency_ms is not None:
+                details["capture_to_commit_ms"] = round(latency_ms, 1)
+            self.usage_logger.log_event("TEXT_SAVED", "Texto salvo no arquivo", details)
+
+    def _on_traces_persisted(self, traces):
+        """Chamado na thread do escritor: envia as latências por etapa para os histogramas."""
+        for trace in traces:
+            for name, value in trace.stage_latencies().items():
+                self.observe_metric(name, value)
+
+    def _on_debug_log(self, message):
+        self._add_debug(message)
+
+    def _add_debug(self, message):
+        """Acumula uma mensagem para a próxima atualização; com a fila cheia, a mais antiga sai e é contada."""
+        if len(self._pending_debug) == self._pending_debug.maxlen:
+            self._debug_dropped += 1
+            self.dropped_debug_count += 1
+        self._pending_debug.append(message)
+
+    def _on_auto_adjust(self, parameter, old_value, new_value, reason=None):
+        self.auto_adjusted.emit(parameter, old_value, new_value, reason)
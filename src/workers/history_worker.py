@@ -0,0 +1,116 @@
+import queue
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from src.core.caption_line_store import CaptionLineStore, iter_matches
+
+
+class HistoryIndexWorker(QThread):
+    """
+    Monta o índice de linhas do histórico de legendas fora da thread da GUI.
+    Emite `index_ready` com o CaptionLineStore pronto para o modelo da tabela.
+    """
+    index_ready = pyqtSignal(object)  # CaptionLineStore
+
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = list(paths)
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        store = CaptionLineStore(self.paths)
+        store.build(should_stop=lambda: self._cancelled)
+        if not self._cancelled:
+            self.index_ready.emit(store)
+
+
+class HistoryBlockLoader(QThread):
+    """
+    Lê do disco os blocos de linhas pedidos pela tabela do histórico, fora da thread da
+    GUI (num histórico .gz cada leitura descomprime o arquivo desde o início).
+    Emite `block_loaded` com o intervalo de linhas que ficou disponível em store.peek().
+    """
+    block_loaded = pyqtSignal(int, int)  # primeira linha, última linha
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self._requests = queue.Queue()
+        self._pending = set()  # Blocos já na fila (a tabela pede a mesma linha várias vezes)
+        self._pending_lock = threading.Lock()
+        self._cancelled = False
+
+    def request(self, index):
+        """Pede o bloco da linha `index` (não bloqueia; pedidos repetidos são ignorados)."""
+        block_index = self.store.block_of(index)
+        with self._pending_lock:
+            if block_index in self._pending:
+                return
+            self._pending.add(block_index)
+        self._requests.put(block_index)
+
+    def cancel(self):
+        self._cancelled = True
+        self._requests.put(None)
+
+    def run(self):
+        while not self._cancelled:
+            block_index = self._requests.get()
+            if block_index is None:
+                break
+            try:
+                first, count = self.store.block_bounds(block_index)
+                self.store.row(first)  # Carrega o bloco no cache do store
+            except Exception as e:
+                print(f"[HISTORY_LOADER] Erro ao carregar bloco {block_index}: {e}")
+                first, count = None, 0
+            with self._pending_lock:
+                self._pending.discard(block_index)
+            if first is not None and not self._cancelled:
+                self.block_loaded.emit(first, first + count - 1)
+
+
+class HistorySearchWorker(QThread):
+    """
+    Busca incremental no histórico: os resultados são enviados em lotes enquanto
+    são encontrados (no máximo um sinal a cada BATCH_INTERVAL_S), e a busca pode ser
+    cancelada a qualquer momento (ex.: o usuário digitou outra letra).
+    """
+    matches_found = pyqtSignal(list)  # [(índice, segundos, texto), ...]
+    search_finished = pyqtSignal(int, bool)  # total encontrado, cancelada
+
+    BATCH_INTERVAL_S = 0.1
+    MAX_MATCHES = 10000  # Resultados além disso não são enviados (refine a busca)
+
+    def __init__(self, store, query):
+        super().__init__()
+        self.store = store
+        self.query = query
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        batch = []
+        total = 0
+        last_emit = time.monotonic()
+        try:
+            for match in iter_matches(self.store, self.query):
+                if self._cancelled or total >= self.MAX_MATCHES:
+                    break
+                batch.append(match)
+                total += 1
+                now = time.monotonic()
+                if now - last_emit >= self.BATCH_INTERVAL_S:
+                    self.matches_found.emit(batch)
+                    batch = []
+                    last_emit = now
+        except Exception as e:
+            print(f"[HISTORY_SEARCH] Erro na busca: {e}")
+        if batch and not self._cancelled:
+            self.matches_found.emit(batch)
+        self.search_finished.emit(total, self._cancelled)
@@ -1,3 +1,4 @@
+import math
 import time
 import sys
 import numpy as np
@@ -5,9 +6,15 @@ import mss
 import threading
 from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QMutexLocker
 from src.utils.image_processing import process_image_for_ocr
+from src.utils.ocr_lines import group_results_into_lines
+from src.core.perf_stats import FRAMES_SKIPPED
+from src.core.frame_trace import FrameTrace, PREPROCESSED, OCR_DONE
 
 class OCRWorker(QThread):
-    text_detected = pyqtSignal(str)
+    FRAME_INTERVAL_S = 0.2  # Intervalo mínimo entre capturas
+
+    text_detected = pyqtSignal(str, object)  # Texto, FrameTrace do frame
+    frame_processed = pyqtSignal(float)  # Tempo de captura + OCR do frame (ms)
     error_occurred = pyqtSignal(str, str) # Título, Mensagem
 
     # Sinais de Dependência
@@ -22,9 +29,13 @@ class OCRWorker(QThread):
         # Configuração padrão
         self.region = None # {'top': y, 'left': x, 'width': w, 'height': h}
         self.invert_colors = False
+        self.line_mode = False  # Emite uma linha por linha visual ("\n") em vez de um bloco só
 
         # MSS instance - Criado na thread do worker para thread-safety
         self.sct = None
+        # Fábrica de um backend de captura no lugar do mss (ex.: SyntheticCapture, para
+        # testes de carga sem tela). Chamada dentro da thread, como o mss.
+        self.capture_backend_factory = None
 
         # EasyOCR Reader
         self.reader = None
@@ -32,6 +43,12 @@ class OCRWorker(QThread):
         self.force_cpu = False
         self.languages = ['pt', 'en']
 
+        # PerfStats do painel de desempenho (opcional; gravar é barato com o painel fechado)
+        self.perf_stats = None
+        # FrameRecorder (opcional): guarda os frames num anel em disco para re-OCR offline.
+        # O laço só enfileira as referências; a gravação é na thread do gravador.
+        self.frame_recorder = None
+
     @staticmethod
     def _detect_gpu():
         """Auto-detecta se há GPU CUDA disponível."""
@@ -67,10 +84,11 @@ class OCRWorker(QThread):
     def update_config(self, config):
         """
         Atualiza configurações dinâmicas.
-        config: dict com chaves como 'invert_colors'
+        config: dict com chaves como 'invert_colors' e 'line_mode'
         """
         with QMutexLocker(self._mutex):
             self.invert_colors = config.get('invert_colors', False)
+            self.line_mode = config.get('line_mode', False)
 
     def stop(self):
         self._is_running = False
@@ -116,7 +134,7 @@ class OCRWorker(QThread):
 
         # Criar instância MSS DENTRO da thread QThread (thread-safety)
         # MSS não é thread-safe, então deve ser criado na mesma thread que será usado
-        self.sct = mss.mss()
+        self.sct = self.capture_backend_factory() if self.capture_backend_factory else mss.mss()
 
         if not self.reader:
             self.error_occurred.emit("Erro Interno", "Reader OCR não inicializado.")
@@ -129,6 +147,7 @@ class OCRWorker(QThread):
             with QMutexLocker(self._mutex):
                 region = self.region
                 invert = self.invert_colors
+                line_mode = self.line_mode
 
             if not region:
                 time.sleep(0.1)
@@ -136,23 +155,37 @@ class OCRWorker(QThread):
 
             try:
                 # 1. Screen Capture (mss)
+                trace = FrameTrace()
                 sct_img = self.sct.grab(region)
                 img = np.array(sct_img)
 
                 # 2. Image Processing
                 # Converte para grayscale se necessário e aplica filtros
                 processed_img = process_image_for_ocr(img, invert=invert)
+                trace.mark(PREPROCESSED)
+                if self.frame_recorder is not None:
+                    self.frame_recorder.submit((img, processed_img, invert), trace.captured)
 
                 # 3. OCR com EasyOCR
-                # detail=0 retorna apenas lista de textos
-                # paragraph=True tenta combinar linhas
-                results = self.reader.readtext(processed_img, detail=0, paragraph=True)
-
-                # Junta resultados em uma string única
-                text = " ".join(results).strip()
-
+                if line_mode:
+                    # detail=1 retorna as caixas, usadas para separar as linhas visuais
+                    results = self.reader.readtext(processed_img, detail=1, paragraph=False)
+                    text = "\n".join(group_results_into_lines(results)).strip()
+                else:
+                    # detail=0 retorna apenas lista de textos
+                    # paragraph=True tenta combinar linhas
+                    results = self.reader.readtext(processed_img, detail=0, paragraph=True)
+
+                    # Junta resultados em uma string única
+                    text = " ".join(results).strip()
+
+                trace.mark(OCR_DONE)
+                latency_ms = (time.time() - start_time) * 1000
+                self.frame_processed.emit(latency_ms)
+                if self.perf_stats is not None:
+                    self.perf_stats.record_frame(latency_ms)
                 if text:
-                    self.text_detected.emit(text)
+                    self.text_detected.emit(text, trace)
 
             except Exception as e:
                 print(f"Erro no loop OCR: {e}")
@@ -160,5 +193,10 @@ class OCRWorker(QThread):
             # Controle de taxa de quadros
             # EasyOCR é mais pesado que Tesseract, então talvez demore mais que 200ms
             elapsed = time.time() - start_time
-            if elapsed < 0.2:
-                time.sleep(0.2 - elapsed)
+            if elapsed < self.FRAME_INTERVAL_S:
+                time.sleep(self.FRAME_INTERVAL_S - elapsed)
+            elif self.perf_stats is not None:
+                # Capturas que deveriam ter acontecido enquanto este frame era processado
+                skipped = math.ceil(elapsed / self.FRAME_INTERVAL_S) - 1
+                if skipped > 0:
+                    self.perf_stats.increment(FRAMES_SKIPPED, skipped)
@@ -0,0 +1,49 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+class PerfMonitor(QThread):
+    """
+    Calcula periodicamente o snapshot do PerfStats (percentis, RSS, CPU) fora da thread
+    da GUI e o envia por sinal, no máximo uma vez por INTERVAL_S.
+    Inativo (painel fechado), fica bloqueado esperando e a coleta fica desligada.
+    """
+    stats_updated = pyqtSignal(dict)
+
+    INTERVAL_S = 1.0
+
+    def __init__(self, perf_stats):
+        super().__init__()
+        self.perf_stats = perf_stats
+        self._active = threading.Event()
+        self._stopping = threading.Event()
+        self._wakeup = threading.Event()
+
+    def set_active(self, active):
+        """Liga/desliga a coleta e a publicação (chamado quando o painel abre/fecha)."""
+        self.perf_stats.set_enabled(active)
+        if active:
+            self.perf_stats.process_stats.cpu_percent()  # Começa a janela de CPU agora
+            self._active.set()
+        else:
+            self._active.clear()
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        self.wait()
+
+    def run(self):
+        while not self._stopping.is_set():
+            if not self._active.is_set():
+                self._wakeup.wait()  # Painel fechado: nenhum trabalho periódico
+                self._wakeup.clear()
+                continue
+            self._wakeup.wait(self.INTERVAL_S)
+            self._wakeup.clear()
+            if self._active.is_set() and not self._stopping.is_set():
+                try:
+                    self.stats_updated.emit(self.perf_stats.snapshot())
+                except Exception as e:
+                    print(f"[PERF_MONITOR] Erro ao calcular estatísticas: {e}")
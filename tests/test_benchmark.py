@@ -0,0 +1,98 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.benchmark import (BenchmarkCase, SkipBenchmark, compare_results, format_us, load_results,
+                                run_case, run_cases, save_results)
+from src.tools import benchmark as benchmark_tool
+
+
+def _document(**per_op_us):
+    return {"version": 1, "results": {name: {"per_op_us": value} for name, value in per_op_us.items()}}
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_run_case_reports_per_op_cost(self):
+        calls = []
+        ticks = iter([0.0, 0.2, 1.0, 1.1, 2.0, 2.3])
+        case = BenchmarkCase("x", lambda state: calls.append(state), ops=10,
+                             setup=lambda: "estado", repeat=3, warmup=2)
+        result = run_case(case, clock=lambda: next(ticks))
+        self.assertEqual(calls, ["estado"] * 5)
+        self.assertAlmostEqual(result["median_s"], 0.2)
+        self.assertAlmostEqual(result["min_s"], 0.1)
+        self.assertAlmostEqual(result["per_op_us"], 20000.0)
+
+    def test_skipped_case_and_teardown(self):
+        def setup():
+            raise SkipBenchmark("sem GPU")
+        torn_down = []
+        document = run_cases([
+            BenchmarkCase("pulado", lambda s: None, 1, setup=setup),
+            BenchmarkCase("roda", lambda s: None, 1, teardown=torn_down.append, repeat=1)
+        ])
+        self.assertEqual(document["results"]["pulado"], {"skipped": "sem GPU"})
+        self.assertIn("per_op_us", document["results"]["roda"])
+        self.assertEqual(torn_down, [None])
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        baseline = _document(a=10.0, b=10.0, c=10.0, d=10.0)
+        current = _document(a=11.0, b=13.0, c=5.0, e=1.0)
+        current["results"]["d"] = {"skipped": "x"}
+        rows = {row["name"]: row["status"] for row in compare_results(baseline, current, threshold=0.2)}
+        self.assertEqual(rows, {"a": "ok", "b": "regression", "c": "improvement"})
+
+    def test_save_and_load_roundtrip(self):
+        path = os.path.join(self.tmpdir, "r.json")
+        save_results(_document(a=1.0), path)
+        self.assertEqual(load_results(path)["results"]["a"]["per_op_us"], 1.0)
+        with open(path, "w") as f:
+            json.dump({"version": 99}, f)
+        with self.assertRaises(ValueError):
+            load_results(path)
+
+    def test_format_us(self):
+        self.assertEqual(format_us(0.5), "500 ns")
+        self.assertEqual(format_us(12.34), "12.3 µs")
+        self.assertEqual(format_us(4560), "4.56 ms")
+
+    def test_cli_run_and_compare(self):
+        output = os.path.join(self.tmpdir, "atual.json")
+        trace = os.path.join(self.tmpdir, "sessao.jsonl")
+        with open(trace, "w", encoding="utf-8") as f:
+            for i, text in enumerate(["Ola", "Ola mundo", "Ola mundo", ""]):
+                f.write(json.dumps({"t": i * 0.2, "text": text}) + "\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = benchmark_tool.main(["run", "--quick", "--only", "stabilizer,usage_logger",
+                                        "--trace", trace, "--output", output])
+        self.assertEqual(code, 0)
+        results = load_results(output)["results"]
+        self.assertIn("stabilizer/synthetic-expanding", results)
+        self.assertIn("stabilizer/trace-sessao.jsonl", results)
+        self.assertIn("usage_logger/_log", results)
+
+        # Base artificialmente 10x mais rápida: todo caso vira regressão
+        baseline = load_results(output)
+        for result in baseline["results"].values():
+            result["per_op_us"] /= 10
+        baseline_path = os.path.join(self.tmpdir, "base.json")
+        save_results(baseline, baseline_path)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(benchmark_tool.main(["compare", baseline_path, output]), 1)
+        self.assertIn("REGRESSÃO", out.getvalue())
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(benchmark_tool.main(["compare", output, output]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.caption_archive import CaptionArchive, fts_query
+
+
+class TestCaptionArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "archive.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_append_and_search(self):
+        archive = CaptionArchive(db_path=self.db_path)
+        archive.append("Hoje vamos falar sobre o orçamento")
+        archive.append("A reunião de planejamento começa às dez")
+        archive.append("Planejamento do orçamento aprovado")
+        self.assertTrue(archive.flush())
+
+        results = archive.search("planejamento orçamento")
+        self.assertEqual([r[2] for r in results], ["Planejamento do orçamento aprovado"])
+        self.assertEqual(results[0][1], archive.session_id)
+        self.assertEqual(len(archive.search("planejamento")), 2)
+        self.assertEqual(archive.search(""), [])
+        self.assertEqual(archive.search("   "), [])
+        archive.close()
+
+    def test_sessions_are_distinct(self):
+        first = CaptionArchive(db_path=self.db_path)
+        first.append("primeira sessão")
+        first.close()
+        second = CaptionArchive(db_path=self.db_path)
+        second.append("segunda sessão")
+        second.flush()
+        self.assertNotEqual(first.session_id, second.session_id)
+        second.close()
+
+    def test_read_only_use_creates_no_session(self):
+        archive = CaptionArchive(db_path=self.db_path)
+        archive.search("nada")
+        archive.close()
+        archive = CaptionArchive(db_path=self.db_path)
+        self.assertIsNone(archive.session_id)
+        self.assertEqual(archive._read_conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0], 0)
+        archive.close()
+
+    def test_clear_removes_captions_from_search(self):
+        archive = CaptionArchive(db_path=self.db_path)
+        archive.append("segredo da reunião")
+        self.assertTrue(archive.flush())
+        self.assertTrue(archive.clear())
+        self.assertEqual(archive.count(), 0)
+        self.assertEqual(archive.search("segredo"), [])
+        archive.append("depois da limpeza")
+        archive.flush()
+        self.assertEqual([r[2] for r in archive.search("limpeza")], ["depois da limpeza"])
+        archive.close()
+
+    def test_import_text_files(self):
+        path = os.path.join(self.tmpdir, "captions_hist1.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[09:15:00] primeira frase importada\n[09:15:04] segunda frase\nlinha sem timestamp\n")
+        archive = CaptionArchive(db_path=self.db_path)
+        self.assertEqual(archive.import_text_files([path], date=datetime.date(2026, 10, 18)), 2)
+        rows = archive.captions_between("2026-10-18 00:00:00", "2026-10-19 00:00:00")
+        self.assertEqual([(ts, text) for ts, _, text in rows], [
+            ("2026-10-18 09:15:00.000", "primeira frase importada"),
+            ("2026-10-18 09:15:04.000", "segunda frase"),
+        ])
+        archive.close()
+
+    def test_import_is_idempotent_and_handles_midnight(self):
+        path = os.path.join(self.tmpdir, "captions_hist1.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[23:59:58] antes da meia-noite\n[00:00:03] depois da meia-noite\n")
+        archive = CaptionArchive(db_path=self.db_path)
+        self.assertEqual(archive.import_text_files([path], date=datetime.date(2026, 10, 18)), 2)
+        self.assertEqual(archive.import_text_files([path], date=datetime.date(2026, 10, 18)), 0)
+        rows = archive.captions_between("2026-10-18 00:00:00", "2026-10-20 00:00:00")
+        self.assertEqual([ts for ts, _, _ in rows], ["2026-10-18 23:59:58.000", "2026-10-19 00:00:03.000"])
+        archive.close()
+
+    def test_import_skips_captions_archived_live(self):
+        archive = CaptionArchive(db_path=self.db_path)
+        archive.append("frase ao vivo", datetime.datetime(2026, 10, 18, 9, 15, 0, 450000))
+        archive.flush()
+        path = os.path.join(self.tmpdir, "captions_current.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[09:15:00] frase ao vivo\n[09:15:02] só no arquivo\n")
+        self.assertEqual(archive.import_text_files([path], date=datetime.date(2026, 10, 18)), 1)
+        self.assertEqual(archive.count(), 2)
+        archive.close()
+
+    def test_retention_by_rows(self):
+        archive = CaptionArchive(db_path=self.db_path)
+        for i in range(10):
+            archive.append(f"frase {i}")
+        archive.close()
+        archive = CaptionArchive(db_path=self.db_path, max_rows=3)
+        self.assertEqual(archive.count(), 3)
+        self.assertEqual(archive.search("frase 9")[0][2], "frase 9")
+        self.assertEqual(archive.search("frase 0"), [])
+        archive.close()
+
+    def test_fts_query_quotes_words(self):
+        self.assertEqual(fts_query('ele disse "oi"'), '"ele" "disse" """oi"""')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import time_index
+from src.core.caption_delta import (DeltaDecoder, DeltaEncoder, KEYFRAME, delta_to_txt,
+                                    iter_text_lines, txt_to_delta)
+from src.core.caption_reader import iter_captions, list_caption_files
+from src.core.file_manager import FileManager
+
+
+class TestDeltaCodec(unittest.TestCase):
+    def test_round_trip_with_shared_prefixes(self):
+        texts = ["Bom dia a todos", "Bom dia a todos presentes", "Bom dia a todos presentes hoje",
+                 "Outra frase", "Outra frase\tcom tab"]
+        encoder = DeltaEncoder(keyframe_every=32)
+        records = [encoder.encode("10:00:00", t)[0] for t in texts]
+        self.assertEqual(records[1], "10:00:00\t15\t presentes")
+        self.assertEqual(records[3].split("\t")[1], KEYFRAME)  # Prefixo curto demais
+        decoder = DeltaDecoder()
+        self.assertEqual([decoder.decode(r)[1] for r in records], texts)
+
+    def test_periodic_keyframes(self):
+        encoder = DeltaEncoder(keyframe_every=3)
+        flags = [encoder.encode("10:00:00", "mesmo prefixo " + str(i))[1] for i in range(7)]
+        self.assertEqual(flags, [True, False, False, True, False, False, True])
+
+    def test_delta_without_keyframe_raises(self):
+        with self.assertRaises(ValueError):
+            DeltaDecoder().decode("10:00:00\t5\tsufixo")
+
+    def test_decoded_lines_use_txt_format(self):
+        lines = list(iter_text_lines(["#caption-delta v1", "09:05:01\tK\tolá mundo", "09:05:02\t9\t de novo"]))
+        self.assertEqual(lines, ["[09:05:01] olá mundo\n", "[09:05:02] olá mundo de novo\n"])
+
+
+class TestDeltaFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_txt_conversion_round_trip_is_smaller(self):
+        src = os.path.join(self.tmpdir, "a.txt")
+        with open(src, "w", encoding="utf-8") as f:
+            for i in range(50):
+                f.write(f"[10:00:{i % 60:02d}] O palestrante explica o orçamento do próximo trimestre {i}\n")
+        delta = os.path.join(self.tmpdir, "a.cdelta")
+        back = os.path.join(self.tmpdir, "b.txt")
+        self.assertEqual(txt_to_delta(src, delta, keyframe_every=16), 50)
+        self.assertEqual(delta_to_txt(delta, back), 50)
+        with open(src, encoding="utf-8") as a, open(back, encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertLess(os.path.getsize(delta), os.path.getsize(src) / 2)
+
+    def test_file_manager_delta_format_is_readable_and_indexed(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os", index_every=4,
+                              caption_format="delta", keyframe_every=4)
+        manager.MAX_FILE_SIZE = 200
+        texts = [f"frase que cresce {'x' * i}" for i in range(12)]
+        for text in texts:
+            manager.append_text(text)
+        manager.flush()
+
+        now = datetime.datetime.now()
+        window = list(manager.read_range(now - datetime.timedelta(minutes=5), now + datetime.timedelta(minutes=5)))
+        manager.close()
+
+        paths = list_caption_files(self.tmpdir, manager.current_name)
+        self.assertGreater(len(paths), 1)  # Houve rotação
+        self.assertTrue(all(p.endswith((".cdelta", ".cdelta.gz")) for p in paths))
+        self.assertEqual([text for _, text in iter_captions(paths)], texts)
+        self.assertEqual([text for _, text in window], texts)
+        for path in paths:
+            self.assertTrue(time_index.load_index(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.caption_export import export_captions, iter_cues
+from src.core import time_index
+from src.core.caption_reader import guess_start_date, iter_captions, list_caption_files
+
+
+class TestCaptionReader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write(self, name, lines, mtime):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_history_then_current_with_midnight_rollover(self):
+        base = datetime.datetime(2026, 10, 18, 23, 59, 59).timestamp()
+        self._write("captions_hist1.txt", ["[23:58:00] primeira", "[23:59:50] segunda"], base)
+        self._write("captions_current.txt", ["[00:00:05] terceira", "sem timestamp"], base + 3600)
+
+        paths = list_caption_files(self.tmpdir)
+        self.assertEqual([os.path.basename(p) for p in paths], ["captions_hist1.txt", "captions_current.txt"])
+        captions = list(iter_captions(paths))
+        self.assertEqual(captions, [
+            (datetime.datetime(2026, 10, 18, 23, 58, 0), "primeira"),
+            (datetime.datetime(2026, 10, 18, 23, 59, 50), "segunda"),
+            (datetime.datetime(2026, 10, 19, 0, 0, 5), "terceira"),
+        ])
+
+    def test_date_per_file_from_history_names(self):
+        # Cópias recentes (modificação de hoje): a data sai do nome e há dias sem legenda entre eles
+        copied = datetime.datetime(2026, 10, 19, 9, 0, 0).timestamp()
+        self._write("captions_hist_000001_20261010.txt", ["[09:00:00] sexta"], copied)
+        self._write("captions_hist_000002_20261013.txt", ["[23:30:00] segunda à noite", "[00:10:00] terça"],
+                    copied + 1)
+        captions = list(iter_captions(list_caption_files(self.tmpdir)))
+        self.assertEqual([dt for dt, _ in captions], [
+            datetime.datetime(2026, 10, 10, 9, 0, 0),
+            datetime.datetime(2026, 10, 12, 23, 30, 0),
+            datetime.datetime(2026, 10, 13, 0, 10, 0),
+        ])
+        # Data forçada: uma só data corrente, avançando só nas viradas do relógio
+        forced = list(iter_captions(list_caption_files(self.tmpdir), start_date=datetime.date(2026, 10, 1)))
+        self.assertEqual([dt.date() for dt, _ in forced],
+                         [datetime.date(2026, 10, 1), datetime.date(2026, 10, 1), datetime.date(2026, 10, 2)])
+
+    def test_start_date_from_time_index(self):
+        path = self._write("captions_current.txt", ["[22:00:00] com índice"],
+                           datetime.datetime(2026, 10, 19, 9, 0, 0).timestamp())
+        writer = time_index.TimeIndexWriter(path)
+        writer.note_line(datetime.datetime(2026, 10, 5, 22, 0, 0).timestamp(), 0)
+        writer.close()
+        self.assertEqual(guess_start_date(path), datetime.date(2026, 10, 5))
+        self.assertEqual(guess_start_date(path, use_index=False), datetime.date(2026, 10, 18))
+
+
+class TestCaptionExport(unittest.TestCase):
+    def test_end_time_is_next_start_capped(self):
+        t = datetime.datetime(2026, 10, 19, 10, 0, 0)
+        captions = [(t, "a"), (t + datetime.timedelta(seconds=2), "b"), (t + datetime.timedelta(seconds=30), "c")]
+        cues = list(iter_cues(captions, max_cue_s=5))
+        self.assertEqual([(end - start).total_seconds() for start, end, _ in cues], [2, 5, 5])
+
+    def test_single_pass_multiple_formats(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            t = datetime.datetime(2026, 10, 19, 10, 0, 0)
+            outputs = {fmt: os.path.join(tmpdir, f"out.{fmt}") for fmt in ("srt", "vtt", "jsonl")}
+            count = export_captions(iter([(t, "olá"), (t + datetime.timedelta(seconds=3), "mundo")]), outputs)
+            self.assertEqual(count, 2)
+            with open(outputs["srt"], encoding="utf-8") as f:
+                self.assertTrue(f.read().startswith("1\n10:00:00,000 --> 10:00:03,000\nolá\n"))
+            with open(outputs["vtt"], encoding="utf-8") as f:
+                self.assertIn("10:00:03.000 --> 10:00:09.000\nmundo", f.read())
+            with open(outputs["jsonl"], encoding="utf-8") as f:
+                self.assertEqual(json.loads(f.readline())["end"], "2026-10-19T10:00:03.000")
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
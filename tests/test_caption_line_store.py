@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.caption_delta import txt_to_delta
+from src.core.caption_line_store import CaptionLineStore, format_row, iter_matches
+from src.utils.compression import compress_file
+
+
+class TestCaptionLineStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths = []
+        self.expected = []
+        for file_number in range(3):
+            path = os.path.join(self.tmpdir, f"captions_hist_{file_number}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("linha sem timestamp\n")
+                for i in range(150):
+                    text = f"arquivo {file_number} frase {i}"
+                    f.write(f"[10:{i // 60:02d}:{i % 60:02d}] {text}\n")
+                    self.expected.append(text)
+            self.paths.append(path)
+        # Um histórico comprimido e um em formato delta
+        self.paths[0] = compress_file(self.paths[0])
+        delta = self.paths[1][:-4] + ".cdelta"
+        txt_to_delta(self.paths[1], delta, keyframe_every=10)
+        self.paths[1] = delta
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _store(self):
+        store = CaptionLineStore(self.paths, block_lines=16, cache_blocks=2)
+        store.build()
+        return store
+
+    def test_random_access_across_files(self):
+        store = self._store()
+        self.assertEqual(len(store), 450)
+        for index in (449, 0, 151, 299, 300, 77, 160):
+            self.assertEqual(store.row(index)[1], self.expected[index])
+        self.assertIsNone(store.row(450))
+        self.assertEqual(format_row(store.row(1)), "[10:00:01] arquivo 0 frase 1")
+
+    def test_cache_is_bounded(self):
+        store = self._store()
+        for index in range(0, 450, 7):
+            store.row(index)
+        self.assertLessEqual(len(store._cache), 2)
+
+    def test_iter_rows_from_middle(self):
+        store = self._store()
+        rows = list(store.iter_rows(295))
+        self.assertEqual([r[0] for r in rows], list(range(295, 450)))
+        self.assertEqual([r[2] for r in rows], self.expected[295:])
+
+    def test_incremental_search(self):
+        store = self._store()
+        matches = list(iter_matches(store, "FRASE 14 arquivo"))
+        self.assertEqual([m[2] for m in matches if m[2].endswith(" 14")],
+                         ["arquivo 0 frase 14", "arquivo 1 frase 14", "arquivo 2 frase 14"])
+        self.assertTrue(all(store.row(m[0])[1] == m[2] for m in matches))
+
+    def test_refresh_picks_up_appended_lines(self):
+        store = self._store()
+        with open(self.paths[2], "a", encoding="utf-8") as f:
+            f.write("[11:00:00] nova frase\n")
+        store.refresh_last_file()
+        self.assertEqual(len(store), 451)
+        self.assertEqual(store.row(450)[1], "nova frase")
+
+    def test_peek_never_reads_disk(self):
+        store = self._store()
+        self.assertFalse(store.is_cached(20))
+        self.assertIsNone(store.peek(20))
+        first, count = store.block_bounds(store.block_of(20))
+        self.assertTrue(first <= 20 < first + count)
+        store.row(first)  # Carregado por outra thread na GUI (HistoryBlockLoader)
+        self.assertTrue(store.is_cached(20))
+        self.assertEqual(store.peek(20)[1], self.expected[20])
+        self.assertFalse(store.is_cached(450))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import glob
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from src.core.caption_reader import iter_captions, list_caption_files
+from src.core.file_manager import FileManager
+from src.core.group_commit_writer import GroupCommitWriter, DURABILITY_ALWAYS, DURABILITY_INTERVAL
+
+
+class TestGroupCommitWriter(unittest.TestCase):
+    def test_batches_and_syncs_on_flush(self):
+        batches = []
+        syncs = []
+        writer = GroupCommitWriter(batches.append, lambda: syncs.append(1),
+                                   durability=DURABILITY_INTERVAL, fsync_interval_ms=60000,
+                                   fsync_every_lines=1000)
+        for i in range(100):
+            writer.submit(i)
+        self.assertTrue(writer.flush())
+        self.assertEqual([item for batch in batches for item in batch], list(range(100)))
+        self.assertEqual(len(syncs), 1)
+        self.assertTrue(writer.close())
+
+    def test_always_policy_syncs_every_item(self):
+        events = []
+        release = threading.Event()
+        writer = GroupCommitWriter(lambda batch: (release.wait(5), events.append(("write", len(batch)))),
+                                   lambda: events.append(("sync",)), durability=DURABILITY_ALWAYS,
+                                   max_batch=500)
+        for item in "abc":
+            writer.submit(item)  # Acumulam na fila enquanto a primeira gravação espera
+        release.set()
+        writer.flush()
+        self.assertEqual(writer.written_count, 3)
+        writes = [i for i, e in enumerate(events) if e[0] == "write"]
+        self.assertEqual([events[i][1] for i in writes], [1, 1, 1])
+        self.assertTrue(all(events[i + 1] == ("sync",) for i in writes))
+        writer.close()
+
+    def test_full_queue_drops_and_counts(self):
+        release = threading.Event()
+        writer = GroupCommitWriter(lambda batch: release.wait(5), lambda: None, max_queue=2, max_batch=1)
+        results = [writer.submit(i) for i in range(10)]
+        self.assertIn(False, results)
+        self.assertEqual(writer.dropped_count, results.count(False))
+        release.set()
+        self.assertTrue(writer.close())
+
+    def test_drops_counted_exactly_across_threads(self):
+        release = threading.Event()
+        writer = GroupCommitWriter(lambda batch: release.wait(5), lambda: None, max_queue=1, max_batch=1)
+        accepted = []
+
+        def produce():
+            accepted.append(sum(1 for i in range(2000) if writer.submit(i)))
+
+        threads = [threading.Thread(target=produce) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(writer.dropped_count + sum(accepted), 8 * 2000)
+        release.set()
+        self.assertTrue(writer.close())
+
+    def test_on_exit_runs_after_last_write_even_if_close_times_out(self):
+        release = threading.Event()
+        events = []
+        writer = GroupCommitWriter(lambda batch: (release.wait(5), events.append("write")), lambda: None,
+                                   on_exit=lambda: events.append("exit"))
+        writer.submit("a")
+        self.assertFalse(writer.close(timeout=0.05))
+        self.assertTrue(writer.is_running())
+        self.assertEqual(events, [])
+        release.set()
+        writer._thread.join(5)
+        self.assertEqual(events, ["write", "exit"])
+
+    def test_periodic_runs_without_new_items(self):
+        written = []
+        writer = GroupCommitWriter(written.extend, lambda: None, periodic=lambda: ["tick"],
+                                   periodic_interval_s=0.02)
+        deadline = time.monotonic() + 2
+        while len(written) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.close()
+        self.assertGreaterEqual(written.count("tick"), 2)
+
+    def test_close_drains_queue(self):
+        written = []
+        writer = GroupCommitWriter(written.extend, lambda: None)
+        for i in range(50):
+            writer.submit(i)
+        self.assertTrue(writer.close(timeout=5.0))
+        self.assertEqual(written, list(range(50)))
+        self.assertFalse(writer.submit("depois"))
+
+
+class TestFileManagerWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_lines_written_after_close(self):
+        manager = FileManager(output_dir=self.tmpdir)
+        manager.append_text("primeira frase")
+        manager.append_text("segunda frase")
+        manager.close()
+        with open(os.path.join(self.tmpdir, FileManager.CURRENT_FILE), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith("segunda frase"))
+
+    def test_rotation_uses_in_memory_size(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os")
+        manager.MAX_FILE_SIZE = 100
+        for i in range(10):
+            manager.append_text(f"frase numero {i} com algum texto")
+        manager.close()
+        self.assertTrue(glob.glob(os.path.join(self.tmpdir, "captions_hist_*")))
+        size = os.path.getsize(os.path.join(self.tmpdir, FileManager.CURRENT_FILE))
+        self.assertLess(size, 100 + 60)
+
+
+    def test_rotated_history_is_compressed_with_sequence_names(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os")
+        manager.MAX_FILE_SIZE = 100
+        for i in range(10):
+            manager.append_text(f"frase numero {i} com algum texto")
+        manager.close()
+        history = sorted(os.path.basename(p) for p in glob.glob(os.path.join(self.tmpdir, "captions_hist_*")))
+        self.assertTrue(history)
+        self.assertTrue(all(re.fullmatch(r"captions_hist_\d{6}_\d{8}\.txt(\.gz|\.tidx)", name) for name in history))
+        seqs = sorted({int(name.split("_")[2]) for name in history})
+        self.assertEqual(seqs, list(range(1, len(seqs) + 1)))
+
+        texts = [text for _, text in iter_captions(list_caption_files(self.tmpdir))]
+        self.assertEqual(texts, [f"frase numero {i} com algum texto" for i in range(10)])
+
+    def test_sequence_continues_after_restart_and_legacy_history_is_compressed(self):
+        legacy = os.path.join(self.tmpdir, "captions_hist1.txt")
+        with open(legacy, "w", encoding="utf-8") as f:
+            f.write("[10:00:00] antiga\n")
+        open(os.path.join(self.tmpdir, "captions_hist_000007_20260101.txt.gz"), "wb").close()
+        manager = FileManager(output_dir=self.tmpdir, durability="os")
+        self.assertIn("captions_hist_000008_", manager._next_history_path())
+        manager.close()
+        self.assertFalse(os.path.exists(legacy))
+        self.assertTrue(os.path.exists(legacy + ".gz"))
+
+    def test_retention_by_total_history_size(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os", compress_history=False,
+                              history_max_bytes=250)
+        manager.MAX_FILE_SIZE = 100
+        for i in range(30):
+            manager.append_text(f"frase numero {i} com algum texto")
+        manager.close()
+        history = [p for p in glob.glob(os.path.join(self.tmpdir, "captions_hist_*.txt"))]
+        self.assertLessEqual(sum(os.path.getsize(p) for p in history), 250)
+        # Índices vão embora junto com os históricos removidos
+        indexes = glob.glob(os.path.join(self.tmpdir, "captions_hist_*.tidx"))
+        self.assertEqual(sorted(i[:-len(".tidx")] for i in indexes), sorted(history))
+
+    def test_format_switch_keeps_previous_format_files(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os", compress_history=False)
+        manager.append_text("frase em texto")
+        manager.close()
+        manager = FileManager(output_dir=self.tmpdir, durability="os", compress_history=False,
+                              caption_format=FileManager.FORMAT_DELTA)
+        manager.append_text("frase em delta")
+        manager.flush()
+        # O atual .txt virou histórico e continua na leitura, junto com o atual .cdelta
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir, FileManager.CURRENT_FILE)))
+        self.assertEqual(len(glob.glob(os.path.join(self.tmpdir, "captions_hist_000001_*.txt"))), 1)
+        self.assertEqual(len(manager._get_historical_files()), 1)
+        texts = [text for _, text in iter_captions(list_caption_files(self.tmpdir, manager.current_name))]
+        self.assertEqual(texts, ["frase em texto", "frase em delta"])
+
+        # Limpar remove os arquivos dos dois formatos
+        self.assertTrue(manager.clear_all_files())
+        manager.close()
+        leftovers = [os.path.basename(p) for p in glob.glob(os.path.join(self.tmpdir, "captions_*"))
+                     if not p.endswith(".tidx")]
+        self.assertEqual(leftovers, [manager.current_name])
+
+    def test_listing_includes_current_file_of_other_format(self):
+        with open(os.path.join(self.tmpdir, "captions_current.cdelta"), "w", encoding="utf-8") as f:
+            f.write("")
+        paths = list_caption_files(self.tmpdir)
+        self.assertEqual([os.path.basename(p) for p in paths], ["captions_current.cdelta"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import contextlib
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.frame_ring import (FORMAT_BINARY1, FORMAT_GRAY8, SLOT_HEADER, FrameRecorder, FrameRing,
+                                 previous_ring_path, slot_size_for)
+from src.tools import frame_reocr
+
+try:
+    import cv2  # noqa: F401
+    import numpy as np
+    from src.utils.frame_codec import decode_frame, encode_binary, encode_gray, make_encoder
+    HAS_CV = True
+except ImportError:
+    HAS_CV = False
+
+
+def _payload(n, size=100):
+    return bytes([n % 256]) * size
+
+
+class TestFrameRing(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "frames.ring")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_wraps_around_keeping_newest_frames(self):
+        ring = FrameRing.create(self.path, slot_size=256, slot_count=4)
+        for n in range(1, 7):
+            self.assertEqual(ring.append(1000.0 + n, 10, 10, FORMAT_GRAY8, _payload(n)), n)
+        ring.close()
+
+        reader = FrameRing.open(self.path)
+        frames = reader.frames()
+        self.assertEqual([f.seq for f in frames], [3, 4, 5, 6])
+        self.assertEqual(reader.read_payload(frames[0]), _payload(3))
+        self.assertEqual(reader.next_seq, 7)
+        self.assertEqual([f.seq for f in reader.frames(start=1004.0, end=1005.5)], [4, 5])
+        reader.close()
+
+    def test_oversized_and_interrupted_frames_are_not_listed(self):
+        ring = FrameRing.create(self.path, slot_size=256, slot_count=4)
+        self.assertIsNone(ring.append(1.0, 10, 10, FORMAT_GRAY8, b"x" * (256 - SLOT_HEADER.size + 1)))
+        self.assertEqual(ring.oversized_count, 1)
+        ring.append(2.0, 10, 10, FORMAT_GRAY8, _payload(1))
+        ring.append(3.0, 10, 10, FORMAT_GRAY8, _payload(2))
+        first = ring.frames()[0]
+        ring._mm[ring._slot_offset(1):ring._slot_offset(1) + 8] = b"\0" * 8  # Escrita interrompida
+        self.assertEqual([f.seq for f in ring.frames()], [1])
+        ring.append(4.0, 10, 10, FORMAT_GRAY8, _payload(3))
+        ring.append(5.0, 10, 10, FORMAT_GRAY8, _payload(4))
+        ring.append(6.0, 10, 10, FORMAT_GRAY8, _payload(5))
+        ring.append(7.0, 10, 10, FORMAT_GRAY8, _payload(6))
+        self.assertIsNone(ring.read_payload(first))  # Slot reaproveitado por um frame mais novo
+        ring.close()
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"nada a ver" * 10)
+        with self.assertRaises(ValueError):
+            FrameRing.open(self.path)
+
+    def test_recorder_writes_in_background_and_grows_slots(self):
+        encode = lambda frame: (len(frame), 1, FORMAT_GRAY8, 0, frame)
+        recorder = FrameRecorder(self.path, encode, capacity_bytes=1024 * 1024)
+        self.assertTrue(recorder.submit(b"a" * 1000, 10.0))
+        self.assertTrue(recorder.flush())
+        small_slot = recorder.ring.slot_size
+        self.assertEqual(small_slot, slot_size_for(1000))
+        recorder.submit(b"b" * 20000, 11.0)
+        recorder.submit(b"c" * 100, 12.0)
+        self.assertEqual(recorder.close(), self.path)
+        self.assertEqual(recorder.recorded_count, 3)
+
+        ring = FrameRing.open(self.path)
+        self.assertGreater(ring.slot_size, small_slot)
+        self.assertEqual(ring.slot_count, 1024 * 1024 // ring.slot_size)
+        self.assertEqual([(f.timestamp, f.width) for f in ring.frames()], [(11.0, 20000), (12.0, 100)])
+        ring.close()
+        # O anel de slots pequenos foi preservado ao lado
+        previous = FrameRing.open(previous_ring_path(self.path))
+        self.assertEqual([f.timestamp for f in previous.frames()], [10.0])
+        previous.close()
+
+    def test_recorder_reuses_compatible_ring_across_sessions(self):
+        encode = lambda frame: (len(frame), 1, FORMAT_GRAY8, 0, frame)
+        recorder = FrameRecorder(self.path, encode, capacity_bytes=1024 * 1024)
+        recorder.submit(b"a" * 1000, 10.0)
+        recorder.close()
+        recorder = FrameRecorder(self.path, encode, capacity_bytes=1024 * 1024)
+        recorder.submit(b"b" * 900, 20.0)
+        recorder.close()
+        ring = FrameRing.open(self.path)
+        self.assertEqual([(f.seq, f.timestamp) for f in ring.frames()], [(1, 10.0), (2, 20.0)])
+        ring.close()
+        self.assertFalse(os.path.exists(previous_ring_path(self.path)))
+
+        # Outra capacidade: o anel antigo vai para o lado em vez de ser apagado
+        recorder = FrameRecorder(self.path, encode, capacity_bytes=512 * 1024)
+        recorder.submit(b"c" * 900, 30.0)
+        recorder.close()
+        ring = FrameRing.open(self.path)
+        self.assertEqual([f.timestamp for f in ring.frames()], [30.0])
+        ring.close()
+        previous = FrameRing.open(previous_ring_path(self.path))
+        self.assertEqual(len(previous.frames()), 2)
+        previous.close()
+
+    def test_recorder_never_exceeds_capacity(self):
+        encode = lambda frame: (len(frame), 1, FORMAT_GRAY8, 0, frame)
+        slot = slot_size_for(30000)
+        recorder = FrameRecorder(self.path, encode, capacity_bytes=slot * 3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            recorder.submit(b"a" * 30000, 1.0)
+            recorder.submit(b"b" * (slot * 4), 2.0)  # Não cabe nem num único slot
+            recorder.close()
+        self.assertEqual(recorder.skipped_count, 1)
+        ring = FrameRing.open(self.path)
+        self.assertEqual(ring.slot_count, 3)
+        self.assertLessEqual(os.path.getsize(self.path) - 64, slot * 3)
+        ring.close()
+
+    def test_recorder_without_frames_leaves_no_file(self):
+        recorder = FrameRecorder(self.path, lambda frame: None, capacity_bytes=1024 * 1024)
+        self.assertIsNone(recorder.close())
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestFrameReocrTool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "frames.ring")
+        self.start = datetime.datetime(2026, 10, 19, 14, 0, 0).timestamp()
+        ring = FrameRing.create(self.path, slot_size=4096, slot_count=64)
+        for n in range(50):
+            ring.append(self.start + n * 0.2, 8, 4, FORMAT_BINARY1, b"\xff\x00\xff\x00")
+        ring.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_select_frames_by_time(self):
+        ring = FrameRing.open(self.path)
+        try:
+            start = frame_reocr.parse_time("14:00:02", self.start)
+            end = frame_reocr.parse_time("2026-10-19 14:00:04", self.start)
+            self.assertEqual([f.seq for f in frame_reocr.select_frames(ring, start, end)], list(range(11, 22)))
+            self.assertEqual(len(frame_reocr.select_frames(ring, last=1.0)), 6)
+            self.assertEqual(len(frame_reocr.select_frames(ring, every=10)), 5)
+        finally:
+            ring.close()
+
+    def test_info_and_errors(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(frame_reocr.main([self.path, "--info"]), 0)
+        self.assertIn("50 frame(s)", out.getvalue())
+        self.assertIn("binary", out.getvalue())
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(frame_reocr.main([self.path, "--from", "amanhã"]), 2)
+            self.assertEqual(frame_reocr.main([os.path.join(self.tmpdir, "nao_existe.ring")]), 1)
+
+    @unittest.skipIf(not HAS_CV, "OpenCV/numpy indisponível")
+    def test_export_pngs(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = frame_reocr.main([self.path, "--last", "0.5", "--export-dir", os.path.join(self.tmpdir, "png")])
+        self.assertEqual(code, 0)
+        self.assertEqual(len(os.listdir(os.path.join(self.tmpdir, "png"))), 3)
+
+
+@unittest.skipIf(not HAS_CV, "OpenCV/numpy indisponível")
+class TestFrameCodec(unittest.TestCase):
+    def test_gray_and_binary_roundtrip(self):
+        capture = np.zeros((30, 50, 4), dtype=np.uint8)
+        capture[10:20, 5:45] = (200, 200, 200, 255)
+        binary = np.where(capture[:, :, 0] > 100, 255, 0).astype(np.uint8)
+
+        width, height, fmt, flags, payload = encode_gray(capture)
+        self.assertEqual((width, height, fmt), (50, 30, FORMAT_GRAY8))
+        frame = type("F", (), {"width": width, "height": height, "frame_format": fmt})()
+        self.assertEqual(decode_frame(frame, payload)[15, 20], 200)
+
+        width, height, fmt, flags, payload = make_encoder("binary")((capture, binary, True))
+        self.assertEqual(len(payload), (50 * 30 + 7) // 8)
+        self.assertTrue(flags)
+        frame = type("F", (), {"width": width, "height": height, "frame_format": fmt})()
+        self.assertTrue(np.array_equal(decode_frame(frame, payload), binary))
+        self.assertEqual(encode_binary(binary)[3], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+import unittest
+
+from src.core.file_manager import FileManager
+from src.core.frame_trace import (FrameTrace, format_latency, CAPTURED, PREPROCESSED, OCR_DONE,
+                                  DECIDED, PERSISTED)
+from src.core.stabilizer import CaptionStabilizer, ManualClock
+
+
+class TestFrameTrace(unittest.TestCase):
+    def test_stage_latencies_only_for_marked_stages(self):
+        trace = FrameTrace(captured=100.0)
+        trace.mark(PREPROCESSED, 100.01)
+        trace.mark(OCR_DONE, 100.21)
+        latencies = trace.stage_latencies()
+        self.assertAlmostEqual(latencies["trace_preprocess_ms"], 10.0, places=3)
+        self.assertAlmostEqual(latencies["trace_ocr_ms"], 200.0, places=3)
+        self.assertNotIn("trace_total_ms", latencies)
+        self.assertIsNone(trace.capture_to_commit_ms())
+
+        trace.mark(DECIDED, 101.5)
+        trace.mark(PERSISTED, 101.52)
+        self.assertAlmostEqual(trace.capture_to_commit_ms(), 1500.0, places=3)
+        self.assertAlmostEqual(trace.stage_latencies()["trace_total_ms"], 1520.0, places=3)
+        self.assertEqual(trace.to_dict()[CAPTURED], 100.0)
+
+    def test_frame_ids_are_unique(self):
+        self.assertNotEqual(FrameTrace().frame_id, FrameTrace().frame_id)
+
+    def test_format_latency(self):
+        self.assertEqual(format_latency(850), "+850ms")
+        self.assertEqual(format_latency(2400), "+2.4s")
+
+
+class TestStabilizerTraces(unittest.TestCase):
+    def setUp(self):
+        self.committed = []
+        self.clock = ManualClock(0.0)
+        self.stabilizer = CaptionStabilizer(self._on_commit, initial_timeout_ms=500, clock=self.clock)
+
+    def _on_commit(self, text):
+        self.committed.append((text, self.stabilizer.last_commit_trace))
+
+    def test_commit_carries_oldest_frame_since_previous_commit(self):
+        first = FrameTrace(captured=1.0)
+        second = FrameTrace(captured=1.2)
+        self.stabilizer.process_new_text("Bom dia", first)
+        self.clock.advance(0.2)
+        self.stabilizer.process_new_text("Bom dia a todos", second)
+        self.clock.advance(1.0)
+        self.stabilizer.force_check()
+
+        self.assertEqual(len(self.committed), 1)
+        text, trace = self.committed[0]
+        self.assertEqual(text, "Bom dia a todos")
+        self.assertIs(trace, first)
+        self.assertIsNotNone(first.decided)
+        self.assertIsNone(second.decided)
+
+        # A próxima frase começa um novo trace
+        third = FrameTrace(captured=3.0)
+        self.stabilizer.process_new_text("Outra frase completamente diferente", third)
+        self.stabilizer.flush()
+        self.assertIs(self.committed[-1][1], third)
+
+    def test_untraced_text_commits_without_trace(self):
+        self.stabilizer.process_new_text("Sem trace")
+        self.stabilizer.flush()
+        self.assertEqual(self.committed, [("Sem trace", None)])
+
+
+class TestFileManagerTraces(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_persisted_is_marked_and_reported(self):
+        reported = []
+        fm = FileManager(output_dir=self.tmpdir, durability="os")
+        fm.on_persisted = reported.extend
+        trace = FrameTrace()
+        trace.mark(DECIDED)
+        fm.append_text("frase rastreada", trace)
+        fm.append_text("frase sem trace")
+        fm.close()
+
+        self.assertEqual(reported, [trace])
+        self.assertGreaterEqual(trace.persisted, trace.decided)
+        self.assertIn("trace_write_ms", trace.stage_latencies())
+        with open(fm.filepath, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from src.core.line_tracker import LineTracker
+from src.core.stabilizer import CaptionStabilizer, ManualClock
+from src.utils.ocr_lines import group_results_into_lines
+
+
+class TestLineTracker(unittest.TestCase):
+    def test_unchanged_lines_are_matched_without_diff(self):
+        tracker = LineTracker()
+        tracker.update(["primeira linha", "segunda linha"], 0.0)
+        first = tracker.lines[0]
+        self.assertEqual(tracker.update(["primeira linha", "segunda linha"], 1.0), ([], 0, 0))
+        self.assertIs(tracker.lines[0], first)
+        self.assertEqual(first.last_update, 0.0)
+
+    def test_only_changed_line_is_updated(self):
+        tracker = LineTracker()
+        tracker.update(["primeira linha", "segunda li"], 0.0)
+        self.assertEqual(tracker.update(["primeira linha", "segunda linha"], 1.0), ([], 0, 1))
+        self.assertEqual(tracker.lines[0].last_update, 0.0)
+        self.assertEqual(tracker.lines[1].last_update, 1.0)
+
+    def test_scrolled_off_line_is_returned(self):
+        tracker = LineTracker()
+        tracker.update(["primeira linha", "segunda linha"], 0.0)
+        scrolled, new_count, _ = tracker.update(["segunda linha", "terceira coisa dita"], 1.0)
+        self.assertEqual(scrolled, ["primeira linha"])
+        self.assertEqual(new_count, 1)
+
+    def test_partial_bottom_line_does_not_replace_scrolled_line(self):
+        tracker = LineTracker()
+        tracker.update(["Hello there friend", "How are"], 0.0)
+        scrolled, new_count, updated_count = tracker.update(["How are you", "Hel"], 1.0)
+        self.assertEqual(scrolled, ["Hello there friend"])
+        self.assertEqual((new_count, updated_count), (1, 1))
+        self.assertEqual([line.text for line in tracker.lines], ["How are you", "Hel"])
+
+    def test_shrunk_reading_keeps_longer_pending_text(self):
+        tracker = LineTracker()
+        tracker.update(["vamos revisar o projeto"], 0.0)
+        self.assertEqual(tracker.update(["vamos revisar o projet"], 1.0), ([], 0, 1))
+        self.assertEqual(tracker.lines[0].text, "vamos revisar o projeto")
+        self.assertEqual(tracker.lines[0].last_update, 1.0)
+
+    def test_expired_lines_are_committed_once(self):
+        tracker = LineTracker()
+        tracker.update(["primeira linha", "segunda linha"], 0.0)
+        tracker.update(["primeira linha", "segunda linha completa"], 1.0)
+        self.assertEqual(tracker.next_deadline(0.5), 0.5)
+        self.assertEqual(tracker.pop_expired(0.5, 0.5), ["primeira linha"])
+        self.assertEqual(tracker.pop_expired(2.0, 0.5), ["segunda linha completa"])
+        self.assertIsNone(tracker.next_deadline(0.5))
+        self.assertFalse(tracker.has_pending())
+
+
+class TestStabilizerLineMode(unittest.TestCase):
+    def setUp(self):
+        self.committed = []
+        self.clock = ManualClock(0.0)
+        self.stabilizer = CaptionStabilizer(self.committed.append, initial_timeout_ms=500, clock=self.clock)
+        self.stabilizer.set_line_mode(True)
+
+    def test_lines_are_committed_independently(self):
+        self.stabilizer.process_batch([
+            (0.0, "o gato subiu\nno telhado da"),
+            (0.2, "o gato subiu\nno telhado da casa"),
+            (0.8, "no telhado da casa\ne ficou por lá"),
+        ])
+        self.assertEqual(self.committed, ["o gato subiu", "no telhado da casa", "e ficou por lá"])
+
+    def test_flush_commits_pending_lines(self):
+        self.stabilizer.process_new_text("linha um de texto\nlinha dois diferente")
+        self.stabilizer.flush()
+        self.assertEqual(self.committed, ["linha um de texto", "linha dois diferente"])
+        self.assertIsNone(self.stabilizer.get_next_deadline())
+
+    def test_block_mode_joins_lines(self):
+        self.stabilizer.set_line_mode(False)
+        self.stabilizer.process_batch([(0.0, "o gato subiu\nno telhado")])
+        self.assertEqual(self.committed, ["o gato subiu no telhado"])
+
+
+class TestGroupResultsIntoLines(unittest.TestCase):
+    def test_boxes_are_grouped_by_row_and_sorted_by_x(self):
+        def box(x, y, text):
+            return ([[x, y], [x + 40, y], [x + 40, y + 20], [x, y + 20]], text, 0.9)
+
+        results = [box(50, 32, "linha"), box(0, 0, "primeira"), box(0, 30, "segunda"), box(50, 2, "linha")]
+        self.assertEqual(group_results_into_lines(results), ["primeira linha", "segunda linha"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.core.log_index import LogIndex, count_by_minute, find_log_files, index_path_for, query
+from src.utils.compression import compress_file
+
+
+def _entry(timestamp, category, data=None):
+    return json.dumps({"timestamp": timestamp, "category": category, "message": "m", "data": data or {}},
+                      ensure_ascii=False) + "\n"
+
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.part1 = os.path.join(self.tmpdir, "usage_2026-10-19_13-50-00_part1.log")
+        self.part2 = os.path.join(self.tmpdir, "usage_2026-10-19_13-50-00_part2.log")
+        with open(self.part1, "w", encoding="utf-8") as f:
+            f.write(_entry("2026-10-19 13:59:58.000", "AUTO_ADJUST", {"parameter": "similarity_threshold"}))
+            f.write(_entry("2026-10-19 14:00:01.000", "AUTO_ADJUST", {"parameter": "timeout_ms"}))
+            f.write(_entry("2026-10-19 14:00:02.000", "EVENT", {"event_type": "TEXT_COMMITTED"}))
+            f.write(_entry("2026-10-19 14:10:00.000", "AUTO_ADJUST", {"parameter": "similarity_threshold"}))
+        with open(self.part2, "w", encoding="utf-8") as f:
+            f.write(_entry("2026-10-19 14:59:00.000", "AUTO_ADJUST", {"parameter": "similarity_threshold"}))
+            f.write(_entry("2026-10-19 15:00:00.000", "AUTO_ADJUST", {"parameter": "similarity_threshold"}))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_query_across_parts(self):
+        paths = find_log_files(self.tmpdir)
+        self.assertEqual(paths, [self.part1, self.part2])
+        results = list(query(paths, "AUTO_ADJUST", "14:00", "15:00", {"parameter": "similarity_threshold"}))
+        self.assertEqual([r["timestamp"] for r in results],
+                         ["2026-10-19 14:10:00.000", "2026-10-19 14:59:00.000"])
+        self.assertTrue(os.path.exists(index_path_for(self.part1)))
+
+    def test_count_by_minute_from_index(self):
+        counts = list(count_by_minute([self.part1], start="2026-10-19 14:00"))
+        self.assertEqual(counts, [
+            ("2026-10-19 14:00", "AUTO_ADJUST", 1),
+            ("2026-10-19 14:00", "EVENT", 1),
+            ("2026-10-19 14:10", "AUTO_ADJUST", 1),
+        ])
+
+    def test_index_is_extended_incrementally(self):
+        index = LogIndex.load_or_build(self.part1)
+        size = index.indexed_size
+        with open(self.part1, "a", encoding="utf-8") as f:
+            f.write(_entry("2026-10-19 14:20:00.000", "CONFIG"))
+            f.write('{"timestamp": "2026-10-19 14:21')  # Linha incompleta (ainda sendo escrita)
+        index = LogIndex.load_or_build(self.part1)
+        self.assertEqual(len(index.categories["CONFIG"]), 1)
+        self.assertEqual(index.categories["CONFIG"][0], size)
+        self.assertEqual(list(index.read_entries(index.categories["CONFIG"]))[0]["category"], "CONFIG")
+
+    def test_compressed_part_reuses_index(self):
+        before = list(query([self.part1], "AUTO_ADJUST"))
+        compressed = compress_file(self.part1)
+        paths = find_log_files(self.tmpdir)
+        self.assertIn(compressed, paths)
+        self.assertEqual(list(query([compressed], "AUTO_ADJUST")), before)
+        self.assertEqual(list(query([compressed], "EVENT", "14:00", "14:01"))[0]["data"]["event_type"], "TEXT_COMMITTED")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import time
+import unittest
+
+try:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.log_view import BoundedLogView
+    HAS_QT = True
+except ImportError:
+    HAS_QT = False
+
+
+@unittest.skipUnless(HAS_QT, "PyQt6 não instalado")
+class TestBoundedLogView(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_keeps_only_last_lines(self):
+        view = BoundedLogView(max_lines=15)
+        for i in range(100):
+            view.append_line(f"linha {i}")
+        self.assertEqual(view.blockCount(), 15)
+        self.assertEqual(view.toPlainText().splitlines()[-1], "linha 99")
+        self.assertEqual(view.toPlainText().splitlines()[0], "linha 85")
+
+    def test_coalesces_until_flush(self):
+        view = BoundedLogView(max_lines=15, coalesce_ms=50)
+        for i in range(40):
+            view.append_line(f"debug {i}")
+        self.assertEqual(view.toPlainText(), "")  # Nada desenhado antes do intervalo
+        self.assertEqual(view.pending_count(), 15)
+        view.flush()
+        self.assertEqual(view.toPlainText().splitlines(), [f"debug {i}" for i in range(25, 40)])
+
+    def test_stress_10k_messages_per_second(self):
+        """10k mensagens em 1s de relógio: o tempo gasto na thread da UI deve ser uma fração disso."""
+        view = BoundedLogView(max_lines=15, coalesce_ms=16)
+        messages = [f"[DEBUG] frame {i}: similaridade=0.{i % 100:02d} decisão=buffer" for i in range(10000)]
+        ui_time = 0.0
+        start = time.perf_counter()
+        for chunk in range(100):  # 100 rajadas de 100 mensagens, espalhadas em ~1s
+            t0 = time.thread_time()
+            for message in messages[chunk * 100:(chunk + 1) * 100]:
+                view.append_line(message)
+            self.app.processEvents()
+            ui_time += time.thread_time() - t0
+            time.sleep(max(0.0, start + (chunk + 1) / 100 - time.perf_counter()))
+        view.flush()
+        self.assertEqual(view.blockCount(), 15)
+        self.assertEqual(view.toPlainText().splitlines()[-1], messages[-1])
+        self.assertLess(ui_time, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
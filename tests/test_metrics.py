@@ -0,0 +1,26 @@
+import unittest
+from src.core.metrics import Histogram, MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets(self):
+        histogram = Histogram((10, 100))
+        for value in (5, 10, 50, 500):
+            histogram.observe(value)
+        data = histogram.to_dict()
+        self.assertEqual(data["buckets"], {"10": 2, "100": 1, "+inf": 1})
+        self.assertEqual((data["count"], data["min"], data["max"]), (4, 5, 500))
+
+    def test_snapshot_resets(self):
+        registry = MetricsRegistry()
+        registry.increment("DECISION:REPETITION_DETECTED")
+        registry.increment("DECISION:REPETITION_DETECTED", 2)
+        registry.observe("similarity", 0.75)
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["counters"]["DECISION:REPETITION_DETECTED"], 3)
+        self.assertEqual(snapshot["histograms"]["similarity"]["buckets"], {"0.8": 1})
+        self.assertTrue(registry.is_empty())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.caption_timeline import CaptionTimeline
+from src.core.ocr_trace import (OCRTraceWriter, is_trace_path, load_events, read_trace,
+                                trace_start_epoch, write_events)
+from src.core.replay import count_duplicates, edit_distance, load_reference, normalize_words, replay
+from src.tools import ocr_replay
+
+
+class TestOCRTrace(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_roundtrip_preserves_text_and_timing(self):
+        path = os.path.join(self.tmpdir, "s.ocrtrace")
+        frames = [(100.0, "Ola"), (100.2, "Ola mundo"), (100.4, "Ola mundo"),
+                  (100.61, "linha 1\nlinha 2"), (101.0, "barra \\n literal\tcom tab"), (3700.0, "fim\r")]
+        writer = OCRTraceWriter(path, compress_on_close=False)
+        for timestamp, text in frames:
+            writer.record(text, timestamp)
+        self.assertEqual(writer.close(), path)
+
+        events = load_events(path)
+        self.assertEqual([text for _, text in events], [text for _, text in frames])
+        for (t, _), (original, _) in zip(events, frames):
+            self.assertAlmostEqual(t, original - 100.0, places=3)
+        self.assertIsNotNone(trace_start_epoch(path))
+
+    def test_prefix_sharing_keeps_file_small(self):
+        path = os.path.join(self.tmpdir, "s.ocrtrace")
+        long_text = "uma legenda razoavelmente longa que se repete em muitos frames"
+        write_events(path, [(i * 0.2, long_text) for i in range(500)])
+        self.assertLess(os.path.getsize(path), 500 * 12)
+
+    def test_gzip_on_close_and_no_file_without_frames(self):
+        empty = OCRTraceWriter(os.path.join(self.tmpdir, "vazio.ocrtrace"))
+        self.assertIsNone(empty.close())
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+        path = write_events(os.path.join(self.tmpdir, "s.ocrtrace.gz"), [(0.0, "a"), (0.5, "ab")])
+        self.assertTrue(path.endswith(".ocrtrace.gz"))
+        self.assertTrue(is_trace_path(path))
+        self.assertEqual(list(read_trace(path)), [(0.0, "a"), (0.5, "ab")])
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.tmpdir, "x.ocrtrace")
+        with open(path, "w") as f:
+            f.write("[00:00:01] legenda\n")
+        with self.assertRaises(ValueError):
+            load_events(path)
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.timeline = CaptionTimeline(seed=3, loop=False)
+        self.events = self.timeline.events(self.timeline.duration + 5)
+        self.reference = [entry["text"] for entry in self.timeline.transcript()]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_clean_stream_matches_reference(self):
+        report = replay(self.events, {"timeout_ms": 1000}, self.reference)
+        self.assertEqual(report["events"], len(self.events))
+        self.assertEqual(report["commits"], len(self.reference))
+        self.assertEqual(report["duplicates"], 0)
+        self.assertEqual(report["edit_distance"], 0)
+        self.assertEqual(report["word_error_rate"], 0.0)
+        self.assertGreater(report["speedup"], 1)
+
+    def test_metrics_helpers(self):
+        self.assertEqual(normalize_words("Olá, Mundo!"), ["olá", "mundo"])
+        self.assertEqual(edit_distance("a b c d".split(), "a x c d e".split()), 2)
+        self.assertEqual(count_duplicates(["bom dia a todos", "Bom dia, a todos!", "outra coisa", "dia a"]), 2)
+
+    def test_load_reference_formats(self):
+        truth = os.path.join(self.tmpdir, "v.truth.json")
+        with open(truth, "w", encoding="utf-8") as f:
+            json.dump({"captions": [{"start": 0, "end": 1, "text": "frase um"}]}, f)
+        captions = os.path.join(self.tmpdir, "captions.txt")
+        with open(captions, "w", encoding="utf-8") as f:
+            f.write("[10:00:00] frase um\n[10:00:03] frase dois\n")
+        plain = os.path.join(self.tmpdir, "ref.txt")
+        with open(plain, "w", encoding="utf-8") as f:
+            f.write("frase um\n\nfrase dois\n")
+        self.assertEqual(load_reference(truth), ["frase um"])
+        self.assertEqual(load_reference(captions), ["frase um", "frase dois"])
+        self.assertEqual(load_reference(plain), ["frase um", "frase dois"])
+
+    def test_cli_report(self):
+        trace = write_events(os.path.join(self.tmpdir, "s.ocrtrace.gz"), self.events)
+        reference = os.path.join(self.tmpdir, "ref.txt")
+        with open(reference, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.reference))
+        commits = os.path.join(self.tmpdir, "commits.txt")
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            code = ocr_replay.main([trace, "--preset", "zoom", "--set", "timeout_ms=1000",
+                                    "--reference", reference, "--commits", commits, "--json"])
+        self.assertEqual(code, 0)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["config"]["timeout_ms"], 1000)
+        self.assertEqual(report["commits"], len(self.reference))
+        with open(commits, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), len(self.reference))
+
+
+if __name__ == "__main__":
+    unittest.main()
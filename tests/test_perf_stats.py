@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.core.file_manager import FileManager
+from src.core.perf_stats import (PerfStats, percentile, OCR_LATENCY, COMMIT_TO_DISK,
+                                 FRAMES_SKIPPED, QUEUE_DEPTH)
+from src.utils.process_stats import ProcessStats
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeProcessStats:
+    def rss_mb(self):
+        return 42.0
+
+    def cpu_percent(self):
+        return 12.5
+
+
+class TestPerfStats(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.stats = PerfStats(window_samples=100, clock=self.clock, process_stats=FakeProcessStats())
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+        self.assertEqual(percentile([7], 0.99), 7)
+
+    def test_disabled_records_nothing(self):
+        self.stats.record_frame(100)
+        self.stats.observe(COMMIT_TO_DISK, 5)
+        self.stats.increment(FRAMES_SKIPPED)
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["fps"], 0.0)
+        self.assertEqual(snapshot["counters"], {})
+        self.assertNotIn(OCR_LATENCY, snapshot)
+
+    def test_fps_and_latency_percentiles(self):
+        self.stats.set_enabled(True)
+        for i in range(11):
+            self.stats.record_frame(latency_ms=10 * (i + 1))
+            self.clock.now += 0.2
+        self.stats.increment(FRAMES_SKIPPED, 3)
+        snapshot = self.stats.snapshot()
+        self.assertAlmostEqual(snapshot["fps"], 5.0)
+        self.assertEqual(snapshot[OCR_LATENCY]["count"], 11)
+        self.assertEqual(snapshot[OCR_LATENCY]["p50"], 60)
+        self.assertEqual(snapshot[OCR_LATENCY]["p99"], 110)
+        self.assertEqual(snapshot["counters"][FRAMES_SKIPPED], 3)
+        self.assertEqual(snapshot["rss_mb"], 42.0)
+        self.assertEqual(snapshot["cpu_percent"], 12.5)
+
+    def test_window_is_bounded_and_old_frames_expire(self):
+        self.stats.set_enabled(True)
+        for i in range(500):
+            self.stats.observe(COMMIT_TO_DISK, i)
+        self.assertEqual(self.stats.snapshot()[COMMIT_TO_DISK]["count"], 100)
+        self.stats.record_frame(1)
+        self.clock.now += 60
+        self.assertEqual(self.stats.snapshot()["fps"], 0.0)
+
+    def test_reenable_starts_fresh(self):
+        self.stats.set_enabled(True)
+        self.stats.increment(FRAMES_SKIPPED)
+        self.stats.set_enabled(False)
+        self.stats.set_enabled(True)
+        self.assertEqual(self.stats.snapshot()["counters"], {})
+
+    def test_gauge_read_on_snapshot(self):
+        depth = [3]
+        self.stats.set_gauge(QUEUE_DEPTH, lambda: depth[0])
+        self.assertEqual(self.stats.snapshot()[QUEUE_DEPTH], 3)
+        depth[0] = 0
+        self.assertEqual(self.stats.snapshot()[QUEUE_DEPTH], 0)
+
+    def test_file_manager_reports_commit_latency(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            fm = FileManager(output_dir=tmpdir, durability="none")
+            fm.perf_stats = self.stats
+            self.stats.set_enabled(True)
+            fm.append_text("olá mundo")
+            fm.close()
+            snapshot = self.stats.snapshot()
+            self.assertEqual(snapshot[COMMIT_TO_DISK]["count"], 1)
+            self.assertGreaterEqual(snapshot[COMMIT_TO_DISK]["p50"], 0)
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+class TestProcessStats(unittest.TestCase):
+    def test_returns_numbers(self):
+        stats = ProcessStats()
+        stats.cpu_percent()
+        end = time.process_time() + 0.05
+        while time.process_time() < end:
+            pass
+        rss = stats.rss_mb()
+        if rss is not None:
+            self.assertGreater(rss, 0)
+        self.assertGreaterEqual(stats.cpu_percent(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.preset_tuner import (PresetTuner, base_config_for, evaluate, grid_candidates, load_reference_entries,
+                                   match_commits, preset_entry, save_preset_entry, synthetic_dataset)
+from src.tools import preset_tuner as tuner_tool
+
+SMALL_SPACE = {"timeout_ms": [1000, 4000], "similarity_threshold": [0.5, 0.8], "min_update_interval": [50]}
+
+
+class TestScoring(unittest.TestCase):
+    def test_match_commits_counts_missed_spurious_and_latency(self):
+        reference = [{"text": "bom dia a todos", "end": 1.0},
+                     {"text": "vamos revisar o projeto", "end": 3.0},
+                     {"text": "frase que nunca apareceu", "end": 5.0}]
+        commits = [(2.5, "Bom dia a todos!"), (3.0, "ruido"), (4.0, "vamos revisar o projeto")]
+        missed, spurious, latencies = match_commits(commits, reference)
+        self.assertEqual(missed, 1)
+        self.assertEqual(spurious, 1)
+        self.assertEqual(latencies, [1.5, 1.0])
+
+    def test_one_commit_can_cover_several_lines(self):
+        reference = [{"text": "primeira frase", "end": None}, {"text": "segunda frase", "end": None}]
+        missed, spurious, latencies = match_commits([(1.0, "primeira frase segunda frase")], reference)
+        self.assertEqual((missed, spurious, latencies), (0, 0, []))
+
+    def test_longer_timeout_costs_latency(self):
+        datasets = [synthetic_dataset("expanding", 60, flicker_rate=0.0)]
+        fast = evaluate({"timeout_ms": 1000}, datasets, {"auto_timeout": False})
+        slow = evaluate({"timeout_ms": 4000}, datasets, {"auto_timeout": False})
+        self.assertEqual(fast["missed"], 0)
+        self.assertGreater(slow["latency_s"], fast["latency_s"])
+        self.assertGreater(slow["score"], fast["score"])
+
+    def test_auto_adjust_flags_are_pinned_off(self):
+        datasets = [synthetic_dataset("expanding", 60)]
+        params = {"timeout_ms": 3000, "min_update_interval": 200}
+        auto = {"auto_timeout": True, "auto_smart_adjust": True}
+        pinned = evaluate(params, datasets, auto)
+        self.assertEqual(pinned["score"], evaluate(params, datasets, {})["score"])
+        self.assertEqual(pinned["params"], params)
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.datasets = [synthetic_dataset("expanding", 40)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_grid_evaluates_every_combination(self):
+        self.assertEqual(len(grid_candidates(SMALL_SPACE)), 4)
+        ranked = PresetTuner(self.datasets, space=SMALL_SPACE, workers=1).run("grid")
+        self.assertEqual(len(ranked), 4)
+        self.assertEqual([r["score"] for r in ranked], sorted(r["score"] for r in ranked))
+
+    def test_random_search_respects_budget_and_pool_matches_inline(self):
+        progress = []
+        inline = PresetTuner(self.datasets, space=SMALL_SPACE, workers=1).run(
+            "random", budget=3, seed=2, progress=lambda done, best: progress.append(done))
+        self.assertEqual(len(inline), 3)
+        self.assertEqual(progress, [1, 2, 3])
+        pooled = PresetTuner(self.datasets, space=SMALL_SPACE, workers=2).run("grid")
+        self.assertEqual(pooled[0]["score"], PresetTuner(self.datasets, space=SMALL_SPACE, workers=1).run("grid")[0]["score"])
+
+    def test_preset_entry_and_save(self):
+        result = {"params": {"timeout_ms": 1000}, "score": 1.0}
+        entry = preset_entry(result, "zoom")
+        self.assertEqual(entry["name"], "Zoom (ajustado)")
+        self.assertEqual(entry["timeout_ms"], 1000)
+        self.assertEqual(entry["repetition_threshold"], base_config_for("zoom")["repetition_threshold"])
+        self.assertFalse(entry["auto_timeout"])
+        self.assertFalse(entry["auto_smart_adjust"])
+
+        path = os.path.join(self.tmpdir, "ajustados.json")
+        save_preset_entry(path, "a", entry, {"score": 1.0})
+        presets = save_preset_entry(path, "b", preset_entry(result))
+        self.assertEqual(sorted(presets), ["a", "b"])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["a"]["_tuning"], {"score": 1.0})
+
+    def test_reference_entries_from_truth_file(self):
+        path = os.path.join(self.tmpdir, "v.truth.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"captions": [{"start": 0.0, "end": 2.5, "text": "frase"}]}, f)
+        self.assertEqual(load_reference_entries(path), [{"text": "frase", "end": 2.5}])
+
+    def test_cli_writes_best_preset(self):
+        output = os.path.join(self.tmpdir, "ajustados.json")
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            code = tuner_tool.main(["--synthetic", "expanding", "--seconds", "40", "--base", "zoom",
+                                    "--strategy", "grid", "--param", "timeout_ms=1000,2000",
+                                    "--param", "similarity_threshold=0.6", "--param", "min_update_interval=50",
+                                    "--param", "jitter_detection_threshold=50",
+                                    "--param", "stability_detection_threshold=20",
+                                    "--workers", "1", "--output", output, "--json"])
+        self.assertEqual(code, 0)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["evaluated"], 2)
+        self.assertIn("zoom_tuned", report["preset"])
+        with open(output, encoding="utf-8") as f:
+            self.assertIn(json.load(f)["zoom_tuned"]["timeout_ms"], (1000, 2000))
+
+    def test_cli_requires_reference_per_trace(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(tuner_tool.main(["x.ocrtrace"]), 2)
+            self.assertEqual(tuner_tool.main(["--synthetic", "expanding", "--param", "foo=1"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from src.core.rolling_merge import RollingMerger, fuzzy_suffix_prefix_overlap, longest_suffix_prefix_overlap
+from src.core.stabilizer import CaptionStabilizer, ManualClock
+
+
+class TestSuffixPrefixOverlap(unittest.TestCase):
+    def test_overlap(self):
+        tail = "a b c d e".split()
+        self.assertEqual(longest_suffix_prefix_overlap(tail, "c d e f g".split()), (3, False))
+        self.assertEqual(longest_suffix_prefix_overlap(tail, "x y".split()), (0, False))
+
+    def test_overlap_with_repeated_words(self):
+        # Bordas repetidas exigem o fallback da função de prefixo
+        tail = "a a b a a".split()
+        self.assertEqual(longest_suffix_prefix_overlap(tail, "a a b a a c".split())[0], 5)
+        self.assertEqual(longest_suffix_prefix_overlap(tail, "a a c".split())[0], 2)
+
+    def test_contained(self):
+        tail = "a b c d e".split()
+        self.assertEqual(longest_suffix_prefix_overlap(tail, "b c".split()), (0, True))
+
+    def test_fuzzy_overlap_tolerates_ocr_errors(self):
+        tail = "vamos falar sobre o projeto".split()
+        self.assertEqual(fuzzy_suffix_prefix_overlap(tail, "falar sobre 0 projeto novo".split(), 2), 4)
+        self.assertEqual(fuzzy_suffix_prefix_overlap(tail, "falar sobre o projetu novo".split(), 2), 4)
+        self.assertEqual(fuzzy_suffix_prefix_overlap(tail, "outra coisa qualquer".split(), 2), 0)
+
+
+class TestRollingMerger(unittest.TestCase):
+    def test_only_new_words_are_returned(self):
+        merger = RollingMerger()
+        self.assertEqual(merger.merge("hoje vamos falar"), (0, ["hoje", "vamos", "falar"]))
+        self.assertEqual(merger.merge("vamos falar sobre o projeto"), (0, ["sobre", "o", "projeto"]))
+        self.assertEqual(merger.merge("sobre o projeto"), (0, []))
+
+    def test_partial_last_word_is_replaced(self):
+        merger = RollingMerger()
+        merger.merge("hoje vamos progra")
+        self.assertEqual(merger.merge("hoje vamos programar juntos"), (1, ["programar", "juntos"]))
+
+    def test_normalizes_case_and_punctuation(self):
+        merger = RollingMerger()
+        merger.merge("Olá, tudo bem")
+        self.assertEqual(merger.merge("tudo bem? Sim"), (0, ["Sim"]))
+
+    def test_garbled_seam_uses_fuzzy_overlap(self):
+        merger = RollingMerger()
+        merger.merge("hoje vamos falar sobre o projeto")
+        self.assertEqual(merger.merge("falar sobre 0 projeto da equipe"), (0, ["da", "equipe"]))
+
+    def test_single_long_word_overlap(self):
+        merger = RollingMerger()
+        merger.merge("hoje vamos revisar o planejamento")
+        self.assertEqual(merger.merge("planejamento trimestral completo"), (0, ["trimestral", "completo"]))
+
+    def test_window_without_overlap_is_skipped_until_confirmed(self):
+        merger = RollingMerger(resync_frames=3)
+        merger.merge("hoje vamos falar sobre o projeto")
+        # Leitura ruim: não repete a janela inteira na transcrição
+        self.assertEqual(merger.merge("xx yy zz"), (0, []))
+        self.assertEqual(merger.merge("outra tela agora"), (0, []))
+        self.assertEqual(merger.skipped_count, 2)
+        # Terceira leitura seguida sem emenda: a tela mudou de fato
+        self.assertEqual(merger.merge("outra tela agora"), (0, ["outra", "tela", "agora"]))
+        self.assertEqual(merger.merge("tela agora mesmo"), (0, ["mesmo"]))
+
+
+class TestStabilizerRollingMode(unittest.TestCase):
+    def setUp(self):
+        self.committed = []
+        self.clock = ManualClock(0.0)
+        self.stabilizer = CaptionStabilizer(self.committed.append, initial_timeout_ms=500, clock=self.clock)
+        self.stabilizer.set_rolling_mode(True)
+
+    def test_sliding_window_is_not_duplicated(self):
+        self.stabilizer.process_batch([
+            (0.0, "hoje vamos falar"),
+            (0.2, "hoje vamos falar sobre o"),
+            (0.4, "vamos falar sobre o projeto"),
+            (0.6, "sobre o projeto novo"),
+            (2.0, "sobre o projeto novo"),
+            (2.2, "projeto novo da equipe"),
+        ])
+        self.assertEqual(self.committed, ["hoje vamos falar sobre o projeto novo", "da equipe"])
+
+    def test_correction_of_pending_word(self):
+        self.stabilizer.process_new_text("hoje vamos progra")
+        self.clock.advance(0.2)
+        self.stabilizer.process_new_text("hoje vamos programar juntos")
+        self.assertEqual(self.stabilizer.current_buffer, "hoje vamos programar juntos")
+
+
+if __name__ == '__main__':
+    unittest.main()
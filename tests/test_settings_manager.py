@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.core.settings_manager import SettingsManager
+
+
+class TestSettingsManagerWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "user_settings.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _saved(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_synchronous_mode_writes_immediately(self):
+        manager = SettingsManager(self.path)
+        manager.set("timeout_ms", 1234)
+        self.assertEqual(self._saved()["timeout_ms"], 1234)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_changes_within_window_are_coalesced(self):
+        manager = SettingsManager(self.path, debounce_ms=100)
+        writes = []
+        original = manager._write_now
+        manager._write_now = lambda: (writes.append(1), original())
+        for value in range(20):
+            manager.set_multiple({"timeout_ms": 1000 + value})
+        self.assertFalse(os.path.exists(self.path))  # Ainda na janela de debounce
+        time.sleep(0.4)
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(self._saved()["timeout_ms"], 1019)
+        manager.close()
+
+    def test_close_flushes_pending_changes(self):
+        manager = SettingsManager(self.path, debounce_ms=60000)
+        manager.set("preset", "fast")
+        manager.close()
+        self.assertEqual(self._saved()["preset"], "fast")
+        self.assertEqual(SettingsManager(self.path).get("preset"), "fast")
+
+
+if __name__ == '__main__':
+    unittest.main()
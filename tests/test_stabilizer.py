@@ -1,14 +1,16 @@
 import unittest
-import time
-from src.core.stabilizer import CaptionStabilizer
+from src.core.stabilizer import CaptionStabilizer, ManualClock
 
 class TestCaptionStabilizer(unittest.TestCase):
     def setUp(self):
         self.committed_phrases = []
+        # Relógio virtual: os testes avançam o tempo sem time.sleep
+        self.clock = ManualClock(1000.0)
         # Callback simples que guarda o que foi commitado
         self.stabilizer = CaptionStabilizer(
             on_commit_callback=lambda text: self.committed_phrases.append(text),
-            initial_timeout_ms=100
+            initial_timeout_ms=100,
+            clock=self.clock
         )
 
     def test_basic_deduplication(self):
@@ -32,7 +34,7 @@ class TestCaptionStabilizer(unittest.TestCase):
 
     def test_commit_on_timeout(self):
         self.stabilizer.process_new_text("Frase isolada")
-        time.sleep(0.2) # Espera 200ms (timeout é 100ms)
+        self.clock.advance(0.2) # Avança 200ms (timeout é 100ms)
 
         # O process_new_text com texto vazio ou force_check deve disparar o commit
         self.stabilizer.force_check()
@@ -53,8 +55,8 @@ class TestCaptionStabilizer(unittest.TestCase):
             self.stabilizer.update_deltas.append(100)
 
         # Força recalculo
-        time.sleep(0.2)
-        self.stabilizer._recalculate_if_needed(time.time())
+        self.clock.advance(0.2)
+        self.stabilizer._recalculate_if_needed(self.clock())
 
         # Média = 100. Stdev = 0.
         # Fórmula: Avg + 3*Stdev + 500 = 100 + 0 + 500 = 600
@@ -77,7 +79,7 @@ class TestCaptionStabilizer(unittest.TestCase):
         self.stabilizer.process_new_text(inputs[4])
 
         # Force flush final
-        time.sleep(0.2)
+        self.clock.advance(0.2)
         self.stabilizer.force_check()
 
         expected = ["Ola tudo bem.", "Hoje vamos programar"]
@@ -1,5 +1,7 @@
 import unittest
-from src.core.stabilizer import CaptionStabilizer
+import random
+import time
+from src.core.stabilizer import CaptionStabilizer, ManualClock
 
 class TestStabilizerExtended(unittest.TestCase):
     def setUp(self):
@@ -23,5 +25,115 @@ class TestStabilizerExtended(unittest.TestCase):
         self.assertEqual(self.stabilizer.current_buffer, "hello")
         self.assertEqual(len(self.committed), 0)
 
+class TestStabilizerBatchReplay(unittest.TestCase):
+    def _replay(self, events):
+        committed = []
+        stabilizer = CaptionStabilizer(
+            on_commit_callback=committed.append,
+            initial_timeout_ms=500,
+            clock=ManualClock(0.0)
+        )
+        stabilizer.process_batch(events)
+        return committed
+
+    def test_timeout_fires_between_events(self):
+        # Silêncio de 2s entre os textos: o timeout deve commitar antes do próximo evento,
+        # mesmo que o novo texto seja uma expansão do buffer.
+        events = [(0.0, "Ola"), (0.2, "Ola tudo"), (2.2, "Ola tudo bem, como vai voce hoje?")]
+        committed = self._replay(events)
+        self.assertEqual(committed, ["Ola tudo", "Ola tudo bem, como vai voce hoje?"])
+
+    def test_flush_commits_pending_buffer(self):
+        committed = []
+        stabilizer = CaptionStabilizer(committed.append, initial_timeout_ms=500, clock=ManualClock(0.0))
+        commits = stabilizer.process_batch([(0.0, "Primeira frase")], flush=False)
+        self.assertEqual(commits, 0)
+        self.assertEqual(stabilizer.current_buffer, "Primeira frase")
+
+        commits = stabilizer.process_batch([])
+        self.assertEqual(commits, 1)
+        self.assertEqual(committed, ["Primeira frase"])
+        self.assertAlmostEqual(stabilizer.clock(), 0.5)
+
+    def test_replay_is_deterministic_and_fast(self):
+        # Uma hora de legendas (uma frase a cada 3s, atualizada a cada 200ms)
+        rng = random.Random(42)
+        vocabulary = ["reuniao", "projeto", "cliente", "entrega", "sprint", "bug", "deploy",
+                      "amanha", "semana", "revisar", "codigo", "teste", "servidor", "banco",
+                      "dados", "equipe", "prazo", "tarefa", "documento", "versao"]
+        events = []
+        for n in range(1200):
+            base = n * 3.0
+            words = rng.sample(vocabulary, 6)
+            for i in range(1, len(words) + 1):
+                events.append((base + i * 0.2, " ".join(words[:i])))
+
+        start = time.perf_counter()
+        first = self._replay(events)
+        elapsed = time.perf_counter() - start
+        second = self._replay(events)
+
+        self.assertEqual(first, second)
+        self.assertGreater(len(first), 0)
+        self.assertLess(elapsed, 30.0)
+
+    def test_default_clock_uses_virtual_time_only_during_batch(self):
+        committed = []
+        real_clock = lambda: 1000.0
+        stabilizer = CaptionStabilizer(committed.append, initial_timeout_ms=500, clock=real_clock)
+        stabilizer.process_batch([(10.0, "Frase unica")])
+        self.assertIs(stabilizer.clock, real_clock)
+        self.assertEqual(committed, ["Frase unica"])
+
+        # Sem flush, o buffer pendente continua valendo no relógio original
+        stabilizer.process_batch([(20.0, "Outra frase"), (20.2, "Outra frase aqui")], flush=False)
+        self.assertIs(stabilizer.clock, real_clock)
+        self.assertEqual(stabilizer.current_buffer, "Outra frase aqui")
+        self.assertAlmostEqual(stabilizer.get_next_deadline(), 1000.5)
+
+    def test_apply_config_uses_preset_keys(self):
+        stabilizer = CaptionStabilizer(lambda text: None, initial_timeout_ms=500, clock=ManualClock(0.0))
+        stabilizer.apply_config({'timeout_ms': 2500, 'similarity_threshold': 0.55,
+                                 'repetition_threshold': 0.75, 'name': 'ignorado'})
+        self.assertEqual(stabilizer.silence_timeout_ms, 2500)
+        self.assertAlmostEqual(stabilizer.similarity_threshold, 0.55)
+        self.assertAlmostEqual(stabilizer.repetition_threshold, 0.75)
+
+class TestStabilizerDeadline(unittest.TestCase):
+    def setUp(self):
+        self.committed = []
+        self.deadlines = []
+        self.clock = ManualClock(100.0)
+        self.stabilizer = CaptionStabilizer(self.committed.append, initial_timeout_ms=500, clock=self.clock)
+        self.stabilizer.set_deadline_callback(self.deadlines.append)
+
+    def test_no_deadline_while_idle(self):
+        self.assertIsNone(self.stabilizer.get_next_deadline())
+        self.stabilizer.force_check()
+        self.assertEqual(self.deadlines, [None])
+
+    def test_deadline_follows_last_update(self):
+        self.stabilizer.process_new_text("Ola")
+        self.assertAlmostEqual(self.deadlines[-1], 100.5)
+        self.clock.advance(0.2)
+        self.stabilizer.process_new_text("Ola tudo")
+        self.assertAlmostEqual(self.deadlines[-1], 100.7)
+
+    def test_deadline_cleared_after_timeout_commit(self):
+        self.stabilizer.process_new_text("Frase isolada")
+        self.clock.advance(0.5)
+        self.stabilizer.force_check()
+        self.assertEqual(self.committed, ["Frase isolada"])
+        self.assertIsNone(self.deadlines[-1])
+
+    def test_early_wakeup_republishes_deadline(self):
+        self.stabilizer.process_new_text("Frase isolada")
+        count = len(self.deadlines)
+        self.clock.advance(0.3)
+        self.stabilizer.force_check()
+        self.assertEqual(self.committed, [])
+        self.assertEqual(len(self.deadlines), count + 1)
+        self.assertAlmostEqual(self.deadlines[-1], 100.5)
+
 if __name__ == '__main__':
     unittest.main()
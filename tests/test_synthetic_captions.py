@@ -0,0 +1,89 @@
+import unittest
+
+from src.core.caption_timeline import CaptionTimeline, MODE_SCROLLING, MAX_SCROLL_WORDS
+
+try:
+    import cv2  # noqa: F401
+    from src.utils.synthetic_captions import STYLES, SyntheticCaptionSource, SyntheticCapture, to_renderable
+except ImportError:
+    cv2 = None
+
+
+class TestCaptionTimeline(unittest.TestCase):
+    def setUp(self):
+        self.timeline = CaptionTimeline(["um dois tres", "quatro cinco"], words_per_second=2.0, hold_s=1.0)
+
+    def test_expanding_reveals_words_then_replaces(self):
+        self.assertEqual(self.timeline.text_at(-1), "")
+        self.assertEqual(self.timeline.text_at(0.0), "um")
+        self.assertEqual(self.timeline.text_at(0.6), "um dois")
+        self.assertEqual(self.timeline.text_at(1.9), "um dois tres")
+        self.assertEqual(self.timeline.text_at(2.0), "quatro")
+        self.assertEqual(self.timeline.duration, 3.5)
+        self.assertEqual(self.timeline.text_at(3.5), "um")  # loop
+
+    def test_scrolling_keeps_previous_sentences(self):
+        timeline = CaptionTimeline(["um dois tres", "quatro cinco"], words_per_second=2.0,
+                                   hold_s=1.0, mode=MODE_SCROLLING)
+        self.assertEqual(timeline.text_at(2.6), "um dois tres quatro cinco")
+        self.assertEqual(timeline.text_at(3.5), "um dois tres quatro cinco um")
+        long_run = CaptionTimeline(["a b c d e f g h i j"] * 20, words_per_second=10, mode=MODE_SCROLLING)
+        self.assertEqual(len(long_run.text_at(long_run.duration - 0.01).split()), MAX_SCROLL_WORDS)
+
+    def test_transcript_end_is_when_sentence_is_complete(self):
+        self.assertEqual(self.timeline.transcript(), [
+            {"start": 0.0, "end": 1.0, "text": "um dois tres"},
+            {"start": 2.0, "end": 2.5, "text": "quatro cinco"},
+        ])
+        self.assertEqual(len(self.timeline.transcript(12.0)), 7)
+
+    def test_flicker_is_deterministic_and_rate_bounded(self):
+        timeline = CaptionTimeline(["o gato comeu a sopa"], flicker_rate=0.3, seed=7)
+        results = [timeline.frame_text(1.0, i) for i in range(1000)]
+        self.assertEqual(results, [timeline.frame_text(1.0, i) for i in range(1000)])
+        flickered = sum(1 for _, bad in results if bad)
+        self.assertTrue(200 < flickered < 400)
+        clean = CaptionTimeline(["o gato comeu a sopa"])
+        self.assertFalse(any(clean.frame_text(1.0, i)[1] for i in range(100)))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            CaptionTimeline(["x"], mode="diagonal")
+        with self.assertRaises(ValueError):
+            CaptionTimeline([" "])
+
+
+@unittest.skipIf(cv2 is None, "OpenCV/numpy não instalados")
+class TestSyntheticCapture(unittest.TestCase):
+    def test_renders_bgra_frames_for_every_style(self):
+        for style in STYLES:
+            source = SyntheticCaptionSource(style, width=640, height=120)
+            frame = source.render(2.0, frame_index=10)
+            self.assertEqual(frame.shape, (120, 640, 4))
+            self.assertTrue(source.visible_lines(2.0))
+            self.assertGreater(int(frame[:, :, :3].max()) - int(frame[:, :, :3].min()), 100)
+
+    def test_lines_fit_the_region(self):
+        source = SyntheticCaptionSource("teams", sentences=["palavra " * 40], width=300, words_per_second=100)
+        lines = source.visible_lines(1.0)
+        self.assertLessEqual(len(lines), STYLES["teams"]["max_lines"])
+        for line in lines:
+            (w, _), _ = cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 1)
+            self.assertLessEqual(w, 300)
+
+    def test_capture_backend_follows_clock(self):
+        now = [10.0]
+        capture = SyntheticCapture(SyntheticCaptionSource("zoom"), speed=2.0, clock=lambda: now[0])
+        region = {"top": 0, "left": 0, "width": 400, "height": 100}
+        self.assertEqual(capture.grab(region).shape, (100, 400, 4))
+        now[0] = 11.5
+        capture.grab(region)
+        self.assertEqual(capture.last_time, 3.0)
+        self.assertEqual(capture.frame_index, 2)
+
+    def test_to_renderable(self):
+        self.assertEqual(to_renderable("Reunião às três"), "Reuniao as tres")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import datetime
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import time_index
+from src.core.file_manager import FileManager
+
+
+def _write_captions(path, start, count, step_s, every=2):
+    """Escreve `count` linhas a partir de `start`, uma a cada `step_s` segundos, com índice."""
+    writer = time_index.TimeIndexWriter(path, every=every)
+    offset = 0
+    with open(path, "wb") as f:
+        for i in range(count):
+            moment = start + datetime.timedelta(seconds=i * step_s)
+            line = f"[{moment.strftime('%H:%M:%S')}] frase {i}\n".encode("utf-8")
+            writer.note_line(moment.timestamp(), offset)
+            f.write(line)
+            offset += len(line)
+    writer.close()
+
+
+class TestTimeIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "captions_current.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_records_every_n_lines(self):
+        _write_captions(self.path, datetime.datetime(2026, 10, 18, 10, 0, 0), 10, 60, every=4)
+        records = time_index.load_index(self.path)
+        self.assertEqual(len(records), 3)  # Linhas 0, 4 e 8
+        self.assertTrue(time_index.is_index_valid(self.path, records))
+
+    def test_range_read_across_midnight(self):
+        start = datetime.datetime(2026, 10, 18, 23, 50, 0)
+        _write_captions(self.path, start, 40, 60)
+        lines = list(time_index.iter_range(self.path,
+                                           datetime.datetime(2026, 10, 19, 0, 5, 0),
+                                           datetime.datetime(2026, 10, 19, 0, 8, 0)))
+        self.assertEqual([text for _, text in lines], ["frase 15", "frase 16", "frase 17"])
+        self.assertEqual(lines[0][0], datetime.datetime(2026, 10, 19, 0, 5, 0))
+
+    def test_rebuild_matches_written_index(self):
+        start = datetime.datetime(2026, 10, 18, 9, 0, 0)
+        _write_captions(self.path, start, 9, 30)
+        written = time_index.load_index(self.path)
+        time_index.rebuild_index(self.path, every=2, start_date=start.date())
+        self.assertEqual(time_index.load_index(self.path), written)
+
+    def test_index_pointing_past_end_is_invalid(self):
+        _write_captions(self.path, datetime.datetime(2026, 10, 18, 9, 0, 0), 5, 30)
+        with open(self.path, "wb"):
+            pass
+        self.assertFalse(time_index.is_index_valid(self.path))
+
+
+class TestFileManagerTimeIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_index_follows_rotation_and_range_reads_all_files(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os", index_every=2)
+        manager.MAX_FILE_SIZE = 100
+        for i in range(10):
+            manager.append_text(f"frase numero {i} com algum texto")
+        manager.flush()
+
+        manager._wait_maintenance()
+        history = glob.glob(os.path.join(self.tmpdir, "captions_hist_*.txt.gz"))
+        self.assertTrue(history)
+        for hist in history:
+            self.assertTrue(time_index.load_index(hist))  # O índice acompanha o arquivo comprimido
+
+        now = datetime.datetime.now()
+        texts = [text for _, text in manager.read_range(now - datetime.timedelta(minutes=5),
+                                                        now + datetime.timedelta(minutes=5))]
+        manager.close()
+        self.assertEqual(len(texts), 10)
+        self.assertTrue(all(f"frase numero {i} " in text for i, text in enumerate(texts)))
+
+    def test_clear_removes_indexes(self):
+        manager = FileManager(output_dir=self.tmpdir, durability="os")
+        manager.append_text("frase")
+        manager.clear_all_files()
+        manager.close()
+        index_path = time_index.index_path_for(os.path.join(self.tmpdir, FileManager.CURRENT_FILE))
+        self.assertEqual(os.path.getsize(index_path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
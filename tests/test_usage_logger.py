@@ -0,0 +1,137 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.core.log_index import find_log_files
+from src.core.usage_logger import UsageLogger, parse_level
+from src.utils.compression import open_text
+
+
+class TestUsageLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _read_entries(self):
+        entries = []
+        for path in find_log_files(self.tmpdir):
+            with open_text(path) as f:
+                entries.extend(json.loads(line) for line in f if line.strip())
+        return entries
+
+    def test_parse_level(self):
+        self.assertEqual(parse_level("sample:5"), ("sample", 5))
+        self.assertEqual(parse_level("count"), ("count", 1))
+        self.assertEqual(parse_level("bogus"), ("full", 1))
+
+    def test_high_frequency_events_become_counters(self):
+        logger = UsageLogger(log_dir=self.tmpdir)
+        for _ in range(100):
+            logger.log_event("TEXT_DETECTED", "Texto detectado pelo OCR", {"text_length": 10})
+        logger.log_event("RECORDING_STARTED", "Gravação iniciada")
+        logger.log_config_change("timeout_ms", 1000, 1500)
+        logger.close()
+
+        entries = self._read_entries()
+        event_types = [e["data"].get("event_type") for e in entries if e["category"] == "EVENT"]
+        self.assertEqual(event_types, ["RECORDING_STARTED"])
+        self.assertEqual(len([e for e in entries if e["category"] == "CONFIG"]), 1)
+        metrics = [e for e in entries if e["category"] == "METRICS"]
+        self.assertEqual(metrics[0]["data"]["counters"]["EVENT:TEXT_DETECTED"], 100)
+
+    def test_sampling_keeps_one_in_n(self):
+        logger = UsageLogger(log_dir=self.tmpdir, levels={"TEXT_PROCESSING": "sample:10"})
+        for i in range(30):
+            logger.log_text_processing("NEW_PHRASE", f"frase {i}")
+        logger.close()
+        processed = [e for e in self._read_entries() if e["category"] == "TEXT_PROCESSING"]
+        self.assertEqual(len(processed), 3)
+
+    def test_metrics_snapshot_is_single_record(self):
+        logger = UsageLogger(log_dir=self.tmpdir)
+        for i in range(50):
+            logger.log_decision("EXACT_DUPLICATE_DETECTED", "Duplicata exata ignorada")
+            logger.observe("similarity", i / 50)
+        logger.flush_metrics()
+        logger.close()
+        entries = self._read_entries()
+        self.assertEqual(len([e for e in entries if e["category"] == "DECISION"]), 0)
+        metrics = [e for e in entries if e["category"] == "METRICS"]
+        self.assertEqual(len(metrics), 1)
+        self.assertEqual(metrics[0]["data"]["counters"]["DECISION:EXACT_DUPLICATE_DETECTED"], 50)
+        self.assertEqual(metrics[0]["data"]["histograms"]["similarity"]["count"], 50)
+
+    def test_metrics_snapshot_written_on_timer_without_new_events(self):
+        logger = UsageLogger(log_dir=self.tmpdir, metrics_interval_s=0.05)
+        logger.increment("frames", 3)
+        deadline = time.monotonic() + 2
+        metrics = []
+        while not metrics and time.monotonic() < deadline:
+            time.sleep(0.02)
+            logger._writer.flush()
+            metrics = [e for e in self._read_entries() if e["category"] == "METRICS"]
+        logger.close()
+        self.assertEqual(metrics[0]["data"]["counters"]["frames"], 3)
+
+    def test_idle_snapshot_skipped_after_drops_already_reported(self):
+        logger = UsageLogger(log_dir=self.tmpdir)
+        logger._writer._count_drop()
+        logger.flush_metrics()
+        logger.flush_metrics()  # Nada novo: nem métricas nem descartes desde o último snapshot
+        logger._writer._count_drop()
+        logger.flush_metrics()
+        logger.close()
+        metrics = [e for e in self._read_entries() if e["category"] == "METRICS"]
+        self.assertEqual([m["data"]["dropped_total"] for m in metrics], [1, 2])
+
+    def test_file_closed_by_writer_thread(self):
+        logger = UsageLogger(log_dir=self.tmpdir)
+        logger.log_event("RECORDING_STARTED", "Gravação iniciada")
+        logger.close()
+        self.assertFalse(logger._writer.is_running())
+        self.assertTrue(logger.file.closed)
+        logger.close()  # Idempotente
+
+    def test_debug_mode_logs_every_event(self):
+        logger = UsageLogger(log_dir=self.tmpdir, debug_events=True)
+        for _ in range(5):
+            logger.log_event("TEXT_DETECTED", "Texto detectado pelo OCR")
+        logger.close()
+        detected = [e for e in self._read_entries() if e["data"].get("event_type") == "TEXT_DETECTED"]
+        self.assertEqual(len(detected), 5)
+
+    def test_protected_categories_cannot_be_filtered(self):
+        logger = UsageLogger(log_dir=self.tmpdir, levels={"AUTO_ADJUST": "off"})
+        logger.log_auto_adjust("timeout_ms", 1000, 1200, "teste")
+        logger.close()
+        self.assertEqual(len([e for e in self._read_entries() if e["category"] == "AUTO_ADJUST"]), 1)
+
+    def test_rotation_without_stat(self):
+        logger = UsageLogger(log_dir=self.tmpdir, max_file_size=500, levels={"TEXT_PROCESSING": "full"})
+        for i in range(20):
+            logger.log_text_processing("NEW_PHRASE", f"frase número {i}")
+        logger.close()
+        self.assertGreater(len(find_log_files(self.tmpdir)), 1)
+        # Partes rotacionadas são comprimidas; só a atual continua em texto puro
+        self.assertEqual(len(glob.glob(os.path.join(self.tmpdir, "usage_*.log"))), 1)
+        processed = [e for e in self._read_entries() if e["category"] == "TEXT_PROCESSING"]
+        self.assertEqual(len(processed), 20)
+
+    def test_retention_removes_oldest_parts(self):
+        old_part = os.path.join(self.tmpdir, "usage_2020-01-01_00-00-00_part1.log")
+        with open(old_part, "w", encoding="utf-8") as f:
+            f.write("{}\n")
+        old_time = time.time() - 90 * 86400
+        os.utime(old_part, (old_time, old_time))
+        logger = UsageLogger(log_dir=self.tmpdir, max_age_days=30)
+        logger.close()
+        self.assertEqual(glob.glob(os.path.join(self.tmpdir, "usage_2020-*")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()